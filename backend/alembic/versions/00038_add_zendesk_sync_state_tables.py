@@ -0,0 +1,61 @@
+"""add zendesk sync state tables
+
+Moves the Zendesk article sync watermark and the per-article updated_at map
+out of knowledge_bases.extra_metadata into dedicated tables.
+
+Revision ID: 3d9e1f0a7b21
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9e1f0a7b21'
+down_revision: Union[str, None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'zendesk_sync_states',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('kb_id', sa.UUID(), nullable=False),
+        sa.Column('watermark', sa.BigInteger(), nullable=True),
+        sa.Column('last_full_sync', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.Column('is_deleted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('updated_by', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['kb_id'], ['knowledge_bases.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kb_id', name='zendesk_sync_states_kb_unique')
+    )
+    op.create_table(
+        'zendesk_synced_articles',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('kb_id', sa.UUID(), nullable=False),
+        sa.Column('article_id', sa.String(length=64), nullable=False),
+        sa.Column('article_updated_at', sa.String(length=64), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.Column('is_deleted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('updated_by', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['kb_id'], ['knowledge_bases.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kb_id', 'article_id', name='zendesk_synced_articles_unique')
+    )
+    op.create_index('idx_zendesk_synced_articles_kb', 'zendesk_synced_articles', ['kb_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_zendesk_synced_articles_kb', table_name='zendesk_synced_articles')
+    op.drop_table('zendesk_synced_articles')
+    op.drop_table('zendesk_sync_states')
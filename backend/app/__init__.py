@@ -19,6 +19,7 @@ from app.db.multi_tenant_session import multi_tenant_manager
 
 from celery.schedules import crontab
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 
 init_logging()
@@ -181,6 +182,63 @@ async def _cleanup_websocket_services():
         logger.error(f"Error during SocketConnectionManager cleanup: {e}")
 
 
+def _start_llm_provider_invalidation():
+    """
+    Listen for LLM provider edits made by other API workers.
+    """
+    from app.modules.workflow.llm.provider_invalidation import start_invalidation_listener
+
+    try:
+        start_invalidation_listener()
+    except Exception as e:
+        logger.error(f"Failed to start LLM provider invalidation listener: {e}")
+
+
+def _stop_llm_provider_invalidation():
+    from app.modules.workflow.llm.provider_invalidation import stop_invalidation_listener
+
+    try:
+        stop_invalidation_listener()
+    except Exception as e:
+        logger.error(f"Error stopping LLM provider invalidation listener: {e}")
+
+
+async def _cleanup_http_clients():
+    """
+    Close pooled outbound HTTP clients (keep-alive connections to integrations).
+    """
+    from app.core.http_client import close_http_clients
+
+    try:
+        await close_http_clients()
+    except Exception as e:
+        logger.error(f"Error closing outbound HTTP clients: {e}")
+
+
+async def _cleanup_vector_stores():
+    """
+    Flush FAISS collections with unsaved changes.
+    """
+    from app.modules.data.providers.vector.db.faiss import flush_faiss_collections
+
+    try:
+        await flush_faiss_collections()
+    except Exception as e:
+        logger.error(f"Error flushing FAISS collections: {e}")
+
+
+def _cleanup_extraction_workers():
+    """
+    Stop document extraction worker processes.
+    """
+    from app.modules.data.utils.extraction_service import shutdown_extraction_service
+
+    try:
+        shutdown_extraction_service()
+    except Exception as e:
+        logger.error(f"Error stopping document extraction workers: {e}")
+
+
 # --------------------------------------------------------------------------- #
 # Lifespan handler                                                            #
 # --------------------------------------------------------------------------- #
@@ -204,6 +262,7 @@ async def _lifespan(app: FastAPI):
     # Initialize services in dependency order
     redis_string, redis_binary = await _initialize_redis_services(app)
     await _initialize_websocket_services()
+    _start_llm_provider_invalidation()
 
     # Initialize database and application services
     await multi_tenant_manager.initialize()
@@ -222,6 +281,10 @@ async def _lifespan(app: FastAPI):
 
         # Clean up services in reverse dependency order
         await _cleanup_websocket_services()
+        _stop_llm_provider_invalidation()
+        await _cleanup_http_clients()
+        _cleanup_extraction_workers()
+        await _cleanup_vector_stores()
         await _cleanup_redis_services(app, redis_string, redis_binary)
         await multi_tenant_manager.close_all()
 
@@ -356,3 +419,18 @@ def create_celery():
     }
 
     return celery_app
+
+
+@worker_process_init.connect
+def _celery_worker_process_init(**kwargs):
+    # Celery processes keep their own LLMProvider per tenant
+    _start_llm_provider_invalidation()
+
+
+@worker_process_shutdown.connect
+def _celery_worker_process_shutdown(**kwargs):
+    _stop_llm_provider_invalidation()
+    # Vector store changes still waiting for their write-behind flush
+    from app.modules.data.providers.vector.db.faiss import flush_faiss_collections_sync
+
+    flush_faiss_collections_sync()
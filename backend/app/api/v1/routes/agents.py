@@ -1,14 +1,18 @@
+import json
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi_injector import Injected
+from fastapi.responses import StreamingResponse
+from fastapi_injector import Injected, RequestScopeFactory
 from app.core.permissions.constants import Permissions as P
 from app.auth.dependencies import auth, permissions
 from app.cache.redis_cache import invalidate_agent_cache
 from app.core.exceptions.error_messages import ErrorKey
 from app.core.exceptions.exception_classes import AppException
+from app.core.tenant_scope import get_tenant_context, set_tenant_context
+from app.dependencies.injector import injector
 from app.modules.workflow.registry import RegistryItem
 from app.schemas.agent import QueryRequest
 from app.services.agent_config import AgentConfigService
@@ -62,31 +66,56 @@ async def query_agent(
                                                                                         request.metadata else {}), "thread_id": thread_id})
 
 
-async def run_query_agent_logic(
-        agent_service: AgentConfigService,
-        agent_id: str,
-        session_message: str,
-        metadata: Optional[Dict[str, Any]] = None,
-        ):
+@router.post("/{agent_id}/query/{thread_id}/stream", dependencies=[
+        Depends(auth),
+    ])
+async def query_agent_stream(
+        agent_id: UUID,
+        thread_id: str,
+        request: QueryRequest,
+        agent_service: AgentConfigService = Injected(AgentConfigService),
+):
     """
-    Run a query against an agent.
+    Same as query_agent, streamed as server-sent events.
 
-    Fetches agent from database on demand - always gets latest configuration.
+    Sends `token` events ({"node_id", "delta"}) while the answer is generated,
+    then one `final` event with the query_agent response, or an `error` event.
     """
-
-    # Fetch agent from database and execute
+    metadata = {**(request.metadata if request.metadata else {}), "thread_id": thread_id}
+    # Load the agent now, so a missing or inactive agent is a plain HTTP error
+    agent = await _load_agent(agent_service, str(agent_id))
+    tenant_id = get_tenant_context()
+
+    async def events() -> AsyncIterator[str]:
+        # The request scope ends with the route; the run gets its own
+        async with injector.get(RequestScopeFactory).create_scope():
+            set_tenant_context(tenant_id)
+            try:
+                async for event in _stream_agent(agent, str(agent_id), request.query, metadata):
+                    event_type = event.pop("type")
+                    yield f"event: {event_type}\ndata: {json.dumps(event, default=str)}\n\n"
+            except Exception as e:
+                logger.error(f"Error streaming agent {agent_id}: {e}")
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                yield f"event: error\ndata: {json.dumps({'detail': detail}, default=str)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _load_agent(agent_service: AgentConfigService, agent_id: str) -> RegistryItem:
+    # Fetch agent from database - always gets latest configuration
     agent = await agent_service.get_by_id_full(UUID(agent_id))
     if not agent.is_active:
         raise AppException(ErrorKey.AGENT_INACTIVE, status_code=400)
 
-    agent = RegistryItem(agent)
+    return RegistryItem(agent)
 
-    logger.info(f"Workflow Metadata: {metadata}")
 
-    result = await agent.execute(
-            session_message=session_message,
-            metadata=metadata
-            )
+def _backward_compatible_result(result: Dict[str, Any], agent_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
     logger.info(f"Workflow Final Result: {result}")
     backward_compatibility_result = {
                 "status": result.get("status"),
@@ -96,8 +125,61 @@ async def run_query_agent_logic(
                 "rag_used": False
 
     }
-    logger.info(f"Result: {result}")
     logger.info(f"Backward compatibility result: {backward_compatibility_result}")
     if backward_compatibility_result.get("status") == "error":
         raise HTTPException(status_code=400, detail=result.get("message"))
-    return backward_compatibility_result
\ No newline at end of file
+    return backward_compatibility_result
+
+
+async def _stream_agent(
+        agent: RegistryItem,
+        agent_id: str,
+        session_message: str,
+        metadata: Dict[str, Any],
+        ) -> AsyncIterator[Dict[str, Any]]:
+    logger.info(f"Workflow Metadata: {metadata}")
+    async for event in agent.stream(session_message=session_message, metadata=metadata):
+        if event["type"] == "final":
+            yield {"type": "final", "response": _backward_compatible_result(event["response"], agent_id, metadata)}
+        else:
+            yield event
+
+
+async def run_query_agent_logic(
+        agent_service: AgentConfigService,
+        agent_id: str,
+        session_message: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        ):
+    """
+    Run a query against an agent.
+
+    Fetches agent from database on demand - always gets latest configuration.
+    """
+    agent = await _load_agent(agent_service, agent_id)
+
+    logger.info(f"Workflow Metadata: {metadata}")
+
+    result = await agent.execute(
+            session_message=session_message,
+            metadata=metadata
+            )
+    return _backward_compatible_result(result, agent_id, metadata)
+
+
+async def run_query_agent_stream(
+        agent_service: AgentConfigService,
+        agent_id: str,
+        session_message: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        ) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of run_query_agent_logic.
+
+    Yields {"type": "token", "node_id", "delta"} events while the answer is
+    generated, then {"type": "final", "response": ...} with the same response
+    run_query_agent_logic returns.
+    """
+    agent = await _load_agent(agent_service, agent_id)
+    async for event in _stream_agent(agent, agent_id, session_message, metadata or {}):
+        yield event
@@ -2,7 +2,6 @@ from fastapi import APIRouter, Depends, status, UploadFile, Request
 from fastapi.responses import Response
 from uuid import UUID
 from typing import Optional, List
-import base64
 import mimetypes
 
 from app.schemas.file import (
@@ -61,19 +60,13 @@ async def get_file(
 @router.get("/files/{file_id}/download", response_model=FileResponse)
 async def download_file(
     file_id: UUID,
+    request: Request,
     service: FileManagerService = Injected(FileManagerService),
 ):
-    """Download a file by ID."""
+    """Download a file by ID (streamed, supports Range and If-None-Match)."""
     try:
-        # download the file
-        file, content = await service.download_file(file_id)
-        headers, media_type = service.build_file_headers(file, content=content, disposition_type="attachment")
-
-        return Response(
-            content=content,
-            media_type=media_type,
-            headers=headers
-        )
+        file = await service.get_file_by_id(file_id)
+        return await service.build_file_response(file, request, disposition_type="attachment")
     except Exception as e:
         raise AppException(
             error_key=ErrorKey.FILE_NOT_FOUND,
@@ -87,27 +80,11 @@ async def get_file_source(
     request: Request,
     service: FileManagerService = Injected(FileManagerService),
 ):
-    """Get file source content for inline display."""
+    """Get file source content for inline display (streamed, seekable via Range)."""
     try:
-        # For HEAD requests, only get metadata (no content download)
-        if request.method == "HEAD":
-            file = await service.get_file_by_id(file_id)
-            headers, media_type = service.build_file_headers(file, disposition_type="inline")
-            return Response(
-                content=b"",
-                media_type=media_type,
-                headers=headers
-            )
-
-        # For GET requests, download the file content
-        file, content = await service.download_file(file_id)
-        headers, media_type = service.build_file_headers(file, content=content, disposition_type="inline")
-
-        return Response(
-            content=content,
-            media_type=media_type,
-            headers=headers
-        )
+        # HEAD requests get the same headers without any content being read
+        file = await service.get_file_by_id(file_id)
+        return await service.build_file_response(file, request, disposition_type="inline")
     except Exception as e:
         raise AppException(
             error_key=ErrorKey.FILE_NOT_FOUND,
@@ -123,18 +100,10 @@ async def get_file_base64(
 ):
     """Get file content as base64 encoded string (public endpoint)."""
     try:
-        file, content = await service.download_file(file_id)
-
-        # Encode content to base64
-        base64_content = base64.standard_b64encode(content).decode('utf-8')
-
-        return {
-            "file_id": str(file_id),
-            "name": file.name,
-            "mime_type": file.mime_type,
-            "size": file.size,
-            "content": base64_content
-        }
+        file = await service.get_file_by_id(file_id)
+
+        # Encoded incrementally while streaming from storage
+        return await service.build_file_base64_response(file)
     except Exception as e:
         raise AppException(
             error_key=ErrorKey.FILE_NOT_FOUND,
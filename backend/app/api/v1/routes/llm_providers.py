@@ -5,6 +5,7 @@ from fastapi_injector import Injected
 from app.core.permissions.constants import Permissions as P
 from app.auth.dependencies import auth, permissions
 from app.modules.workflow.llm.provider import LLMProvider
+from app.modules.workflow.llm.provider_invalidation import publish_invalidation
 from app.schemas.llm import LlmProviderCreate, LlmProviderRead, LlmProviderUpdate
 from app.services.llm_providers import LlmProviderService
 
@@ -54,6 +55,7 @@ async def create(
 ):
     res = await service.create(data)
     await llm_provider.reload()
+    await publish_invalidation([res.id])
     return res
 
 
@@ -70,6 +72,7 @@ async def update(
 ):
     res = await service.update(llm_provider_id, data)
     await llm_provider.reload()
+    await publish_invalidation([llm_provider_id])
     return res
 
 
@@ -84,4 +87,5 @@ async def delete(
 ):
     res = await service.delete(llm_provider_id)
     await llm_provider.reload()
+    await publish_invalidation([llm_provider_id])
     return res
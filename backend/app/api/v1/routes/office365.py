@@ -8,9 +8,10 @@ from app.auth.dependencies import auth, permissions
 from app.schemas.datasource import DataSourceUpdate
 from app.services.app_settings import AppSettingsService
 from app.services.datasources import DataSourceService
+from app.core.http_client import http_request
 from app.core.utils.encryption_utils import decrypt_key
 from fastapi_injector import Injected
-import requests
+import httpx
 from datetime import datetime, timedelta
 
 from app.tasks.sharepoint_tasks import import_sharepoint_files_to_kb_async_with_scope
@@ -171,8 +172,8 @@ async def get_office365_access_token(
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-        response = requests.post(
-            token_url, data=payload, headers=headers, timeout=30)
+        response = await http_request(
+            "POST", token_url, data=payload, headers=headers, timeout=30)
         response.raise_for_status()
         token_data = response.json()
 
@@ -189,9 +190,9 @@ async def get_office365_access_token(
             "scope": token_data.get("scope", ""),
         }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Office365 token exchange failed: {e}")
-        if hasattr(e, "response") and e.response is not None:
+        if isinstance(e, httpx.HTTPStatusError):
             logger.error(f"Response content: {e.response.text}")
         return None
     except KeyError as e:
@@ -213,8 +214,8 @@ async def get_office365_user_email(access_token: str) -> str:
             "Authorization": f"Bearer {access_token}",
             "Accept": "application/json"
         }
-        response = requests.get(
-            "https://graph.microsoft.com/v1.0/me", headers=headers, timeout=15)
+        response = await http_request(
+            "GET", "https://graph.microsoft.com/v1.0/me", headers=headers, timeout=15)
 
         if response.status_code != 200:
             logger.error(
@@ -5,6 +5,7 @@ Use this for testing and development purposes only.
 Available endpoints:
 - GET /api/v1/playground/ - Root endpoint
 - GET /api/v1/playground/health - Health check
+- GET /api/v1/playground/health/http_clients - Outbound HTTP pool and retry counters
 - GET/POST/PUT/DELETE/PATCH /api/v1/playground/mock/{endpoint} - Mock any endpoint
 - POST /api/v1/playground/echo - Echo request data
 - GET /api/v1/playground/sample-data - Return sample data
@@ -207,6 +208,19 @@ async def redis_health():
         }
 
 
+@router.get("/health/http_clients")
+async def http_clients_health():
+    """
+    Outbound HTTP client statistics: requests, retries, failures, latency and
+    connection reuse per origin (see app.core.http_client), and the hit rates
+    of API tool response caches.
+    """
+    from app.core.http_cache import get_http_cache_stats
+    from app.core.http_client import get_http_client_metrics
+
+    return {**get_http_client_metrics(), "caches": get_http_cache_stats()}
+
+
 @router.get("/mock/{endpoint}")
 async def mock_get_endpoint(endpoint: str, request: Request):
     """Mock any GET endpoint - returns the endpoint name and query parameters."""
@@ -5,7 +5,7 @@ import asyncio
 from uuid import UUID
 import uuid
 import websockets
-import httpx  # For making HTTP requests to the TTS API
+import httpx
 import audioop  # For audio format conversion
 import wave
 import io
@@ -19,6 +19,7 @@ from twilio.twiml.voice_response import VoiceResponse, Connect, Say, Stream
 from dotenv import load_dotenv
 from app.api.v1.routes.voice import get_openai_session_key
 from app.auth.dependencies import auth
+from app.core.http_client import http_request
 from app.modules.workflow.registry import RegistryItem
 from app.services.agent_config import AgentConfigService
 
@@ -110,51 +111,50 @@ async def text_to_speech_openai(text: str) -> bytes:
         "response_format": "wav",
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(api_url, headers=headers, json=data)
-            response.raise_for_status()
+    try:
+        response = await http_request("POST", api_url, headers=headers, json=data)
+        response.raise_for_status()
 
-            # Parse the WAV file
-            wav_data = response.content
-            wav_io = io.BytesIO(wav_data)
+        # Parse the WAV file
+        wav_data = response.content
+        wav_io = io.BytesIO(wav_data)
 
-            with wave.open(wav_io, "rb") as wav_file:
-                # Get audio parameters
-                sample_rate = wav_file.getframerate()
-                sample_width = wav_file.getsampwidth()
-                channels = wav_file.getnchannels()
+        with wave.open(wav_io, "rb") as wav_file:
+            # Get audio parameters
+            sample_rate = wav_file.getframerate()
+            sample_width = wav_file.getsampwidth()
+            channels = wav_file.getnchannels()
 
-                logger.debug(
-                    f"Original audio: {sample_rate}Hz, {sample_width}-byte samples, {channels} channels"
-                )
+            logger.debug(
+                f"Original audio: {sample_rate}Hz, {sample_width}-byte samples, {channels} channels"
+            )
 
-                # Read all audio data
-                audio_data = wav_file.readframes(wav_file.getnframes())
+            # Read all audio data
+            audio_data = wav_file.readframes(wav_file.getnframes())
 
-                # Downsample to 8kHz if needed
-                if sample_rate != 8000:
-                    audio_data, _ = audioop.ratecv(
-                        audio_data, sample_width, channels, sample_rate, 8000, None
-                    )
+            # Downsample to 8kHz if needed
+            if sample_rate != 8000:
+                audio_data, _ = audioop.ratecv(
+                    audio_data, sample_width, channels, sample_rate, 8000, None
+                )
 
-                # Convert to mono if stereo
-                if channels == 2:
-                    audio_data = audioop.tomono(audio_data, sample_width, 1, 1)
+            # Convert to mono if stereo
+            if channels == 2:
+                audio_data = audioop.tomono(audio_data, sample_width, 1, 1)
 
-                # Convert to µ-law
-                ulaw_data = audioop.lin2ulaw(audio_data, sample_width)
+            # Convert to µ-law
+            ulaw_data = audioop.lin2ulaw(audio_data, sample_width)
 
-                return ulaw_data
+            return ulaw_data
 
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                f"TTS API request failed with status {e.response.status_code}: {e.response.text}"
-            )
-            return None
-        except Exception as e:
-            logger.error(f"An unexpected error occurred during TTS processing: {e}")
-            return None
+    except httpx.HTTPStatusError as e:
+        logger.error(
+            f"TTS API request failed with status {e.response.status_code}: {e.response.text}"
+        )
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during TTS processing: {e}")
+        return None
 
 
 @router.get("", summary="Twilio Voice API Root Endpoint", dependencies=[
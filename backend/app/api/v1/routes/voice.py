@@ -4,7 +4,7 @@ import os
 from typing import Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
-import httpx
+from app.core.http_client import http_request
 from app.auth.dependencies import auth, permissions, socket_auth
 from app.services.auth import AuthService
 from app.auth.utils import has_permission, socket_user_id
@@ -66,11 +66,10 @@ async def get_openai_session_key(lang_code: str = Query(default=""), input_audio
                 ]
             }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, json=payload)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        data = response.json()
-        return data["client_secret"]["value"]
+    response = await http_request("POST", url, headers=headers, json=payload)
+    response.raise_for_status()  # Raise an exception for HTTP errors
+    data = response.json()
+    return data["client_secret"]["value"]
 
 @router.websocket("/audio/tts")
 async def ws_tts(
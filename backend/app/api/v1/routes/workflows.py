@@ -14,6 +14,8 @@ from app.services.workflow import WorkflowService
 from app.dependencies.injector import injector
 from app.modules.workflow.llm.provider import LLMProvider
 from app.modules.workflow.engine.workflow_engine import WorkflowEngine
+from app.modules.workflow.tracing import get_duration_stats, get_trace
+from app.core.tenant_scope import get_tenant_context
 
 from app.schemas.dynamic_form_schemas.nodes import NODE_DIALOG_SCHEMAS
 
@@ -92,6 +94,33 @@ async def get_node_dialog_schemas():
     return NODE_DIALOG_SCHEMAS
 
 
+@router.get(
+    "/traces/stats",
+    dependencies=[Depends(auth), Depends(permissions(P.Workflow.READ))],
+)
+async def get_trace_stats():
+    """
+    Sampled duration percentiles (ms) of the runs traced by this worker,
+    per node type, LLM call, tool and memory operation.
+    """
+    return get_duration_stats(get_tenant_context())
+
+
+@router.get(
+    "/traces/{execution_id}",
+    dependencies=[Depends(auth), Depends(permissions(P.Workflow.READ))],
+)
+async def get_trace_timeline(execution_id: str):
+    """
+    Gantt-style timeline of a recent run (execution_id of its state).
+    Only the worker that ran it has the trace; use the OTLP export for others.
+    """
+    trace = get_trace(execution_id, get_tenant_context())
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace.timeline()
+
+
 @router.get(
     "",
     response_model=List[Workflow],
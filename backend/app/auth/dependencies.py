@@ -15,7 +15,7 @@ from app.schemas.socket_principal import SocketPrincipal
 from app.schemas.user import UserReadAuth
 from app.services.auth import AuthService
 from app.core.config.settings import settings
-from app.core.tenant_scope import set_tenant_context
+from app.core.tenant_scope import get_tenant_context, set_tenant_context
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +67,31 @@ async def auth(
     else:
         raise AppException(status_code=401, error_key=ErrorKey.NOT_AUTHENTICATED)
 
+    await enforce_quota(request)
+
+
+async def enforce_quota(request: Request):
+    """
+    Charges the request against the tenant quota and, for API key auth, the key quota.
+    The resulting status is kept on request.state for the quota headers middleware.
+    """
+    if not settings.QUOTA_ENABLED:
+        return
+
+    from app.dependencies.injector import injector
+    from app.services.quotas import QuotaService
+
+    api_key = getattr(request.state, "api_key", None)
+    api_key_id = str(api_key.id) if api_key and getattr(api_key, "id", None) else None
+
+    quota_service = injector.get(QuotaService)
+    request.state.quota = await quota_service.check_quota(
+        get_tenant_context(), api_key_id
+    )
+
+    if request.state.quota is not None and not request.state.quota.allowed:
+        raise AppException(status_code=429, error_key=ErrorKey.QUOTA_EXCEEDED)
+
 
 def permissions(*permissions: str) -> Callable[[Request], Awaitable[None]]:
     async def wrapper(request: Request):
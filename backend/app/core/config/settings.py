@@ -1,4 +1,4 @@
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 from urllib.parse import quote, unquote 
 
 from pydantic import computed_field, ConfigDict, Field
@@ -20,8 +20,10 @@ class ProjectSettings(BaseSettings):
     REDIS_SSL: Optional[bool] = False
     REDIS_OVERRIDE_URL: Optional[str] = None
     # Memory efficiency settings for Redis conversations
-    CONVERSATION_MAX_MEMORY_MESSAGES: int = 50  # Max messages kept in memory
+    CONVERSATION_MAX_MEMORY_MESSAGES: int = 50  # Max messages kept per thread (Redis lists are trimmed to this)
     CONVERSATION_REDIS_EXPIRY_DAYS: int = 30  # Redis data expiration
+    CONVERSATION_MEMORY_TOKEN_BUDGET: int = 0  # Default history budget of LLM/agent nodes (0 = no summarisation)
+    CONVERSATION_SUMMARY_PROVIDER_ID: Optional[str] = None  # Cheap LLM provider for rolling summaries (default: the node's)
     # Redis connection pool settings
     # For 300-500 concurrent WebSocket users, 30-40 connections is optimal
     # Each publish takes ~5ms, so connections are rapidly reused
@@ -61,6 +63,16 @@ class ProjectSettings(BaseSettings):
     AGENT_FOLDER: str = str(DATA_VOLUME / "uploads/agents")
     RECORDINGS_DIR: str = str(DATA_VOLUME / "recordings")
 
+    # === Document Extraction (process pool) ===
+    EXTRACTION_MAX_WORKERS: int = 2  # 0 runs extraction in a thread of the calling process
+    EXTRACTION_TIMEOUT_SECONDS: int = 600  # per file, or per page batch for PDFs
+    EXTRACTION_MEMORY_LIMIT_MB: int = 2048  # address space a worker may add on top of its baseline; 0 = unlimited
+    EXTRACTION_MAX_TASKS_PER_WORKER: int = 50  # recycle workers to release memory held by parsers
+    EXTRACTION_PDF_PAGES_PER_TASK: int = 10  # pages per parallel PDF/OCR batch
+    EXTRACTION_CACHE_DIR: str = str(DATA_VOLUME / "extraction_cache")  # empty disables the cache
+    EXTRACTION_CACHE_MAX_MB: int = 512
+    LEXICAL_INDEX_DIR: str = str(DATA_VOLUME / "lexical_index")  # BM25 indexes for hybrid vector search
+
     # === Limits ===
     MAX_CONTENT_LENGTH: int = 50 * 1024 * 1024  # 50MB
     DEFAULT_WINDOW_SECONDS: int = 60
@@ -84,6 +96,18 @@ class ProjectSettings(BaseSettings):
     DB_POOL_TIMEOUT: int = 30  # seconds
     DB_POOL_RECYCLE: int = 1800  # seconds
 
+    # === Workflow Execution ===
+    WORKFLOW_MAX_PARALLEL_NODES: int = 8  # nodes running at once within one workflow run
+    WORKFLOW_PROCESS_MAX_PARALLEL_NODES: int = 64  # across all runs in this process
+    WORKFLOW_MAX_DB_SCOPES: int = 20  # concurrent request scopes (DB sessions) opened by workflow nodes
+    AGENT_TOOL_TIMEOUT: float = 60.0  # seconds per agent tool call
+    AGENT_MAX_PARALLEL_TOOLS: int = 4  # tool calls run at once within one agent turn
+    WORKFLOW_TRACING_ENABLED: bool = True  # per-node span tracing of workflow runs
+    WORKFLOW_TRACE_SAMPLE_RATE: float = 1.0  # fraction of runs traced
+    WORKFLOW_TRACE_BUFFER_SIZE: int = 200  # recent traces kept per process for the timeline API
+    WORKFLOW_TRACE_RESERVOIR_SIZE: int = 512  # sampled durations kept per node type for percentiles
+    WORKFLOW_TRACE_EXPORT_PATH: Optional[str] = None  # OTLP/JSON lines file read by an OpenTelemetry Collector
+
     # === Multi-Tenancy ===
     MULTI_TENANT_ENABLED: bool = False
     TENANT_HEADER_NAME: str = "x-tenant-id"
@@ -115,6 +139,11 @@ class ProjectSettings(BaseSettings):
     ZENDESK_EMAIL: Optional[str] = "<enter-value-here>"
     ZENDESK_API_TOKEN: Optional[str] = "<enter-value-here>"
     ZENDESK_CUSTOM_FIELD_CONVERSATION_ID: Optional[int] = 0
+    # Outbound request tuning (limits per tenant and Zendesk account)
+    ZENDESK_MAX_CONCURRENT_REQUESTS: int = 5
+    ZENDESK_MAX_RETRIES: int = 3  # retries on 429, honouring Retry-After
+    # Incremental article sync runs a full listing this often to detect deletions
+    ZENDESK_FULL_SYNC_INTERVAL_HOURS: int = 24
 
     AWS_RECORDINGS_BUCKET: Optional[str] = "genassist-dev-temp-bucket"
     AWS_S3_TEST_BUCKET: Optional[str] = "genassist-dev-temp-bucket"
@@ -124,6 +153,18 @@ class ProjectSettings(BaseSettings):
     CONNECT_TIMEOUT: float = 5.0
     MAX_CONNECTIONS: int = 20
     MAX_KEEPALIVE_CONNECTIONS: int = 10
+    # Shared outbound clients (app.core.http_client): one keep-alive pool per host
+    HTTP_CLIENT_TIMEOUT: float = 30.0
+    HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_CLIENT_MAX_CONCURRENCY_PER_HOST: int = 50  # requests in flight per host and process
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle connection is kept
+    HTTP_CLIENT_HTTP2: bool = True  # used when the h2 package is installed
+    HTTP_CLIENT_MAX_RETRIES: int = 2
+    HTTP_CLIENT_RETRY_BACKOFF: float = 0.2  # base seconds, doubled per attempt, full jitter
+    HTTP_CLIENT_RETRY_BACKOFF_MAX: float = 5.0
+    HTTP_CLIENT_MAX_HOSTS: int = 256  # idle pools beyond this are closed, least recently used first
+    # Per-host overrides of timeout, max_connections and max_concurrency
+    HTTP_CLIENT_HOST_OVERRIDES: Dict[str, Dict[str, float]] = {}
 
     # Test credentials
     TEST_USERNAME: Optional[str] = "test"
@@ -153,6 +194,15 @@ class ProjectSettings(BaseSettings):
     # Rate limit storage backend (redis or memory)
     RATE_LIMIT_STORAGE_BACKEND: str = "redis"  # "redis" or "memory"
 
+    # === Quota Configuration (Redis sliding window, per tenant / API key) ===
+    QUOTA_ENABLED: bool = False
+    # Requests allowed per DEFAULT_WINDOW_SECONDS; 0 disables that quota
+    QUOTA_TENANT_PER_WINDOW: int = 6000
+    QUOTA_API_KEY_PER_WINDOW: int = 600
+    # Permits reserved per Redis round trip and spent from an in-process cache
+    QUOTA_LOCAL_ALLOWANCE_BATCH: int = 5
+    QUOTA_LOCAL_ALLOWANCE_TTL: float = 1.0  # seconds
+
     # === Chroma Configuration ===
     CHROMA_HOST: str = Field(default="localhost", description="Database host")
     CHROMA_PORT: int = Field(default=8005, description="Database port")
@@ -0,0 +1,326 @@
+"""
+Response cache for outbound API calls of workflow tools.
+
+Opted into per node (`cacheResponses`). Entries are keyed on the tenant and
+the resolved request: method, URL with its query parameters, body and
+headers (so callers with different credentials never share an entry).
+Lifetimes follow the response's Cache-Control (s-maxage, max-age, no-cache,
+no-store) and Expires headers, falling back to the node's TTL when the API
+sends none. Stale entries carrying an ETag or Last-Modified are revalidated
+with a conditional request, and a 304 renews them without a new body.
+
+Identical requests in flight at the same time share one upstream call.
+
+    cache = get_http_cache(node_id, HttpCacheConfig(ttl_seconds=30))
+    response = await cache.request("GET", url, params=params, headers=headers)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+from pydantic import BaseModel, Field
+
+from app.core.http_client import http_request
+from app.core.tenant_scope import get_tenant_context
+
+logger = logging.getLogger(__name__)
+
+# Methods that change state by definition are never cached; POST is, for
+# query-style APIs, since the tool opted in
+UNCACHEABLE_METHODS = {"PUT", "PATCH", "DELETE"}
+MAX_CACHED_BODY_BYTES = 1024 * 1024
+# Headers describing the body as sent on the wire; the stored body is decoded
+_TRANSPORT_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class HttpCacheConfig(BaseModel):
+    """Per-node HTTP response cache settings"""
+    enabled: bool = Field(
+        default=False, description="Whether responses are cached")
+    ttl_seconds: float = Field(
+        default=60, description="Lifetime of responses without Cache-Control or Expires headers")
+    max_entries: int = Field(
+        default=500, description="Cached responses kept per node")
+
+    @classmethod
+    def from_node_config(cls, config: Dict[str, Any]) -> Optional["HttpCacheConfig"]:
+        """Read the cache fields of an API tool node"""
+        if not config.get("cacheResponses"):
+            return None
+        ttl = config.get("cacheTtlSeconds")
+        return cls(enabled=True, ttl_seconds=float(60 if ttl in (None, "") else ttl))
+
+
+@dataclass
+class _Entry:
+    status_code: int
+    headers: httpx.Headers
+    content: bytes
+    expires_at: float
+
+    @classmethod
+    def from_response(cls, response: httpx.Response, lifetime: float) -> "_Entry":
+        headers = httpx.Headers([(k, v) for k, v in response.headers.multi_items()
+                                 if k.lower() not in _TRANSPORT_HEADERS])
+        return cls(response.status_code, headers, response.content, time.monotonic() + lifetime)
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.monotonic()
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers revalidating this entry"""
+        headers = {}
+        if "etag" in self.headers:
+            headers["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(self.status_code, headers=self.headers, content=self.content, request=request)
+
+
+def _cache_control(headers: httpx.Headers) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in ",".join(headers.get_list("cache-control")).split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers: httpx.Headers, default_ttl: float) -> Optional[float]:
+    """
+    Seconds a response stays fresh, or None when it must not be stored.
+
+    A shared cache reads s-maxage, then max-age, then Expires (relative to
+    Date), minus the Age the response already had; without any of them the
+    configured TTL applies.
+    """
+    directives = _cache_control(headers)
+    if "no-store" in directives or headers.get("vary", "").strip() == "*":
+        return None
+    if "no-cache" in directives:
+        return 0.0
+
+    lifetime: Optional[float] = None
+    for name in ("s-maxage", "max-age"):
+        try:
+            lifetime = float(directives[name])
+            break
+        except (KeyError, TypeError, ValueError):
+            continue
+    if lifetime is None and "expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["expires"])
+            date = parsedate_to_datetime(headers["date"]) if "date" in headers else None
+            lifetime = (expires - date).total_seconds() if date else expires.timestamp() - time.time()
+        except (TypeError, ValueError):
+            lifetime = 0.0  # An invalid Expires means already expired
+    if lifetime is None:
+        return max(default_ttl, 0.0)
+
+    try:
+        age = float(headers.get("age", 0))
+    except ValueError:
+        age = 0.0
+    return max(lifetime - age, 0.0)
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class HttpResponseCache:
+    """
+    Response cache of one API tool node.
+
+    Stores successful responses only. Requests that cannot be cached go
+    straight to http_request.
+    """
+
+    def __init__(self, namespace: str, config: HttpCacheConfig):
+        self.namespace = namespace
+        self.config = config
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    # ==================== KEYS ====================
+
+    @staticmethod
+    def _key(method: str, url: httpx.URL, headers: Dict[str, str], body: Any) -> str:
+        header_items = sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items())
+        return _digest(
+            get_tenant_context() or "",
+            method,
+            str(url),
+            json.dumps(header_items),
+            json.dumps(body, sort_keys=True, default=str),
+        )
+
+    @staticmethod
+    def accepts(method: str) -> bool:
+        return method.upper() not in UNCACHEABLE_METHODS
+
+    # ==================== STORAGE ====================
+
+    def _get(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not entry.fresh and not entry.validators:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: str, entry: _Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.config.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    # ==================== REQUESTS ====================
+
+    async def request(
+        self,
+        method: str,
+        url: httpx.URL | str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Answer from the cache, revalidate a stale entry or send the request,
+        sharing the upstream call with identical requests already in flight.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            params: Query parameters, part of the key
+            headers: Request headers, part of the key
+            json: JSON body, part of the key
+            **kwargs: Passed to http_request (timeout, follow_redirects...)
+        """
+        method = method.upper()
+        if not self.accepts(method):
+            return await http_request(method, url, params=params, headers=headers, json=json, **kwargs)
+
+        url = httpx.URL(url).copy_merge_params(params or {})
+        request = httpx.Request(method, url, headers=headers)
+        key = self._key(method, url, headers, json)
+
+        entry = self._get(key)
+        if entry is not None and entry.fresh:
+            self._count("hits")
+            return entry.to_response(request)
+
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._fetch(key, entry, method, url, headers, json, kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key, None)
+                                   if self._inflight.get(key) is done else None)
+        else:
+            self._count("coalesced")
+
+        # Shielded, so a cancelled caller does not cancel the call others wait on
+        return (await asyncio.shield(task)).to_response(request)
+
+    async def _fetch(self, key: str, stale: Optional[_Entry], method: str, url: httpx.URL,
+                     headers: Optional[Dict[str, str]], body: Any, kwargs: Dict[str, Any]) -> _Entry:
+        conditional = {**(headers or {}), **(stale.validators if stale else {})}
+        response = await http_request(method, url, headers=conditional, json=body, **kwargs)
+
+        if response.status_code == 304 and stale is not None:
+            # The 304 carries the current caching headers; the stored body is still valid
+            merged = httpx.Headers(stale.headers)
+            for name, value in response.headers.items():
+                if name.lower() not in _TRANSPORT_HEADERS and not name.lower().startswith("content-"):
+                    merged[name] = value
+            lifetime = freshness_lifetime(merged, self.config.ttl_seconds)
+            entry = _Entry(stale.status_code, merged, stale.content, time.monotonic() + (lifetime or 0.0))
+            if lifetime is not None:
+                self._put(key, entry)
+            self._count("revalidated")
+            return entry
+
+        self._count("misses")
+        lifetime = freshness_lifetime(response.headers, self.config.ttl_seconds)
+        entry = _Entry.from_response(response, lifetime or 0.0)
+        if (lifetime is not None and response.is_success
+                and len(response.content) <= MAX_CACHED_BODY_BYTES
+                and (lifetime > 0 or entry.validators)):
+            self._put(key, entry)
+        elif stale is not None:
+            with self._lock:
+                self._entries.pop(key, None)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ==================== STATS ====================
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.revalidated + self.coalesced + self.misses
+            served = self.hits + self.revalidated + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+            }
+
+
+_caches: Dict[str, HttpResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_http_cache(namespace: str, config: HttpCacheConfig) -> HttpResponseCache:
+    """Process-wide cache of a node; entries survive across workflow runs"""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = HttpResponseCache(namespace, config)
+        else:
+            # Node settings may have been edited since the cache was created
+            cache.config = config
+        return cache
+
+
+def get_http_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit statistics of every node cache in this process"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.namespace: cache.stats for cache in caches}
@@ -0,0 +1,270 @@
+"""
+Shared outbound HTTP clients.
+
+Tools, connectors and TTS call a handful of hosts over and over. Instead of a
+new client (and a new DNS lookup, TCP connection and TLS handshake) per call,
+each origin gets one pooled httpx.AsyncClient per event loop that keeps its
+connections alive, and speaks HTTP/2 when the h2 package is installed.
+Requests to an origin are capped by a semaphore, connection failures and
+retryable responses of idempotent requests are retried with jittered
+backoff, and per-origin counters show how often connections are reused.
+
+    response = await http_request("GET", url, params=params, headers=headers)
+
+    client = get_http_client(url)  # the pooled client itself, without retries
+
+Per-host limits can be tuned with HTTP_CLIENT_HOST_OVERRIDES, e.g.
+{"api.openai.com": {"timeout": 120, "max_concurrency": 50}}.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set, Tuple
+
+import httpx
+
+from app.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Raised before the request reached the server, so any method can be retried
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# The server may have acted on the request; only idempotent methods are retried
+_TRANSIENT_ERRORS = (httpx.ReadTimeout, httpx.RemoteProtocolError, httpx.ReadError)
+
+
+@dataclass
+class HostPolicy:
+    """Limits for one host"""
+    timeout: float
+    max_connections: int
+    max_concurrency: int
+
+    @classmethod
+    def for_host(cls, host: str) -> "HostPolicy":
+        overrides = (settings.HTTP_CLIENT_HOST_OVERRIDES or {}).get(host, {})
+        return cls(
+            timeout=overrides.get("timeout", settings.HTTP_CLIENT_TIMEOUT),
+            max_connections=overrides.get("max_connections", settings.HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST),
+            max_concurrency=overrides.get("max_concurrency", settings.HTTP_CLIENT_MAX_CONCURRENCY_PER_HOST),
+        )
+
+
+@dataclass
+class HostMetrics:
+    """Counters of one origin, across event loops"""
+    requests: int = 0
+    failures: int = 0
+    retries: int = 0
+    connections_opened: int = 0
+    tls_handshakes: int = 0
+    http2_responses: int = 0
+    in_flight: int = 0
+    total_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retries,
+            "connections_opened": self.connections_opened,
+            "tls_handshakes": self.tls_handshakes,
+            "http2_responses": self.http2_responses,
+            "in_flight": self.in_flight,
+            "avg_ms": round(self.total_seconds / self.requests * 1000, 2) if self.requests else 0.0,
+            # Share of requests served over an already open connection
+            "connection_reuse": round(1 - self.connections_opened / self.requests, 3) if self.requests else 0.0,
+        }
+
+
+@dataclass
+class _HostPool:
+    client: httpx.AsyncClient
+    semaphore: asyncio.Semaphore
+    policy: HostPolicy
+    last_used: float = field(default_factory=time.monotonic)
+    in_flight: int = 0
+
+
+# httpx connections are bound to the loop that opened them (Celery tasks may
+# run on a fresh loop), so pools are kept per loop
+_pools: Dict[Tuple[asyncio.AbstractEventLoop, str], _HostPool] = {}
+_metrics: Dict[str, HostMetrics] = {}
+_closing: Set[asyncio.Task] = set()
+
+
+def _origin(url: httpx.URL | str) -> Tuple[str, str]:
+    """(origin, host) of a URL; the origin includes the port so pools never mix schemes"""
+    url = httpx.URL(url)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    return f"{url.scheme}://{url.host}:{port}", url.host
+
+
+def _http2_available() -> bool:
+    return settings.HTTP_CLIENT_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _new_pool(host: str) -> _HostPool:
+    policy = HostPolicy.for_host(host)
+    client = httpx.AsyncClient(
+        http2=_http2_available(),
+        timeout=httpx.Timeout(policy.timeout, connect=settings.CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=policy.max_connections,
+            max_keepalive_connections=policy.max_connections,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+        ),
+    )
+    return _HostPool(client=client, semaphore=asyncio.Semaphore(policy.max_concurrency), policy=policy)
+
+
+def _evict_idle_pools(loop: asyncio.AbstractEventLoop) -> None:
+    """Forget pools of closed loops and close the least recently used idle pools over the cap"""
+    for key in [key for key in _pools if key[0].is_closed()]:
+        _pools.pop(key)
+
+    own = sorted(((key, pool) for key, pool in _pools.items() if key[0] is loop),
+                 key=lambda item: item[1].last_used)
+    excess = len(own) - settings.HTTP_CLIENT_MAX_HOSTS
+    for key, pool in own:
+        if excess <= 0:
+            break
+        if pool.in_flight == 0:
+            _pools.pop(key)
+            task = loop.create_task(pool.client.aclose())
+            _closing.add(task)
+            task.add_done_callback(_closing.discard)
+            excess -= 1
+
+
+def _get_pool(url: httpx.URL | str) -> Tuple[str, _HostPool]:
+    origin, host = _origin(url)
+    loop = asyncio.get_running_loop()
+    pool = _pools.get((loop, origin))
+    if pool is None or pool.client.is_closed:
+        pool = _new_pool(host)
+        _pools[(loop, origin)] = pool
+        _evict_idle_pools(loop)
+    pool.last_used = time.monotonic()
+    return origin, pool
+
+
+def get_http_client(url: httpx.URL | str) -> httpx.AsyncClient:
+    """
+    The pooled client for the origin of `url`, for callers that need the client
+    itself (streaming, custom auth flows). Must be called on the loop that uses
+    it and must not be closed by the caller.
+    """
+    return _get_pool(url)[1].client
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Retry-After when the server sent one, else exponential backoff with full jitter"""
+    if response is not None:
+        try:
+            return min(max(float(response.headers.get("Retry-After", "")), 0.0),
+                       settings.HTTP_CLIENT_RETRY_BACKOFF_MAX)
+        except ValueError:
+            pass
+    ceiling = min(settings.HTTP_CLIENT_RETRY_BACKOFF * 2 ** attempt, settings.HTTP_CLIENT_RETRY_BACKOFF_MAX)
+    return random.uniform(0, ceiling)
+
+
+def _connection_tracer(metrics: HostMetrics):
+    async def trace(event: str, info: Dict[str, Any]) -> None:
+        if event.endswith("connect_tcp.complete"):
+            metrics.connections_opened += 1
+        elif event.endswith("start_tls.complete"):
+            metrics.tls_handshakes += 1
+    return trace
+
+
+async def http_request(
+    method: str,
+    url: httpx.URL | str,
+    *,
+    retries: Optional[int] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    Send a request through the pooled client of its origin.
+
+    Connection failures are retried for every method; timeouts, dropped
+    connections and 429/502/503/504 responses only for idempotent methods.
+    The last response is returned as is (callers check the status); the last
+    exception is raised once retries are exhausted.
+
+    Args:
+        method: HTTP method
+        url: Absolute URL
+        retries: Retries after the first attempt (defaults to HTTP_CLIENT_MAX_RETRIES)
+        **kwargs: Passed to httpx.AsyncClient.request (headers, params, json, timeout, auth...)
+    """
+    method = method.upper()
+    retries = settings.HTTP_CLIENT_MAX_RETRIES if retries is None else retries
+    idempotent = method in IDEMPOTENT_METHODS
+    origin, pool = _get_pool(url)
+    metrics = _metrics.setdefault(origin, HostMetrics())
+    extensions = {**kwargs.pop("extensions", {}), "trace": _connection_tracer(metrics)}
+
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        metrics.requests += 1
+        metrics.in_flight += 1
+        pool.in_flight += 1
+        try:
+            async with pool.semaphore:
+                response = await pool.client.request(method, url, extensions=extensions, **kwargs)
+        except (*_NOT_SENT_ERRORS, *_TRANSIENT_ERRORS) as e:
+            metrics.failures += 1
+            retryable = isinstance(e, _NOT_SENT_ERRORS) or idempotent
+            if not retryable or attempt >= retries:
+                raise
+            delay = _retry_delay(attempt)
+            logger.warning(f"{method} {origin} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+        except httpx.HTTPError:
+            metrics.failures += 1
+            raise
+        else:
+            if response.http_version == "HTTP/2":
+                metrics.http2_responses += 1
+            if not (idempotent and response.status_code in RETRY_STATUSES and attempt < retries):
+                return response
+            delay = _retry_delay(attempt, response)
+            logger.warning(f"{method} {origin} answered {response.status_code}, retrying in {delay:.2f}s")
+            await response.aclose()
+        finally:
+            metrics.total_seconds += time.perf_counter() - started
+            metrics.in_flight -= 1
+            pool.in_flight -= 1
+            pool.last_used = time.monotonic()
+
+        attempt += 1
+        metrics.retries += 1
+        await asyncio.sleep(delay)
+
+
+def get_http_client_metrics() -> Dict[str, Any]:
+    """Per-origin request, retry and connection counters, and the open pools"""
+    return {
+        "http2": _http2_available(),
+        "pools": len(_pools),
+        "hosts": {origin: metrics.to_dict() for origin, metrics in sorted(_metrics.items())},
+    }
+
+
+async def close_http_clients() -> None:
+    """Close the pooled clients owned by the running event loop."""
+    loop = asyncio.get_running_loop()
+    for key, pool in list(_pools.items()):
+        if key[0] is loop:
+            _pools.pop(key, None)
+            await pool.client.aclose()
@@ -4,8 +4,9 @@ from typing import Any, Dict
 from uuid import UUID
 from fastapi import HTTPException
 from fastapi_injector import Injected
-import requests
+import httpx
 
+from app.core.http_client import http_request
 from app.core.utils.encryption_utils import decrypt_key
 from app.services.app_settings import AppSettingsService
 
@@ -54,8 +55,8 @@ async def get_access_token(
             'Content-Type': 'application/x-www-form-urlencoded'
         }
 
-        response = requests.post(
-            token_url, data=payload, headers=headers, timeout=30)
+        response = await http_request(
+            "POST", token_url, data=payload, headers=headers, timeout=30)
         response.raise_for_status()
 
         token_data = response.json()
@@ -76,9 +77,9 @@ async def get_access_token(
             'app_settings_id': app_settings_id
         }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Token exchange request failed: {e}")
-        if hasattr(e, 'response') and e.response is not None:
+        if isinstance(e, httpx.HTTPStatusError):
             logger.error(f"Response content: {e.response.text}")
         return None
     except KeyError as e:
@@ -103,7 +104,7 @@ async def get_user_email(access_token: str) -> str:
         headers = {
             "Authorization": f"Bearer {access_token}"
         }
-        response = requests.request("GET", user_info_url, headers=headers)
+        response = await http_request("GET", user_info_url, headers=headers)
         if response.status_code != 200:
             logger.error(
                 f"Failed to retrieve user info: {response.status_code} - {response.text}")
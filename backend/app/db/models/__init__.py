@@ -36,6 +36,7 @@ from .app_settings import AppSettingsModel
 from .webhook import WebhookModel
 from .mcp_server import MCPServerModel, MCPServerWorkflowModel
 from .file import FileModel, StorageProvider
+from .zendesk_sync import ZendeskSyncStateModel, ZendeskSyncedArticleModel
 __all__ = [
     # Primary model class names
     "OperatorModel",
@@ -79,7 +80,9 @@ __all__ = [
     "MCPServerModel",
     "MCPServerWorkflowModel",
     "FileModel",
-    "StorageProvider"
+    "StorageProvider",
+    "ZendeskSyncStateModel",
+    "ZendeskSyncedArticleModel",
 ]
 
 models = [
@@ -116,7 +119,9 @@ models = [
     FineTuningEventModel,
     MCPServerModel,
     MCPServerWorkflowModel,
-    FileModel
+    FileModel,
+    ZendeskSyncStateModel,
+    ZendeskSyncedArticleModel,
 ]
 
 auto_register_updated_by(models)
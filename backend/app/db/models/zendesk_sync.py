@@ -0,0 +1,43 @@
+from typing import Optional
+from uuid import UUID
+import datetime
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ZendeskSyncStateModel(Base):
+    """
+    Incremental sync state of a Zendesk-backed knowledge base.
+    `watermark` is the unix start_time for the next incremental article export.
+    """
+
+    __tablename__ = "zendesk_sync_states"
+    __table_args__ = (
+        UniqueConstraint("kb_id", name="zendesk_sync_states_kb_unique"),
+    )
+
+    kb_id: Mapped[UUID] = mapped_column(
+        ForeignKey("knowledge_bases.id", ondelete="CASCADE"), nullable=False
+    )
+    watermark: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    last_full_sync: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime(True), nullable=True
+    )
+
+
+class ZendeskSyncedArticleModel(Base):
+    """Last seen Zendesk `updated_at` of each article synced into a knowledge base."""
+
+    __tablename__ = "zendesk_synced_articles"
+    __table_args__ = (
+        UniqueConstraint("kb_id", "article_id", name="zendesk_synced_articles_unique"),
+        Index("idx_zendesk_synced_articles_kb", "kb_id"),
+    )
+
+    kb_id: Mapped[UUID] = mapped_column(
+        ForeignKey("knowledge_bases.id", ondelete="CASCADE"), nullable=False
+    )
+    article_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    article_updated_at: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
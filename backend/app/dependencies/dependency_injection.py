@@ -62,6 +62,8 @@ from redis.asyncio import Redis
 from app.modules.data.manager import AgentRAGServiceManager
 from app.repositories.file_manager import FileManagerRepository
 from app.services.file_manager import FileManagerService
+from app.services.quotas import QuotaService
+from app.repositories.zendesk_sync import ZendeskSyncRepository
 # Multi-tenant session manager
 from app.core.tenant_scope import tenant_scope
 from app.db.multi_tenant_session import multi_tenant_manager
@@ -74,7 +76,7 @@ logger = logging.getLogger(__name__)
 
 # Type annotations for different Redis clients (similar to Spring @Qualifier)
 RedisString = Annotated[Redis, 'string']  # For WebSockets, conversations
-RedisBinary = Annotated[Redis, 'binary']  # For FastAPI cache
+RedisBinary = Annotated[Redis, 'binary']  # For FastAPI cache, conversation memory
 
 
 class Dependencies(Module):
@@ -118,8 +120,9 @@ class Dependencies(Module):
 
         Used by:
         - FastAPI cache (binary cache data)
+        - Conversation memory (msgpack-encoded messages, one round trip per operation)
 
-        Connection pool: 20 connections (smaller, only cache uses this)
+        Connection pool: 20 connections (from settings.REDIS_MAX_CONNECTIONS_FOR_ENDPOINT_CACHE)
         """
         return Redis.from_url(
             settings.REDIS_URL,
@@ -144,6 +147,16 @@ class Dependencies(Module):
         """
         return SocketConnectionManager(redis_client=redis_string)
 
+    @provider
+    @singleton
+    def provide_quota_service(self, redis_string: RedisString) -> QuotaService:
+        """
+        Provide QuotaService backed by the shared async Redis string client.
+
+        Singleton so the in-process quota allowance cache is shared by all requests.
+        """
+        return QuotaService(redis_client=redis_string)
+
     @provider
     @request_scope
     def provide_session(
@@ -291,3 +304,6 @@ class Dependencies(Module):
         # File Manager services
         binder.bind(FileManagerRepository, scope=request_scope)
         binder.bind(FileManagerService, scope=request_scope)
+
+        # Zendesk sync state
+        binder.bind(ZendeskSyncRepository, scope=request_scope)
@@ -98,6 +98,7 @@ def build_middlewares() -> list[Middleware]:
                 allow_headers=["*"],
             ),
             Middleware(VersionHeaderMiddleware),
+            Middleware(QuotaHeaderMiddleware),
         ]
     )
 
@@ -214,3 +215,25 @@ class VersionHeaderMiddleware(BaseHTTPMiddleware):
             )
 
         return response
+
+
+# --------------------------------------------------------------------------- #
+# Middleware that writes remaining quota in response headers
+# --------------------------------------------------------------------------- #
+
+
+class QuotaHeaderMiddleware(BaseHTTPMiddleware):
+    """Exposes the quota status recorded by the auth dependency as response headers."""
+
+    async def dispatch(self, request: Request, call_next):
+        response: Response = await call_next(request)
+
+        quota = getattr(request.state, "quota", None)
+        if quota is not None:
+            response.headers["X-RateLimit-Limit"] = str(quota.limit)
+            response.headers["X-RateLimit-Remaining"] = str(quota.remaining)
+            response.headers["X-RateLimit-Reset"] = str(quota.reset_seconds)
+            if not quota.allowed:
+                response.headers["Retry-After"] = str(quota.reset_seconds)
+
+        return response
@@ -25,12 +25,19 @@ _request_context: ContextVar[Request] = ContextVar('request_context', default=No
 def get_user_identifier(request: Request) -> str:
     """
     Get a unique identifier for rate limiting.
-    Prefers authenticated user ID, falls back to IP address.
+    Prefers API key ID, then authenticated user ID (both scoped to the tenant),
+    falls back to IP address.
     """
+    from app.core.tenant_scope import get_tenant_context
+
+    api_key = getattr(request.state, "api_key", None)
+    if api_key and getattr(api_key, "id", None):
+        return f"tenant:{get_tenant_context()}:api_key:{api_key.id}"
+
     # # Try to get user ID from request state (set by auth middleware)
     user = getattr(request.state, "user", None)
     if user and hasattr(user, "id"):
-        return f"user:{user.id}"
+        return f"tenant:{get_tenant_context()}:user:{user.id}"
 
     # Fall back to IP address
     return get_remote_address(request)
@@ -6,7 +6,8 @@ from typing import Optional, Dict, Any
 from pydantic import BaseModel, Field
 
 from .providers import VectorConfig, LegraConfig, LightRAGConfig
-from .providers.vector import ChunkConfig, EmbeddingConfig, VectorDBConfig
+from .providers.vector import ChunkConfig, EmbeddingConfig, VectorDBConfig, LexicalConfig
+from .rerank import RerankConfig
 from .schema_utils import get_schema_default
 
 
@@ -19,6 +20,8 @@ class AgentRAGConfig(BaseModel):
         default=None, description="LEGRA system configuration")
     lightrag_config: Optional[LightRAGConfig] = Field(
         default=None, description="LightRAG system configuration")
+    rerank_config: Optional[RerankConfig] = Field(
+        default=None, description="Reranking stage configuration")
 
     class Config:
         extra = "allow"  # Allow additional fields for extensibility
@@ -50,6 +53,15 @@ class AgentRAGConfig(BaseModel):
 
         return self.lightrag_config
 
+    def get_rerank_config(self) -> Optional[RerankConfig]:
+        """Get reranking configuration with defaults applied"""
+        if self.rerank_config is None:
+            return None
+        if not self.rerank_config.enabled:
+            return None
+
+        return self.rerank_config
+
 
 class KbRAGConfig(BaseModel):
     """Configuration for Knowledge Base RAG systems based on form schema"""
@@ -72,6 +84,12 @@ class KbRAGConfig(BaseModel):
         description="LightRAG system configuration"
     )
 
+    # Reranking configuration
+    rerank: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Reranking stage configuration"
+    )
+
     class Config:
         extra = "allow"  # Allow additional fields for extensibility
 
@@ -122,11 +140,19 @@ class KbRAGConfig(BaseModel):
         if vector_data.get("vector_db_persist_directory"):
             vector_db_data["persist_directory"] = vector_data.get("vector_db_persist_directory")
 
+        # Extract hybrid (BM25 + vector) search config with schema defaults
+        lexical_data = {
+            "enabled": vector_data.get("hybrid_enabled", get_schema_default("vector", "hybrid_enabled", True)),
+            "vector_weight": vector_data.get("hybrid_vector_weight", get_schema_default("vector", "hybrid_vector_weight", 1.0)),
+            "lexical_weight": vector_data.get("hybrid_lexical_weight", get_schema_default("vector", "hybrid_lexical_weight", 1.0)),
+        }
+
         return VectorConfig(
             enabled=True,
             chunking=ChunkConfig(**chunking_data),
             embedding=EmbeddingConfig(**embedding_data),
-            vector_db=VectorDBConfig(**vector_db_data)
+            vector_db=VectorDBConfig(**vector_db_data),
+            lexical=LexicalConfig(**lexical_data)
         )
 
     def get_legra_config(self) -> Optional[LegraConfig]:
@@ -153,6 +179,8 @@ class KbRAGConfig(BaseModel):
                 "legra", "graph_n_neighbors", 10)),
             metric=legra_data.get("graph_distance_metric", get_schema_default(
                 "legra", "graph_distance_metric", "cosine")),
+            knn_mode=legra_data.get("graph_knn_mode", get_schema_default(
+                "legra", "graph_knn_mode", "auto")),
             min_sents=legra_data.get("chunk_min_sentences", get_schema_default(
                 "legra", "chunk_min_sentences", 1)),
             max_sents=legra_data.get("chunk_max_sentences", get_schema_default(
@@ -194,3 +222,25 @@ class KbRAGConfig(BaseModel):
             response_type=lightrag_data.get(
                 "response_type", get_schema_default("lightrag", "response_type", "Single Paragraph"))
         )
+
+    def get_rerank_config(self) -> Optional[RerankConfig]:
+        """Convert rerank dict to RerankConfig object"""
+        if not self.rerank or not self.rerank.get("enabled", False):
+            return None
+
+        rerank_data = self.rerank.copy()
+
+        # Map the flat structure to RerankConfig fields with schema defaults
+        return RerankConfig(
+            enabled=True,
+            model_name=rerank_data.get(
+                "rerank_model_name", get_schema_default("rerank", "rerank_model_name", "cross-encoder/ms-marco-MiniLM-L-6-v2")),
+            backend=rerank_data.get(
+                "rerank_backend", get_schema_default("rerank", "rerank_backend", "torch")),
+            candidate_multiplier=rerank_data.get(
+                "rerank_candidate_multiplier", get_schema_default("rerank", "rerank_candidate_multiplier", 4)),
+            latency_budget_ms=rerank_data.get(
+                "rerank_latency_budget_ms", get_schema_default("rerank", "rerank_latency_budget_ms", 300)),
+            min_score=rerank_data.get(
+                "rerank_min_score", get_schema_default("rerank", "rerank_min_score", 0.1)),
+        )
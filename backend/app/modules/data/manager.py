@@ -274,20 +274,24 @@ class AgentRAGServiceManager:
                         and hasattr(item, "files")
                         and item.files
                     ):
-                        from app.modules.data.utils import FileTextExtractor
+                        from app.modules.data.utils import get_extraction_service
 
                         doc_ids = []
                         contents = []
 
-                        for idx, file_path in enumerate(item.files):
-                            try:
-                                doc_ids.append(
-                                    f"KB:{kb_id}#file_{idx}:{file_path}")
-                                contents.append(
-                                    FileTextExtractor().extract(path=file_path))
-                            except Exception as e:
+                        # Files are extracted concurrently in the extraction worker pool
+                        extractor = get_extraction_service()
+                        extracted = await asyncio.gather(
+                            *(extractor.extract(path=file_path) for file_path in item.files),
+                            return_exceptions=True,
+                        )
+                        for idx, (file_path, text) in enumerate(zip(item.files, extracted)):
+                            if isinstance(text, BaseException):
                                 logger.error(
-                                    f"Error extracting file {file_path}: {e}")
+                                    f"Error extracting file {file_path}: {text}")
+                                continue
+                            doc_ids.append(f"KB:{kb_id}#file_{idx}:{file_path}")
+                            contents.append(text)
 
                     # Handle URL content
                     elif getattr(item, "type", "") == "url":
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Sequence
 
 import igraph as ig
 
@@ -20,3 +20,15 @@ class Clusterer(ABC):
         index.
         """
         raise NotImplementedError
+
+    def refine_partition(
+        self,
+        graph: ig.Graph,
+        initial_membership: Sequence[int],
+        is_membership_fixed: Optional[Sequence[bool]] = None,
+    ) -> List[int]:
+        """
+        Improve an existing partition after the graph changed. Clusterers that
+        cannot start from a previous partition recompute it from scratch.
+        """
+        return self.find_partition(graph)
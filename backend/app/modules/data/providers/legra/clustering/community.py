@@ -1,7 +1,8 @@
-from typing import List
+from typing import List, Optional, Sequence
 
 import igraph as ig
 import leidenalg as la
+import numpy as np
 
 from .base import Clusterer
 
@@ -33,6 +34,30 @@ class LeidenClusterer(Clusterer):
         # partition.membership is a list of community membership per node index
         return partition.membership
 
+    def refine_partition(
+        self,
+        graph: ig.Graph,
+        initial_membership: Sequence[int],
+        is_membership_fixed: Optional[Sequence[bool]] = None,
+    ) -> List[int]:
+        """
+        Run Leiden starting from `initial_membership`; nodes flagged in
+        `is_membership_fixed` keep their community.
+        """
+        # leidenalg expects community ids in [0, n)
+        _, membership = np.unique(np.asarray(initial_membership), return_inverse=True)
+        partition = la.RBConfigurationVertexPartition(
+            graph,
+            initial_membership=membership.tolist(),
+            resolution_parameter=self.resolution,
+        )
+        la.Optimiser().optimise_partition(
+            partition,
+            n_iterations=-1,
+            is_membership_fixed=None if is_membership_fixed is None else list(is_membership_fixed),
+        )
+        return partition.membership
+
 
 class LouvainClusterer(Clusterer):
     """
@@ -17,6 +17,18 @@ DEFAULT_METRIC: Final[str] = "cosine"
 # Default community‐detection resolution parameter
 DEFAULT_RESOLUTION: Final[float] = 1.0
 
+# Incremental graph maintenance: rebuild everything after this many updates
+DEFAULT_FULL_REBUILD_EVERY: Final[int] = 20
+
+# ...or when more than this fraction of the nodes were added or removed at once
+DEFAULT_MAX_INCREMENTAL_CHANGE: Final[float] = 0.3
+
+# Re-summarise a community once this fraction of its membership has changed
+DEFAULT_RESUMMARIZE_THRESHOLD: Final[float] = 0.2
+
+# Concurrent LLM calls when generating node / community summaries
+DEFAULT_SUMMARY_CONCURRENCY: Final[int] = 4
+
 # Path to a cache directory (for embeddings, indexes, etc.)
 CACHE_DIR: Final[Path] = Path(".cache/graphrag")
 
@@ -42,6 +54,14 @@ class LegraConfig(BaseModel):
                              description="Number of neighbors for kNN graph")
     metric: str = Field(default=LEGRA_DEFAULTS["graph_distance_metric"],
                         description="Distance metric for similarity")
+    knn_mode: str = Field(default=LEGRA_DEFAULTS["graph_knn_mode"],
+                          description="kNN graph neighbor search (auto, exact, approximate)")
+    summary_concurrency: int = Field(default=DEFAULT_SUMMARY_CONCURRENCY,
+                                     description="Concurrent LLM calls when summarising")
+    summary_requests_per_minute: Optional[int] = Field(
+        default=None, description="Per-tenant LLM requests per minute for summaries (unlimited if unset)")
+    summary_tokens_per_minute: Optional[int] = Field(
+        default=None, description="Per-tenant LLM prompt tokens per minute for summaries (unlimited if unset)")
     min_sents: int = Field(
         default=LEGRA_DEFAULTS["chunk_min_sentences"], description="Minimum sentences per chunk")
     max_sents: int = Field(
@@ -1,10 +1,10 @@
+import hashlib
 import json
 import os
-from collections import defaultdict
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, cast
 
-import faiss
 import igraph as ig
 import numpy as np
 import numpy.typing as npt
@@ -16,12 +16,21 @@ from transformers import AutoTokenizer
 from . import embedding
 from .chunking.base import Chunker
 from .clustering.base import Clusterer
-from .config import DEFAULT_METRIC, DEFAULT_N_NEIGHBORS
+from .config import (
+    DEFAULT_FULL_REBUILD_EVERY,
+    DEFAULT_MAX_INCREMENTAL_CHANGE,
+    DEFAULT_METRIC,
+    DEFAULT_N_NEIGHBORS,
+    DEFAULT_RESUMMARIZE_THRESHOLD,
+    DEFAULT_SUMMARY_CONCURRENCY,
+)
 from .embedding.base import Embedder
 from .generation.base import Generator
-from .graph.knn_graph import KNNGraphBuilder
+from .graph.knn_graph import KNNGraphBuilder, get_graph_builder
 from .index.base import Indexer
 from .retrieval.base import Retriever
+from .storage import FORMAT_VERSION, LegraStore
+from .summarization import BudgetedGenerator, RateBudget, SummaryCache, SummaryScheduler
 from .utils import get_logger
 
 _logger = get_logger(__name__)
@@ -45,6 +54,10 @@ class Legra:
       7. On query:
          a. Retrieve top-k chunks (using a Retriever).
          b. Generate answer (using a Generator) or fallback to returning raw chunks.
+
+    After documents are added or deleted, `update_index_graph` patches the
+    graph and communities in place instead of rebuilding them; every
+    `full_rebuild_every` updates (or after a large change) it rebuilds fully.
     """
 
     def __init__(
@@ -61,25 +74,37 @@ class Legra:
         extension: str = "txt",
         n_neighbors: int = DEFAULT_N_NEIGHBORS,
         metric: str = DEFAULT_METRIC,
+        full_rebuild_every: int = DEFAULT_FULL_REBUILD_EVERY,
+        max_incremental_change: float = DEFAULT_MAX_INCREMENTAL_CHANGE,
+        resummarize_threshold: float = DEFAULT_RESUMMARIZE_THRESHOLD,
+        summary_concurrency: int = DEFAULT_SUMMARY_CONCURRENCY,
+        summary_budget: RateBudget | None = None,
     ) -> None:
         self.doc_folder = doc_folder
         self.chunker = chunker
         self.embedder = embedder
         self.indexer = indexer
         self.max_tokens = max_tokens
-        self.graph_builder = graph_builder or KNNGraphBuilder(
+        self.graph_builder = graph_builder or get_graph_builder(
             n_neighbors=n_neighbors, metric=metric
         )
         self.clusterer = clusterer
         self.retriever = retriever  # may fill after indexing
         self.generator = generator
         self.extension = extension
+        self.full_rebuild_every = full_rebuild_every
+        self.max_incremental_change = max_incremental_change
+        self.resummarize_threshold = resummarize_threshold
+        self.summary_concurrency = summary_concurrency
+        self.summary_budget = summary_budget
 
         # Internal storage
         self.docs_meta: List[Dict[str, Any]] = []
         self.emb_matrix: npt.NDArray | None = None
 
         self.community_summaries: Dict[int, str] = {}
+        # Incremental graph updates since the last full rebuild
+        self.graph_updates = 0
 
     def _load_folder(self) -> List[Dict[str, Any]]:
         """
@@ -137,15 +162,18 @@ class Legra:
         # ------------------------------------------------------------------ #
         # 0. Load existing embeddings & meta for this KB (if they exist)     #
         # ------------------------------------------------------------------ #
-        kb_dir = Path("legra_data").joinpath(kb_id)
-        if kb_dir.exists():
-            with open(kb_dir / "docs_meta.json", encoding="utf-8") as f:
-                existing_meta: list[dict] = json.load(f)
-            existing_embs: np.ndarray = np.load(kb_dir / "emb_matrix.npy")
+        store = LegraStore(Path("legra_data").joinpath(kb_id))
+        if store.exists():
+            existing_meta: list[dict] = store.read_docs_meta()
+            existing_embs: np.ndarray = store.read_embeddings()
+            # The count of updates since the last full rebuild belongs to the
+            # KB; a fresh instance would otherwise save it back as 0
+            if (store.path / "legra.json").exists():
+                self.graph_updates = store.read_config().get("graph_updates", 0)
         else:
             existing_meta = []
             existing_embs = np.empty((0, self.embedder.dimension), dtype=np.float32)
-            kb_dir.mkdir(parents=True, exist_ok=True)
+            store.path.mkdir(parents=True, exist_ok=True)
 
         # ------------------------------------------------------------------ #
         # 1. Chunk the new document                                          #
@@ -187,8 +215,7 @@ class Legra:
             # index / graph
             _logger.info("Finalizing KB.")
 
-            self.complete_index_graph(kb_id)
-            self.save(kb_id, full=True)
+            self.update_index_graph(kb_id)
         else :
             self.save(kb_id, full=False)  # writes docs_meta.json + emb_matrix.npy
             _logger.info("Embeddings saved.")
@@ -197,9 +224,10 @@ class Legra:
     def delete_document(self, doc_id: str) -> bool:
         """
         Delete all chunks belonging to `doc_id` from the knowledge base `kb_id`.
-        • Only docs_meta.json and emb_matrix.npy are rewritten.
-        • The FAISS index / graph / community files are deleted because they are
-          now stale; your separate “re-index” endpoint will recreate them later.
+        • Only the chunk metadata and emb_matrix.npy are rewritten.
+        • The FAISS index is deleted because its rows are now stale. The graph and
+          community summaries are kept: their nodes are keyed by chunk, so the
+          next `update_index_graph` patches them instead of rebuilding.
         Returns
         -------
         True  – deletion succeeded (or doc_id not present)
@@ -207,8 +235,9 @@ class Legra:
         """
         kb_id = (doc_id.split("#", 1)[0])[3:] # remove part after # and remove 'KB:' to extract kb_id
 
-        kb_dir = Path("legra_data") / kb_id
-        if not kb_dir.exists():
+        store = LegraStore(Path("legra_data") / kb_id)
+        kb_dir = store.path
+        if not store.exists():
             _logger.warning(f"delete_document: KB {kb_id} does not exist.")
             return False
 
@@ -216,10 +245,8 @@ class Legra:
             # -----------------------------------------------------------------
             # 1. Load current meta + embeddings
             # -----------------------------------------------------------------
-            with open(kb_dir / "docs_meta.json", encoding="utf-8") as f:
-                meta: List[Dict[str, Any]] = json.load(f)
-
-            emb = np.load(kb_dir / "emb_matrix.npy")
+            meta: List[Dict[str, Any]] = store.read_docs_meta()
+            emb = store.read_embeddings()
 
             # -----------------------------------------------------------------
             # 2. Build mask of rows to *keep*
@@ -245,23 +272,13 @@ class Legra:
             # -----------------------------------------------------------------
             # 3. Save stripped corpus back to disk
             # -----------------------------------------------------------------
-            # Strip embeddings before saving docs_meta.json
-            meta_for_save = [{k: v for k, v in m.items() if k != "embedding"}
-                             for m in new_meta]
-
-            with open(kb_dir / "docs_meta.json", "w", encoding="utf-8") as f:
-                json.dump(meta_for_save, f, ensure_ascii=False, indent=2)
-
-            np.save(kb_dir / "emb_matrix.npy", new_emb)
+            store.write_docs_meta(new_meta)  # strips embeddings
+            store.write_embeddings(new_emb)
 
             # -----------------------------------------------------------------
-            # 4. Remove stale index / graph files
+            # 4. Remove the stale index file
             # -----------------------------------------------------------------
-            for stale in ("faiss_index.bin", "graph.graphml",
-                          "community_summaries.json"):
-                p = kb_dir / stale
-                if p.exists():
-                    p.unlink()
+            store.remove("faiss_index.bin")
 
             # -----------------------------------------------------------------
             # 5. Refresh in-memory state of *this* instance
@@ -269,7 +286,8 @@ class Legra:
             self.docs_meta = new_meta
             self.emb_matrix = new_emb
 
-            # the index / graph / labels are now invalid; clear them
+            # the index / labels are now invalid; clear them. The graph on disk
+            # still describes the previous corpus and seeds the next update.
             if hasattr(self, "indexer"):
                 self.indexer.index = None
             self.graph = None
@@ -291,7 +309,10 @@ class Legra:
 
         # 2. Build graph
         _logger.info("Constructing kNN graph...")
-        graph, edges = self.graph_builder.fit(self.emb_matrix)
+        graph, edges = self.graph_builder.fit(
+            self.emb_matrix, index=getattr(self.indexer, "index", None)
+        )
+        graph.vs["node_key"] = self._node_keys()
         self.graph = graph
         self.edges = edges
 
@@ -299,9 +320,9 @@ class Legra:
         if self.clusterer is not None:
             _logger.info("Running community detection...")
             labels = self.clusterer.find_partition(graph)
-            for idx, label in enumerate(labels):
-                self.docs_meta[idx]["community"] = label
-            self.community_labels = labels
+            self._set_communities(labels)
+        self.community_summaries = {}
+        self.graph_updates = 0
 
         # 4. Prepare retriever if not provided
         if self.retriever is None:
@@ -315,7 +336,214 @@ class Legra:
         self.save(kb_id, True)
         _logger.info("Saving completed.")
 
+    def update_index_graph(self, kb_id: str) -> Set[int]:
+        """
+        Bring index, graph and communities in line with docs_meta after
+        documents were added or deleted, touching only what changed:
+
+          1. Rebuild the flat vector index (a linear copy of the embeddings).
+          2. Keep the previous graph's edges between surviving chunks and
+             query kNN edges only for new chunks and for chunks that lost a
+             neighbour.
+          3. Seed Leiden with the previous partition and let only the changed
+             neighbourhood move.
+          4. Drop (and, when a generator is set, regenerate) the summaries of
+             communities whose membership changed by more than
+             `resummarize_threshold`.
+
+        Falls back to `complete_index_graph` when there is no keyed previous
+        graph, the builder cannot update, more than `max_incremental_change`
+        of the nodes changed, or `full_rebuild_every` updates have passed.
+
+        Returns:
+            The communities whose summaries went stale.
+        """
+        keys = self._node_keys()
+        previous = self._previous_graph(kb_id)
+        old_keys = previous.vs["node_key"] if previous is not None else []
+        positions = {key: row for row, key in enumerate(keys)}
+        old_to_new = np.array([positions.get(key, -1) for key in old_keys], dtype=np.int64)
+        added = np.setdiff1d(np.arange(len(keys)), old_to_new[old_to_new >= 0])
+        changed = len(added) + int((old_to_new < 0).sum())
+
+        reason = None
+        if previous is None:
+            reason = "no keyed graph from a previous build"
+        elif not hasattr(self.graph_builder, "update"):
+            reason = f"{type(self.graph_builder).__name__} cannot update graphs"
+        elif self.graph_updates >= self.full_rebuild_every:
+            reason = f"{self.graph_updates} incremental updates since the last rebuild"
+        elif changed > self.max_incremental_change * max(len(old_keys), 1):
+            reason = f"{changed} of {len(old_keys)} nodes changed"
+        if reason is not None:
+            _logger.info(f"Full graph rebuild for KB {kb_id}: {reason}.")
+            self.complete_index_graph(kb_id)
+            # Community ids start over, every community needs a new summary
+            return set(getattr(self, "community_labels", None) or [])
+
+        # 1. Index
+        self.indexer.build_index(self.emb_matrix)
+
+        # 2. Graph: surviving edges, plus fresh neighbours around the change
+        old_edges = np.array(previous.get_edgelist(), dtype=np.int64).reshape(-1, 2)
+        mapped = old_to_new[old_edges]
+        survived = (mapped >= 0).all(axis=1)
+        orphaned = mapped[~survived][mapped[~survived] >= 0]
+        affected = np.union1d(added, orphaned)
+        graph, edges = self.graph_builder.update(
+            self.emb_matrix, mapped[survived], affected,
+            index=getattr(self.indexer, "index", None),
+        )
+        graph.vs["node_key"] = keys
+        self.graph = graph
+        self.edges = edges
 
+        # 3. Communities
+        stale: Set[int] = set()
+        if self.clusterer is not None:
+            old_labels = self._community_attribute(previous)
+            seed: List[Optional[int]] = [None] * len(keys)
+            if old_labels is not None:
+                for old_row, new_row in enumerate(old_to_new):
+                    if new_row >= 0:
+                        seed[new_row] = old_labels[old_row]
+            labels = self._refine_communities(graph, seed, affected)
+            self._set_communities(labels)
+            if old_labels is not None:
+                stale = self._stale_communities(old_keys, old_labels, keys, labels)
+                self._refresh_summaries(stale, kb_id)
+
+        # 4. Prepare retriever if not provided
+        if self.retriever is None:
+            from .retrieval.neighbor_retriever import NeighborRetriever
+
+            self.retriever = NeighborRetriever(
+                    embedder=self.embedder, indexer=self.indexer, docs_meta=self.docs_meta
+                    )
+
+        self.graph_updates += 1
+        _logger.info(
+            f"Incremental graph update for KB {kb_id}: {len(added)} added, "
+            f"{changed - len(added)} removed, {len(affected)} nodes re-queried, "
+            f"{len(stale)} communities stale."
+        )
+        self.save(kb_id, True)
+        return stale
+
+    def _node_keys(self) -> List[str]:
+        """
+        Identity of each chunk, stored on graph vertices. Includes a hash of
+        the chunk text, so chunks of a re-added (edited) document count as
+        new and get fresh neighbours.
+        """
+        return [
+            f"{m['doc_id']}#{m['chunk_ix']}#{hashlib.sha1(m.get('text', '').encode('utf-8')).hexdigest()[:12]}"
+            for m in self.docs_meta
+        ]
+
+    def _previous_graph(self, kb_id: str) -> Optional[ig.Graph]:
+        """The last persisted graph for this KB, if its vertices carry node keys."""
+        graph = LegraStore(Path("legra_data") / kb_id).read_graph()
+        if graph is None or "node_key" not in graph.vs.attributes():
+            return None
+        return graph
+
+    @staticmethod
+    def _community_attribute(graph: ig.Graph) -> Optional[List[int]]:
+        if "community" not in graph.vs.attributes():
+            return None
+        # GraphML stores numbers as doubles
+        return [int(label) for label in graph.vs["community"]]
+
+    def _set_communities(self, labels: List[int]) -> None:
+        labels = [int(label) for label in labels]
+        for idx, label in enumerate(labels):
+            self.docs_meta[idx]["community"] = label
+        self.graph.vs["community"] = labels
+        self.community_labels = labels
+
+    def _refine_communities(
+        self, graph: ig.Graph, seed: List[Optional[int]], affected: npt.NDArray
+    ) -> List[int]:
+        """
+        Refine the previous partition on the updated graph. New nodes start in
+        their neighbours' most common community; only affected nodes and their
+        neighbours may move. Labels are mapped back onto the previous ids.
+        """
+        initial = list(seed)
+        next_label = max((label for label in seed if label is not None), default=-1) + 1
+        for row, label in enumerate(seed):
+            if label is None:
+                votes = Counter(seed[n] for n in graph.neighbors(row) if seed[n] is not None)
+                if votes:
+                    initial[row] = votes.most_common(1)[0][0]
+                else:
+                    initial[row], next_label = next_label, next_label + 1
+
+        movable = set(affected.tolist())
+        for row in affected.tolist():
+            movable.update(graph.neighbors(row))
+        fixed = [row not in movable for row in range(graph.vcount())]
+
+        labels = self.clusterer.refine_partition(graph, initial, fixed)
+        return self._align_labels(seed, labels)
+
+    @staticmethod
+    def _align_labels(previous: List[Optional[int]], labels: List[int]) -> List[int]:
+        """Renumber `labels` so each community keeps the previous id it overlaps most."""
+        overlap = Counter(
+            (label, old) for label, old in zip(labels, previous) if old is not None
+        )
+        mapping: Dict[int, int] = {}
+        taken: Set[int] = set()
+        for (label, old), _ in overlap.most_common():
+            if label not in mapping and old not in taken:
+                mapping[label] = old
+                taken.add(old)
+
+        next_label = max((old for old in previous if old is not None), default=-1) + 1
+        for label in dict.fromkeys(labels):
+            if label not in mapping:
+                mapping[label], next_label = next_label, next_label + 1
+        return [mapping[label] for label in labels]
+
+    def _stale_communities(
+        self,
+        old_keys: List[str],
+        old_labels: List[int],
+        keys: List[str],
+        labels: List[int],
+    ) -> Set[int]:
+        """Communities whose member set changed by more than the threshold (Jaccard distance)."""
+        before: Dict[int, Set[str]] = defaultdict(set)
+        after: Dict[int, Set[str]] = defaultdict(set)
+        for key, label in zip(old_keys, old_labels):
+            before[label].add(key)
+        for key, label in zip(keys, labels):
+            after[label].add(key)
+
+        stale = set()
+        for comm in before.keys() | after.keys():
+            old, new = before.get(comm, set()), after.get(comm, set())
+            if 1 - len(old & new) / len(old | new) > self.resummarize_threshold:
+                stale.add(comm)
+        return stale
+
+    def _refresh_summaries(self, stale: Set[int], kb_id: str) -> None:
+        if not self.community_summaries or not stale:
+            return
+        had_summaries = set(self.community_summaries)
+        for comm in stale:
+            self.community_summaries.pop(comm, None)
+        current = set(getattr(self, "community_labels", None) or [])
+        # Communities that disappeared need no new summary
+        regenerate = stale & current & had_summaries
+        if self.generator is None or not regenerate:
+            return
+        try:
+            self.generate_community_summaries(communities=regenerate, kb_id=kb_id)
+        except Exception as e:
+            _logger.warning(f"Could not re-summarise communities {sorted(regenerate)}: {e}")
 
     def index(self, files: list[UploadFile]) -> None:
         """
@@ -359,7 +587,9 @@ class Legra:
 
         # 5. Build graph
         _logger.info("Constructing kNN graph...")
-        graph, edges = self.graph_builder.fit(embeddings)
+        graph, edges = self.graph_builder.fit(
+            embeddings, index=getattr(self.indexer, "index", None)
+        )
         self.graph = graph
         self.edges = edges
 
@@ -381,9 +611,25 @@ class Legra:
 
         _logger.info("Indexing pipeline completed.")
 
+    def _summary_scheduler(
+        self, generator: Generator, kb_id: str | None
+    ) -> Tuple[SummaryScheduler, Generator]:
+        """
+        Scheduler running `summary_concurrency` LLM calls at a time, and the
+        generator wrapped to draw on `summary_budget`. With a `kb_id`, the
+        summary cache (and thereby the run's checkpoints) is kept with the KB.
+        """
+        store = LegraStore(Path("legra_data") / kb_id) if kb_id is not None else None
+        namespace = getattr(generator, "model_name", None) or type(generator).__name__
+        scheduler = SummaryScheduler(
+            SummaryCache(store, namespace=namespace), max_concurrency=self.summary_concurrency
+        )
+        return scheduler, BudgetedGenerator(generator, self.summary_budget)
+
     def generate_node_summaries(
         self,
         generator: Generator | None = None,
+        kb_id: str | None = None,
         **kwargs,
     ) -> List[str]:
         """
@@ -393,8 +639,12 @@ class Legra:
         if generator is None:
             raise ValueError("Cannot generate summaries without a generator.")
 
-        texts = [doc["text"] for doc in self.docs_meta]
-        summaries = [generator.generate(f"Summarize: {text}", **kwargs) for text in texts]
+        scheduler, generator = self._summary_scheduler(generator, kb_id)
+        texts = {ix: doc["text"] for ix, doc in enumerate(self.docs_meta)}
+        results = scheduler.run(
+            "node", texts, lambda text: generator.generate(f"Summarize: {text}", **kwargs)
+        )
+        summaries = [results[ix] for ix in range(len(self.docs_meta))]
 
         for doc, summary in zip(self.docs_meta, summaries):
             doc["summary"] = summary
@@ -404,10 +654,15 @@ class Legra:
     def generate_community_summaries(
         self,
         generator: Generator | None = None,
+        communities: Iterable[int] | None = None,
+        kb_id: str | None = None,
         **kwargs,
     ) -> Dict[int, str]:
         """
         Generate summaries for each community by aggregating node summaries.
+        With `communities`, only those are (re)generated and merged into the
+        existing summaries. Communities whose member content is unchanged are
+        served from the summary cache.
         """
         generator = generator or self.generator
         if generator is None:
@@ -416,21 +671,27 @@ class Legra:
             raise RuntimeError("Community labels not found. Run index() first.")
 
         # Form communities
-        communities: Dict[int, List[str]] = defaultdict(list)
+        selected = None if communities is None else set(communities)
+        members: Dict[int, List[str]] = defaultdict(list)
         for meta in self.docs_meta:
             comm = meta["community"]
+            if selected is not None and comm not in selected:
+                continue
             summary = meta.get("summary", meta["text"])
-            communities[comm].append(summary)
+            members[comm].append(summary)
 
         # Summarize communities
-        summaries: Dict[int, str] = {}
-        bar = tqdm(communities.items(), desc="Generating community summaries")
-        for comm, texts in bar:
-            combined_text = "\n".join(texts)
-            comm_summary = self._summarize(generator, combined_text, max_tokens=self.max_tokens)
-            summaries[comm] = comm_summary
-
-        self.community_summaries = summaries
+        scheduler, generator = self._summary_scheduler(generator, kb_id)
+        summaries: Dict[int, str] = scheduler.run(
+            "community",
+            {comm: "\n".join(texts) for comm, texts in members.items()},
+            lambda text: self._summarize(generator, text, max_tokens=self.max_tokens),
+        )
+
+        if selected is None:
+            self.community_summaries = summaries
+        else:
+            self.community_summaries.update(summaries)
         return summaries
 
     def _summarize(
@@ -501,29 +762,20 @@ class Legra:
           - docs_meta.json (without embeddings)
           - emb_matrix.npy
           - faiss_index.bin (if using FaissFlatIndexer)
-          - graph.graphml
-          - community_summaries.json (if any)
+          - graph CSR arrays + node attributes
+          - community_summaries.msgpack (if any)
+          - legra.json, with the storage format version, last
+        See `LegraStore` for the layout.
         """
-        base = Path("legra_data")
-        path = base.joinpath(path)
+        store = LegraStore(Path("legra_data").joinpath(path))
+        path = store.path
         path.mkdir(parents=True, exist_ok=True)
 
         # Save docs_meta without embeddings
-        docs_meta_to_save: List[Dict[str, Any]] = []
-
-        for meta in self.docs_meta:
-            meta_copy = meta.copy()
-            meta_copy.pop("embedding", None)
-            docs_meta_to_save.append(meta_copy)
-
-        with open(path / "docs_meta.json", "w", encoding="utf-8") as f:
-            json.dump(docs_meta_to_save, f, ensure_ascii=False, indent=2)
-
-        with open(path / "legra.json", "w", encoding="utf-8") as f:
-            json.dump({"max_tokens": self.max_tokens}, f)
+        store.write_docs_meta(self.docs_meta)
 
         # Save embeddings matrix
-        np.save(path / "emb_matrix.npy", self.emb_matrix)
+        store.write_embeddings(self.emb_matrix)
 
         with open(path / "embedder.json", "w", encoding="utf-8") as f:
             json.dump(
@@ -556,17 +808,17 @@ class Legra:
             # Save index if FaissFlatIndexer
             if isinstance(self.indexer, Indexer) and hasattr(self.indexer, "index"):
                 try:
-                    faiss.write_index(self.indexer.index, str(path / "faiss_index.bin"))
+                    store.write_index(self.indexer.index)
                 except Exception:
                     pass
 
-            # Save graph to GraphML
-            self.graph.write_graphml(str(path / "graph.graphml"))
+            # Save graph as CSR arrays
+            store.write_graph(self.graph)
 
             # Save community summaries if exist
-            if self.community_summaries:
-                with open(path / "community_summaries.json", "w", encoding="utf-8") as f:
-                    json.dump(self.community_summaries, f, ensure_ascii=False, indent=2)
+            store.write_summaries(self.community_summaries)
+
+        store.write_config({"max_tokens": self.max_tokens, "graph_updates": self.graph_updates})
 
 
     @classmethod
@@ -575,27 +827,36 @@ class Legra:
         Load a knowledge-base snapshot from disk.
 
         Directory layout (some files may be missing):
-            docs_meta.json                # REQUIRED
+            docs_meta.msgpack             # REQUIRED
             emb_matrix.npy                # REQUIRED
             faiss_index.bin               # OPTIONAL
-            graph.graphml                 # OPTIONAL
-            community_summaries.json      # OPTIONAL
+            graph_*.npy / .msgpack        # OPTIONAL
+            community_summaries.msgpack   # OPTIONAL
             embedder.json                 # REQUIRED
             legra.json                    # REQUIRED  (contains max_tokens)
+
+        Stores written in format 1 (JSON / GraphML) are converted on first
+        load. For search, embeddings and the index are memory-mapped and the
+        graph, which retrieval does not use, is skipped.
         """
-        kb_path = Path("legra_data").joinpath(path)
+        store = LegraStore(Path("legra_data").joinpath(path))
+        kb_path = store.path
+        legra_conf = store.read_config()
+        if legra_conf.get("format_version", 1) < FORMAT_VERSION:
+            store.migrate()
+        elif legra_conf["format_version"] > FORMAT_VERSION:
+            raise RuntimeError(
+                f"KB {path} was saved in storage format {legra_conf['format_version']}, "
+                f"this version reads up to {FORMAT_VERSION}."
+            )
+        searching = load_reason == "search"
 
         # 1. docs_meta + embeddings  ------------------------------------
-        with open(kb_path / "docs_meta.json", encoding="utf-8") as f:
-            docs_meta: List[Dict[str, Any]] = json.load(f)
-
-        emb_matrix: npt.NDArray = np.load(kb_path / "emb_matrix.npy")
+        docs_meta: List[Dict[str, Any]] = store.read_docs_meta()
+        emb_matrix: npt.NDArray = store.read_embeddings(mmap=True)
 
         # 2. (optional) graph  ------------------------------------------
-        graph_file = kb_path / "graph.graphml"
-        graph: Optional[ig.Graph] = (
-            ig.Graph.Read_GraphML(str(graph_file)) if graph_file.exists() else None
-        )
+        graph: Optional[ig.Graph] = None if searching else store.read_graph()
 
         # 3. embedder  ---------------------------------------------------
         with open(kb_path / "embedder.json", encoding="utf-8") as f:
@@ -624,11 +885,11 @@ class Legra:
         dim = emb_matrix.shape[1]
         indexer = _FFI(dim=dim, use_gpu=False)
 
-        faiss_file = kb_path / "faiss_index.bin"
-        if faiss_file.exists():
-            indexer.index = faiss.read_index(str(faiss_file))
+        index = store.read_index(mmap=searching)
+        if index is not None:
+            indexer.index = index
         else:
-            if load_reason == "search":
+            if searching:
                 raise RuntimeError("Indexing has not been completed.")
 
         # 6. retriever (optional, but create default if missing)
@@ -653,18 +914,13 @@ class Legra:
         if docs_meta and "community" in docs_meta[0]:
             community_labels = [m.get("community") for m in docs_meta]
 
-        summaries_file = kb_path / "community_summaries.json"
-        community_summaries: Dict[int, str] = {}
-        if summaries_file.exists():
-            with open(summaries_file, encoding="utf-8") as f:
-                community_summaries = json.load(f)
+        community_summaries: Dict[int, str] = store.read_summaries()
 
         # 8. misc config  ------------------------------------------------
-        with open(kb_path / "legra.json", encoding="utf-8") as f:
-            max_tokens: int = json.load(f)["max_tokens"]
+        max_tokens: int = legra_conf["max_tokens"]
 
         # 9. create instance & inject loaded state -----------------------
-        return cls(
+        instance = cls(
                 doc_folder=Path(),  # original disk source no longer needed
                 chunker=None,  # chunker only used for *new* docs
                 max_tokens=max_tokens,
@@ -681,6 +937,8 @@ class Legra:
                 community_labels=community_labels,
                 community_summaries=community_summaries,
                 )
+        instance.graph_updates = legra_conf.get("graph_updates", 0)
+        return instance
 
 
     def _finalize_load(
@@ -1,5 +1,7 @@
-from .knn_graph import KNNGraphBuilder
+from .knn_graph import FaissKNNGraphBuilder, KNNGraphBuilder, get_graph_builder
 
 __all__ = [
     'KNNGraphBuilder',
+    'FaissKNNGraphBuilder',
+    'get_graph_builder',
 ]
@@ -1,11 +1,20 @@
-from typing import List, Tuple
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
+import faiss
 import igraph as ig
+import numpy as np
 import numpy.typing as npt
 from sklearn.neighbors import NearestNeighbors
 
+from ..utils import get_logger
+
+_logger = get_logger(__name__)
+
 __all__ = [
     'KNNGraphBuilder',
+    'FaissKNNGraphBuilder',
+    'get_graph_builder',
 ]
 
 
@@ -29,9 +38,13 @@ class KNNGraphBuilder:
         )
 
 
-    def fit(self, emb_matrix: npt.NDArray) -> Tuple[ig.Graph, List[Tuple[int, int]]]:
+    def fit(
+        self, emb_matrix: npt.NDArray, index: Optional[faiss.Index] = None
+    ) -> Tuple[ig.Graph, List[Tuple[int, int]]]:
         """
         Build the k-NN graph from emb_matrix (N × D).
+
+        `index` is accepted for interface compatibility and ignored.
         """
         N = emb_matrix.shape[0]
         if N < 2:  # nothing to connect
@@ -57,3 +70,253 @@ class KNNGraphBuilder:
         graph = ig.Graph(n=N, edges=edges, directed=False)
         return graph, edges
 
+
+class FaissKNNGraphBuilder(KNNGraphBuilder):
+    """
+    Build an undirected kNN graph with FAISS, querying neighbours in batches.
+
+    Modes:
+      - "exact":       batched brute-force search (BLAS, multi-threaded).
+      - "approximate": HNSW search; recall@k is estimated on a sample of nodes
+                       against exact neighbours and reported in `last_stats`.
+      - "auto":        exact up to `exact_max_nodes` nodes, approximate above.
+
+    A FAISS index passed to `fit` (e.g. the one LEGRA builds for retrieval) is
+    reused when it holds exactly the embedding matrix: a flat index serves exact
+    search, an HNSW/IVF index approximate search.
+
+    Edges are built as numpy arrays: node i is linked to each of its k
+    neighbours, duplicates from mutual neighbours collapse into one edge.
+    `fit` returns the edges as an (E, 2) int64 array.
+
+    `update` maintains an existing graph: only the given rows (new nodes, and
+    nodes that lost a neighbour) are queried and their edges merged into the
+    surviving ones, so the cost follows the size of the change.
+    """
+
+    def __init__(
+        self,
+        n_neighbors: int = 10,
+        metric: str = "cosine",
+        mode: str = "auto",
+        batch_size: int = 4096,
+        exact_max_nodes: int = 50_000,
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 40,
+        hnsw_ef_search: int = 64,
+        recall_sample_size: int = 1000,
+        seed: int = 0,
+    ):
+        if mode not in ("exact", "approximate", "auto"):
+            raise ValueError("mode must be one of 'exact', 'approximate', 'auto'")
+        if metric not in ("cosine", "euclidean", "l2"):
+            raise ValueError("metric must be 'cosine' or 'euclidean'")
+        super().__init__(n_neighbors=n_neighbors, metric=metric)
+        self.mode = mode
+        self.batch_size = batch_size
+        self.exact_max_nodes = exact_max_nodes
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+        self.recall_sample_size = recall_sample_size
+        self.seed = seed
+        self.last_stats: Dict[str, Any] = {}
+
+    @property
+    def _faiss_metric(self) -> int:
+        return faiss.METRIC_INNER_PRODUCT if self.metric == "cosine" else faiss.METRIC_L2
+
+    def fit(
+        self, emb_matrix: npt.NDArray, index: Optional[faiss.Index] = None
+    ) -> Tuple[ig.Graph, npt.NDArray]:
+        """
+        Build the k-NN graph from emb_matrix (N × D), reusing `index` if it fits.
+        """
+        started = time.perf_counter()
+        N = emb_matrix.shape[0]
+        if N < 2:  # nothing to connect
+            return ig.Graph(n=N), np.empty((0, 2), dtype=np.int64)
+
+        k = min(self.n_neighbors, N - 1)
+        vectors = self._prepare(emb_matrix)
+        mode = self.mode
+        if mode == "auto":
+            mode = "exact" if N <= self.exact_max_nodes else "approximate"
+
+        search_index = self._usable_index(index, mode, N, vectors.shape[1])
+        reused = search_index is not None
+        if search_index is None:
+            search_index = self._build_index(vectors, mode)
+
+        neighbours = self._search(search_index, vectors, k)
+        edges = self._edges_from_neighbours(neighbours)
+        graph = ig.Graph(n=N, edges=edges, directed=False)
+
+        self.last_stats = {
+            "mode": mode,
+            "nodes": N,
+            "edges": len(edges),
+            "k": k,
+            "reused_index": reused,
+            "seconds": round(time.perf_counter() - started, 3),
+            "recall": 1.0 if mode == "exact" else self._estimate_recall(vectors, neighbours, k),
+        }
+        _logger.info(f"kNN graph built: {self.last_stats}")
+        return graph, edges
+
+    def update(
+        self,
+        emb_matrix: npt.NDArray,
+        kept_edges: npt.NDArray,
+        rows: npt.NDArray,
+        index: Optional[faiss.Index] = None,
+    ) -> Tuple[ig.Graph, npt.NDArray]:
+        """
+        Re-query the neighbours of `rows` only and merge them into `kept_edges`.
+
+        `kept_edges` are the surviving edges of the previous graph, already
+        renumbered to rows of emb_matrix (N × D).
+        """
+        started = time.perf_counter()
+        N = emb_matrix.shape[0]
+        rows = np.asarray(rows, dtype=np.int64)
+        kept_edges = np.asarray(kept_edges, dtype=np.int64).reshape(-1, 2)
+        if N < 2:
+            return ig.Graph(n=N), np.empty((0, 2), dtype=np.int64)
+
+        k = min(self.n_neighbors, N - 1)
+        edges = kept_edges
+        if len(rows):
+            vectors = self._prepare(emb_matrix)
+            # Querying a handful of rows exhaustively is cheaper than building HNSW
+            search_index = self._usable_index(index, "exact", N, vectors.shape[1])
+            if search_index is None:
+                search_index = self._usable_index(index, "approximate", N, vectors.shape[1])
+            if search_index is None:
+                search_index = self._build_index(vectors, "exact")
+            neighbours = self._search(search_index, vectors, k, rows=rows)
+            edges = np.concatenate([kept_edges, self._edges_from_neighbours(neighbours, rows, N)])
+        edges = self._unique_edges(edges[:, 0], edges[:, 1], N)
+        graph = ig.Graph(n=N, edges=edges, directed=False)
+
+        self.last_stats = {
+            "mode": "incremental",
+            "nodes": N,
+            "edges": len(edges),
+            "k": k,
+            "queried": len(rows),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        _logger.info(f"kNN graph updated: {self.last_stats}")
+        return graph, edges
+
+    def _prepare(self, emb_matrix: npt.NDArray) -> npt.NDArray:
+        vectors = np.ascontiguousarray(emb_matrix, dtype=np.float32)
+        if self.metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+            vectors = vectors / norms
+        return vectors
+
+    def _usable_index(
+        self, index: Optional[faiss.Index], mode: str, n: int, dim: int
+    ) -> Optional[faiss.Index]:
+        """Return `index` if it holds this matrix in order, with the right metric and kind."""
+        if index is None or index.ntotal != n or index.d != dim:
+            return None
+        if index.metric_type != self._faiss_metric:
+            return None
+        index = faiss.downcast_index(index)
+        if mode == "exact":
+            return index if isinstance(index, faiss.IndexFlat) else None
+        return index if isinstance(index, (faiss.IndexHNSW, faiss.IndexIVF)) else None
+
+    def _build_index(self, vectors: npt.NDArray, mode: str) -> faiss.Index:
+        dim = vectors.shape[1]
+        if mode == "exact":
+            index = faiss.IndexFlat(dim, self._faiss_metric)
+        else:
+            index = faiss.IndexHNSWFlat(dim, self.hnsw_m, self._faiss_metric)
+            index.hnsw.efConstruction = self.hnsw_ef_construction
+        index.add(vectors)
+        return index
+
+    def _search(
+        self, index: faiss.Index, vectors: npt.NDArray, k: int, rows: Optional[npt.NDArray] = None
+    ) -> npt.NDArray:
+        """Neighbour ids (rows × k, all rows by default) excluding each node itself, -1 where missing."""
+        if rows is None:
+            rows = np.arange(vectors.shape[0], dtype=np.int64)
+        n = len(rows)
+        params = None
+        if isinstance(index, faiss.IndexHNSW):
+            params = faiss.SearchParametersHNSW(efSearch=max(self.hnsw_ef_search, k + 1))
+        elif isinstance(index, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF(nprobe=max(index.nprobe, 8))
+
+        neighbours = np.empty((n, k), dtype=np.int64)
+        for start in range(0, n, self.batch_size):
+            stop = min(start + self.batch_size, n)
+            batch = rows[start:stop]
+            _, ids = index.search(vectors[batch], k + 1, params=params)
+            neighbours[start:stop] = self._drop_self(ids, batch, k)
+        return neighbours
+
+    @staticmethod
+    def _drop_self(ids: npt.NDArray, rows: npt.NDArray, k: int) -> npt.NDArray:
+        """Remove each row's own id (wherever it ranks, if at all) keeping k columns."""
+        is_self = ids == rows[:, None]
+        # Rows that did not return themselves lose their last (k+1-th) neighbour instead
+        is_self[~is_self.any(axis=1), -1] = True
+        return ids[~is_self].reshape(len(rows), k)
+
+    @staticmethod
+    def _edges_from_neighbours(
+        neighbours: npt.NDArray, sources: Optional[npt.NDArray] = None, n: Optional[int] = None
+    ) -> npt.NDArray:
+        """Unique undirected edges linking each source row to its neighbours."""
+        rows, k = neighbours.shape
+        if sources is None:
+            sources = np.arange(rows, dtype=np.int64)
+        n = rows if n is None else n
+        src = np.repeat(np.asarray(sources, dtype=np.int64), k)
+        dst = neighbours.ravel()
+        valid = dst >= 0
+        return FaissKNNGraphBuilder._unique_edges(src[valid], dst[valid], n)
+
+    @staticmethod
+    def _unique_edges(src: npt.NDArray, dst: npt.NDArray, n: int) -> npt.NDArray:
+        lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+        keys = np.unique(lo[lo != hi] * n + hi[lo != hi])
+        return np.stack([keys // n, keys % n], axis=1)
+
+    def _estimate_recall(self, vectors: npt.NDArray, neighbours: npt.NDArray, k: int) -> float:
+        """Average recall@k of `neighbours` against exact search on a node sample."""
+        n = vectors.shape[0]
+        sample_size = min(self.recall_sample_size, n)
+        if sample_size == 0:
+            return 1.0
+        rng = np.random.default_rng(self.seed)
+        rows = np.sort(rng.choice(n, size=sample_size, replace=False))
+
+        exact = faiss.IndexFlat(vectors.shape[1], self._faiss_metric)
+        exact.add(vectors)
+        _, ids = exact.search(vectors[rows], k + 1)
+        truth = self._drop_self(ids, rows, k)
+
+        hits = sum(
+            len(np.intersect1d(truth[i], neighbours[row], assume_unique=True))
+            for i, row in enumerate(rows)
+        )
+        return round(hits / (sample_size * k), 4)
+
+
+def get_graph_builder(
+    n_neighbors: int = 10, metric: str = "cosine", mode: str = "auto"
+) -> KNNGraphBuilder:
+    """
+    FAISS-backed builder for the metrics it supports, sklearn for the rest
+    (e.g. "manhattan").
+    """
+    if metric in ("cosine", "euclidean", "l2"):
+        return FaissKNNGraphBuilder(n_neighbors=n_neighbors, metric=metric, mode=mode)
+    return KNNGraphBuilder(n_neighbors=n_neighbors, metric=metric)
@@ -6,10 +6,12 @@ Implements the BaseDataProvider interface for LEGRA-based graph search.
 
 import logging
 from typing import List, Dict, Any, Optional
+from app.core.tenant_scope import get_tenant_context
 from .config import LegraConfig
 from ..base import FinalizableProvider, SearchResult
 from ..legra import FaissFlatIndexer, HuggingFaceGenerator, Legra, LeidenClusterer, SemanticChunker, \
-    SentenceTransformerEmbedder
+    SentenceTransformerEmbedder, get_graph_builder
+from .summarization import get_budget
 logger = logging.getLogger(__name__)
 
 
@@ -67,9 +69,12 @@ class LegraProvider(FinalizableProvider):
                 chunker=chunker,
                 embedder=embedder,
                 indexer=indexer,
+                graph_builder=self._graph_builder(),
                 clusterer=clusterer,
                 generator=generator,
                 max_tokens=self.config.max_tokens,
+                summary_concurrency=self.config.summary_concurrency,
+                summary_budget=self._summary_budget(),
             )
 
             self._initialized = True
@@ -229,10 +234,13 @@ class LegraProvider(FinalizableProvider):
             return False
 
         try:
-            # Build the graph and clusters
+            # Update (or rebuild) the graph and clusters
             self.legra_instance = Legra.load(str(self.knowledge_base_id), load_reason="finalize")
             self.legra_instance.clusterer =  LeidenClusterer(resolution_parameter=0.5)
-            self.legra_instance.complete_index_graph(
+            self.legra_instance.graph_builder = self._graph_builder()
+            self.legra_instance.summary_concurrency = self.config.summary_concurrency
+            self.legra_instance.summary_budget = self._summary_budget()
+            self.legra_instance.update_index_graph(
                 str(self.knowledge_base_id))
             return True
 
@@ -240,6 +248,21 @@ class LegraProvider(FinalizableProvider):
             logger.error(f"Failed to finalize LEGRA: {e}")
             return False
 
+    def _summary_budget(self):
+        # Shared by all knowledge bases of the tenant
+        return get_budget(
+            get_tenant_context(),
+            requests_per_minute=self.config.summary_requests_per_minute,
+            tokens_per_minute=self.config.summary_tokens_per_minute,
+        )
+
+    def _graph_builder(self):
+        return get_graph_builder(
+            n_neighbors=self.config.n_neighbors,
+            metric=self.config.metric,
+            mode=self.config.knn_mode,
+        )
+
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the LEGRA provider"""
         stats = {
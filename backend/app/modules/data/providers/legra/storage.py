@@ -0,0 +1,221 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import faiss
+import igraph as ig
+import numpy as np
+import numpy.typing as npt
+import ormsgpack
+
+from .utils import get_logger
+
+_logger = get_logger(__name__)
+
+__all__ = [
+    'FORMAT_VERSION',
+    'LegraStore',
+]
+
+# 1: docs_meta.json, graph.graphml, community_summaries.json (indented JSON / XML)
+# 2: msgpack metadata and summaries, graph as CSR .npy arrays
+FORMAT_VERSION = 2
+
+
+class LegraStore:
+    """
+    On-disk layout of one knowledge base under legra_data/<kb_id>.
+
+    Files (format 2):
+        legra.json                    config, carries "format_version"
+        docs_meta.msgpack             chunk metadata, without embeddings
+        emb_matrix.npy                embeddings, memory-mapped on load
+        graph_indptr.npy              CSR row pointers of the kNN graph
+        graph_indices.npy             CSR column ids (each edge once, i < j)
+        graph_nodes.msgpack           per-vertex node_key / community
+        community_summaries.msgpack   [[community, summary], ...]
+        summary_cache.msgpack         {content hash: summary}, see SummaryCache
+        faiss_index.bin               vector index
+
+    Readers fall back to the format 1 files, and writers remove them once the
+    binary counterpart is in place, so a KB migrates as it is saved (or all at
+    once via `migrate`). Every file is written to a temp name and renamed, so
+    memory-mapped readers keep a consistent view of the previous version.
+    """
+
+    LEGACY_FILES = ("docs_meta.json", "graph.graphml", "community_summaries.json")
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    # ------------------------------------------------------------------ #
+    # Config                                                             #
+    # ------------------------------------------------------------------ #
+    def read_config(self) -> Dict[str, Any]:
+        with open(self.path / "legra.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_config(self, config: Dict[str, Any]) -> None:
+        self._write_atomic(
+            "legra.json",
+            json.dumps({**config, "format_version": FORMAT_VERSION}).encode("utf-8"),
+        )
+
+    # ------------------------------------------------------------------ #
+    # Chunk metadata & embeddings                                        #
+    # ------------------------------------------------------------------ #
+    def read_docs_meta(self) -> List[Dict[str, Any]]:
+        packed = self.path / "docs_meta.msgpack"
+        if packed.exists():
+            return ormsgpack.unpackb(packed.read_bytes())
+        with open(self.path / "docs_meta.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_docs_meta(self, docs_meta: List[Dict[str, Any]]) -> None:
+        stripped = [{k: v for k, v in m.items() if k != "embedding"} for m in docs_meta]
+        self._write_atomic(
+            "docs_meta.msgpack",
+            ormsgpack.packb(stripped, option=ormsgpack.OPT_SERIALIZE_NUMPY),
+        )
+        self.remove("docs_meta.json")
+
+    def read_embeddings(self, mmap: bool = True) -> npt.NDArray:
+        return np.load(self.path / "emb_matrix.npy", mmap_mode="r" if mmap else None)
+
+    def write_embeddings(self, emb_matrix: npt.NDArray) -> None:
+        self._write_npy("emb_matrix.npy", emb_matrix)
+
+    def read_index(self, mmap: bool = True) -> Optional[faiss.Index]:
+        index_file = self.path / "faiss_index.bin"
+        if not index_file.exists():
+            return None
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+        return faiss.read_index(str(index_file), flags)
+
+    def write_index(self, index: faiss.Index) -> None:
+        self._write_atomic("faiss_index.bin", faiss.serialize_index(index))
+
+    # ------------------------------------------------------------------ #
+    # Graph                                                              #
+    # ------------------------------------------------------------------ #
+    def has_graph(self) -> bool:
+        return (self.path / "graph_indptr.npy").exists() or (self.path / "graph.graphml").exists()
+
+    def read_graph(self) -> Optional[ig.Graph]:
+        if not (self.path / "graph_indptr.npy").exists():
+            graphml = self.path / "graph.graphml"
+            return ig.Graph.Read_GraphML(str(graphml)) if graphml.exists() else None
+
+        indptr = np.load(self.path / "graph_indptr.npy", mmap_mode="r")
+        indices = np.load(self.path / "graph_indices.npy", mmap_mode="r")
+        n = len(indptr) - 1
+        src = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+        graph = ig.Graph(n=n, edges=np.stack([src, indices], axis=1), directed=False)
+        nodes = ormsgpack.unpackb((self.path / "graph_nodes.msgpack").read_bytes())
+        for name, values in nodes.items():
+            graph.vs[name] = values
+        return graph
+
+    def write_graph(self, graph: ig.Graph) -> None:
+        n = graph.vcount()
+        edges = np.array(graph.get_edgelist(), dtype=np.int64).reshape(-1, 2)
+        lo, hi = edges.min(axis=1), edges.max(axis=1)
+        order = np.lexsort((hi, lo))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(lo, minlength=n), out=indptr[1:])
+        nodes = {name: graph.vs[name] for name in graph.vs.attributes()}
+
+        # Row pointers go last: until they are back the graph reads as missing
+        self.remove("graph_indptr.npy")
+        self._write_npy("graph_indices.npy", hi[order].astype(np.int32 if n < 2**31 else np.int64))
+        self._write_atomic(
+            "graph_nodes.msgpack", ormsgpack.packb(nodes, option=ormsgpack.OPT_SERIALIZE_NUMPY)
+        )
+        self._write_npy("graph_indptr.npy", indptr)
+        self.remove("graph.graphml")
+
+    # ------------------------------------------------------------------ #
+    # Community summaries                                                #
+    # ------------------------------------------------------------------ #
+    def read_summaries(self) -> Dict[int, str]:
+        packed = self.path / "community_summaries.msgpack"
+        if packed.exists():
+            return {int(c): s for c, s in ormsgpack.unpackb(packed.read_bytes())}
+        legacy = self.path / "community_summaries.json"
+        if legacy.exists():
+            with open(legacy, encoding="utf-8") as f:
+                # JSON object keys are strings; community labels are ints
+                return {int(k): v for k, v in json.load(f).items()}
+        return {}
+
+    def write_summaries(self, summaries: Dict[int, str]) -> None:
+        if summaries:
+            self._write_atomic(
+                "community_summaries.msgpack",
+                ormsgpack.packb([[int(c), s] for c, s in summaries.items()]),
+            )
+        else:
+            self.remove("community_summaries.msgpack")
+        self.remove("community_summaries.json")
+
+    def read_summary_cache(self) -> Dict[str, str]:
+        packed = self.path / "summary_cache.msgpack"
+        return ormsgpack.unpackb(packed.read_bytes()) if packed.exists() else {}
+
+    def write_summary_cache(self, entries: Dict[str, str]) -> None:
+        self._write_atomic("summary_cache.msgpack", ormsgpack.packb(entries))
+
+    # ------------------------------------------------------------------ #
+    # Migration                                                          #
+    # ------------------------------------------------------------------ #
+    def migrate(self) -> bool:
+        """
+        Rewrite a format 1 knowledge base in the current format.
+        Returns True if anything was converted.
+        """
+        if not any((self.path / name).exists() for name in self.LEGACY_FILES):
+            return False
+
+        _logger.info(f"Migrating LEGRA store {self.path} to format {FORMAT_VERSION} …")
+        if (self.path / "docs_meta.json").exists():
+            self.write_docs_meta(self.read_docs_meta())
+        if (self.path / "graph.graphml").exists():
+            self.write_graph(self.read_graph())
+        if (self.path / "community_summaries.json").exists():
+            self.write_summaries(self.read_summaries())
+        if (self.path / "legra.json").exists():
+            self.write_config(self.read_config())
+        return True
+
+    # ------------------------------------------------------------------ #
+    # Helpers                                                            #
+    # ------------------------------------------------------------------ #
+    def remove(self, name: str) -> None:
+        p = self.path / name
+        if p.exists():
+            p.unlink()
+
+    def _write_npy(self, name: str, array: npt.NDArray) -> None:
+        self._write_atomic(name, array, npy=True)
+
+    def _write_atomic(self, name: str, data, npy: bool = False) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if npy:
+                    np.save(f, np.asarray(data))
+                else:
+                    f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path / name)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
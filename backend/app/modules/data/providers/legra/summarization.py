@@ -0,0 +1,258 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .generation.base import Generator
+from .storage import LegraStore
+from .utils import get_logger
+
+_logger = get_logger(__name__)
+
+__all__ = [
+    'RateBudget',
+    'get_budget',
+    'BudgetedGenerator',
+    'SummaryCache',
+    'SummaryScheduler',
+]
+
+
+class RateBudget:
+    """
+    Requests- and tokens-per-minute limits as two token buckets, refilled
+    continuously. A budget is shared by every summarisation run of a tenant
+    (see `get_budget`), so concurrent finalisations split one allowance.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = clock()
+
+    def acquire(self, tokens: int) -> float:
+        """Block until one request of `tokens` tokens fits. Returns the time waited."""
+        waited = 0.0
+        while True:
+            delay = self._try_reserve(tokens)
+            if delay == 0:
+                return waited
+            self._sleep(delay)
+            waited += delay
+
+    def _try_reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = self._clock()
+            elapsed, self._updated = now - self._updated, now
+
+            delay = 0.0
+            if self.requests_per_minute:
+                rate = self.requests_per_minute / 60
+                self._requests = min(self.requests_per_minute, self._requests + elapsed * rate)
+                delay = max(delay, (1 - self._requests) / rate)
+            if self.tokens_per_minute:
+                # A single request larger than the whole budget waits for a full bucket
+                tokens = min(tokens, self.tokens_per_minute)
+                rate = self.tokens_per_minute / 60
+                self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * rate)
+                delay = max(delay, (tokens - self._tokens) / rate)
+
+            if delay > 0:
+                return delay
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+            return 0.0
+
+
+_budgets: Dict[str, RateBudget] = {}
+_budgets_lock = threading.Lock()
+
+
+def get_budget(
+    key: str,
+    requests_per_minute: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+) -> Optional[RateBudget]:
+    """Process-wide budget for `key` (e.g. the tenant id), None when unlimited."""
+    if not requests_per_minute and not tokens_per_minute:
+        return None
+    with _budgets_lock:
+        budget = _budgets.get(key)
+        if (budget is None or budget.requests_per_minute != requests_per_minute
+                or budget.tokens_per_minute != tokens_per_minute):
+            budget = _budgets[key] = RateBudget(requests_per_minute, tokens_per_minute)
+        return budget
+
+
+class BudgetedGenerator(Generator):
+    """
+    Wraps a generator so every call is charged against a `RateBudget`.
+    Prompt size is counted with the generator's tokenizer when it has one,
+    roughly (4 characters per token) otherwise.
+    """
+
+    def __init__(self, generator: Generator, budget: Optional[RateBudget]) -> None:
+        self.generator = generator
+        self.budget = budget
+
+    def __getattr__(self, name: str) -> Any:
+        # tokenizer, model_name, ... of the wrapped generator
+        if name == "generator":
+            raise AttributeError(name)
+        return getattr(self.generator, name)
+
+    def count_tokens(self, text: str) -> int:
+        tokenizer = getattr(self.generator, "tokenizer", None)
+        if tokenizer is not None:
+            return len(tokenizer.encode(text, add_special_tokens=True))
+        return len(text) // 4 + 1
+
+    def generate(self, query: str, context: str | None = None, **kwargs: Any) -> str:
+        if self.budget is not None:
+            self.budget.acquire(self.count_tokens(query) + self.count_tokens(context or ""))
+        if context is None:
+            return self.generator.generate(query, **kwargs)
+        return self.generator.generate(query, context, **kwargs)
+
+
+class SummaryCache:
+    """
+    Summaries keyed by a hash of the summarised content, persisted with the
+    knowledge base. Unchanged communities / nodes are never sent to the LLM
+    again, and since every finished summary lands here, the cache doubles as
+    the checkpoint a crashed run resumes from.
+    """
+
+    def __init__(self, store: Optional[LegraStore] = None, namespace: str = "") -> None:
+        self.store = store
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._entries: Dict[str, str] = store.read_summary_cache() if store is not None else {}
+        self._dirty = False
+
+    def key(self, kind: str, text: str) -> str:
+        digest = hashlib.sha256()
+        for part in (self.namespace, kind, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._entries.get(key)
+
+    def put(self, key: str, summary: str) -> None:
+        with self._lock:
+            self._entries[key] = summary
+            self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self.store is None or not self._dirty:
+                return
+            entries = dict(self._entries)
+            self._dirty = False
+        self.store.write_summary_cache(entries)
+
+
+class SummaryScheduler:
+    """
+    Summarises many texts with bounded concurrency.
+
+    Cached results are returned without an LLM call, identical texts are
+    summarised once, and the cache is flushed every `checkpoint_every`
+    completions (and when the run ends or fails) so a restarted run picks up
+    where the last checkpoint left off.
+    """
+
+    def __init__(
+        self,
+        cache: SummaryCache,
+        max_concurrency: int = 4,
+        checkpoint_every: int = 20,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.checkpoint_every = checkpoint_every
+        self.last_stats: Dict[str, Any] = {}
+
+    def run(
+        self,
+        kind: str,
+        texts: Dict[Hashable, str],
+        summarize: Callable[[str], str],
+    ) -> Dict[Hashable, str]:
+        """Summaries for every entry of `texts`, keyed like `texts`."""
+        started = time.perf_counter()
+        results: Dict[Hashable, str] = {}
+        pending: Dict[str, Tuple[str, List[Hashable]]] = {}
+        for item, text in texts.items():
+            key = self.cache.key(kind, text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[item] = cached
+            else:
+                pending.setdefault(key, (text, []))[1].append(item)
+
+        generated = 0
+        error: Optional[BaseException] = None
+        pool = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                  thread_name_prefix="legra-summary")
+        try:
+            futures = {pool.submit(summarize, text): key for key, (text, _) in pending.items()}
+            remaining = set(futures)
+            while remaining:
+                done, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    if future.exception() is not None:
+                        # Stop queued work, but keep what is already in flight
+                        if error is None:
+                            error = future.exception()
+                            for other in remaining:
+                                other.cancel()
+                        continue
+                    key = futures[future]
+                    summary = future.result()
+                    self.cache.put(key, summary)
+                    for item in pending[key][1]:
+                        results[item] = summary
+                    generated += 1
+                    if generated % self.checkpoint_every == 0:
+                        self.cache.flush()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.cache.flush()
+        if error is not None:
+            _logger.error(f"Summarisation stopped after {generated} new {kind} summaries: {error}")
+            raise error
+
+        self.last_stats = {
+            "kind": kind,
+            "total": len(texts),
+            "cached": len(texts) - sum(len(items) for _, items in pending.values()),
+            "generated": generated,
+            "concurrency": self.max_concurrency,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        _logger.info(f"Summaries done: {self.last_stats}")
+        return results
@@ -5,11 +5,12 @@ A clean, modular vector provider system that separates concerns:
 - chunking: Text splitting strategies
 - embedding: Text embedding providers  
 - db: Vector database providers
+- lexical: Keyword (BM25) indexes for hybrid search
 - orchestrator: Coordinates all components based on configuration
 """
 
 from .provider import VectorProvider
-from .config import ChunkConfig, EmbeddingConfig, VectorDBConfig, VectorConfig
+from .config import ChunkConfig, EmbeddingConfig, VectorDBConfig, LexicalConfig, VectorConfig
 
 __all__ = ["VectorProvider", "ChunkConfig",
-           "EmbeddingConfig", "VectorDBConfig", "VectorConfig"]
+           "EmbeddingConfig", "VectorDBConfig", "LexicalConfig", "VectorConfig"]
@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field
 from .chunking import ChunkConfig
 from .embedding import EmbeddingConfig
 from .db import VectorDBConfig
+from .lexical import LexicalConfig
 
 
 class VectorConfig(BaseModel):
@@ -20,6 +21,8 @@ class VectorConfig(BaseModel):
         default_factory=EmbeddingConfig)
     vector_db: VectorDBConfig = Field(
         default_factory=VectorDBConfig)
+    lexical: LexicalConfig = Field(
+        default_factory=LexicalConfig)
 
     class Config:
         extra = "allow"  # Allow additional fields for extensibility
@@ -35,6 +38,7 @@ class VectorConfig(BaseModel):
         chunking = data.get("chunking", None)
         embedding = data.get("embedding", None)
         vector_db = data.get("vector_db", None)
+        lexical = data.get("lexical", None)
 
         return VectorConfig(
             enabled=data.get("enabled", False),
@@ -43,4 +47,6 @@ class VectorConfig(BaseModel):
                 **embedding) if embedding else EmbeddingConfig(),
             vector_db=VectorDBConfig(
                 **vector_db) if vector_db else VectorDBConfig(),
+            lexical=LexicalConfig(
+                **lexical) if lexical else LexicalConfig(),
         )
@@ -41,6 +41,21 @@ class ChromaVectorDB(BaseVectorDB):
             logger.error(f"Failed to initialize ChromaDB: {e}")
             return False
 
+    @staticmethod
+    def _build_where(filter_dict: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Translate a flat equality filter into a Chroma where clause
+
+        Chroma only accepts one key per clause, so several keys become an $and.
+        The filter is then applied by Chroma's metadata index before the ANN
+        search, rather than on a truncated result list.
+        """
+        if not filter_dict:
+            return None
+        if len(filter_dict) == 1 or any(key.startswith("$") for key in filter_dict):
+            return filter_dict
+        return {"$and": [{key: value} for key, value in filter_dict.items()]}
+
     def set_embedding_function(self, embedding_function):
         """Set the embedding function for LangChain integration"""
         self.embedding_function = embedding_function
@@ -172,7 +187,7 @@ class ChromaVectorDB(BaseVectorDB):
             results = await self.collection.query(
                 query_embeddings=[query_vector],
                 n_results=limit,
-                where=filter_dict,
+                where=self._build_where(filter_dict),
                 include=["documents", "metadatas", "distances"]
             )
 
@@ -238,7 +253,7 @@ class ChromaVectorDB(BaseVectorDB):
 
             # Use async method for all clients
             results = await self.collection.get(
-                where=filter_dict,
+                where=self._build_where(filter_dict),
                 include=[]  # Only IDs
             )
 
@@ -255,10 +270,12 @@ class ChromaVectorDB(BaseVectorDB):
                 logger.error("Collection not initialized")
                 return 0
 
-            # ChromaDB doesn't have a direct count method, so we get all IDs
-            # Use async method for all clients
+            if not filter_dict:
+                return await self.collection.count()
+
+            # Filtered counts need the matching IDs
             results = await self.collection.get(
-                where=filter_dict,
+                where=self._build_where(filter_dict),
                 include=[]  # Only IDs
             )
 
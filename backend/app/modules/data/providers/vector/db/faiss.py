@@ -2,28 +2,112 @@
 FAISS vector database implementation
 """
 
+import asyncio
 import logging
 import os
-import pickle
-from typing import List, Dict, Any
+import threading
+import weakref
+from typing import List, Dict, Any, Optional, Set
 import numpy as np
 
 from .base import BaseVectorDB, VectorDBConfig, SearchResult
+from .faiss_store import ADD, DELETE, FaissCollectionStore
 
 logger = logging.getLogger(__name__)
 
+# Compact once tombstones make up this share of the index (override via extra_params)
+DEFAULT_COMPACTION_RATIO = 0.2
+# ...but never for fewer tombstones than this, small collections are cheap to over-fetch
+DEFAULT_COMPACTION_MIN_TOMBSTONES = 1000
+# Write-behind: flush dirty collections after this many seconds...
+DEFAULT_FLUSH_INTERVAL_SECONDS = 5.0
+# ...or as soon as this many metadata changes are pending
+DEFAULT_FLUSH_MAX_PENDING = 10000
+# Rewrite the metadata log once it holds this many more records than live entries
+LOG_REWRITE_SLACK = 10000
+# Filtered searches over at most this many matches are scored exactly (override via extra_params)
+DEFAULT_BRUTE_FORCE_MAX_CANDIDATES = 10000
+# Upper bound for the widened HNSW beam on filtered searches
+MAX_FILTERED_EF_SEARCH = 1024
+# Per-chunk positional keys, never worth an inverted index
+UNINDEXED_METADATA_KEYS = frozenset({"chunk_index", "chunk_id", "start_char", "end_char"})
+
+# Collections with a persist directory, flushed on shutdown
+_persistent_collections: "weakref.WeakSet[FaissVectorDB]" = weakref.WeakSet()
+
+
+async def flush_faiss_collections():
+    """Flush every persistent FAISS collection with unsaved changes"""
+    for db in list(_persistent_collections):
+        try:
+            await db.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush FAISS collection {db.config.collection_name}: {e}")
+
+
+def flush_faiss_collections_sync():
+    """Blocking flush of every persistent FAISS collection, for processes without a running loop"""
+    for db in list(_persistent_collections):
+        try:
+            db.flush_sync()
+        except Exception as e:
+            logger.error(f"Failed to flush FAISS collection {db.config.collection_name}: {e}")
+
 
 class FaissVectorDB(BaseVectorDB):
-    """FAISS vector database provider"""
+    """
+    FAISS vector database provider
+
+    Vectors live in an IndexIDMap2 under stable 64-bit ids. Deletes only tombstone
+    the id and are skipped at search time; the index is compacted in the background
+    once enough tombstones accumulate.
+
+    Scalar metadata values are kept in an inverted index (key -> value -> ids), used
+    for exact get_all_ids lookups and to pre-filter searches.
+
+    Persistence is write-behind: changes are buffered and flushed on an interval,
+    once enough are pending, and on close. See faiss_store for the on-disk layout.
+    """
     
     def __init__(self, config: VectorDBConfig):
         super().__init__(config)
+        self.faiss = None
         self.index = None
-        self.id_map = {}  # Maps internal index to document ID
+        self.id_map: Dict[int, str] = {}  # Maps internal id to document ID
+        self.doc_to_id: Dict[str, int] = {}  # Maps document ID to internal id
         self.metadata_map = {}  # Maps document ID to metadata
         self.content_map = {}  # Maps document ID to content
+        self.tombstones: Set[int] = set()  # Internal ids deleted but still in the index
+        self.metadata_index: Dict[str, Dict[Any, Set[int]]] = {}  # key -> value -> internal ids
         self.dimension = None
         self.next_id = 0
+        self.compaction_ratio = float(
+            self.config.extra_params.get("compaction_ratio", DEFAULT_COMPACTION_RATIO))
+        self.compaction_min_tombstones = int(
+            self.config.extra_params.get("compaction_min_tombstones", DEFAULT_COMPACTION_MIN_TOMBSTONES))
+        filterable_keys = self.config.extra_params.get("filterable_keys")
+        self.filterable_keys = frozenset(filterable_keys) if filterable_keys is not None else None
+        self.brute_force_max_candidates = int(
+            self.config.extra_params.get("brute_force_max_candidates", DEFAULT_BRUTE_FORCE_MAX_CANDIDATES))
+        self.flush_interval = float(
+            self.config.extra_params.get("flush_interval_seconds", DEFAULT_FLUSH_INTERVAL_SECONDS))
+        self.flush_max_pending = int(
+            self.config.extra_params.get("flush_max_pending", DEFAULT_FLUSH_MAX_PENDING))
+        self._index_lock = asyncio.Lock()
+        self._compaction_task: Optional[asyncio.Task] = None
+
+        # Write-behind state
+        self.store = None
+        self._pending_records: List[tuple] = []
+        self._index_dirty = False
+        self._rewrite_log = False
+        self._flush_now = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._commit_lock = threading.Lock()
+        if self.config.persist_directory:
+            self.store = FaissCollectionStore(self.config.persist_directory, self.config.collection_name)
+            _persistent_collections.add(self)
     
     async def initialize(self) -> bool:
         """Initialize the FAISS index"""
@@ -32,7 +116,7 @@ class FaissVectorDB(BaseVectorDB):
             self.faiss = faiss
             
             # Load existing index if it exists
-            if self.config.persist_directory:
+            if self.store and self.index is None:
                 self._load_index()
             
             logger.info("Initialized FAISS vector database")
@@ -52,40 +136,18 @@ class FaissVectorDB(BaseVectorDB):
                 if not await self.initialize():
                     return False
             
+            # Keep a collection loaded from disk
+            if self.index is not None and self.dimension == dimension:
+                logger.info(f"Using existing FAISS index with {self.index.ntotal} vectors")
+                return True
+
             self.dimension = dimension
-            
-            # Create index based on configuration
-            if self.config.index_type == "flat":
-                if self.config.distance_metric == "cosine":
-                    # Normalize vectors for cosine similarity
-                    self.index = self.faiss.IndexFlatIP(dimension)
-                elif self.config.distance_metric == "euclidean":
-                    self.index = self.faiss.IndexFlatL2(dimension)
-                else:
-                    self.index = self.faiss.IndexFlatIP(dimension)  # Default to inner product
-            
-            elif self.config.index_type == "hnsw":
-                # HNSW index for faster search
-                if self.config.distance_metric == "cosine":
-                    self.index = self.faiss.IndexHNSWFlat(dimension, self.config.hnsw_m)
-                    self.index.hnsw.efConstruction = self.config.hnsw_ef_construction
-                    self.index.hnsw.efSearch = self.config.hnsw_ef_search
-                elif self.config.distance_metric == "euclidean":
-                    self.index = self.faiss.IndexHNSWFlat(dimension, self.config.hnsw_m, self.faiss.METRIC_L2)
-                    self.index.hnsw.efConstruction = self.config.hnsw_ef_construction
-                    self.index.hnsw.efSearch = self.config.hnsw_ef_search
-                else:
-                    self.index = self.faiss.IndexHNSWFlat(dimension, self.config.hnsw_m)
-            
-            else:
-                # Default to flat index
-                self.index = self.faiss.IndexFlatIP(dimension)
+            self.index = self._new_index(dimension)
             
             # Reset mappings
-            self.id_map = {}
-            self.metadata_map = {}
-            self.content_map = {}
-            self.next_id = 0
+            self._reset_mappings()
+            self._pending_records = []
+            self._mark_dirty(index_changed=True, rewrite_log=True)
             
             logger.info(f"Created FAISS index with dimension {dimension}")
             return True
@@ -97,20 +159,17 @@ class FaissVectorDB(BaseVectorDB):
     async def delete_collection(self) -> bool:
         """Delete the collection"""
         try:
+            self._cancel_compaction()
+            self._cancel_flush()
             self.index = None
-            self.id_map = {}
-            self.metadata_map = {}
-            self.content_map = {}
-            self.next_id = 0
+            self._reset_mappings()
+            self._pending_records = []
+            self._index_dirty = self._rewrite_log = False
             
             # Delete persisted files
-            if self.config.persist_directory:
-                index_file = os.path.join(self.config.persist_directory, f"{self.config.collection_name}.index")
-                metadata_file = os.path.join(self.config.persist_directory, f"{self.config.collection_name}_metadata.pkl")
-                
-                for file_path in [index_file, metadata_file]:
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
+            if self.store:
+                with self._commit_lock:
+                    self.store.destroy()
             
             logger.info("Deleted FAISS collection")
             return True
@@ -126,38 +185,40 @@ class FaissVectorDB(BaseVectorDB):
         metadatas: List[Dict[str, Any]],
         contents: List[str]
     ) -> bool:
-        """Add vectors to the index"""
+        """Add vectors to the index, replacing any existing vectors with the same IDs"""
         try:
             if not self.index:
                 logger.error("Index not initialized")
                 return False
             
             # Convert to numpy array
-            vectors_np = np.array(vectors, dtype=np.float32)
-            
-            # Normalize vectors if using cosine similarity
-            if self.config.distance_metric == "cosine":
-                norms = np.linalg.norm(vectors_np, axis=1, keepdims=True)
-                norms = np.where(norms == 0, 1, norms)  # Avoid division by zero
-                vectors_np = vectors_np / norms
-            
-            # Add vectors to index
-            start_idx = self.index.ntotal
-            self.index.add(vectors_np)
-            
-            # Update mappings
-            for i, doc_id in enumerate(ids):
-                internal_id = start_idx + i
-                self.id_map[internal_id] = doc_id
-                self.metadata_map[doc_id] = metadatas[i]
-                self.content_map[doc_id] = contents[i]
-            
-            self.next_id = self.index.ntotal
-            
-            # Persist if configured
-            if self.config.persist_directory:
-                self._save_index()
+            vectors_np = self._prepare_vectors(vectors)
+            
+            async with self._index_lock:
+                # Re-adding an ID supersedes the previous vector
+                records = []
+                for doc_id in ids:
+                    internal_id = self._tombstone(doc_id)
+                    if internal_id is not None:
+                        records.append((DELETE, internal_id, doc_id))
+
+                internal_ids = np.arange(self.next_id, self.next_id + len(ids), dtype=np.int64)
+                self.index.add_with_ids(vectors_np, internal_ids)
+                self.next_id += len(ids)
+
+                # Update mappings
+                for i, doc_id in enumerate(ids):
+                    internal_id = int(internal_ids[i])
+                    self.id_map[internal_id] = doc_id
+                    self.doc_to_id[doc_id] = internal_id
+                    self.metadata_map[doc_id] = metadatas[i]
+                    self.content_map[doc_id] = contents[i]
+                    self._index_metadata(internal_id, metadatas[i])
+                    records.append((ADD, internal_id, doc_id, metadatas[i], contents[i]))
+
+                self._mark_dirty(records, index_changed=True)
             
+            self._maybe_schedule_compaction()
             logger.info(f"Added {len(ids)} vectors to FAISS index")
             return True
             
@@ -166,32 +227,25 @@ class FaissVectorDB(BaseVectorDB):
             return False
     
     async def delete_vectors(self, ids: List[str]) -> bool:
-        """Delete vectors by IDs (FAISS doesn't support deletion, so we rebuild)"""
+        """Delete vectors by IDs (tombstoned now, physically removed on compaction)"""
         try:
             if not self.index:
                 logger.error("Index not initialized")
                 return False
             
-            # Remove from mappings
-            internal_ids_to_remove = []
-            for internal_id, doc_id in self.id_map.items():
-                if doc_id in ids:
-                    internal_ids_to_remove.append(internal_id)
-            
-            for internal_id in internal_ids_to_remove:
-                doc_id = self.id_map[internal_id]
-                del self.id_map[internal_id]
-                if doc_id in self.metadata_map:
-                    del self.metadata_map[doc_id]
-                if doc_id in self.content_map:
-                    del self.content_map[doc_id]
-            
-            # For FAISS, we need to rebuild the index without deleted vectors
-            # This is expensive but necessary since FAISS doesn't support deletion
-            if internal_ids_to_remove:
-                self._rebuild_index()
+            async with self._index_lock:
+                records = []
+                for doc_id in ids:
+                    internal_id = self._tombstone(doc_id)
+                    if internal_id is not None:
+                        records.append((DELETE, internal_id, doc_id))
+                deleted = len(records)
+
+                if records:
+                    self._mark_dirty(records)
             
-            logger.info(f"Deleted {len(ids)} vectors from FAISS index")
+            self._maybe_schedule_compaction()
+            logger.info(f"Deleted {deleted} vectors from FAISS index")
             return True
             
         except Exception as e:
@@ -206,40 +260,38 @@ class FaissVectorDB(BaseVectorDB):
     ) -> List[SearchResult]:
         """Search for similar vectors"""
         try:
-            if not self.index or self.index.ntotal == 0:
+            if not self.index or not self.id_map:
                 return []
             
             # Convert query to numpy array
-            query_np = np.array([query_vector], dtype=np.float32)
-            
-            # Normalize if using cosine similarity
-            if self.config.distance_metric == "cosine":
-                norm = np.linalg.norm(query_np)
-                if norm > 0:
-                    query_np = query_np / norm
+            query_np = self._prepare_vectors([query_vector])
             
-            # Search the index
-            distances, indices = self.index.search(query_np, min(limit * 2, self.index.ntotal))
+            if filter_dict:
+                # Pre-filter: only ever score matching vectors
+                candidates = self._filter_internal_ids(filter_dict)
+                if not candidates:
+                    return []
+                distances, indices = self._search_candidates(query_np, candidates, limit)
+            else:
+                # Over-fetch so tombstoned hits don't eat into the requested limit
+                k = min(limit * 2 + len(self.tombstones), self.index.ntotal)
+                distances, indices = self.index.search(query_np, k)
             
             # Convert results
             search_results = []
-            for i, (distance, internal_id) in enumerate(zip(distances[0], indices[0])):
+            for distance, internal_id in zip(distances[0], indices[0]):
                 if internal_id == -1:  # Invalid result
                     continue
                 
-                doc_id = self.id_map.get(internal_id)
-                if not doc_id:
+                doc_id = self.id_map.get(int(internal_id))
+                if not doc_id:  # Tombstoned
                     continue
                 
-                # Apply filters if provided
-                if filter_dict:
-                    metadata = self.metadata_map.get(doc_id, {})
-                    if not self._matches_filter(metadata, filter_dict):
-                        continue
-                
                 # Convert distance to score
                 if self.config.distance_metric == "cosine":
-                    score = distance  # Inner product for cosine (higher is better)
+                    # Inner product for cosine (higher is better), clipped for float error
+                    score = min(max(float(distance), 0.0), 1.0)
+                    distance = 1.0 - score
                 else:
                     score = 1.0 / (1.0 + distance)  # Convert L2 distance to similarity
                 
@@ -286,12 +338,7 @@ class FaissVectorDB(BaseVectorDB):
         """Get all document IDs in the collection"""
         try:
             if filter_dict:
-                # Apply filter
-                filtered_ids = []
-                for doc_id, metadata in self.metadata_map.items():
-                    if self._matches_filter(metadata, filter_dict):
-                        filtered_ids.append(doc_id)
-                return filtered_ids
+                return [self.id_map[internal_id] for internal_id in self._filter_internal_ids(filter_dict)]
             else:
                 return list(self.metadata_map.keys())
             
@@ -301,9 +348,37 @@ class FaissVectorDB(BaseVectorDB):
     
     async def count(self, filter_dict: Dict[str, Any] = None) -> int:
         """Count documents in the collection"""
-        ids = await self.get_all_ids(filter_dict)
-        return len(ids)
+        if filter_dict:
+            return len(self._filter_internal_ids(filter_dict))
+        return len(self.id_map)
     
+    async def flush(self) -> bool:
+        """
+        Write pending changes to disk
+
+        Returns:
+            Success status
+        """
+        if not self.store:
+            return True
+        async with self._flush_lock:
+            async with self._index_lock:
+                if not self._is_dirty():
+                    return True
+                batch = await asyncio.to_thread(self._take_flush_batch)
+            return await asyncio.to_thread(self._commit_flush_batch, batch)
+
+    def flush_sync(self):
+        """Write pending changes to disk without an event loop"""
+        if self.store and self._is_dirty():
+            self._commit_flush_batch(self._take_flush_batch())
+
+    def close(self):
+        """Stop background work and flush pending changes"""
+        self._cancel_compaction()
+        self._cancel_flush()
+        self.flush_sync()
+
     def _matches_filter(self, metadata: Dict[str, Any], filter_dict: Dict[str, Any]) -> bool:
         """Check if metadata matches filter criteria"""
         for key, value in filter_dict.items():
@@ -311,84 +386,341 @@ class FaissVectorDB(BaseVectorDB):
                 return False
         return True
     
-    def _rebuild_index(self):
-        """Rebuild the index without deleted vectors"""
-        if not self.index or self.index.ntotal == 0:
-            return
-        
-        # Get all remaining vectors
-        remaining_vectors = []
-        remaining_ids = []
-        remaining_metadatas = []
-        remaining_contents = []
+    def _is_filterable(self, key: str, value: Any) -> bool:
+        if self.filterable_keys is not None:
+            return key in self.filterable_keys
+        return key not in UNINDEXED_METADATA_KEYS and (value is None or isinstance(value, (str, int, float, bool)))
+
+    def _index_metadata(self, internal_id: int, metadata: Dict[str, Any]):
+        for key, value in (metadata or {}).items():
+            if self._is_filterable(key, value):
+                try:
+                    self.metadata_index.setdefault(key, {}).setdefault(value, set()).add(internal_id)
+                except TypeError:  # Unhashable value
+                    continue
+
+    def _unindex_metadata(self, internal_id: int, metadata: Dict[str, Any]):
+        for key, value in (metadata or {}).items():
+            postings = self.metadata_index.get(key)
+            if not postings:
+                continue
+            try:
+                ids = postings.get(value)
+            except TypeError:
+                continue
+            if ids is not None:
+                ids.discard(internal_id)
+                if not ids:
+                    del postings[value]
+
+    def _filter_internal_ids(self, filter_dict: Dict[str, Any]) -> Set[int]:
+        """Live internal ids whose metadata matches every filter entry"""
+        postings = []
+        unindexed = {}
+        for key, value in filter_dict.items():
+            try:
+                if self._is_filterable(key, value):
+                    postings.append(self.metadata_index.get(key, {}).get(value, set()))
+                    continue
+            except TypeError:  # Unhashable value
+                pass
+            unindexed[key] = value
+
+        if postings:
+            # Intersect from the most selective posting list
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for ids in postings[1:]:
+                if not candidates:
+                    break
+                candidates &= ids
+        else:
+            # No indexed key in the filter: fall back to a linear scan
+            candidates = set(self.id_map)
+
+        if unindexed:
+            candidates = {
+                internal_id for internal_id in candidates
+                if self._matches_filter(self.metadata_map.get(self.id_map[internal_id], {}), unindexed)
+            }
+        return candidates
+
+    def _search_candidates(self, query_np: np.ndarray, candidates: Set[int], limit: int):
+        """Nearest neighbours restricted to the candidate ids"""
+        candidate_ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        k = min(limit, len(candidate_ids))
+
+        if len(candidate_ids) > self.brute_force_max_candidates:
+            base = self.faiss.downcast_index(self.index.index)
+            selector = self.faiss.IDSelectorBatch(candidate_ids)
+            if isinstance(base, self.faiss.IndexHNSW):
+                # Widen the beam in proportion to how much of the graph is filtered out
+                ef_search = max(base.hnsw.efSearch, k)
+                ef_search = max(ef_search, min(int(ef_search * self.index.ntotal / len(candidate_ids)), MAX_FILTERED_EF_SEARCH))
+                params = self.faiss.SearchParametersHNSW(sel=selector, efSearch=ef_search)
+            else:
+                params = self.faiss.SearchParameters(sel=selector)
+            return self.index.search(query_np, k, params=params)
+
+        # Small candidate sets: exact scoring is cheaper than a filtered graph walk and never misses
+        vectors = self.index.reconstruct_batch(candidate_ids)
+        if self.index.metric_type == self.faiss.METRIC_L2:
+            distances = ((vectors - query_np) ** 2).sum(axis=1)
+            order = np.argsort(distances)[:k]
+        else:
+            distances = vectors @ query_np[0]
+            order = np.argsort(-distances)[:k]
+        return distances[order][None, :], candidate_ids[order][None, :]
+
+    def _new_index(self, dimension: int):
+        """Create an empty id-mapped index based on configuration"""
+        if self.config.index_type == "hnsw":
+            # HNSW index for faster search
+            if self.config.distance_metric == "euclidean":
+                base = self.faiss.IndexHNSWFlat(dimension, self.config.hnsw_m, self.faiss.METRIC_L2)
+            else:
+                base = self.faiss.IndexHNSWFlat(dimension, self.config.hnsw_m, self.faiss.METRIC_INNER_PRODUCT)
+            base.hnsw.efConstruction = self.config.hnsw_ef_construction
+            base.hnsw.efSearch = self.config.hnsw_ef_search
+        elif self.config.index_type == "flat" and self.config.distance_metric == "euclidean":
+            base = self.faiss.IndexFlatL2(dimension)
+        else:
+            # Inner product; vectors are normalized for cosine similarity
+            base = self.faiss.IndexFlatIP(dimension)
         
-        for internal_id, doc_id in self.id_map.items():
-            if doc_id in self.metadata_map:
-                # Get vector from index
-                vector = self.index.reconstruct(internal_id)
-                remaining_vectors.append(vector)
-                remaining_ids.append(doc_id)
-                remaining_metadatas.append(self.metadata_map[doc_id])
-                remaining_contents.append(self.content_map[doc_id])
+        return self.faiss.IndexIDMap2(base)
+
+    def _prepare_vectors(self, vectors: List[List[float]]) -> np.ndarray:
+        """Convert to float32, normalizing if using cosine similarity"""
+        vectors_np = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        if self.config.distance_metric == "cosine":
+            norms = np.linalg.norm(vectors_np, axis=1, keepdims=True)
+            norms = np.where(norms == 0, 1, norms)  # Avoid division by zero
+            vectors_np = vectors_np / norms
+        return np.ascontiguousarray(vectors_np, dtype=np.float32)
+
+    def _reset_mappings(self):
+        self.id_map = {}
+        self.doc_to_id = {}
+        self.metadata_map = {}
+        self.content_map = {}
+        self.tombstones = set()
+        self.metadata_index = {}
+        self.next_id = 0
+
+    def _tombstone(self, doc_id: str) -> Optional[int]:
+        """Drop a document from the mappings and mark its vector as dead"""
+        internal_id = self.doc_to_id.pop(doc_id, None)
+        if internal_id is None:
+            return None
+        self._unindex_metadata(internal_id, self.metadata_map.get(doc_id))
+        self.id_map.pop(internal_id, None)
+        self.metadata_map.pop(doc_id, None)
+        self.content_map.pop(doc_id, None)
+        self.tombstones.add(internal_id)
+        return internal_id
+
+    def _needs_compaction(self) -> bool:
+        if not self.index or not self.tombstones:
+            return False
+        return (len(self.tombstones) >= self.compaction_min_tombstones
+                and len(self.tombstones) >= self.compaction_ratio * self.index.ntotal)
+
+    def _maybe_schedule_compaction(self):
+        if self._compaction_task and not self._compaction_task.done():
+            return
+        if self._needs_compaction():
+            self._compaction_task = asyncio.create_task(self.compact())
+
+    def _cancel_compaction(self):
+        if self._compaction_task and not self._compaction_task.done():
+            self._compaction_task.cancel()
+        self._compaction_task = None
+
+    async def compact(self) -> int:
+        """
+        Rebuild the index without tombstoned vectors
+
+        Writers are only blocked while the live vectors are copied out and while the
+        new index is swapped in; the rebuild itself runs in a worker thread.
+
+        Returns:
+            Number of tombstones removed
+        """
+        try:
+            async with self._index_lock:
+                if not self.index or not self.tombstones:
+                    return 0
+                old_index = self.index
+                snapshot_next_id = self.next_id
+                live_ids = np.fromiter(self.id_map.keys(), dtype=np.int64, count=len(self.id_map))
+                vectors = await asyncio.to_thread(self._reconstruct, old_index, live_ids)
+
+            new_index = await asyncio.to_thread(self._build_index, live_ids, vectors)
+
+            async with self._index_lock:
+                if self.index is not old_index:
+                    # Collection was recreated meanwhile
+                    return 0
+
+                # Carry over vectors added while rebuilding
+                added = np.array([i for i in self.id_map if i >= snapshot_next_id], dtype=np.int64)
+                if len(added):
+                    new_index.add_with_ids(self._reconstruct(old_index, added), added)
+
+                # Ids deleted while rebuilding are still in the new index
+                removed = len(self.tombstones)
+                self.tombstones = {int(i) for i in live_ids if int(i) not in self.id_map}
+                removed -= len(self.tombstones)
+                self.index = new_index
+                self._mark_dirty(index_changed=True)
+
+            logger.info(f"Compacted FAISS index, removed {removed} tombstoned vectors")
+            return removed
         
-        # Recreate index
-        if remaining_vectors:
-            self.create_collection(self.dimension)
-            self.add_vectors(remaining_ids, remaining_vectors, remaining_metadatas, remaining_contents)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to compact FAISS index: {e}")
+            return 0
+
+    def _build_index(self, internal_ids: np.ndarray, vectors: np.ndarray):
+        index = self._new_index(self.dimension)
+        if len(internal_ids):
+            index.add_with_ids(vectors, internal_ids)
+        return index
+
+    def _reconstruct(self, index, internal_ids: np.ndarray) -> np.ndarray:
+        """Fetch stored vectors for the given internal ids"""
+        if not len(internal_ids):
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.ascontiguousarray(index.reconstruct_batch(internal_ids), dtype=np.float32)
     
-    def _save_index(self):
-        """Save the index and metadata to disk"""
-        if not self.config.persist_directory:
+    def _is_dirty(self) -> bool:
+        return bool(self._pending_records) or self._index_dirty or self._rewrite_log
+
+    def _mark_dirty(self, records: Optional[List[tuple]] = None, index_changed: bool = False, rewrite_log: bool = False):
+        """Buffer changes for the next flush and make sure one is scheduled"""
+        if not self.store:
             return
+        if records:
+            self._pending_records.extend(records)
+        self._index_dirty = self._index_dirty or index_changed
+        self._rewrite_log = self._rewrite_log or rewrite_log
         
-        os.makedirs(self.config.persist_directory, exist_ok=True)
-        
-        # Save FAISS index
-        index_file = os.path.join(self.config.persist_directory, f"{self.config.collection_name}.index")
-        self.faiss.write_index(self.index, index_file)
-        
-        # Save metadata
-        metadata_file = os.path.join(self.config.persist_directory, f"{self.config.collection_name}_metadata.pkl")
-        metadata = {
-            "id_map": self.id_map,
-            "metadata_map": self.metadata_map,
-            "content_map": self.content_map,
+        if self._flush_task is not None and self._flush_task.get_loop() is not asyncio.get_running_loop():
+            # Scheduled on a loop that has since finished (e.g. an earlier Celery task):
+            # it would never run, so start over on this one
+            self._cancel_flush()
+            self._flush_now = asyncio.Event()
+        if len(self._pending_records) >= self.flush_max_pending:
+            self._flush_now.set()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while self._is_dirty():
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            if not await self.flush():
+                # Keep the changes buffered and retry on the next interval
+                await asyncio.sleep(self.flush_interval)
+
+    def _cancel_flush(self):
+        task = self._flush_task
+        if task and not task.done() and not task.get_loop().is_closed():
+            task.cancel()
+        self._flush_task = None
+
+    def _take_flush_batch(self) -> Dict[str, Any]:
+        """Detach everything that needs writing, consistent with the current index"""
+        records, self._pending_records = self._pending_records, []
+        logged = self.store.manifest.get("log_records", 0) if self.store.manifest else 0
+        snapshot = None
+        if self._rewrite_log or logged + len(records) > len(self.id_map) + LOG_REWRITE_SLACK:
+            # Live state already includes the pending records
+            snapshot = [
+                (ADD, internal_id, doc_id, self.metadata_map.get(doc_id, {}), self.content_map.get(doc_id, ""))
+                for internal_id, doc_id in self.id_map.items()
+            ]
+            records = []
+        batch = {
+            "index_bytes": self.faiss.serialize_index(self.index) if self._index_dirty else None,
+            "records": records,
+            "snapshot": snapshot,
             "next_id": self.next_id,
-            "dimension": self.dimension
+            "dimension": self.dimension,
         }
-        with open(metadata_file, "wb") as f:
-            pickle.dump(metadata, f)
+        self._index_dirty = self._rewrite_log = False
+        return batch
+
+    def _commit_flush_batch(self, batch: Dict[str, Any]) -> bool:
+        try:
+            with self._commit_lock:
+                self.store.commit(**batch)
+            if self.store.has_legacy():
+                # Migrated collection is now fully written in the new layout
+                for path in self.store.legacy_paths:
+                    os.remove(path)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to persist FAISS collection {self.config.collection_name}: {e}")
+            # Put the batch back so nothing is lost
+            if batch["snapshot"] is not None:
+                self._rewrite_log = True
+            else:
+                self._pending_records[:0] = batch["records"]
+            self._index_dirty = self._index_dirty or batch["index_bytes"] is not None
+            return False
     
     def _load_index(self):
         """Load the index and metadata from disk"""
-        if not self.config.persist_directory:
-            return
-        
-        index_file = os.path.join(self.config.persist_directory, f"{self.config.collection_name}.index")
-        metadata_file = os.path.join(self.config.persist_directory, f"{self.config.collection_name}_metadata.pkl")
-        
-        if os.path.exists(index_file) and os.path.exists(metadata_file):
-            try:
-                # Load FAISS index
-                self.index = self.faiss.read_index(index_file)
-                
-                # Load metadata
-                with open(metadata_file, "rb") as f:
-                    metadata = pickle.load(f)
-                
-                self.id_map = metadata["id_map"]
-                self.metadata_map = metadata["metadata_map"]
-                self.content_map = metadata["content_map"]
-                self.next_id = metadata["next_id"]
-                self.dimension = metadata["dimension"]
-                
-                logger.info(f"Loaded FAISS index with {self.index.ntotal} vectors")
-                
-            except Exception as e:
-                logger.error(f"Failed to load FAISS index: {e}")
-                # Reset on load failure
-                self.index = None
-                self.id_map = {}
-                self.metadata_map = {}
-                self.content_map = {}
-                self.next_id = 0
+        try:
+            state = self.store.load(self.faiss)
+            migrating = state is None
+            if migrating:
+                if not self.store.has_legacy():
+                    return
+                state = self.store.load_legacy(self.faiss)
+
+            self.index = state.index
+            self.id_map = state.id_map
+            self.doc_to_id = {doc_id: internal_id for internal_id, doc_id in self.id_map.items()}
+            self.metadata_map = state.metadata_map
+            self.content_map = state.content_map
+            self.metadata_index = {}
+            for internal_id, doc_id in self.id_map.items():
+                self._index_metadata(internal_id, self.metadata_map.get(doc_id))
+            self.next_id = state.next_id
+            self.dimension = state.dimension
+
+            if not isinstance(self.index, self.faiss.IndexIDMap2):
+                self._upgrade_positional_index()
+
+            stored_ids = self.faiss.vector_to_array(self.index.id_map)
+            self.tombstones = {int(i) for i in stored_ids if int(i) not in self.id_map}
+
+            if migrating:
+                # Written in the new layout on the first flush
+                self._mark_dirty(index_changed=True, rewrite_log=True)
+
+            logger.info(f"Loaded FAISS index with {self.index.ntotal} vectors")
+
+        except Exception as e:
+            logger.error(f"Failed to load FAISS index: {e}")
+            # Reset on load failure
+            self.index = None
+            self._reset_mappings()
+
+    def _upgrade_positional_index(self):
+        """Wrap an index saved before id mapping; positions become the stable ids"""
+        positions = np.array(sorted(self.id_map), dtype=np.int64)
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)[positions] if len(positions) else None
+        self.index = self._new_index(self.dimension)
+        if vectors is not None:
+            self.index.add_with_ids(np.ascontiguousarray(vectors), positions)
+        self.next_id = max(self.next_id, int(positions[-1]) + 1 if len(positions) else 0)
+        logger.info(f"Upgraded FAISS index {self.config.collection_name} to stable ids")
@@ -0,0 +1,221 @@
+"""
+On-disk layout for FAISS collections
+
+A collection is a versioned JSON manifest pointing at one index snapshot and one
+append-only metadata log. Every file is written to a temp name and renamed into
+place, and the manifest is replaced last, so a crash at any point leaves the
+previous consistent generation on disk.
+"""
+
+import json
+import logging
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+
+# Log records
+ADD = "add"  # (ADD, internal_id, doc_id, metadata, content)
+DELETE = "del"  # (DELETE, internal_id, doc_id)
+
+
+@dataclass
+class FaissCollectionState:
+    """Collection contents as read back from disk"""
+    index: Any
+    dimension: int
+    next_id: int
+    id_map: Dict[int, str] = field(default_factory=dict)
+    metadata_map: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    content_map: Dict[str, str] = field(default_factory=dict)
+    log_records: int = 0
+
+
+class FaissCollectionStore:
+    """Reads and atomically writes one collection under a persist directory"""
+
+    def __init__(self, directory: str, name: str):
+        self.directory = directory
+        self.name = name
+        self.manifest: Optional[Dict[str, Any]] = None
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.manifest.json")
+
+    @property
+    def legacy_paths(self) -> Tuple[str, str]:
+        return (
+            os.path.join(self.directory, f"{self.name}.index"),
+            os.path.join(self.directory, f"{self.name}_metadata.pkl"),
+        )
+
+    def has_legacy(self) -> bool:
+        return all(os.path.exists(path) for path in self.legacy_paths)
+
+    def load(self, faiss) -> Optional[FaissCollectionState]:
+        """Load the committed generation, or None if nothing was persisted yet"""
+        if not os.path.exists(self.manifest_path):
+            return None
+
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported FAISS manifest version {manifest.get('format_version')}")
+
+        state = FaissCollectionState(
+            index=faiss.read_index(self._path(manifest["index_file"])),
+            dimension=manifest["dimension"],
+            next_id=manifest["next_id"],
+        )
+
+        log_path = self._path(manifest["log_file"])
+        log_size = manifest["log_size"]
+        # Drop anything appended after the last commit (torn or uncommitted writes)
+        if os.path.getsize(log_path) > log_size:
+            os.truncate(log_path, log_size)
+        with open(log_path, "rb") as f:
+            while f.tell() < log_size:
+                self._apply(state, pickle.load(f))
+                state.log_records += 1
+
+        self.manifest = manifest
+        return state
+
+    def load_legacy(self, faiss) -> FaissCollectionState:
+        """Load a collection saved as a single index file plus one metadata pickle"""
+        index_file, metadata_file = self.legacy_paths
+        with open(metadata_file, "rb") as f:
+            metadata = pickle.load(f)
+        return FaissCollectionState(
+            index=faiss.read_index(index_file),
+            dimension=metadata["dimension"],
+            next_id=metadata["next_id"],
+            id_map=metadata["id_map"],
+            metadata_map=metadata["metadata_map"],
+            content_map=metadata["content_map"],
+        )
+
+    def commit(
+        self,
+        *,
+        index_bytes: Optional[np.ndarray],
+        records: List[tuple],
+        snapshot: Optional[List[tuple]],
+        next_id: int,
+        dimension: int,
+    ) -> int:
+        """
+        Write a new generation
+
+        Args:
+            index_bytes: Serialized index, or None if it has not changed
+            records: Log records to append since the last commit
+            snapshot: If given, start a fresh log with these records instead of appending
+            next_id: Next internal id to hand out
+            dimension: Vector dimension
+
+        Returns:
+            Number of records in the committed log
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        previous = self.manifest or {}
+        generation = previous.get("generation", 0) + 1
+        index_file = previous.get("index_file")
+        log_file = previous.get("log_file")
+        log_records = previous.get("log_records", 0)
+
+        if index_bytes is not None:
+            index_file = f"{self.name}.{generation}.index"
+            self._write_atomic(index_file, index_bytes)
+        elif index_file is None:
+            raise ValueError("First commit of a collection must include the index")
+
+        if snapshot is not None or log_file is None:
+            log_file = f"{self.name}.{generation}.log"
+            entries = (snapshot or []) + records
+            self._write_atomic(log_file, b"".join(pickle.dumps(r) for r in entries))
+            log_records = len(entries)
+            log_size = os.path.getsize(self._path(log_file))
+        else:
+            with open(self._path(log_file), "ab") as f:
+                f.seek(previous["log_size"])
+                f.truncate()
+                for record in records:
+                    pickle.dump(record, f)
+                f.flush()
+                os.fsync(f.fileno())
+                log_size = f.tell()
+            log_records += len(records)
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "generation": generation,
+            "index_file": index_file,
+            "log_file": log_file,
+            "log_size": log_size,
+            "log_records": log_records,
+            "next_id": next_id,
+            "dimension": dimension,
+        }
+        self._write_atomic(
+            os.path.basename(self.manifest_path), json.dumps(manifest).encode("utf-8"))
+        self.manifest = manifest
+
+        self._remove_unreferenced({index_file, log_file})
+        return log_records
+
+    def destroy(self):
+        """Remove every file belonging to the collection"""
+        self._remove_unreferenced(set())
+        for path in (self.manifest_path, *self.legacy_paths):
+            if os.path.exists(path):
+                os.remove(path)
+        self.manifest = None
+
+    def _apply(self, state: FaissCollectionState, record: tuple):
+        if record[0] == ADD:
+            _, internal_id, doc_id, metadata, content = record
+            state.id_map[internal_id] = doc_id
+            state.metadata_map[doc_id] = metadata
+            state.content_map[doc_id] = content
+        elif record[0] == DELETE:
+            _, internal_id, doc_id = record
+            state.id_map.pop(internal_id, None)
+            state.metadata_map.pop(doc_id, None)
+            state.content_map.pop(doc_id, None)
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.directory, file_name)
+
+    def _write_atomic(self, file_name: str, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{file_name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path(file_name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _remove_unreferenced(self, keep: set):
+        if not os.path.isdir(self.directory):
+            return
+        prefix = f"{self.name}."
+        for file_name in os.listdir(self.directory):
+            if (file_name.startswith(prefix) and file_name.endswith((".index", ".log"))
+                    and file_name[len(prefix):].split(".")[0].isdigit() and file_name not in keep):
+                try:
+                    os.remove(self._path(file_name))
+                except OSError as e:
+                    logger.warning(f"Could not remove stale FAISS file {file_name}: {e}")
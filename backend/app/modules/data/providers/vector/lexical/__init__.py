@@ -0,0 +1,10 @@
+"""
+Lexical Module
+
+Provides keyword (BM25) indexes that complement vector search.
+"""
+
+from .base import BaseLexicalIndex, LexicalConfig, fuse_results, is_exact_term_query
+from .sqlite_fts import SqliteFTSIndex
+
+__all__ = ["BaseLexicalIndex", "LexicalConfig", "SqliteFTSIndex", "fuse_results", "is_exact_term_query"]
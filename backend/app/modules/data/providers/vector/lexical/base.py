@@ -0,0 +1,124 @@
+"""
+Base lexical index interface and hybrid retrieval configuration
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config.settings import settings
+
+from ..db.base import SearchResult
+from ....schema_utils import VECTOR_DEFAULTS
+
+# Words, optionally joined by the punctuation found in SKUs, error codes,
+# ticket numbers and versions: ERR-4012, AB_12.3, #5521, v2/beta
+TERM_PATTERN = re.compile(r"\w+(?:[-_./#:]\w+)*")
+
+
+def query_terms(query: str) -> List[str]:
+    """Terms of a free-text query, as matched against the lexical index"""
+    return TERM_PATTERN.findall(query)
+
+
+def is_exact_term_query(query: str, max_terms: int = 4) -> bool:
+    """
+    Short queries that name an identifier (a term with a digit or inner
+    punctuation) rather than describe a topic
+    """
+    terms = query_terms(query)
+    return 0 < len(terms) <= max_terms and any(
+        any(ch.isdigit() for ch in term) or not term.isalnum() for term in terms
+    )
+
+
+class LexicalConfig(BaseModel):
+    """Configuration for the per-knowledge-base BM25 index and result fusion"""
+    enabled: bool = Field(
+        default=VECTOR_DEFAULTS["hybrid_enabled"], description="Whether lexical (BM25) search is combined with vector search")
+    vector_weight: float = Field(
+        default=VECTOR_DEFAULTS["hybrid_vector_weight"], description="Weight of the vector ranking in fusion")
+    lexical_weight: float = Field(
+        default=VECTOR_DEFAULTS["hybrid_lexical_weight"], description="Weight of the lexical ranking in fusion")
+    rrf_k: int = Field(
+        default=60, description="Reciprocal rank fusion constant")
+    decisive_ratio: float = Field(
+        default=2.0,
+        description="Identifier queries are answered lexically, without embedding, when the best "
+                    "document's BM25 score is at least this many times the runner-up's (0 disables)")
+    index_directory: Optional[str] = Field(
+        default=None, description="Directory for index files (defaults to LEXICAL_INDEX_DIR)")
+
+    @field_validator('vector_weight', 'lexical_weight')
+    @classmethod
+    def validate_weight(cls, v):
+        if v < 0:
+            raise ValueError('fusion weights must be non-negative')
+        return v
+
+    def get(self, name: str) -> "BaseLexicalIndex":
+        """Get the lexical index stored under `name`"""
+        from .sqlite_fts import SqliteFTSIndex
+        return SqliteFTSIndex(self.index_directory or settings.LEXICAL_INDEX_DIR, name)
+
+
+class BaseLexicalIndex(ABC):
+    """Keyword index over chunks, kept in step with the vector database"""
+
+    @abstractmethod
+    def add(self, ids: List[str], contents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Add or replace chunks"""
+        pass
+
+    @abstractmethod
+    def delete(self, ids: List[str]) -> None:
+        """Delete chunks by id"""
+        pass
+
+    @abstractmethod
+    def search(
+        self, query: str, limit: int, filter_dict: Optional[Dict[str, Any]] = None
+    ) -> List[SearchResult]:
+        """
+        BM25 search. Results are best first; `score` is relative to the best
+        match (1.0) and the raw BM25 score is kept in `bm25`.
+        """
+        pass
+
+    @abstractmethod
+    def count(self, filter_dict: Optional[Dict[str, Any]] = None) -> int:
+        """Number of indexed chunks"""
+        pass
+
+    def close(self):
+        """Release resources"""
+        pass
+
+
+def fuse_results(
+    rankings: Sequence[Tuple[List[SearchResult], float]],
+    k: int = 60,
+) -> List[SearchResult]:
+    """
+    Weighted reciprocal rank fusion of several rankings of chunks.
+
+    Each chunk scores sum(weight / (k + rank)) over the rankings it appears
+    in, normalised so a chunk ranked first everywhere scores 1.0.
+    """
+    total_weight = sum(weight for _, weight in rankings) or 1.0
+    scores: Dict[str, float] = {}
+    chunks: Dict[str, SearchResult] = {}
+    for results, weight in rankings:
+        for rank, result in enumerate(results, start=1):
+            scores[result.id] = scores.get(result.id, 0.0) + weight / (k + rank)
+            chunks.setdefault(result.id, result)
+
+    best_possible = total_weight / (k + 1)
+    fused = [
+        chunks[chunk_id].model_copy(update={"score": min(score / best_possible, 1.0)})
+        for chunk_id, score in scores.items()
+    ]
+    fused.sort(key=lambda r: r.score, reverse=True)
+    return fused
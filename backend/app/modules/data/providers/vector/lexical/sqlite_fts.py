@@ -0,0 +1,151 @@
+"""
+SQLite FTS5 lexical index implementation
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..db.base import SearchResult
+from .base import BaseLexicalIndex, query_terms
+
+logger = logging.getLogger(__name__)
+
+_SAFE_KEY = re.compile(r"^\w+$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    chunk_id TEXT NOT NULL UNIQUE,
+    doc_id TEXT,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_doc_id ON chunks(doc_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+    content, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+class SqliteFTSIndex(BaseLexicalIndex):
+    """
+    BM25 index in one SQLite file per knowledge base
+
+    Chunk text lives in an FTS5 table whose rowid is the primary key of a
+    regular table holding chunk id, document id and metadata (JSON). Scalar
+    metadata filters are evaluated in SQL with json_extract.
+    """
+
+    def __init__(self, directory: str, name: str):
+        self.name = re.sub(r"[^\w.-]", "_", name)
+        if directory == ":memory:":
+            self.path = directory
+        else:
+            os.makedirs(directory, exist_ok=True)
+            self.path = os.path.join(directory, f"{self.name}.sqlite")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, ids: List[str], contents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        with self._lock, self._conn:
+            self._delete_locked(ids)
+            for chunk_id, content, metadata in zip(ids, contents, metadatas):
+                cursor = self._conn.execute(
+                    "INSERT INTO chunks (chunk_id, doc_id, metadata) VALUES (?, ?, ?)",
+                    (chunk_id, metadata.get("doc_id"), json.dumps(metadata, default=str)),
+                )
+                self._conn.execute(
+                    "INSERT INTO chunks_fts (rowid, content) VALUES (?, ?)",
+                    (cursor.lastrowid, content),
+                )
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock, self._conn:
+            self._delete_locked(ids)
+
+    def _delete_locked(self, ids: List[str]):
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            self._conn.execute(
+                f"DELETE FROM chunks_fts WHERE rowid IN "
+                f"(SELECT id FROM chunks WHERE chunk_id IN ({placeholders}))", batch)
+            self._conn.execute(f"DELETE FROM chunks WHERE chunk_id IN ({placeholders})", batch)
+
+    def search(
+        self, query: str, limit: int, filter_dict: Optional[Dict[str, Any]] = None
+    ) -> List[SearchResult]:
+        terms = query_terms(query)
+        if not terms or limit <= 0:
+            return []
+        # Each term as a phrase: "ERR-4012" matches the tokens err + 4012 in order
+        match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        where, params, post_filter = self._where(filter_dict or {})
+
+        sql = (
+            "SELECT c.chunk_id, c.metadata, chunks_fts.content, bm25(chunks_fts) AS rank "
+            "FROM chunks_fts JOIN chunks c ON c.id = chunks_fts.rowid "
+            f"WHERE chunks_fts MATCH ?{where} ORDER BY rank LIMIT ?"
+        )
+        # Filters SQL cannot express are applied afterwards, so fetch extra rows
+        fetch = limit * 4 if post_filter else limit
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, [match, *params, fetch]).fetchall()
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Lexical search failed for {query!r}: {e}")
+                return []
+
+        results: List[SearchResult] = []
+        best: Optional[float] = None
+        for chunk_id, metadata_json, content, rank in rows:
+            metadata = json.loads(metadata_json)
+            if any(metadata.get(key) != value for key, value in post_filter.items()):
+                continue
+            bm25 = -rank  # SQLite returns lower-is-better
+            best = best or bm25
+            results.append(SearchResult(
+                id=chunk_id,
+                content=content,
+                metadata=metadata,
+                score=min(max(bm25 / best, 0.0), 1.0) if best > 0 else 0.0,
+                bm25=bm25,
+            ))
+            if len(results) == limit:
+                break
+        return results
+
+    def count(self, filter_dict: Optional[Dict[str, Any]] = None) -> int:
+        where, params, post_filter = self._where(filter_dict or {})
+        with self._lock:
+            if post_filter:
+                rows = self._conn.execute(
+                    f"SELECT c.metadata FROM chunks c WHERE 1 = 1{where}", params).fetchall()
+                return sum(
+                    all(json.loads(m).get(k) == v for k, v in post_filter.items()) for (m,) in rows
+                )
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM chunks c WHERE 1 = 1{where}", params).fetchone()[0]
+
+    @staticmethod
+    def _where(filter_dict: Dict[str, Any]) -> Tuple[str, List[Any], Dict[str, Any]]:
+        clauses, params, post_filter = [], [], {}
+        for key, value in filter_dict.items():
+            if _SAFE_KEY.match(key) and isinstance(value, (str, int, float)) and not isinstance(value, bool):
+                clauses.append(f" AND json_extract(c.metadata, '$.{key}') = ?")
+                params.append(value)
+            else:
+                post_filter[key] = value
+        return "".join(clauses), params, post_filter
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -5,8 +5,9 @@ Implements the BaseDataProvider interface for vector-based search using
 chunking, embedding, and vector database components.
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Union, cast
+from typing import List, Dict, Any, Optional, Union, cast
 from .db import SearchResult as DBSearchResult
 from ..base import BaseDataProvider
 from ..models import SearchResult
@@ -14,6 +15,7 @@ from .config import VectorConfig
 from .embedding.base import BaseEmbedder
 from .db.base import BaseVectorDB
 from .chunking.base import BaseChunker
+from .lexical import BaseLexicalIndex, fuse_results, is_exact_term_query
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,7 @@ class VectorProvider(BaseDataProvider):
     embedder: BaseEmbedder
     vector_db: BaseVectorDB
     chunker: BaseChunker
+    lexical_index: Optional[BaseLexicalIndex] = None
 
     def __init__(
         self,
@@ -68,6 +71,14 @@ class VectorProvider(BaseDataProvider):
 
                 self.vector_db.set_embedding_function(embedding_function)
 
+            if self.config.lexical.enabled:
+                try:
+                    await self._initialize_lexical_index()
+                except Exception as e:
+                    # Keyword search is an enhancement; vector search still works
+                    logger.warning(f"Keyword index unavailable, using vector search only: {e}")
+                    self.lexical_index = None
+
             self._initialized = True
             logger.info("VectorProvider initialized successfully")
             return True
@@ -137,6 +148,10 @@ class VectorProvider(BaseDataProvider):
                 contents=chunk_texts
             )
 
+            if success and self.lexical_index is not None:
+                await asyncio.to_thread(
+                    self.lexical_index.add, chunk_ids, chunk_texts, chunk_metadatas)
+
             if success:
                 logger.info(
                     f"Added document {doc_id} with {len(chunks)} chunks")
@@ -170,6 +185,8 @@ class VectorProvider(BaseDataProvider):
 
             if all_ids:
                 success = await self.vector_db.delete_vectors(all_ids)
+                if success and self.lexical_index is not None:
+                    await asyncio.to_thread(self.lexical_index.delete, all_ids)
                 if success:
                     logger.info(
                         f"Deleted document {doc_id} with {len(all_ids)} chunks")
@@ -214,6 +231,16 @@ class VectorProvider(BaseDataProvider):
             if self.knowledge_base_id and "kb_id" not in filter_dict:
                 filter_dict["kb_id"] = self.knowledge_base_id
 
+            # Keyword matches first: an exact identifier hit needs no embedding
+            lexical_results: List[DBSearchResult] = []
+            if self.lexical_index is not None:
+                lexical_results = await asyncio.to_thread(
+                    self.lexical_index.search, query, limit * 3, filter_dict)
+                if self._lexical_is_decisive(query, lexical_results):
+                    logger.debug(f"Answered {query!r} from the keyword index")
+                    return self._format_results(
+                        self._consolidate_chunks(lexical_results, limit))
+
             # Generate query embedding
             query_embedding = await self.embedder.embed_query(query)
             if not query_embedding:
@@ -228,23 +255,18 @@ class VectorProvider(BaseDataProvider):
                 filter_dict=filter_dict,
             )
 
+            if lexical_results:
+                lexical = self.config.lexical
+                search_results = fuse_results(
+                    [(search_results, lexical.vector_weight),
+                     (lexical_results, lexical.lexical_weight)],
+                    k=lexical.rrf_k,
+                )
+
             # Group results by document and consolidate chunks
             doc_results = self._consolidate_chunks(search_results, limit)
 
-            # Convert to SearchResult format
-            formatted_results = []
-            for doc_result in doc_results:
-                search_result = SearchResult(
-                    id=doc_result["doc_id"],
-                    content=doc_result["content"],
-                    metadata=doc_result["metadata"],
-                    score=doc_result["score"],
-                    source="vector",
-                    chunk_count=doc_result["chunk_count"]
-                )
-                formatted_results.append(search_result)
-
-            return formatted_results
+            return self._format_results(doc_results)
 
         except Exception as e:
             logger.error(f"Failed to search vector store: {e}")
@@ -289,6 +311,63 @@ class VectorProvider(BaseDataProvider):
             logger.error(f"Failed to get document IDs: {e}")
             return []
 
+    async def _initialize_lexical_index(self):
+        """
+        Open the keyword index, backfilling it from the vector database when
+        it holds fewer chunks (never built, or a backfill was interrupted)
+        """
+        name = f"{self.config.vector_db.collection_name}_{self.knowledge_base_id}"
+        self.lexical_index = self.config.lexical.get(name)
+        kb_filter = {"kb_id": self.knowledge_base_id}
+        indexed = await asyncio.to_thread(self.lexical_index.count, kb_filter)
+        if indexed and indexed >= await self.vector_db.count(kb_filter):
+            return
+
+        all_ids = await self.vector_db.get_all_ids(kb_filter)
+        for start in range(0, len(all_ids), 500):
+            chunks = await self.vector_db.get_by_ids(all_ids[start:start + 500])
+            await asyncio.to_thread(
+                self.lexical_index.add,
+                [chunk.id for chunk in chunks],
+                [chunk.content for chunk in chunks],
+                [chunk.metadata for chunk in chunks],
+            )
+        if all_ids:
+            logger.info(
+                f"Built keyword index for knowledge base {self.knowledge_base_id} "
+                f"from {len(all_ids)} chunks")
+
+    def _lexical_is_decisive(self, query: str, results: List[DBSearchResult]) -> bool:
+        """
+        Whether keyword results alone answer the query: it names an identifier
+        and one document's BM25 score clearly beats every other document's
+        """
+        ratio = self.config.lexical.decisive_ratio
+        if not results or ratio <= 0 or not is_exact_term_query(query):
+            return False
+
+        best_by_doc: Dict[str, float] = {}
+        for result in results:
+            doc_id = result.metadata.get("doc_id", result.id)
+            best_by_doc[doc_id] = max(best_by_doc.get(doc_id, 0.0), getattr(result, "bm25", 0.0))
+        scores = sorted(best_by_doc.values(), reverse=True)
+        return len(scores) == 1 or scores[0] >= ratio * scores[1]
+
+    def _format_results(self, doc_results: List[Dict[str, Any]]) -> List[SearchResult]:
+        """Convert consolidated documents to SearchResult format"""
+        formatted_results = []
+        for doc_result in doc_results:
+            search_result = SearchResult(
+                id=doc_result["doc_id"],
+                content=doc_result["content"],
+                metadata=doc_result["metadata"],
+                score=doc_result["score"],
+                source="vector",
+                chunk_count=doc_result["chunk_count"]
+            )
+            formatted_results.append(search_result)
+        return formatted_results
+
     def _consolidate_chunks(self, search_results: List[DBSearchResult], limit: int) -> List[Dict[str, Any]]:
         """
         Consolidate search results by document, combining chunks
@@ -354,11 +433,15 @@ class VectorProvider(BaseDataProvider):
         """Close database connections"""
         if self.vector_db:
             self.vector_db.close()
+        if self.lexical_index is not None:
+            self.lexical_index.close()
+            self.lexical_index = None
 
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector provider"""
         return {
             "provider_type": "vector",
             "knowledge_base_id": self.knowledge_base_id,
-            "initialized": self._initialized
+            "initialized": self._initialized,
+            "hybrid_search": self.lexical_index is not None
         }
@@ -0,0 +1,10 @@
+"""
+Rerank Module
+
+Reorders retrieved chunks by query relevance before they reach the LLM.
+"""
+
+from .base import BaseReranker, RerankConfig
+from .stage import RerankStage, ScoreCache, get_score_cache
+
+__all__ = ["BaseReranker", "RerankConfig", "RerankStage", "ScoreCache", "get_score_cache"]
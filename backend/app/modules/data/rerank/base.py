@@ -0,0 +1,95 @@
+"""
+Base reranker interface and configuration
+"""
+
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+
+from pydantic import BaseModel, Field, field_validator
+
+from ..schema_utils import get_schema_default
+
+
+class RerankConfig(BaseModel):
+    """Configuration for the cross-encoder reranking stage"""
+    enabled: bool = Field(
+        default=False, description="Whether search results are reranked")
+    type: str = Field(
+        default="cross_encoder", description="Type of reranker")
+    model_name: str = Field(
+        default=get_schema_default("rerank", "rerank_model_name", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+        description="Cross-encoder model name")
+    backend: str = Field(
+        default="torch", description="Inference backend (torch, onnx)")
+    device: str = Field(
+        default="cpu", description="Device to run the model on")
+    candidate_multiplier: int = Field(
+        default=get_schema_default("rerank", "rerank_candidate_multiplier", 4),
+        description="Candidates fetched from providers per requested result")
+    batch_size: int = Field(
+        default=16, description="Candidates scored per model call")
+    max_length: int = Field(
+        default=512, description="Maximum tokens of query + passage")
+    latency_budget_ms: int = Field(
+        default=get_schema_default("rerank", "rerank_latency_budget_ms", 300),
+        description="Time after which remaining candidates keep their retrieval order (0 = unbounded)")
+    min_score: float = Field(
+        default=get_schema_default("rerank", "rerank_min_score", 0.1),
+        description="Reranked results scoring below this relevance (0-1) are dropped")
+    cache_size: int = Field(
+        default=10000, description="Cached (query, chunk) scores")
+
+    @field_validator('candidate_multiplier', 'batch_size')
+    @classmethod
+    def validate_positive(cls, v):
+        if v < 1:
+            raise ValueError('must be at least 1')
+        return v
+
+    @field_validator('backend')
+    @classmethod
+    def validate_backend(cls, v):
+        allowed_backends = ['torch', 'onnx']
+        if v not in allowed_backends:
+            raise ValueError(f'backend must be one of {allowed_backends}')
+        return v
+
+    def get(self) -> "BaseReranker":
+        if self.type == "cross_encoder":
+            from .cross_encoder import CrossEncoderReranker
+            return CrossEncoderReranker(self.model_copy())
+        else:
+            raise ValueError(f"Invalid reranker type: {self.type}")
+
+    class Config:
+        extra = "allow"
+
+
+class BaseReranker(ABC):
+    """Scores (query, passage) pairs; higher is more relevant"""
+
+    def __init__(self, config: Optional[RerankConfig] = None):
+        self.config = config or RerankConfig()
+
+    @property
+    def name(self) -> str:
+        """Identifies the model, so cached scores are not shared between models"""
+        return f"{self.config.type}:{self.config.model_name}"
+
+    def initialize(self) -> bool:
+        """Load the model"""
+        return True
+
+    @abstractmethod
+    def score(self, query: str, passages: Sequence[str]) -> List[float]:
+        """
+        Relevance of each passage to the query, in [0, 1]
+
+        Args:
+            query: Search query
+            passages: Candidate passages
+
+        Returns:
+            One score per passage
+        """
+        raise NotImplementedError
@@ -0,0 +1,62 @@
+"""
+Cross-encoder reranker implementation
+"""
+
+import logging
+import threading
+from typing import List, Sequence
+
+from .base import BaseReranker, RerankConfig
+
+logger = logging.getLogger(__name__)
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+class CrossEncoderReranker(BaseReranker):
+    """
+    Sentence-transformers cross-encoder (torch or ONNX Runtime backend).
+    Models are loaded once per process and shared between knowledge bases.
+    """
+
+    def __init__(self, config: RerankConfig):
+        super().__init__(config)
+        self.model = None
+
+    def initialize(self) -> bool:
+        key = (self.config.model_name, self.config.backend, self.config.device, self.config.max_length)
+        try:
+            with _models_lock:
+                if key not in _models:
+                    from sentence_transformers import CrossEncoder
+
+                    _models[key] = CrossEncoder(
+                        self.config.model_name,
+                        device=self.config.device,
+                        max_length=self.config.max_length,
+                        backend=self.config.backend,
+                    )
+                    logger.info(
+                        f"Loaded cross-encoder {self.config.model_name} ({self.config.backend})")
+            self.model = _models[key]
+            return True
+        except Exception as e:
+            logger.error(f"Failed to load cross-encoder {self.config.model_name}: {e}")
+            return False
+
+    def score(self, query: str, passages: Sequence[str]) -> List[float]:
+        if self.model is None and not self.initialize():
+            raise RuntimeError(f"Cross-encoder {self.config.model_name} is not available")
+        if not passages:
+            return []
+        import torch
+
+        # Sigmoid turns the model's logits into comparable 0-1 relevance
+        scores = self.model.predict(
+            [(query, passage) for passage in passages],
+            batch_size=self.config.batch_size,
+            activation_fn=torch.nn.Sigmoid(),
+            show_progress_bar=False,
+        )
+        return [float(s) for s in scores]
@@ -0,0 +1,160 @@
+"""
+Reranking stage applied to merged provider results
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from ..providers.models import SearchResult
+from .base import BaseReranker, RerankConfig
+
+logger = logging.getLogger(__name__)
+
+ScoreKey = Tuple[str, str, str, str]
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """
+    Thread-safe LRU of (model, query hash, chunk id, content hash) -> score.
+    The content hash keeps a re-ingested document from reusing stale scores.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[ScoreKey, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, query: str, result: SearchResult) -> ScoreKey:
+        return (model, _digest(query.strip()), result.id, _digest(result.content))
+
+    def get(self, key: ScoreKey) -> Optional[float]:
+        with self._lock:
+            score = self._entries.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put(self, key: ScoreKey, score: float):
+        with self._lock:
+            self._entries[key] = score
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_score_cache: Optional[ScoreCache] = None
+
+
+def get_score_cache(max_entries: int = 10000) -> ScoreCache:
+    """Process-wide score cache, shared by every knowledge base"""
+    global _score_cache
+    if _score_cache is None:
+        _score_cache = ScoreCache(max_entries)
+    return _score_cache
+
+
+class RerankStage:
+    """
+    Reorders retrieval candidates by cross-encoder relevance.
+
+    Candidates are scored best-retrieval-first in batches until the latency
+    budget is spent; any left unscored keep their retrieval order behind the
+    scored ones. Scored results under `min_score` are cut, so the LLM gets
+    fewer, more relevant chunks.
+    """
+
+    def __init__(
+        self,
+        config: RerankConfig,
+        reranker: Optional[BaseReranker] = None,
+        cache: Optional[ScoreCache] = None,
+    ):
+        self.config = config
+        self.reranker = reranker if reranker is not None else config.get()
+        self.cache = cache if cache is not None else get_score_cache(config.cache_size)
+        self.last_stats: Dict[str, float] = {}
+
+    def initialize(self) -> bool:
+        return self.reranker.initialize()
+
+    def candidate_limit(self, limit: int) -> int:
+        """Number of candidates to fetch from providers for `limit` results"""
+        return limit * self.config.candidate_multiplier
+
+    async def rerank(self, query: str, results: List[SearchResult], limit: int) -> List[SearchResult]:
+        """Rerank candidates without blocking the event loop"""
+        if not results:
+            return []
+        return await asyncio.to_thread(self.rerank_sync, query, results, limit)
+
+    def rerank_sync(self, query: str, results: List[SearchResult], limit: int) -> List[SearchResult]:
+        started = time.perf_counter()
+        budget = self.config.latency_budget_ms / 1000
+
+        scores: Dict[int, float] = {}
+        misses: List[int] = []
+        for i, result in enumerate(results):
+            cached = self.cache.get(ScoreCache.key(self.reranker.name, query, result))
+            if cached is None:
+                misses.append(i)
+            else:
+                scores[i] = cached
+        cached_count = len(scores)
+
+        for start in range(0, len(misses), self.config.batch_size):
+            if budget and start and time.perf_counter() - started >= budget:
+                break
+            batch = misses[start:start + self.config.batch_size]
+            batch_scores = self.reranker.score(query, [results[i].content for i in batch])
+            for i, score in zip(batch, batch_scores):
+                scores[i] = score
+                self.cache.put(ScoreCache.key(self.reranker.name, query, results[i]), score)
+
+        reranked = []
+        cut = False
+        for i in sorted(scores, key=lambda i: scores[i], reverse=True):
+            # Early cut-off, always keeping the best candidate
+            if scores[i] < self.config.min_score and reranked:
+                cut = True
+                break
+            result = results[i].model_copy(deep=True)
+            result.metadata["retrieval_score"] = results[i].score
+            result.score = scores[i]
+            reranked.append(result)
+        # Out of time: unscored candidates follow in retrieval order, unless
+        # better-retrieved ones were already judged irrelevant
+        unscored = [result for i, result in enumerate(results) if i not in scores]
+        if not cut:
+            floor = reranked[-1].score if reranked else 1.0
+            for result in unscored:
+                # Never outrank a scored result when merged with other knowledge bases
+                reranked.append(result.model_copy(update={"score": min(result.score, floor)}))
+
+        self.last_stats = {
+            "candidates": len(results),
+            "cached": cached_count,
+            "scored": len(scores) - cached_count,
+            "unscored": len(unscored),
+            "returned": min(len(reranked), limit),
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        logger.debug(f"Reranked {query!r}: {self.last_stats}")
+        return reranked[:limit]
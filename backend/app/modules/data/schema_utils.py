@@ -71,6 +71,9 @@ VECTOR_DEFAULTS = {
     "vector_db_collection_name": get_vector_default(
         "vector_db_collection_name", "default"
     ),
+    "hybrid_enabled": get_vector_default("hybrid_enabled", True),
+    "hybrid_vector_weight": get_vector_default("hybrid_vector_weight", 1.0),
+    "hybrid_lexical_weight": get_vector_default("hybrid_lexical_weight", 1.0),
 }
 
 LEGRA_DEFAULTS = {
@@ -82,6 +85,7 @@ LEGRA_DEFAULTS = {
     "chunk_min_sentence_length": get_legra_default("chunk_min_sentence_length", 32),
     "graph_n_neighbors": get_legra_default("graph_n_neighbors", 10),
     "graph_distance_metric": get_legra_default("graph_distance_metric", "cosine"),
+    "graph_knn_mode": get_legra_default("graph_knn_mode", "auto"),
     "cluster_resolution": get_legra_default("cluster_resolution", 0.5),
     "generation_model": get_legra_default("generation_model", "gpt2"),
     "generation_max_tokens": get_legra_default("generation_max_tokens", 1024),
@@ -2,11 +2,13 @@
 Data Source Service - Main orchestrator for vector and LEGRA providers
 """
 
+import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 
 from .config import AgentRAGConfig, KbRAGConfig
 from .providers import SearchResult, BaseDataProvider, LegraProvider, VectorProvider, LightRAGProvider, PlainProvider
+from .rerank import RerankStage
 
 
 logger = logging.getLogger(__name__)
@@ -21,6 +23,7 @@ class AgentRAGService:
         self.config = config
         self.knowledge_base_id = config.knowledge_base_id
         self.data_provider: List[BaseDataProvider] = []
+        self.rerank_stage: Optional[RerankStage] = None
         self._initialized = False
 
     @staticmethod
@@ -35,12 +38,14 @@ class AgentRAGService:
         vector = rag_config.get_vector_config()
         legra = rag_config.get_legra_config()
         lightrag = rag_config.get_lightrag_config()
+        rerank = rag_config.get_rerank_config()
 
         config = AgentRAGConfig(
             knowledge_base_id=knowledge_base_id,
             vector_config=vector,
             legra_config=legra,
             lightrag_config=lightrag,
+            rerank_config=rerank,
         )
         return AgentRAGService(config)
 
@@ -101,6 +106,16 @@ class AgentRAGService:
                     logger.info("Plain provider initialized successfully")
                     self.data_provider.append(plain_provider)
 
+            # Reranking is optional: without the model, results keep their provider order
+            rerank_config = self.config.get_rerank_config()
+            if rerank_config:
+                rerank_stage = RerankStage(rerank_config)
+                if await asyncio.to_thread(rerank_stage.initialize):
+                    logger.info(f"Reranking enabled with {rerank_config.model_name}")
+                    self.rerank_stage = rerank_stage
+                else:
+                    logger.warning("Failed to initialize reranker, results will not be reranked")
+
             self._initialized = success
             logger.info(
                 f"DataSourceService initialized for KB {self.knowledge_base_id}: {success}")
@@ -214,10 +229,13 @@ class AgentRAGService:
         if provider_weights is None:
             provider_weights = {"vector": 1.0, "legra": 1.0, "lightrag": 1.0}
 
+        # Over-fetch candidates when they will be reranked
+        candidate_limit = self.rerank_stage.candidate_limit(limit) if self.rerank_stage else limit
+
         # Search vector provider if available
         for provider in self.data_provider:
             try:
-                vector_results = await provider.search(query, limit, doc_ids)
+                vector_results = await provider.search(query, candidate_limit, doc_ids)
                 # Apply weight to scores
                 weight = provider_weights.get(provider.name, 1.0)
                 for result in vector_results:
@@ -229,6 +247,12 @@ class AgentRAGService:
         # Merge results, avoiding duplicates and sorting by score
         merged_results = self._merge_search_results(all_results)
 
+        if self.rerank_stage and merged_results:
+            try:
+                return await self.rerank_stage.rerank(query, merged_results, limit)
+            except Exception as e:
+                logger.error(f"Reranking failed, using provider order: {e}")
+
         # Return top results
         return merged_results[:limit]
 
@@ -278,6 +302,12 @@ class AgentRAGService:
             stats["service"]["providers"].append(provider.name)
             stats["vector"] = provider_stats
 
+        if self.rerank_stage:
+            stats["rerank"] = {
+                "model": self.rerank_stage.config.model_name,
+                "last_search": self.rerank_stage.last_stats,
+            }
+
         return stats
 
     def is_initialized(self) -> bool:
@@ -1,4 +1,11 @@
 from .file_extractor import FileTextExtractor, FileExtractor
+from .extraction_service import DocumentExtractionService, get_extraction_service
 from .doc import format_search_results
 
-__all__ = ["FileTextExtractor", "format_search_results", "FileExtractor"]
\ No newline at end of file
+__all__ = [
+    "FileTextExtractor",
+    "format_search_results",
+    "FileExtractor",
+    "DocumentExtractionService",
+    "get_extraction_service",
+]
@@ -0,0 +1,473 @@
+"""
+Document Extraction Service - process pool and content-hash cache for FileTextExtractor
+
+Parsing and OCR are CPU bound and can take minutes for large scanned PDFs, so they
+run in a bounded pool of worker processes instead of the event loop. Each unit of
+work is limited in time and memory, large PDFs are split into page batches that are
+extracted in parallel, and results are cached on disk by content hash so re-uploads
+and re-syncs of identical files skip extraction entirely.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from app.core.config.settings import settings
+from app.core.exceptions.error_messages import ErrorKey
+from app.core.exceptions.exception_classes import AppException
+from app.modules.data.utils.file_extractor import ExtractorOptions, FileTextExtractor
+
+logger = logging.getLogger(__name__)
+
+# (pages_done, pages_total); documents that are not split report (1, 1) when done
+ProgressCallback = Callable[[int, int], None]
+
+# Bump when extractor output changes in a way that should invalidate cached text
+_CACHE_FORMAT_VERSION = 1
+_CACHE_PRUNE_EVERY_WRITES = 100
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class _ExtractionTimeout(BaseException):
+    """Raised by SIGALRM inside a worker; a BaseException so extractor fallbacks cannot swallow it."""
+
+
+def _current_address_space() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _init_worker(memory_limit_mb: int) -> None:
+    """Cap the address space a worker may grow by, on top of what its imports already use."""
+    if memory_limit_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+
+    baseline = _current_address_space()
+    if not baseline:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = baseline + memory_limit_mb * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _run_extraction(
+    options: ExtractorOptions,
+    timeout_seconds: int,
+    path: str,
+    first_page: Optional[int] = None,
+    last_page: Optional[int] = None,
+) -> str:
+    """Worker entry point: extract a whole file, or a page range of a PDF."""
+    use_alarm = (
+        timeout_seconds > 0
+        and hasattr(signal, "SIGALRM")
+        and threading.current_thread() is threading.main_thread()
+    )
+    previous_handler = None
+    if use_alarm:
+        def _on_alarm(signum, frame):
+            raise _ExtractionTimeout()
+
+        previous_handler = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.alarm(timeout_seconds)
+
+    try:
+        extractor = FileTextExtractor(options)
+        if first_page is not None and last_page is not None:
+            return extractor.extract_pdf_pages(path, first_page, last_page)
+        return extractor.extract_from_path(path)
+    except _ExtractionTimeout:
+        raise TimeoutError(f"extraction exceeded {timeout_seconds}s") from None
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DocumentExtractionService:
+    """
+    Async front end for FileTextExtractor.
+
+    - extraction runs in a ProcessPoolExecutor (`EXTRACTION_MAX_WORKERS`, 0 = thread in
+      the calling process) whose workers are recycled every `EXTRACTION_MAX_TASKS_PER_WORKER`
+      tasks and capped at `EXTRACTION_MEMORY_LIMIT_MB` of extra address space
+    - every task is limited to `EXTRACTION_TIMEOUT_SECONDS`
+    - PDFs larger than `EXTRACTION_PDF_PAGES_PER_TASK` pages are split into page batches
+      (pdfminer with per-batch OCR fallback) extracted in parallel, with progress reporting
+    - non-empty results are cached under `EXTRACTION_CACHE_DIR`, keyed by the SHA-256 of the
+      content, the file suffix and the extractor options
+    """
+
+    _instance: Optional["DocumentExtractionService"] = None
+
+    def __init__(
+        self,
+        options: Optional[ExtractorOptions] = None,
+        max_workers: Optional[int] = None,
+        timeout_seconds: Optional[int] = None,
+        memory_limit_mb: Optional[int] = None,
+        pages_per_task: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_mb: Optional[int] = None,
+    ):
+        self.options = options or ExtractorOptions()
+        self.max_workers = (
+            max_workers if max_workers is not None else settings.EXTRACTION_MAX_WORKERS
+        )
+        self.timeout_seconds = (
+            timeout_seconds
+            if timeout_seconds is not None
+            else settings.EXTRACTION_TIMEOUT_SECONDS
+        )
+        self.memory_limit_mb = (
+            memory_limit_mb
+            if memory_limit_mb is not None
+            else settings.EXTRACTION_MEMORY_LIMIT_MB
+        )
+        self.pages_per_task = max(
+            1, pages_per_task or settings.EXTRACTION_PDF_PAGES_PER_TASK
+        )
+        cache_dir = cache_dir if cache_dir is not None else settings.EXTRACTION_CACHE_DIR
+        self.cache_dir: Optional[Path] = Path(cache_dir) if cache_dir else None
+        self.cache_max_bytes = (
+            cache_max_mb if cache_max_mb is not None else settings.EXTRACTION_CACHE_MAX_MB
+        ) * 1024 * 1024
+
+        self._options_fingerprint = hashlib.sha256(
+            json.dumps(asdict(self.options), sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._cache_writes = 0
+
+    @classmethod
+    def get_instance(cls) -> "DocumentExtractionService":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    # ---------- Public API ----------
+
+    async def extract(
+        self,
+        *,
+        path: Optional[str | Path] = None,
+        filename: Optional[str] = None,
+        content: Optional[bytes] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> str:
+        """
+        Extract text from a file on disk or from in-memory content.
+
+        Same inputs and output as FileTextExtractor.extract, without blocking the event loop.
+        Raises AppException(ERROR_EXTRACTING_FROM_FILE) when a worker times out or dies.
+        """
+        if path is not None:
+            path = Path(path)
+            digest = await asyncio.to_thread(_hash_file, path)
+            return await self._extract_cached(path, path.name, digest, on_progress)
+
+        if filename is not None and content is not None:
+            if len(content) == 0:
+                logger.warning(f"No content provided for {filename}, returning empty string")
+                return ""
+            return await self._extract_bytes(filename, content, on_progress)
+
+        raise AppException(ErrorKey.FILE_EXTRACT_USAGE)
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- Extraction ----------
+
+    async def _extract_bytes(
+        self, filename: str, content: bytes, on_progress: Optional[ProgressCallback]
+    ) -> str:
+        suffix = (Path(filename).suffix or ".bin").lower()
+        if suffix == ".pdf" and self.options.strict_pdf_header_check:
+            if not FileTextExtractor._looks_like_pdf(content[:8]):
+                logger.warning(
+                    f"[extractor] Not a real PDF for {filename} (head={content[:8]!r}); decoding as text."
+                )
+                return content.decode("utf-8", errors="replace")
+
+        digest = hashlib.sha256(content).hexdigest()
+        cache_key = self._cache_key(digest, suffix)
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        tmp_path = await asyncio.to_thread(self._write_temp_file, suffix, content)
+        try:
+            return await self._extract_cached(
+                tmp_path, filename, digest, on_progress, cache_checked=True
+            )
+        finally:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    async def _extract_cached(
+        self,
+        path: Path,
+        display_name: str,
+        digest: str,
+        on_progress: Optional[ProgressCallback],
+        cache_checked: bool = False,
+    ) -> str:
+        cache_key = self._cache_key(digest, path.suffix.lower() or ".bin")
+        if not cache_checked:
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            if path.suffix.lower() == ".pdf":
+                text = await self._extract_pdf(path, display_name, on_progress)
+            else:
+                text = await self._submit(str(path))
+                if on_progress:
+                    on_progress(1, 1)
+        except TimeoutError:
+            logger.error(
+                f"[extractor] {display_name}: timed out after {self.timeout_seconds}s"
+            )
+            raise AppException(
+                ErrorKey.ERROR_EXTRACTING_FROM_FILE,
+                error_detail=f"Extraction timed out after {self.timeout_seconds}s",
+            )
+        except BrokenProcessPool:
+            logger.error(
+                f"[extractor] {display_name}: worker process died (memory limit is "
+                f"{self.memory_limit_mb} MB)"
+            )
+            raise AppException(
+                ErrorKey.ERROR_EXTRACTING_FROM_FILE,
+                error_detail="Extraction worker process terminated unexpectedly",
+            )
+
+        if text:
+            await self._cache_put(cache_key, text)
+        return text
+
+    async def _extract_pdf(
+        self, path: Path, display_name: str, on_progress: Optional[ProgressCallback]
+    ) -> str:
+        total_pages = await asyncio.to_thread(FileTextExtractor.count_pdf_pages, path)
+        if total_pages <= self.pages_per_task:
+            text = await self._submit(str(path))
+            if on_progress:
+                on_progress(total_pages or 1, total_pages or 1)
+            return text
+
+        ranges = [
+            (first, min(first + self.pages_per_task - 1, total_pages))
+            for first in range(1, total_pages + 1, self.pages_per_task)
+        ]
+        logger.info(
+            f"[extractor] {display_name}: {total_pages} pages in {len(ranges)} parallel batches"
+        )
+        pages_done = 0
+
+        async def _run_batch(first: int, last: int) -> str:
+            nonlocal pages_done
+            text = await self._submit(str(path), first, last)
+            pages_done += last - first + 1
+            logger.info(f"[extractor] {display_name}: {pages_done}/{total_pages} pages")
+            if on_progress:
+                on_progress(pages_done, total_pages)
+            return text
+
+        tasks = [asyncio.ensure_future(_run_batch(first, last)) for first, last in ranges]
+        try:
+            texts: List[str] = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return "\n".join(texts)
+
+    async def _submit(
+        self, path: str, first_page: Optional[int] = None, last_page: Optional[int] = None
+    ) -> str:
+        args = (self.options, self.timeout_seconds, path, first_page, last_page)
+        if self.max_workers <= 0:
+            # Threads cannot be interrupted, so the timeout only releases the caller
+            coro = asyncio.to_thread(_run_extraction, *args)
+            if self.timeout_seconds > 0:
+                return await asyncio.wait_for(coro, self.timeout_seconds)
+            return await coro
+
+        pool = self._get_pool()
+        try:
+            return await asyncio.wrap_future(pool.submit(_run_extraction, *args))
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # forkserver children start from a clean single-threaded process, so the
+                # app's threads and event loop are never forked. Preloading this module
+                # pays the app import once in the server instead of in every recycled worker.
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context("forkserver")
+                    context.set_forkserver_preload([__name__])
+                else:
+                    context = multiprocessing.get_context("spawn")
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self.memory_limit_mb,),
+                    max_tasks_per_child=settings.EXTRACTION_MAX_TASKS_PER_WORKER or None,
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _write_temp_file(suffix: str, content: bytes) -> Path:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            tmp.write(content)
+            return Path(tmp.name)
+
+    # ---------- Cache ----------
+
+    def _cache_key(self, digest: str, suffix: str) -> str:
+        return hashlib.sha256(
+            f"{_CACHE_FORMAT_VERSION}:{self._options_fingerprint}:{suffix}:{digest}".encode()
+        ).hexdigest()
+
+    def _cache_path(self, cache_key: str) -> Path:
+        return self.cache_dir / cache_key[:2] / f"{cache_key}.txt.gz"
+
+    async def _cache_get(self, cache_key: str) -> Optional[str]:
+        if self.cache_dir is None:
+            return None
+        text = await asyncio.to_thread(self._cache_read, cache_key)
+        if text is not None:
+            logger.info(f"[extractor] cache hit {cache_key[:12]}")
+        return text
+
+    async def _cache_put(self, cache_key: str, text: str) -> None:
+        if self.cache_dir is None:
+            return
+        await asyncio.to_thread(self._cache_write, cache_key, text)
+
+    def _cache_read(self, cache_key: str) -> Optional[str]:
+        cache_path = self._cache_path(cache_key)
+        try:
+            with gzip.open(cache_path, "rt", encoding="utf-8") as f:
+                text = f.read()
+            # mtime doubles as last-access time for pruning
+            os.utime(cache_path)
+            return text
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, UnicodeDecodeError) as e:
+            logger.warning(f"[extractor] discarding unreadable cache entry {cache_path}: {e}")
+            try:
+                cache_path.unlink()
+            except OSError:
+                pass
+            return None
+
+    def _cache_write(self, cache_key: str, text: str) -> None:
+        cache_path = self._cache_path(cache_key)
+        tmp_name = None
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=cache_path.parent, suffix=".tmp", delete=False
+            ) as tmp:
+                tmp_name = tmp.name
+                with gzip.GzipFile(fileobj=tmp, mode="wb") as gz:
+                    gz.write(text.encode("utf-8"))
+            os.replace(tmp_name, cache_path)
+            tmp_name = None
+        except OSError as e:
+            logger.warning(f"[extractor] could not write cache entry {cache_path}: {e}")
+        finally:
+            if tmp_name:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+
+        self._cache_writes += 1
+        if self._cache_writes % _CACHE_PRUNE_EVERY_WRITES == 0:
+            self._prune_cache()
+
+    def _prune_cache(self) -> None:
+        """Drop least recently used entries once the cache exceeds its size budget."""
+        entries = []
+        total = 0
+        for entry in self.cache_dir.glob("*/*.txt.gz"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total += stat.st_size
+        if total <= self.cache_max_bytes:
+            return
+
+        target = int(self.cache_max_bytes * 0.9)
+        for _, size, entry in sorted(entries):
+            if total <= target:
+                break
+            try:
+                entry.unlink()
+                total -= size
+            except OSError:
+                pass
+
+
+def get_extraction_service() -> DocumentExtractionService:
+    """Get the process-wide document extraction service"""
+    return DocumentExtractionService.get_instance()
+
+
+def shutdown_extraction_service() -> None:
+    """Stop the worker processes of the process-wide service, if it was started"""
+    if DocumentExtractionService._instance is not None:
+        DocumentExtractionService._instance.shutdown()
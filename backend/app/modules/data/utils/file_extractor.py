@@ -141,6 +141,59 @@ class FileTextExtractor:
         return self._extract_by_suffix(Path(path))
 
 
+    def extract_pdf_pages(self, path: str | Path, first_page: int, last_page: int) -> str:
+        """
+        Extract a 1-based, inclusive page range of a PDF.
+
+        Uses the same pdfminer → OCR → pypdf chain as full documents, decided per range,
+        so scanned and text pages of one document can be processed in parallel.
+        """
+        path = Path(path)
+        page_numbers = list(range(first_page - 1, last_page))
+        txt = ""
+        try:
+            from pdfminer.high_level import extract_text as pdfminer_extract_text
+
+            txt = pdfminer_extract_text(str(path), page_numbers=page_numbers) or ""
+        except Exception as e:
+            logger.info(f"[extractor] pdfminer failed on pages {first_page}-{last_page}: {e}")
+
+        if not self._is_mostly_pagebreaks(txt) or not self.options.ocr.enabled:
+            return txt
+
+        if shutil.which("tesseract"):
+            try:
+                ocr_txt = self._ocr_pdf(path, first_page=first_page, last_page=last_page)
+                if ocr_txt.strip():
+                    return ocr_txt
+            except Exception as e:
+                logger.info(f"[extractor] OCR failed on pages {first_page}-{last_page}: {e}")
+
+        try:
+            import pypdf
+
+            reader = pypdf.PdfReader(str(path))
+            extracted = "\n".join(
+                (reader.pages[i].extract_text() or "") for i in page_numbers
+            )
+            if extracted.strip():
+                return extracted
+        except Exception as e:
+            logger.info(f"[extractor] pypdf failed on pages {first_page}-{last_page}: {e}")
+
+        return txt
+
+    @staticmethod
+    def count_pdf_pages(path: str | Path) -> int:
+        """Return the page count of a PDF, or 0 when it cannot be read."""
+        try:
+            import pypdf
+
+            return len(pypdf.PdfReader(str(path)).pages)
+        except Exception as e:
+            logger.info(f"[extractor] could not count pdf pages: {e}")
+            return 0
+
     # ---------- Routing ----------
 
     def _extract_by_suffix(self, path: Path) -> str:
@@ -561,15 +614,22 @@ class FileTextExtractor:
         return len(s.strip().replace("\x0c", "")) < 10
 
 
-    def _ocr_pdf(self, pdf_path: Path) -> str:
+    def _ocr_pdf(self, pdf_path: Path, first_page: Optional[int] = None,
+                 last_page: Optional[int] = None) -> str:
         from pdf2image import convert_from_path
         import pytesseract
 
-        imgs = convert_from_path(str(pdf_path), dpi=self.options.ocr.dpi)
+        max_pages = self.options.ocr.max_pages
+        start = first_page or 1
+        if max_pages is not None:
+            if start > max_pages:
+                return ""
+            last_page = min(last_page or max_pages, max_pages)
+
+        imgs = convert_from_path(str(pdf_path), dpi=self.options.ocr.dpi,
+                                 first_page=first_page, last_page=last_page)
         texts: list[str] = []
-        for i, img in enumerate(imgs):
-            if self.options.ocr.max_pages is not None and i >= self.options.ocr.max_pages:
-                break
+        for img in imgs:
             texts.append(pytesseract.image_to_string(
                     img, lang=self.options.ocr.lang))
         return "\n".join(texts)
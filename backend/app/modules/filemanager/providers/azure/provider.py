@@ -4,11 +4,13 @@ Azure Blob Storage Provider (Stub Implementation)
 TODO: Implement full Azure Blob Storage operations using azure-storage-blob.
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, BinaryIO, List, Dict, Any, Optional, Union
 
-from ..base import BaseStorageProvider
+from ..base import BaseStorageProvider, DEFAULT_CHUNK_SIZE, StoredFileInfo
 from app.core.config.settings import file_storage_settings
+from azure.core.exceptions import ResourceNotFoundError
 from azure.storage.blob import BlobServiceClient
 logger = logging.getLogger(__name__)
 
@@ -72,14 +74,16 @@ class AzureStorageProvider(BaseStorageProvider):
 
     async def upload_file(
         self,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         storage_path: str,
         file_metadata: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Upload a file to Azure Blob Storage."""
+        """Upload a file to Azure Blob Storage (file objects are uploaded as chunked blocks by the SDK)."""
         self._ensure_initialized()
         try:
-            self.container_client.upload_blob(name=storage_path, data=file_content, overwrite=True)
+            await asyncio.to_thread(
+                self.container_client.upload_blob, name=storage_path, data=file_content, overwrite=True
+            )
             return storage_path
         except Exception as e:
             logger.error(f"Error uploading file to Azure Blob Storage: {e}")
@@ -89,7 +93,41 @@ class AzureStorageProvider(BaseStorageProvider):
         """Download a file from Azure Blob Storage."""
         self._ensure_initialized()
         blob_client = self.container_client.get_blob_client(name=storage_path)
-        return blob_client.download_blob().readall()
+        downloader = await asyncio.to_thread(blob_client.download_blob)
+        return await asyncio.to_thread(downloader.readall)
+
+    async def stream_file(
+        self,
+        storage_path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Stream a byte range of a blob using ranged GETs."""
+        self._ensure_initialized()
+        blob_client = self.container_client.get_blob_client(name=storage_path)
+        length = None if end is None else end - start + 1
+        downloader = await asyncio.to_thread(blob_client.download_blob, offset=start, length=length)
+        blob_chunks = downloader.chunks()
+        while True:
+            chunk = await asyncio.to_thread(next, blob_chunks, None)
+            if chunk is None:
+                break
+            for offset in range(0, len(chunk), chunk_size):
+                yield chunk[offset:offset + chunk_size]
+
+    async def get_file_info(self, storage_path: str) -> Optional[StoredFileInfo]:
+        """Get size, ETag and modification time of a blob."""
+        self._ensure_initialized()
+        blob_client = self.container_client.get_blob_client(name=storage_path)
+        try:
+            properties = await asyncio.to_thread(blob_client.get_blob_properties)
+        except ResourceNotFoundError:
+            return None
+        etag = properties.etag
+        if etag and not etag.startswith(('"', 'W/"')):
+            etag = f'"{etag}"'
+        return StoredFileInfo(size=properties.size, etag=etag, last_modified=properties.last_modified)
 
     async def delete_file(self, storage_path: str) -> bool:
         """Delete a file from Azure Blob Storage."""
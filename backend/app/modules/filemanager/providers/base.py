@@ -5,7 +5,22 @@ Defines the common interface that all storage providers must implement.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, List, Dict, Any, Optional, Union
+
+# Chunk size for streamed reads and writes; keeps memory per transfer constant
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+
+@dataclass
+class StoredFileInfo:
+    """Storage-level metadata used for conditional and Range responses."""
+
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
 
 
 class BaseStorageProvider(ABC):
@@ -52,7 +67,7 @@ class BaseStorageProvider(ABC):
     @abstractmethod
     async def upload_file(
         self,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         storage_path: str,
         file_metadata: Optional[Dict[str, Any]] = None
     ) -> str:
@@ -60,7 +75,8 @@ class BaseStorageProvider(ABC):
         Upload a file to the storage provider
         
         Args:
-            file_content: File content as bytes
+            file_content: File content as bytes, or a readable binary file object
+                that should be consumed in chunks rather than read into memory
             storage_path: Path where the file should be stored
             file_metadata: Optional file metadata dictionary
             
@@ -82,6 +98,49 @@ class BaseStorageProvider(ABC):
         """
         pass
 
+    async def stream_file(
+        self,
+        storage_path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream a file, or the inclusive byte range [start, end] of it, in chunks
+
+        Args:
+            storage_path: Path to the file in storage
+            start: First byte to return
+            end: Last byte to return (inclusive), None for end of file
+            chunk_size: Maximum size of each yielded chunk
+
+        Note:
+            The default implementation downloads the whole file first. Providers
+            that support ranged reads should override it so memory stays constant.
+        """
+        content = await self.download_file(storage_path)
+        stop = len(content) if end is None else min(end + 1, len(content))
+        for offset in range(start, stop, chunk_size):
+            yield content[offset:min(offset + chunk_size, stop)]
+
+    async def get_file_info(self, storage_path: str) -> Optional[StoredFileInfo]:
+        """
+        Get size, ETag and modification time of a stored file
+
+        Returns:
+            StoredFileInfo, or None if the provider cannot report it
+        """
+        return None
+
+    def get_local_path(self, storage_path: str) -> Optional[Path]:
+        """
+        Get the local file system path of a stored file, for zero-copy responses
+
+        Returns:
+            Absolute path, or None for providers that are not backed by local files
+        """
+        return None
+
     @abstractmethod
     async def delete_file(self, storage_path: str) -> bool:
         """
@@ -5,11 +5,18 @@ Implements storage operations using the local file system.
 """
 
 import os
+import asyncio
+import hashlib
 import logging
+import tempfile
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, BinaryIO, List, Dict, Any, Optional, Union
 
-from ..base import BaseStorageProvider
+import aiofiles
+import aiofiles.os
+
+from ..base import BaseStorageProvider, DEFAULT_CHUNK_SIZE, StoredFileInfo
 
 logger = logging.getLogger(__name__)
 
@@ -86,35 +93,54 @@ class LocalFileSystemProvider(BaseStorageProvider):
 
     async def upload_file(
         self,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         storage_path: str,
         file_metadata: Optional[Dict[str, Any]] = None
     ) -> str:
         """
         Upload a file to local file system.
         
+        Content is written to a temporary file next to the target and renamed into
+        place, so readers never see a partially written file. File objects are
+        copied in chunks.
+
         Args:
-            file_content: File content as bytes
+            file_content: File content as bytes or a readable binary file object
             storage_path: Path where the file should be stored
             file_metadata: Optional file metadata dictionary (not used for local storage)
             
         Returns:
             Storage path where the file was stored
         """
+        tmp_name = None
         try:
             full_path = self._resolve_path(storage_path)
             
             # Create parent directories if they don't exist
             full_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Write file content
-            full_path.write_bytes(file_content)
+            fd, tmp_name = tempfile.mkstemp(dir=full_path.parent, prefix=".upload-")
+            os.close(fd)
+            async with aiofiles.open(tmp_name, "wb") as f:
+                if isinstance(file_content, (bytes, bytearray, memoryview)):
+                    await f.write(file_content)
+                else:
+                    while chunk := await asyncio.to_thread(file_content.read, DEFAULT_CHUNK_SIZE):
+                        await f.write(chunk)
+            await aiofiles.os.replace(tmp_name, full_path)
+            tmp_name = None
             
             logger.debug(f"Uploaded file to {full_path}")
             return storage_path
         except Exception as e:
             logger.error(f"Failed to upload file {storage_path}: {e}")
             raise
+        finally:
+            if tmp_name:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
 
     async def download_file(self, storage_path: str) -> bytes:
         """
@@ -132,11 +158,79 @@ class LocalFileSystemProvider(BaseStorageProvider):
             if not full_path.exists():
                 raise FileNotFoundError(f"File not found: {storage_path}")
             
-            return full_path.read_bytes()
+            async with aiofiles.open(full_path, "rb") as f:
+                return await f.read()
         except Exception as e:
             logger.error(f"Failed to download file {storage_path}: {e}")
             raise
 
+    async def stream_file(
+        self,
+        storage_path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream a byte range of a file from local file system.
+
+        Args:
+            storage_path: Path to the file in storage
+            start: First byte to return
+            end: Last byte to return (inclusive), None for end of file
+            chunk_size: Maximum size of each yielded chunk
+        """
+        full_path = self._resolve_path(storage_path)
+        async with aiofiles.open(full_path, "rb") as f:
+            await f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = await f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    async def get_file_info(self, storage_path: str) -> Optional[StoredFileInfo]:
+        """
+        Get size, ETag and modification time of a local file.
+
+        The ETag matches the one Starlette's FileResponse derives from mtime and size.
+
+        Args:
+            storage_path: Path to the file in storage
+
+        Returns:
+            StoredFileInfo, or None if the file does not exist
+        """
+        try:
+            stat_result = await aiofiles.os.stat(self._resolve_path(storage_path))
+        except (OSError, ValueError):
+            return None
+        etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+        return StoredFileInfo(
+            size=stat_result.st_size,
+            etag=f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"',
+            last_modified=datetime.fromtimestamp(stat_result.st_mtime, tz=timezone.utc),
+        )
+
+    def get_local_path(self, storage_path: str) -> Optional[Path]:
+        """
+        Get the absolute path of a stored file.
+
+        Args:
+            storage_path: Path to the file in storage
+
+        Returns:
+            Absolute Path object, or None if the file does not exist
+        """
+        try:
+            full_path = self._resolve_path(storage_path)
+        except ValueError:
+            return None
+        return full_path if full_path.is_file() else None
+
     async def delete_file(self, storage_path: str) -> bool:
         """
         Delete a file from local file system.
@@ -0,0 +1,104 @@
+"""
+HTTP helpers for streamed file responses
+
+Range parsing, conditional request checks and incremental base64 encoding, shared by
+the file manager routes so every storage provider is served with constant memory.
+"""
+
+import base64
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import AsyncIterator, Optional, Tuple
+
+# Multiple of 3 so every encoded piece is valid base64 on its own
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header does not overlap the file."""
+
+    def __init__(self, size: int):
+        self.size = size
+        super().__init__(f"Range not satisfiable for size {size}")
+
+
+def parse_byte_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single `bytes=` range into an inclusive (start, end) pair.
+
+    Returns None when the header is absent, malformed or asks for several ranges,
+    in which case the full file should be sent (RFC 9110 allows ignoring Range).
+    Raises RangeNotSatisfiable when the range lies outside the file.
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            suffix_length = int(last)
+            if suffix_length <= 0 or size == 0:
+                raise RangeNotSatisfiable(size)
+            return max(0, size - suffix_length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable(size)
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == bare for candidate in if_none_match.split(",")
+    )
+
+
+def if_range_allows(
+    if_range: Optional[str], etag: Optional[str], last_modified: Optional[datetime]
+) -> bool:
+    """Whether a Range request may be honoured given its If-Range validator."""
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/"')):
+        # Strong comparison; weak validators never match If-Range
+        return etag is not None and not etag.startswith("W/") and if_range == etag
+    if last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(if_range) == last_modified.replace(microsecond=0)
+    except (TypeError, ValueError):
+        return False
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value, usegmt=True)
+
+
+async def iter_base64(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Base64 encode a byte stream incrementally, keeping at most one chunk in memory."""
+    remainder = b""
+    async for chunk in chunks:
+        data = remainder + chunk
+        cut = len(data) - len(data) % 3
+        remainder = data[cut:]
+        if cut:
+            yield base64.standard_b64encode(data[:cut])
+    if remainder:
+        yield base64.standard_b64encode(remainder)
@@ -1,9 +1,11 @@
+import asyncio
 import base64
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 import logging
 from datetime import datetime, timedelta
 from uuid import UUID
@@ -21,10 +23,20 @@ from app.services.datasources import DataSourceService
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-import requests
+import httpx
+
+from app.core.config.settings import settings
+from app.core.http_client import http_request
 
 logger = logging.getLogger(__name__)
 
+TOKEN_REFRESH_BUFFER = timedelta(minutes=5)
+# Gmail accepts up to 100 calls per batch but recommends at most 50
+GMAIL_BATCH_SIZE = 50
+
+# Refreshed access tokens per data source id: (access_token, expires_at)
+_token_cache: Dict[str, Tuple[str, datetime]] = {}
+
 
 class GmailConnector:
     """
@@ -52,6 +64,19 @@ class GmailConnector:
         self.client_id = ""
         self.client_secret = ""
         self.ds_id = ds_id
+        # The services' httplib2 transport is not thread-safe
+        self._api_lock = threading.Lock()
+
+    async def _call_api(self, fn, *args):
+        """
+        Run a blocking Google API call in a worker thread. Calls of one
+        connector run one at a time, since its services share one transport.
+        """
+        def locked():
+            with self._api_lock:
+                return fn(*args)
+
+        return await asyncio.to_thread(locked)
 
     async def _initialize_service(self):
         try:
@@ -116,7 +141,8 @@ class GmailConnector:
 
     async def get_gmail_tokens(self) -> Optional[Dict[str, str]]:
         """
-        Get Gmail tokens from app settings and refresh if expired
+        Get Gmail tokens from the data source and refresh them if expired.
+        Refreshed tokens are cached per data source until shortly before expiry.
         """
         try:
             if not self.service:
@@ -126,112 +152,53 @@ class GmailConnector:
                 logger.warning("Gmail tokens not found in app settings")
                 return None
 
-            if self.current_access_token and self.expires_at:
-                # Check if current token is still valid
-                if datetime.now() < self.expires_at:
-                    return {
-                        "access_token": self.current_access_token,
-                        "refresh_token": self.refresh_token,
-                    }
+            cached = _token_cache.get(str(self.ds_id))
+            if cached and (not self.expires_at or cached[1] > self.expires_at):
+                self.current_access_token, self.expires_at = cached
 
-            # Check if access token is expired or will expire soon (5 minutes buffer)
-            current_time = datetime.now()
+            if self._token_is_fresh():
+                return {
+                    "access_token": self.current_access_token,
+                    "refresh_token": self.refresh_token,
+                }
 
             if self.expires_at:
-                try:
-                    # Parse expiration time (assuming ISO format or timestamp)
-                    # if self.expires_at.isdigit():
-                    # Unix timestamp
-                    # self.expires_at = datetime.fromtimestamp(int(gmail_token_expires_at.value))
-                    # else:
-                    # ISO format
-                    # expires_at = datetime.fromisoformat(self.expires_at.replace('Z', '+00:00'))
-
-                    # Add 5-minute buffer to refresh before actual expiration
-                    if current_time >= (self.expires_at - timedelta(minutes=5)):
-                        logger.info(
-                            "Gmail access token expired or expiring soon, refreshing..."
-                        )
-                        refreshed_tokens = self._refresh_gmail_token(
-                            self.refresh_token)
-
-                        if refreshed_tokens:
-                            from app.dependencies.injector import injector
-
-                            self.ds_service = injector.get(DataSourceService)
-
-                            # Update tokens in app settings
-                            await self._save_refreshed_tokens(refreshed_tokens)
-
-                            self.current_access_token = refreshed_tokens["access_token"]
-                            self.refresh_token = refreshed_tokens.get(
-                                "refresh_token", self.refresh_token
-                            )
-                            self.expires_at = datetime.fromisoformat(
-                                refreshed_tokens["expires_at"]
-                            )
-                            return refreshed_tokens
-                        else:
-                            logger.error("Failed to refresh Gmail token")
-                            return None
-                    else:
-                        logger.info("Gmail access token is still valid")
-
-                        return {
-                            "access_token": self.current_access_token,
-                            "refresh_token": self.refresh_token,
-                        }
-
-                except (ValueError, AttributeError) as e:
-                    logger.warning(
-                        f"Invalid token expiration format: {e}, attempting refresh"
-                    )
-                    # If we can't parse expiration, try to refresh anyway
-                    refreshed_tokens = self._refresh_gmail_token(
-                        self.refresh_token)
-
-                    if refreshed_tokens:
-                        await self._save_refreshed_tokens(refreshed_tokens)
-                        self.current_access_token = refreshed_tokens["access_token"]
-                        self.refresh_token = refreshed_tokens.get(
-                            "refresh_token", self.refresh_token
-                        )
-                        self.expires_at = datetime.fromisoformat(
-                            refreshed_tokens["expires_at"]
-                        )
-                        return refreshed_tokens
+                logger.info("Gmail access token expired or expiring soon, refreshing...")
             else:
-                # No expiration info stored, try to validate current token
-                logger.info(
-                    "No token expiration info found, validating current token..."
-                )
-                if not self._validate_gmail_token(self.refresh_token):
-                    logger.info("Gmail access token is invalid, refreshing...")
-                    refreshed_tokens = self._refresh_gmail_token(
-                        self.refresh_token)
-
-                    if refreshed_tokens:
-                        self._save_refreshed_tokens(refreshed_tokens)
-                        self.current_access_token = refreshed_tokens["access_token"]
-                        self.refresh_token = refreshed_tokens.get(
-                            "refresh_token", self.refresh_token
-                        )
-                        self.expires_at = datetime.fromisoformat(
-                            refreshed_tokens["expires_at"]
-                        )
-                        return refreshed_tokens
-                    else:
-                        logger.error("Failed to refresh Gmail token")
-                        return None
+                # No expiration info stored, validate the current token first
+                logger.info("No token expiration info found, validating current token...")
+                if await self._validate_gmail_token():
+                    return {"access_token": self.current_access_token}
+                logger.info("Gmail access token is invalid, refreshing...")
+
+            refreshed_tokens = await self._refresh_gmail_token(self.refresh_token)
+            if not refreshed_tokens:
+                logger.error("Failed to refresh Gmail token")
+                return None
 
-            # Token is still valid
-            return {"access_token": self.current_access_token}
+            self.ds_service = injector.get(DataSourceService)
+            # Update tokens in the data source
+            await self._save_refreshed_tokens(refreshed_tokens)
+
+            self.current_access_token = refreshed_tokens["access_token"]
+            self.refresh_token = refreshed_tokens.get("refresh_token", self.refresh_token)
+            self.expires_at = datetime.fromisoformat(refreshed_tokens["expires_at"])
+            _token_cache[str(self.ds_id)] = (self.current_access_token, self.expires_at)
+            return refreshed_tokens
 
         except Exception as e:
             logger.error(f"Failed to get Gmail tokens: {e}")
             return None
 
-    def _refresh_gmail_token(self, refresh_token: str) -> Optional[Dict[str, str]]:
+    def _token_is_fresh(self) -> bool:
+        """True if the access token is known to be valid for at least the refresh buffer."""
+        return bool(
+            self.current_access_token
+            and self.expires_at
+            and datetime.now() < self.expires_at - TOKEN_REFRESH_BUFFER
+        )
+
+    async def _refresh_gmail_token(self, refresh_token: str) -> Optional[Dict[str, str]]:
         """
         Refresh Gmail access token using refresh token
         """
@@ -250,7 +217,8 @@ class GmailConnector:
                 "client_secret": self.client_secret,
             }
 
-            response = requests.post(token_url, data=payload)
+            response = await http_request(
+                "POST", token_url, data=payload, timeout=settings.CONNECT_TIMEOUT * 2)
             response.raise_for_status()
 
             token_data = response.json()
@@ -272,33 +240,35 @@ class GmailConnector:
             logger.info("Gmail access token refreshed successfully")
             return refreshed_tokens
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to refresh Gmail token: {e}")
             return None
         except KeyError as e:
             logger.error(f"Invalid token response format: {e}")
             return None
 
-    def _validate_gmail_token(self) -> bool:
+    async def _validate_gmail_token(self) -> bool:
         """
-        Validate Gmail access token by making a test API call
+        Validate Gmail access token. Tokens with a known, unexpired lifetime are
+        trusted without a network call; otherwise a test API call is made.
         """
+        if self._token_is_fresh():
+            return True
         try:
             # Simple API call to validate token
             logger.info("Fetching user email from Gmail profile")
             user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
             headers = {"Authorization": f"Bearer {self.current_access_token}"}
-            response = requests.request("GET", user_info_url, headers=headers)
+            response = await http_request(
+                "GET", user_info_url, headers=headers, timeout=settings.CONNECT_TIMEOUT * 2)
             if response.status_code != 200:
                 logger.error(
                     f"Failed to retrieve user info: {response.status_code} - {response.text}"
                 )
-                raise HTTPException(
-                    status_code=400, detail="Failed to retrieve user information"
-                )
+                return False
             return True
 
-        except requests.exceptions.RequestException:
+        except httpx.HTTPError:
             return False
 
     async def _save_refreshed_tokens(self, tokens: Dict[str, str]):
@@ -368,7 +338,7 @@ class GmailConnector:
 
         await self.get_gmail_tokens()
 
-        if not self._validate_gmail_token():
+        if not await self._validate_gmail_token():
             return {
                 "success": False,
                 "error": "Failed to authenticate with Gmail API",
@@ -472,11 +442,11 @@ class GmailConnector:
             if not self.service:
                 await self._initialize_service()
 
-            send_result = (
+            send_result = await self._call_api(
                 self.service.users()
                 .messages()
                 .send(userId="me", body={"raw": raw_message})
-                .execute()
+                .execute
             )
 
             result = {
@@ -509,109 +479,138 @@ class GmailConnector:
         """
         Retrieve emails from Gmail
 
+        Message details are fetched with Gmail batch requests in a worker thread,
+        so the event loop is never blocked by the Google API client.
+
         Args:
             query: Gmail search query
             max_results: Maximum number of messages to retrieve
             include_spam_trash: Include spam and trash messages
-            access_token: Optional access token for this operation
 
         Returns:
             List of message dictionaries
         """
         # Ensure authentication
         await self.get_gmail_tokens()
-        if not self._validate_gmail_token():
+        if not await self._validate_gmail_token():
             logger.error("Failed to authenticate with Gmail API")
             return []
         try:
-            # Get message list
             if not self.service:
-                self._initialize_service()
+                await self._initialize_service()
+
+            message_ids = await self._call_api(
+                self._list_message_ids, query, max_results, include_spam_trash
+            )
+            if not message_ids:
+                logger.info("No messages found")
+                return []
+
+            details = await self._call_api(self._batch_get_messages, message_ids)
+            detailed_messages = [self._parse_message(detail) for detail in details]
+
+            logger.info(f"Retrieved {len(detailed_messages)} messages")
+            return detailed_messages
+
+        except HttpError as error:
+            logger.info(f"Failed to retrieve messages: {error}")
+            return []
+
+    def _list_message_ids(
+        self, query: str, max_results: int, include_spam_trash: bool
+    ) -> List[str]:
+        """List message ids matching a query, following pagination (runs in a worker thread)."""
+        message_ids: List[str] = []
+        page_token = None
+        while len(message_ids) < max_results:
             results = (
                 self.service.users()
                 .messages()
                 .list(
                     userId="me",
                     q=query,
-                    maxResults=max_results,
+                    maxResults=min(500, max_results - len(message_ids)),
                     includeSpamTrash=include_spam_trash,
+                    pageToken=page_token,
                 )
                 .execute()
             )
+            message_ids.extend(m["id"] for m in results.get("messages", []))
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+        return message_ids[:max_results]
 
-            messages = results.get("messages", [])
-
-            if not messages:
-                logger.info("No messages found")
-                return []
-
-            detailed_messages = []
+    def _batch_get_messages(self, message_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch full message resources with Gmail batch HTTP requests (runs in a worker thread).
+        Returns messages in the order of `message_ids`, skipping the ones that failed.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
 
-            # Get details for each message
-            if not self.service:
-                await self._initialize_service()
+        def _callback(request_id, response, exception):
+            if exception is not None:
+                logger.warning(f"Failed to retrieve message {request_id}: {exception}")
+            else:
+                results[request_id] = response
 
-            for message in messages:
-                msg_detail = (
+        for start in range(0, len(message_ids), GMAIL_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=_callback)
+            for message_id in message_ids[start:start + GMAIL_BATCH_SIZE]:
+                batch.add(
                     self.service.users()
                     .messages()
-                    .get(userId="me", id=message["id"], format="full")
-                    .execute()
+                    .get(userId="me", id=message_id, format="full"),
+                    request_id=message_id,
                 )
-
-                # Extract message information
-                headers = msg_detail["payload"].get("headers", [])
-                header_dict = {h["name"].lower(): h["value"] for h in headers}
-
-                # Helper function to get header value with fallbacks
-                def get_header_value(header_names):
-                    for name in header_names:
-                        value = header_dict.get(name.lower())
-                        if value:
-                            return value
-                    return ""
-
-                # Get message body
-                body = self._extract_message_body(msg_detail["payload"])
-
-                # Extract recipients more comprehensively
-                to_recipients = get_header_value(
-                    ["to", "delivered-to", "x-original-to"]
-                )
-                cc_recipients = get_header_value(["cc"])
-                bcc_recipients = get_header_value(["bcc"])
-
-                # Sometimes the recipient info is in the 'delivered-to' or other headers
-                if not to_recipients:
-                    # Try to get from other possible headers
-                    for header in headers:
-                        name = header["name"].lower()
-                        if "to" in name or "recipient" in name:
-                            to_recipients = header["value"]
-                            break
-
-                message_info = {
-                    "id": msg_detail["id"],
-                    "thread_id": msg_detail["threadId"],
-                    "labels": msg_detail.get("labelIds", []),
-                    "date": get_header_value(["date"]),
-                    "from": get_header_value(["from", "sender"]),
-                    "to": to_recipients,
-                    "cc": cc_recipients,
-                    "bcc": bcc_recipients,
-                    "subject": get_header_value(["subject"]),
-                    "body": body,
-                    "is_unread": "UNREAD" in msg_detail.get("labelIds", []),
-                }
-
-                detailed_messages.append(message_info)
-
-            logger.info(f"Retrieved {len(detailed_messages)} messages")
-            return detailed_messages
-
-        except HttpError as error:
-            logger.info(f"Failed to retrieve messages: {error}")
-            return []
+            batch.execute()
+
+        return [results[mid] for mid in message_ids if mid in results]
+
+    def _parse_message(self, msg_detail: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a Gmail message resource into the connector's message dictionary."""
+        headers = msg_detail["payload"].get("headers", [])
+        header_dict = {h["name"].lower(): h["value"] for h in headers}
+
+        # Helper function to get header value with fallbacks
+        def get_header_value(header_names):
+            for name in header_names:
+                value = header_dict.get(name.lower())
+                if value:
+                    return value
+            return ""
+
+        # Get message body
+        body = self._extract_message_body(msg_detail["payload"])
+
+        # Extract recipients more comprehensively
+        to_recipients = get_header_value(["to", "delivered-to", "x-original-to"])
+        cc_recipients = get_header_value(["cc"])
+        bcc_recipients = get_header_value(["bcc"])
+
+        # Sometimes the recipient info is in the 'delivered-to' or other headers
+        if not to_recipients:
+            # Try to get from other possible headers
+            for header in headers:
+                name = header["name"].lower()
+                if "to" in name or "recipient" in name:
+                    to_recipients = header["value"]
+                    break
+
+        return {
+            "id": msg_detail["id"],
+            "thread_id": msg_detail["threadId"],
+            "history_id": msg_detail.get("historyId"),
+            "labels": msg_detail.get("labelIds", []),
+            "date": get_header_value(["date"]),
+            "from": get_header_value(["from", "sender"]),
+            "to": to_recipients,
+            "cc": cc_recipients,
+            "bcc": bcc_recipients,
+            "subject": get_header_value(["subject"]),
+            "body": body,
+            "is_unread": "UNREAD" in msg_detail.get("labelIds", []),
+        }
 
     def _extract_message_body(self, payload: Dict) -> str:
         """Extract text body from message payload"""
@@ -635,7 +634,7 @@ class GmailConnector:
     async def mark_as_read(self, message_id: str) -> bool:
         """Mark a message as read"""
         await self.get_gmail_tokens()
-        if not self._validate_gmail_token():
+        if not await self._validate_gmail_token():
             logger.error("Failed to authenticate with Gmail API")
             return False
         if not message_id:
@@ -645,9 +644,11 @@ class GmailConnector:
             if not self.service:
                 await self._initialize_service()
 
-            self.service.users().messages().modify(
-                userId="me", id=message_id, body={"removeLabelIds": ["UNREAD"]}
-            ).execute()
+            await self._call_api(
+                self.service.users().messages().modify(
+                    userId="me", id=message_id, body={"removeLabelIds": ["UNREAD"]}
+                ).execute
+            )
             logger.info(f"Message {message_id} marked as read")
             return True
         except HttpError as error:
@@ -657,7 +658,7 @@ class GmailConnector:
     async def delete_message(self, message_id: str) -> bool:
         """Delete a message"""
         await self.get_gmail_tokens()
-        if not self._validate_gmail_token():
+        if not await self._validate_gmail_token():
             logger.error("Failed to authenticate with Gmail API")
             return False
         if not message_id:
@@ -667,7 +668,9 @@ class GmailConnector:
             if not self.service:
                 await self._initialize_service()
 
-            self.service.users().messages().delete(userId="me", id=message_id).execute()
+            await self._call_api(
+                self.service.users().messages().delete(userId="me", id=message_id).execute
+            )
             logger.info(f"Message {message_id} deleted")
             return True
         except HttpError as error:
@@ -698,7 +701,7 @@ class GmailConnector:
         """
 
         await self.get_gmail_tokens()
-        if not self._validate_gmail_token():
+        if not await self._validate_gmail_token():
             logger.error("Failed to authenticate with Gmail API")
             return []
         if not search_criteria:
@@ -810,14 +813,14 @@ class GmailConnector:
             }
 
         try:
-            result = (
+            result = await self._call_api(
                 self.calendar_service.events()
                 .insert(
                     calendarId=calendar_id,
                     body=event,
                     sendUpdates=send_updates,  # mails the guests
                 )
-                .execute()
+                .execute
             )
             return {
                 "success": True,
@@ -865,7 +868,7 @@ class GmailConnector:
         )
 
         try:
-            items = events_call.execute().get("items", [])
+            items = (await self._call_api(events_call.execute)).get("items", [])
         except Exception as e:
             logger.error(f"Failed to list events: {e}")
             return {"success": False, "error": str(e)}
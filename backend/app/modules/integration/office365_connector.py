@@ -1,11 +1,11 @@
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional
-import httpx
 import requests
 import logging
 from msal import ConfidentialClientApplication
 from urllib.parse import quote, urlparse, unquote
+from app.core.http_client import get_http_client, http_request
 from app.core.exceptions.error_messages import ErrorKey
 from app.core.exceptions.exception_classes import AppException
 
@@ -43,7 +43,6 @@ class Office365Connector:
             "Authorization": f"Bearer {self.access_token}",
         }
         self.for_sharepoint = for_sharepoint
-        self._client: httpx.AsyncClient | None = None
 
         if (self.site_id is None or self.drive_id is None) and self.for_sharepoint:
             self.resolve_sharepoint_url(self.sharepoint_url)
@@ -105,7 +104,7 @@ class Office365Connector:
         # logger.info("Successfully refreshed access token.")
         # return new_token
 
-    def list_files(self, folder_path: Optional[str] = None) -> dict:
+    async def list_files(self, folder_path: Optional[str] = None) -> dict:
         """
         Recursively list all files in the specified SharePoint folder.
         folder_path = "Shared Documents/MyFolder"
@@ -114,13 +113,13 @@ class Office365Connector:
             folder_path=self.folder_path
         logger.info(f"Listing files from folder (recursively): {folder_path}")
         files = []
-        self._list_files_recursive(folder_path, files)
+        await self._list_files_recursive(folder_path, files)
         return {"files": files}
 
-    def _list_files_recursive(self, folder_path: str, files_accumulator: list):
+    async def _list_files_recursive(self, folder_path: str, files_accumulator: list):
         url=f"{self.base_url}/sites/{self.site_id}/drives/{self.drive_id}/root:/{folder_path}:/children"
 
-        response = requests.get(url, headers=self.headers)
+        response = await http_request("GET", url, headers=self.headers)
 
         if response.status_code != 200:
             raise Exception(f"Error listing folder {folder_path}: {response.text}")
@@ -128,7 +127,7 @@ class Office365Connector:
         for item in response.json().get("value", []):
             if "folder" in item:
                 sub_path = f"{folder_path}/{item['name']}"
-                self._list_files_recursive(sub_path, files_accumulator)
+                await self._list_files_recursive(sub_path, files_accumulator)
             elif "file" in item:
                 files_accumulator.append({
                     "name": item["name"],
@@ -136,8 +135,8 @@ class Office365Connector:
                     "download_url": item["@microsoft.graph.downloadUrl"]
                 })
 
-    def get_file_content(self, download_url: str):
-        response = requests.get(download_url)
+    async def get_file_content(self, download_url: str):
+        response = await http_request("GET", download_url, follow_redirects=True)
         if response.status_code != 200:
             raise Exception(f"Error downloading file: {response.status_code} - {response.text}")
         return response.content
@@ -200,21 +199,11 @@ class Office365Connector:
     @asynccontextmanager
     async def _session(self):
         """
-        Lazy-init a shared AsyncClient and auto-close it when
-        the Office365Connector instance gets GC-collected.
+        The shared pooled client for Microsoft Graph (see app.core.http_client);
+        it stays open for other connectors once the block exits.
         Usage:   async with self._session() as client: ...
         """
-        if self._client is None:
-            self._client = httpx.AsyncClient(timeout=20.0)
-        try:
-            yield self._client
-        finally:
-            pass  # caller closes; see __del__
-
-
-    async def __aexit__(self, *exc):
-        if self._client:
-            await self._client.aclose()
+        yield get_http_client(self.base_url)
 
 
     async def create_calendar_event(
@@ -1,15 +1,56 @@
 from typing import Dict, Any, Optional, List, Tuple
+from dataclasses import dataclass
 from datetime import timedelta
+import asyncio
 import logging
+import time
 import httpx
 from fastapi import HTTPException
 
 from app.core.config.settings import settings
+from app.core.http_client import http_request
 from app.core.utils.date_time_utils import utc_now
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _AccountLimiter:
+    """Request limits shared by all connectors of one tenant and Zendesk account."""
+
+    loop: asyncio.AbstractEventLoop
+    semaphore: asyncio.Semaphore
+    # Monotonic time until which requests wait because Zendesk answered 429
+    blocked_until: float = 0.0
+
+
+_limiters: Dict[Tuple[str, str, str], _AccountLimiter] = {}
+
+
+def _get_limiter(subdomain: str, email: Optional[str]) -> _AccountLimiter:
+    from app.core.tenant_scope import get_tenant_context
+
+    key = (get_tenant_context(), subdomain, email or "")
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(key)
+    # Semaphores are bound to the loop that created them (Celery tasks may run
+    # on a fresh loop), so the limiter is replaced when the loop changes
+    if limiter is None or limiter.loop is not loop:
+        limiter = _AccountLimiter(
+            loop=loop,
+            semaphore=asyncio.Semaphore(settings.ZENDESK_MAX_CONCURRENT_REQUESTS),
+        )
+        _limiters[key] = limiter
+    return limiter
+
+
+def _retry_after_seconds(response: httpx.Response) -> float:
+    try:
+        return max(1.0, float(response.headers.get("Retry-After", 0)))
+    except ValueError:
+        return 1.0
+
+
 class ZendeskConnector:
     """
     Centralized Zendesk API connector for all Zendesk operations.
@@ -39,10 +80,44 @@ class ZendeskConnector:
         params: Optional[Dict[str, Any]] = None,
         timeout: float = 10.0,
     ) -> Dict[str, Any]:
-        """Internal method to make HTTP requests to Zendesk API."""
-        async with httpx.AsyncClient(auth=self._auth, timeout=timeout) as client:
+        """
+        Internal method to make HTTP requests to Zendesk API.
+
+        Uses the shared keep-alive client of the Zendesk host, caps concurrent
+        requests per account and honours Retry-After on 429 so concurrent page
+        fetches back off together.
+        """
+        limiter = _get_limiter(self.subdomain, self.email)
+        attempt = 0
+        while True:
+            wait = limiter.blocked_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            async with limiter.semaphore:
+                try:
+                    # 429s are retried below, per account
+                    response = await http_request(
+                        method, url, json=json, params=params, timeout=timeout,
+                        auth=self._auth, retries=0,
+                    )
+                except httpx.RequestError as e:
+                    logger.error(f"Network error during Zendesk API call: {e}")
+                    raise HTTPException(status_code=500, detail="Zendesk API network error") from e
+
+            if response.status_code == 429 and attempt < settings.ZENDESK_MAX_RETRIES:
+                attempt += 1
+                retry_after = _retry_after_seconds(response)
+                logger.warning(
+                    f"Zendesk rate limit hit, retrying in {retry_after}s "
+                    f"(attempt {attempt}/{settings.ZENDESK_MAX_RETRIES})"
+                )
+                limiter.blocked_until = max(
+                    limiter.blocked_until, time.monotonic() + retry_after
+                )
+                continue
+
             try:
-                response = await client.request(method, url, json=json, params=params)
                 response.raise_for_status()
                 return response.json()
             except httpx.HTTPStatusError as e:
@@ -52,9 +127,45 @@ class ZendeskConnector:
                 raise HTTPException(
                     status_code=e.response.status_code, detail="Zendesk API error"
                 ) from e
-            except httpx.RequestError as e:
-                logger.error(f"Network error during Zendesk API call: {e}")
-                raise HTTPException(status_code=500, detail="Zendesk API network error") from e
+
+    async def _fetch_offset_pages(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        result_key: str,
+        timeout: float = 30.0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch every page of an offset-paginated list endpoint.
+
+        The first page reports `page_count`, so the remaining pages are requested
+        concurrently (bounded by the account's semaphore). Falls back to
+        following `next_page` links when the endpoint does not report a page count.
+        """
+        params = {**params, "per_page": 100}
+        first = await self._make_request("GET", url, params=params, timeout=timeout)
+        items = list(first.get(result_key, []))
+        page_count = first.get("page_count")
+
+        if isinstance(page_count, int) and page_count > 1:
+            pages = await asyncio.gather(
+                *[
+                    self._make_request(
+                        "GET", url, params={**params, "page": page}, timeout=timeout
+                    )
+                    for page in range(2, page_count + 1)
+                ]
+            )
+            for page in pages:
+                items.extend(page.get(result_key, []))
+            return items
+
+        next_url = first.get("next_page")
+        while next_url:
+            result = await self._make_request("GET", next_url, timeout=timeout)
+            items.extend(result.get(result_key, []))
+            next_url = result.get("next_page")
+        return items
 
     async def create_ticket(
         self,
@@ -224,39 +335,46 @@ class ZendeskConnector:
 
         results = await self.search_tickets(query_definition)
 
-        for ticket in results:
-            try:
-                ticket_id = ticket["id"]
-                if ticket.get("followup_ids") == []:
-                    # If followup_ids is [] it means it has Related Ticket where analytics is saved
-                    new_ticket = {
-                        "id": ticket_id,
-                        "created_at": ticket.get("created_at"),
-                        "subject": ticket.get("raw_subject"),
-                        "description": ticket.get("description"),
-                        "status": ticket.get("status"),
-                        "tags": ticket.get("tags"),
-                        "transcription": [],
-                    }
+        from app.core.utils.enums.transcript_message_type import TranscriptMessageType
 
-                    # Get comments for this ticket
-                    comments = await self.get_ticket_comments(ticket_id)
-                    from app.core.utils.enums.transcript_message_type import (
-                        TranscriptMessageType,
-                    )
+        # If followup_ids is [] it means it has Related Ticket where analytics is saved
+        results = [
+            t for t in results if "id" in t and t.get("followup_ids") == []
+        ]
+        # Comments are fetched concurrently, bounded by the account's semaphore
+        all_comments = await asyncio.gather(
+            *[self.get_ticket_comments(t["id"]) for t in results],
+            return_exceptions=True,
+        )
 
-                    for comment in comments:
-                        new_comment = {
-                            "id": comment.get("id"),
-                            "timestamp": comment.get("created_at"),
-                            "message": comment.get("plain_body"),
-                            "type": TranscriptMessageType.MESSAGE.value,
-                        }
-                        new_ticket["transcription"].append(new_comment)
+        for ticket, comments in zip(results, all_comments):
+            ticket_id = ticket["id"]
+            if isinstance(comments, Exception):
+                logger.error(f"Error fetching comments for ticket ID {ticket_id}: {comments}")
+                continue
+            try:
+                new_ticket = {
+                    "id": ticket_id,
+                    "created_at": ticket.get("created_at"),
+                    "subject": ticket.get("raw_subject"),
+                    "description": ticket.get("description"),
+                    "status": ticket.get("status"),
+                    "tags": ticket.get("tags"),
+                    "transcription": [],
+                }
+
+                for comment in comments:
+                    new_comment = {
+                        "id": comment.get("id"),
+                        "timestamp": comment.get("created_at"),
+                        "message": comment.get("plain_body"),
+                        "type": TranscriptMessageType.MESSAGE.value,
+                    }
+                    new_ticket["transcription"].append(new_comment)
 
-                    tickets_to_rate.append(new_ticket)
+                tickets_to_rate.append(new_ticket)
             except (KeyError, ValueError, TypeError) as e:
-                logger.error(f"Error processing ticket ID {ticket.get('id')}: {e}")
+                logger.error(f"Error processing ticket ID {ticket_id}: {e}")
                 continue
 
         return tickets_to_rate
@@ -268,15 +386,14 @@ class ZendeskConnector:
     ) -> List[Dict[str, Any]]:
         """
         Fetch all articles from Zendesk Help Center.
+        Pages after the first are fetched concurrently.
         Args:
             locale: Optional locale filter (e.g., "en-us")
             section_id: Optional section ID to filter articles
         Returns:
             List of article dictionaries
         """
-        all_articles = []
-        url: Optional[str] = f"{self.help_center_url}/articles.json"
-
+        url = f"{self.help_center_url}/articles.json"
         if section_id:
             url = f"{self.help_center_url}/sections/{section_id}/articles.json"
 
@@ -284,24 +401,48 @@ class ZendeskConnector:
         if locale:
             params["locale"] = locale
 
-        while url:
-            try:
-                result = await self._make_request("GET", url, params=params, timeout=30.0)
-                articles = result.get("articles", [])
-                all_articles.extend(articles)
-
-                # Check for next page
-                url = result.get("next_page")
-                if url:
-                    # Remove params from next_page URL as it's already included
-                    params = {}
-
-                logger.info(
-                    f"Fetched {len(articles)} articles from Zendesk (total: {len(all_articles)})"
-                )
-            except (httpx.HTTPStatusError, httpx.RequestError) as e:
-                logger.error(f"Error fetching articles: {e}")
-                break
+        all_articles = await self._fetch_offset_pages(url, params, "articles")
 
         logger.info(f"Total articles fetched: {len(all_articles)}")
         return all_articles
+
+    async def fetch_articles_incremental(
+        self,
+        start_time: int,
+        locale: Optional[str] = None,
+        section_id: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Fetch articles changed since `start_time` using the incremental export endpoint.
+        Args:
+            start_time: Unix timestamp watermark from the previous sync
+            locale: Optional locale filter (e.g., "en-us")
+            section_id: Optional section ID to filter articles
+        Returns:
+            Tuple of (changed articles, end_time to use as the next watermark)
+        """
+        url: Optional[str] = f"{self.help_center_url}/incremental/articles.json"
+        params: Dict[str, Any] = {"start_time": start_time}
+        articles: List[Dict[str, Any]] = []
+        end_time = start_time
+
+        # The export is a time cursor, each page depends on the previous one
+        while url:
+            result = await self._make_request("GET", url, params=params, timeout=30.0)
+            articles.extend(result.get("articles", []))
+            end_time = result.get("end_time") or end_time
+            next_url = result.get("next_page")
+            url = next_url if next_url and next_url != url else None
+            params = {}
+
+        if locale:
+            articles = [a for a in articles if a.get("locale") == locale]
+        if section_id:
+            articles = [
+                a for a in articles if str(a.get("section_id")) == str(section_id)
+            ]
+
+        logger.info(
+            f"Fetched {len(articles)} changed articles from Zendesk since {start_time}"
+        )
+        return articles, int(end_time)
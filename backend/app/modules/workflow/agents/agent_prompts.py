@@ -108,7 +108,8 @@ TOOL USAGE GUIDELINES:
 - Use tools when they can provide more accurate, up-to-date, or comprehensive information
 - Pay attention to required parameters - all required parameters must be provided
 - If a parameter has a default value, you can omit it from the tool call
-- If multiple tools could be useful, consider using them in sequence
+- If several tools are needed and none depends on another's result, request them together in one response
+- Use tools in sequence only when a tool needs the result of another
 - Always explain your tool selection reasoning and parameter choices
 - If a tool fails due to missing or invalid parameters, check the parameter requirements
 - Provide clear summaries of tool results to the user
@@ -125,6 +126,16 @@ When you need to use a tool, respond with a JSON object in this exact format:
     "reasoning": "Brief explanation of why you chose this tool and these parameters"
 }}
 
+When you need several independent tools, request them all at once:
+{{
+    "action": "tool_calls",
+    "tool_calls": [
+        {{"tool_name": "first_tool", "parameters": {{"param1": "value1"}}}},
+        {{"tool_name": "second_tool", "parameters": {{"param1": "value1"}}}}
+    ],
+    "reasoning": "Brief explanation of why you need these tools"
+}}
+
 If you don't need to use any tools, respond with:
 {{
     "action": "direct_response",
@@ -177,6 +188,7 @@ User Query: {query}
 
 Analyze the query and decide if you need to use any tools. Respond using the JSON format specified above.
 - If you need a tool, use the "tool_call" action format
+- If you need several independent tools, use the "tool_calls" action format
 - If you can answer directly, use the "direct_response" action format
 - Make sure to include all required parameters and follow the parameter types specified
 - Always include your reasoning for the decision"""
@@ -210,6 +222,21 @@ Explain your reasoning and mention any parameters that would be needed.
 Do not execute any tools, just recommend which ones to use and why."""
 
 
+def create_tool_agent_tool_results_continuation_prompt(tool_results: List[dict]) -> str:
+    """Create continuation prompt for ToolAgent iterations that ran several tools"""
+    results = "\n".join(
+        f"- {tool['tool_name']}: {tool['result']}" for tool in tool_results)
+    return f"""
+
+Tool Results:
+{results}
+
+Based on these results, provide your response using the JSON format:
+- If you need more tools, use "tool_call" or "tool_calls" action
+- If you have enough information to answer, use "direct_response" action
+- Include your reasoning for the decision"""
+
+
 # ==================== SHARED PROMPTS ====================
 
 def create_conversation_context(chat_history: List[dict], max_messages: int = 6) -> str:
@@ -217,8 +244,15 @@ def create_conversation_context(chat_history: List[dict], max_messages: int = 6)
     if not chat_history:
         return ""
     
+    # A rolling summary of older turns leads the history and is always kept
+    head = [m for m in chat_history[:1] if m.get("message_type") == "summary"]
+    recent = chat_history[len(head):]
+    # History compacted to a token budget is already sized; cutting it to the
+    # last N messages would drop turns that are neither summarised nor shown
+    if not head and not (recent and recent[-1].get("in_budget")):
+        recent = recent[-max_messages:]  # Keep last N messages
     context = "\n\nConversation history:\n"
-    for msg in chat_history[-max_messages:]:  # Keep last N messages
+    for msg in head + recent:
         context += f"{msg['role'].capitalize()}: {msg['content']}\n"
     
     return context 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 import logging
 import json
 import re
@@ -88,6 +88,40 @@ def format_tool_parameters(tool: BaseTool) -> str:
     return "\n".join(param_descriptions)
 
 
+_JSON_SCHEMA_TYPES = {
+    "string": "string",
+    "number": "number",
+    "float": "number",
+    "integer": "integer",
+    "boolean": "boolean",
+    "array": "array",
+    "object": "object",
+}
+
+
+def create_tool_function_schema(tool: BaseTool) -> Dict[str, Any]:
+    """Describe a tool in the function-calling format accepted by bind_tools"""
+    properties = {}
+    required = []
+    for param_name, param_info in (getattr(tool, 'parameters', None) or {}).items():
+        prop = {"description": param_info.get('description', '')}
+        json_type = _JSON_SCHEMA_TYPES.get(param_info.get('type', 'any'))
+        if json_type:
+            prop["type"] = json_type
+        properties[param_name] = prop
+        if param_info.get('required', False):
+            required.append(param_name)
+
+    return {
+        "type": "function",
+        "function": {
+            "name": tool.name,
+            "description": tool.description or tool.name,
+            "parameters": {"type": "object", "properties": properties, "required": required},
+        },
+    }
+
+
 def create_tool_descriptions(tools: List[BaseTool]) -> List[str]:
     """Create detailed tool descriptions for prompt generation"""
     tool_descriptions = []
@@ -292,6 +326,87 @@ def extract_direct_response(response: str) -> Optional[str]:
     return response
 
 
+class DirectResponseStream:
+    """
+    Incrementally extracts the user-facing answer from a streamed LLM reply.
+
+    Replies in the agent JSON format emit only the decoded "response" string,
+    and only once the action is known to be "direct_response"; tool calls
+    emit nothing. Replies that are not JSON are emitted as they arrive.
+    """
+
+    _ACTION = re.compile(r'[{,]\s*"action"\s*:\s*"([^"\\]*)"')
+    _RESPONSE = re.compile(r'[{,]\s*"response"\s*:\s*"')
+
+    def __init__(self, on_token: Callable[[str], None]):
+        self.on_token = on_token
+        self.text = ""
+        self._mode: Optional[str] = None  # "text", "json" or "done"
+        self._action: Optional[str] = None
+        self._pos: Optional[int] = None  # next unread char of the response value
+
+    def feed(self, chunk: str) -> None:
+        if not chunk:
+            return
+        self.text += chunk
+        if self._mode is None:
+            stripped = self.text.lstrip()
+            if not stripped or (stripped[0] == "`" and len(stripped) < 3):
+                return
+            self._mode = "json" if stripped[0] == "{" or stripped.startswith("```") else "text"
+            if self._mode == "text":
+                self.on_token(stripped)
+                return
+        elif self._mode == "text":
+            self.on_token(chunk)
+            return
+        if self._mode == "json":
+            self._feed_json()
+
+    def _feed_json(self) -> None:
+        if self._action is None:
+            match = self._ACTION.search(self.text)
+            if not match:
+                return
+            self._action = match.group(1)
+            if self._action != "direct_response":
+                self._mode = "done"
+                return
+        if self._pos is None:
+            match = self._RESPONSE.search(self.text)
+            if not match:
+                return
+            self._pos = match.end()
+
+        out = []
+        i, end = self._pos, len(self.text)
+        while i < end:
+            char = self.text[i]
+            if char == '"':
+                self._mode = "done"
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+            # Escape sequence; wait for the rest of it if the chunk split it
+            length = 6 if self.text[i + 1:i + 2] == "u" else 2
+            if i + length > end:
+                break
+            if length == 6 and 0xD800 <= int(self.text[i + 2:i + 6], 16) < 0xDC00:
+                length = 12  # surrogate pair
+                if i + length > end:
+                    break
+            try:
+                out.append(json.loads(f'"{self.text[i:i + length]}"'))
+            except json.JSONDecodeError:
+                out.append(self.text[i:i + length])
+            i += length
+        self._pos = i
+        if out:
+            self.on_token("".join(out))
+
+
 # ==================== REACT PARSING UTILITIES ====================
 
 def extract_final_answer(text: str) -> Optional[str]:
@@ -2,9 +2,11 @@ from typing import Dict, Any, List, Union
 import logging
 from datetime import datetime
 import json
+import ormsgpack
 from redis.asyncio import Redis
-from app.dependencies.dependency_injection import RedisString
+from app.dependencies.dependency_injection import RedisBinary
 from app.core.config.settings import settings
+from app.modules.workflow.tracing import trace_span
 
 
 logger = logging.getLogger(__name__)
@@ -141,7 +143,18 @@ class InMemoryConversationMemory(BaseConversationMemory):
 
 
 class RedisConversationMemory(BaseConversationMemory):
-    """Redis-based implementation of conversation memory with tenant isolation"""
+    """
+    Redis-based implementation of conversation memory with tenant isolation.
+
+    Every operation is one round trip whose payload does not grow with the
+    thread: writes are a single MULTI that also trims the lists to
+    CONVERSATION_MAX_MEMORY_MESSAGES, and reads fetch only the messages the
+    caller asked for. Each message is pushed to the thread list and to a
+    per-role list, so role-filtered reads never scan other roles.
+
+    Messages are msgpack-encoded on the binary client; JSON entries written by
+    earlier versions are still read.
+    """
 
     def __init__(self, thread_id: str):
         super().__init__(thread_id)
@@ -149,8 +162,11 @@ class RedisConversationMemory(BaseConversationMemory):
         # Prefix keys with tenant context for isolation
         tenant_prefix = self._get_tenant_prefix()
         self._message_key = f"{tenant_prefix}:conversation:{self.thread_id}:messages"
+        self._roles_key = f"{tenant_prefix}:conversation:{self.thread_id}:roles"
         self._metadata_key = f"{tenant_prefix}:conversation:{self.thread_id}:metadata"
         self._conversation_key = f"{tenant_prefix}:conversation:{self.thread_id}:info"
+        self.window = settings.CONVERSATION_MAX_MEMORY_MESSAGES
+        self.ttl = settings.CONVERSATION_REDIS_EXPIRY_DAYS * 86400
         self.initialized = False
 
     def _get_tenant_prefix(self) -> str:
@@ -162,56 +178,75 @@ class RedisConversationMemory(BaseConversationMemory):
             return f"tenant:{tenant_id}:"
         return ""  # Fallback for non-multi-tenant mode
 
+    def _role_key(self, role: str) -> str:
+        return f"{self._message_key}:{role}"
+
     async def _get_redis(self) -> Redis:
         """Get Redis client, initializing if needed"""
         if self.redis_client is None:
             from app.dependencies.injector import injector
 
-            self.redis_client = injector.get(RedisString)
+            self.redis_client = injector.get(RedisBinary)
         return self.redis_client
 
-    async def _initialize_conversation(self) -> None:
-        """Initialize conversation data in Redis if it doesn't exist"""
-        redis = await self._get_redis()
+    def _conversation_data(self) -> Dict[str, Any]:
+        return {
+            "thread_id": self.thread_id,
+            "created_at": self.created_at,
+            "last_updated": self.last_updated,
+            "executions_count": self.executions_count,
+        }
 
-        # Check if conversation exists
+    def _queue_initialize(self, pipe) -> None:
+        """Queue creation of the conversation info unless it already exists"""
         if self.initialized:
             return
-        exists = await redis.exists(self._conversation_key)
-        if not exists:
-            # Initialize conversation metadata
-            conversation_data = {
-                "thread_id": self.thread_id,
-                "created_at": self.created_at,
-                "last_updated": self.last_updated,
-                "executions_count": self.executions_count,
-            }
-            # type: ignore
-            await redis.hset(self._conversation_key, mapping=conversation_data)
-            # type: ignore
-            await redis.expire(self._conversation_key, 86400 * 30)
-        self.initialized = True
+        for key, value in self._conversation_data().items():
+            pipe.hsetnx(self._conversation_key, key, value)
+        pipe.expire(self._conversation_key, self.ttl)
+
+    @staticmethod
+    def _pack(message: Message) -> bytes:
+        return ormsgpack.packb(message.to_dict())
+
+    @staticmethod
+    def _unpack(raw: bytes) -> Message | None:
+        try:
+            if raw[:1] == b"{":
+                message_data = json.loads(raw)  # written before msgpack encoding
+            else:
+                message_data = ormsgpack.unpackb(raw)
+            message = Message(
+                role=message_data["role"],
+                content=message_data["content"],
+                message_type=message_data.get("message_type", "text"),
+            )
+            message.timestamp = message_data["timestamp"]
+            return message
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Failed to parse message from Redis: {e}")
+            return None
 
     async def add_message(self, message: Message) -> None:
         """Add a message to the conversation in Redis"""
         try:
-            await self._initialize_conversation()
             redis = await self._get_redis()
-
-            # Create message data
-            message_data = message.to_dict()
-            message_json = json.dumps(message_data)
-
-            # Add message to Redis list
-            await redis.lpush(self._message_key, message_json)  # type: ignore
-
-            # Update last_updated timestamp
+            packed = self._pack(message)
+            role_key = self._role_key(message.role)
             self.last_updated = message.timestamp
-            # type: ignore
-            await redis.hset(self._conversation_key, "last_updated", self.last_updated)
 
-            # Set TTL for message list (30 days)
-            await redis.expire(self._message_key, 86400 * 30)  # type: ignore
+            async with trace_span("memory.add_message", "memory"), redis.pipeline(transaction=True) as pipe:
+                self._queue_initialize(pipe)
+                # Most recent first; lists are capped to the memory window
+                for key in (self._message_key, role_key):
+                    pipe.lpush(key, packed)
+                    pipe.ltrim(key, 0, self.window - 1)
+                    pipe.expire(key, self.ttl)
+                pipe.sadd(self._roles_key, message.role)
+                pipe.expire(self._roles_key, self.ttl)
+                pipe.hset(self._conversation_key, "last_updated", self.last_updated)
+                await pipe.execute()
+            self.initialized = True
 
             logger.debug(f"Added message to Redis for thread {self.thread_id}")
 
@@ -235,38 +270,28 @@ class RedisConversationMemory(BaseConversationMemory):
         """Get messages from the conversation, optionally filtered by role"""
         try:
             redis = await self._get_redis()
+            count = min(max_messages, self.window) if max_messages else self.window
+            keys = [self._role_key(role) for role in dict.fromkeys(roles)] if roles else [self._message_key]
 
-            # Get messages from Redis (most recent first due to lpush)
-            # type: ignore
-            message_jsons = await redis.lrange(self._message_key, 0, max_messages - 1)
+            async with trace_span("memory.get_messages", "memory"), redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.lrange(key, 0, count - 1)
+                results = await pipe.execute()
 
             messages: List[Message] = []
-            for message_json in message_jsons:
-                try:
-                    message_data = json.loads(message_json)
-                    message = Message(
-                        role=message_data["role"],
-                        content=message_data["content"],
-                        message_type=message_data.get("message_type", "text"),
-                    )
-                    message.timestamp = message_data["timestamp"]
-
-                    # Filter by roles if specified
-                    if roles is None or message.role in roles:
+            for raw_messages in results:
+                # Reverse to get chronological order (oldest first, due to lpush)
+                for raw in reversed(raw_messages):
+                    message = self._unpack(raw)
+                    if message is not None:
                         messages.append(message)
 
-                except (json.JSONDecodeError, KeyError) as e:
-                    logger.warning(f"Failed to parse message from Redis: {e}")
-                    continue
-
-            # Reverse to get chronological order (oldest first)
-            messages.reverse()
+            if len(keys) > 1:
+                # Merge the per-role lists; the sort is stable for equal timestamps
+                messages.sort(key=lambda m: m.timestamp)
+                messages = messages[-count:]
 
-            # Apply max_messages limit after filtering
-            if max_messages and len(messages) > max_messages:
-                messages = messages[-max_messages:]
-
-            return [messages.to_dict() for messages in messages]
+            return [message.to_dict() for message in messages]
 
         except Exception as e:
             logger.error(
@@ -274,29 +299,28 @@ class RedisConversationMemory(BaseConversationMemory):
             )
             return []
 
+    async def _message_keys(self, redis: Redis) -> List[str]:
+        roles = await redis.smembers(self._roles_key)  # type: ignore
+        return [self._message_key, self._roles_key] + [
+            self._role_key(role.decode() if isinstance(role, bytes) else role) for role in roles
+        ]
+
     async def clear(self) -> None:
         """Clear the conversation from Redis"""
         try:
             redis = await self._get_redis()
-
-            # Delete all conversation data
-            await redis.delete(self._message_key)
-            await redis.delete(self._metadata_key)
+            message_keys = await self._message_keys(redis)
 
             # Reset conversation info
             self.last_updated = datetime.now().isoformat()
             self.executions_count = 0
 
-            conversation_data = {
-                "thread_id": self.thread_id,
-                "created_at": self.created_at,
-                "last_updated": self.last_updated,
-                "executions_count": self.executions_count,
-            }
-            # type: ignore
-            await redis.hset(self._conversation_key, mapping=conversation_data)
-            # type: ignore
-            await redis.expire(self._conversation_key, 86400 * 30)
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(*message_keys, self._metadata_key)
+                pipe.hset(self._conversation_key, mapping=self._conversation_data())
+                pipe.expire(self._conversation_key, self.ttl)
+                await pipe.execute()
+            self.initialized = True
 
             logger.debug(f"Cleared conversation data for thread {self.thread_id}")
 
@@ -309,14 +333,16 @@ class RedisConversationMemory(BaseConversationMemory):
     async def set_metadata(self, key: str, value: Any) -> None:
         """Set metadata for the conversation in Redis"""
         try:
-            await self._initialize_conversation()
             redis = await self._get_redis()
 
             # Store metadata as JSON
             metadata_json = json.dumps(value)
-            # type: ignore
-            await redis.hset(self._metadata_key, key, metadata_json)
-            await redis.expire(self._metadata_key, 86400 * 30)  # type: ignore
+            async with trace_span("memory.set_metadata", "memory"), redis.pipeline(transaction=True) as pipe:
+                self._queue_initialize(pipe)
+                pipe.hset(self._metadata_key, key, metadata_json)
+                pipe.expire(self._metadata_key, self.ttl)
+                await pipe.execute()
+            self.initialized = True
 
             logger.debug(f"Set metadata {key} for thread {self.thread_id}")
 
@@ -331,8 +357,8 @@ class RedisConversationMemory(BaseConversationMemory):
         try:
             redis = await self._get_redis()
 
-            # type: ignore
-            metadata_json = await redis.hget(self._metadata_key, key)
+            async with trace_span("memory.get_metadata", "memory"):
+                metadata_json = await redis.hget(self._metadata_key, key)  # type: ignore
             if metadata_json is None:
                 return default
 
@@ -376,9 +402,11 @@ class RedisConversationMemory(BaseConversationMemory):
             if not info:
                 return {}
 
-            # Convert string values back to appropriate types
+            # Convert values back to appropriate types
             result = {}
             for key, value in info.items():
+                key = key.decode() if isinstance(key, bytes) else key
+                value = value.decode() if isinstance(value, bytes) else value
                 if key in ["executions_count"]:
                     result[key] = int(value)
                 else:
@@ -396,12 +424,12 @@ class RedisConversationMemory(BaseConversationMemory):
         """Increment the execution count for this conversation"""
         try:
             redis = await self._get_redis()
-            # type: ignore
-            await redis.hincrby(self._conversation_key, "executions_count", 1)
-            # type: ignore
-            await redis.hset(
-                self._conversation_key, "last_updated", datetime.now().isoformat()
-            )
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.hincrby(self._conversation_key, "executions_count", 1)
+                pipe.hset(
+                    self._conversation_key, "last_updated", datetime.now().isoformat()
+                )
+                await pipe.execute()
 
         except Exception as e:
             logger.error(
@@ -415,9 +443,9 @@ class RedisConversationMemory(BaseConversationMemory):
             redis = await self._get_redis()
 
             # Delete all keys related to this conversation
-            await redis.delete(self._message_key)
-            await redis.delete(self._metadata_key)
-            await redis.delete(self._conversation_key)
+            message_keys = await self._message_keys(redis)
+            await redis.delete(*message_keys, self._metadata_key, self._conversation_key)
+            self.initialized = False
 
             logger.info(f"Deleted conversation data for thread {self.thread_id}")
 
@@ -0,0 +1,214 @@
+"""
+Rolling summarisation of conversation memory.
+
+When a node sets a token budget, its history is the thread's rolling summary
+followed by the most recent messages that fit in the budget. Messages pushed
+out of that window are folded into the summary by a background task on a
+cheap model, so the prompt stays bounded however long the chat runs and the
+request never waits for a summary.
+
+The summary is stored in the thread's memory metadata, next to the messages:
+
+    {"text": "...", "covered_until": "<timestamp of the last summarised message>"}
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, Field
+
+from app.core.config.settings import settings
+from app.core.tenant_scope import get_tenant_context
+from app.modules.workflow.agents.memory import BaseConversationMemory
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_METADATA_KEY = "rolling_summary"
+SUMMARY_MESSAGE_TYPE = "summary"
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a support conversation. Merge the new "
+    "messages into the existing summary. Keep facts the assistant needs later: "
+    "the user's goal, identifiers, decisions, open questions and commitments. "
+    "Drop greetings and repetition. Answer with the summary only."
+)
+
+
+class MemoryCompactionConfig(BaseModel):
+    """Per-node memory budget"""
+    token_budget: int = Field(
+        description="Tokens of history (summary and recent messages) sent with each prompt")
+    summary_share: float = Field(
+        default=0.25, description="Part of the budget the summary may use")
+
+    @property
+    def summary_tokens(self) -> int:
+        return max(int(self.token_budget * self.summary_share), 1)
+
+    @property
+    def recent_tokens(self) -> int:
+        return max(self.token_budget - self.summary_tokens, 1)
+
+    @classmethod
+    def from_node_config(cls, config: Dict[str, Any]) -> Optional["MemoryCompactionConfig"]:
+        """Read the memory budget of an LLM or agent node; None keeps plain history"""
+        budget = config.get("memoryTokenBudget") or settings.CONVERSATION_MEMORY_TOKEN_BUDGET
+        try:
+            budget = int(budget or 0)
+        except (TypeError, ValueError):
+            return None
+        return cls(token_budget=budget) if budget > 0 else None
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (4 characters per token), good enough for budgeting"""
+    return len(text) // 4 + 1
+
+
+def _message_tokens(message: Dict[str, Any]) -> int:
+    return count_tokens(f"{message['role']}: {message['content']}")
+
+
+def _truncate(text: str, tokens: int) -> str:
+    limit = tokens * 4
+    return text if len(text) <= limit else text[:limit].rstrip() + "..."
+
+
+def split_history(
+    messages: List[Dict[str, Any]], summary: Optional[Dict[str, Any]], config: MemoryCompactionConfig
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split chronological messages into (recent, overflow): the newest messages
+    not yet summarised that fit in the budget, and the older ones that should
+    be folded into the summary.
+    """
+    covered_until = (summary or {}).get("covered_until")
+    pending = [m for m in messages if not covered_until or m["timestamp"] > covered_until]
+
+    recent: List[Dict[str, Any]] = []
+    used = 0
+    for message in reversed(pending):
+        tokens = _message_tokens(message)
+        if used + tokens > config.recent_tokens:
+            if not recent:
+                # A single oversized message still goes in, shortened
+                recent.append({**message, "content": _truncate(str(message["content"]), config.recent_tokens)})
+            break
+        recent.append(message)
+        used += tokens
+    recent.reverse()
+    return recent, pending[:len(pending) - len(recent)]
+
+
+def summary_message(summary: Optional[Dict[str, Any]], config: MemoryCompactionConfig) -> Optional[Dict[str, Any]]:
+    if not summary or not summary.get("text"):
+        return None
+    return {
+        "role": "system",
+        "content": "Summary of the earlier conversation: " + _truncate(summary["text"], config.summary_tokens),
+        "message_type": SUMMARY_MESSAGE_TYPE,
+        "timestamp": summary.get("covered_until"),
+    }
+
+
+async def summarise(
+    llm: BaseChatModel, previous: str, messages: List[Dict[str, Any]], max_tokens: int
+) -> str:
+    """Fold messages into the previous summary"""
+    transcript = "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in messages)
+    prompt = (
+        f"Existing summary:\n{previous or '(none)'}\n\n"
+        f"New messages:\n{transcript}\n\n"
+        f"Write the updated summary in at most {max_tokens * 3 // 4} words."
+    )
+    response = await llm.ainvoke([SystemMessage(content=SUMMARY_SYSTEM_PROMPT), HumanMessage(content=prompt)])
+    return str(response.content).strip()
+
+
+_compacting: Set[Tuple[str, str]] = set()
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def _compact(
+    memory: BaseConversationMemory,
+    llm: BaseChatModel,
+    summary: Optional[Dict[str, Any]],
+    overflow: List[Dict[str, Any]],
+    config: MemoryCompactionConfig,
+    key: Tuple[str, str],
+) -> None:
+    try:
+        text = await summarise(llm, (summary or {}).get("text", ""), overflow, config.summary_tokens)
+        if text:
+            await memory.set_metadata(SUMMARY_METADATA_KEY, {
+                "text": text,
+                "covered_until": overflow[-1]["timestamp"],
+            })
+            logger.debug(f"Summarised {len(overflow)} messages of thread {memory.thread_id}")
+    except Exception as e:
+        # The next turn retries; meanwhile the prompt simply lacks these messages
+        logger.warning(f"Failed to summarise memory of thread {memory.thread_id}: {e}")
+    finally:
+        _compacting.discard(key)
+
+
+def schedule_compaction(
+    memory: BaseConversationMemory,
+    llm: BaseChatModel,
+    summary: Optional[Dict[str, Any]],
+    overflow: List[Dict[str, Any]],
+    config: MemoryCompactionConfig,
+) -> Optional[asyncio.Task]:
+    """Summarise overflow messages in the background, once per thread at a time"""
+    key = (get_tenant_context(), memory.thread_id)
+    if not overflow or key in _compacting:
+        return None
+    _compacting.add(key)
+    task = asyncio.create_task(_compact(memory, llm, summary, overflow, config, key))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def get_summary_model(default_provider_id: Optional[str]) -> BaseChatModel:
+    """The cheap model of CONVERSATION_SUMMARY_PROVIDER_ID, else the node's own"""
+    from app.dependencies.injector import injector
+    from app.modules.workflow.llm.provider import LLMProvider
+
+    provider_id = settings.CONVERSATION_SUMMARY_PROVIDER_ID or default_provider_id
+    return await injector.get(LLMProvider).get_model(provider_id)
+
+
+async def get_compacted_history(
+    memory: BaseConversationMemory,
+    config: MemoryCompactionConfig,
+    provider_id: Optional[str] = None,
+    summary_llm: Optional[BaseChatModel] = None,
+) -> List[Dict[str, Any]]:
+    """
+    History within the node's token budget: the rolling summary (as a first
+    "system" message) and the recent messages, flagged "in_budget".
+    Schedules summarisation of the messages that no longer fit.
+    """
+    messages = await memory.get_messages(max_messages=0)
+    summary = await memory.get_metadata(SUMMARY_METADATA_KEY)
+    recent, overflow = split_history(messages, summary, config)
+
+    if overflow:
+        try:
+            llm = summary_llm or await get_summary_model(provider_id)
+            schedule_compaction(memory, llm, summary, overflow, config)
+        except Exception as e:
+            logger.warning(f"Memory summarisation unavailable for thread {memory.thread_id}: {e}")
+
+    head = summary_message(summary, config)
+    # Marks the messages as budgeted, so prompt builders do not cut them further
+    return ([head] if head else []) + [{**m, "in_budget": True} for m in recent]
+
+
+def format_history(messages: List[Dict[str, Any]]) -> str:
+    """Render history the way get_chat_history(as_string=True) does"""
+    return "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in messages)
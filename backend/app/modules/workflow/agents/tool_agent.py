@@ -1,10 +1,14 @@
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
+import asyncio
 import logging
 import json
 from langchain_core.language_models import BaseChatModel
 
+from app.core.config.settings import settings
+
 from app.modules.workflow.agents.base_tool import BaseTool
 from app.modules.workflow.agents.base_tool_agent import BaseToolAgent
+from app.modules.workflow.tracing import trace_span
 from app.modules.workflow.agents.agent_utils import (
     validate_tool_parameters,
     format_tool_parameters,
@@ -14,7 +18,9 @@ from app.modules.workflow.agents.agent_utils import (
     handle_parameter_validation_error,
     handle_tool_execution_error,
     parse_json_response,
-    extract_direct_response
+    extract_direct_response,
+    create_tool_function_schema,
+    DirectResponseStream
 )
 from app.modules.workflow.agents.agent_prompts import (
     create_tool_agent_tools_available_prompt,
@@ -22,6 +28,7 @@ from app.modules.workflow.agents.agent_prompts import (
     create_tool_agent_no_tools_query_prompt,
     create_tool_agent_tools_query_prompt,
     create_tool_agent_iteration_continuation_prompt,
+    create_tool_agent_tool_results_continuation_prompt,
     create_tool_selection_prompt,
     create_conversation_context as build_conversation_context
 )
@@ -38,7 +45,10 @@ class ToolAgent(BaseToolAgent):
         system_prompt: str,
         tools: List[BaseTool],
         verbose: bool = False,
-        max_iterations: int = 6
+        max_iterations: int = 6,
+        native_tool_calls: bool = False,
+        tool_timeout: Optional[float] = None,
+        max_parallel_tools: Optional[int] = None
     ):
         """Initialize a Tool agent
 
@@ -48,9 +58,29 @@ class ToolAgent(BaseToolAgent):
             tools: List of tools the agent can use to accomplish tasks
             verbose: Whether to enable verbose logging of tool execution
             max_iterations: Maximum number of tool execution iterations
+            native_tool_calls: Bind tools to models that support native tool calling,
+                instead of the JSON tool-call protocol in the prompt (off by default)
+            tool_timeout: Seconds allowed per tool call (defaults to AGENT_TOOL_TIMEOUT)
+            max_parallel_tools: Tool calls run at once (defaults to AGENT_MAX_PARALLEL_TOOLS)
         """
         super().__init__(llm_model, system_prompt, tools,
                          verbose=verbose, max_iterations=max_iterations)
+        # 0 disables the timeout
+        self.tool_timeout = (tool_timeout if tool_timeout is not None else settings.AGENT_TOOL_TIMEOUT) or None
+        self.max_parallel_tools = max_parallel_tools or settings.AGENT_MAX_PARALLEL_TOOLS
+        self._tool_model = self._bind_tools() if native_tool_calls and self.tools else None
+
+    def _bind_tools(self) -> Optional[Any]:
+        """Model with the tools bound for native calls, or None if unsupported"""
+        bind_tools = getattr(self.llm_model, "bind_tools", None)
+        if bind_tools is None:
+            return None
+        try:
+            return bind_tools([create_tool_function_schema(tool) for tool in self.tools])
+        except Exception as e:
+            # BaseChatModel raises NotImplementedError for models without tool calling
+            logger.debug(f"Native tool calling unavailable, using the JSON protocol: {e}")
+            return None
 
     # ==================== PROMPT GENERATION ====================
 
@@ -78,6 +108,77 @@ class ToolAgent(BaseToolAgent):
         # fallback old version
         return response.content if hasattr(response, 'content') else str(response)
 
+    async def _generate(
+        self,
+        prompt: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        use_tools: bool = False
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Run the LLM on a prompt, streaming the user-facing answer to on_token
+
+        Returns the response text and any native tool calls
+        """
+        model = self._tool_model if use_tools and self._tool_model is not None else self.llm_model
+        try:
+            return await self._generate_with(model, prompt, on_token)
+        except Exception as e:
+            if model is self.llm_model or not self._tools_rejected(e):
+                raise
+            # Some providers accept bind_tools but reject tools per model
+            logger.warning(f"Native tool call request failed, using the JSON protocol: {e}")
+            self._tool_model = None
+            return await self._generate_with(self.llm_model, prompt, on_token)
+
+    @staticmethod
+    def _tools_rejected(error: Exception) -> bool:
+        """Whether a failed request means the model does not take tools, as opposed to a transient failure"""
+        if isinstance(error, NotImplementedError):
+            return True
+        status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        message = str(error).lower()
+        return status in (400, 422) and ("tool" in message or "function" in message)
+
+    async def _generate_with(
+        self,
+        model: Any,
+        prompt: str,
+        on_token: Optional[Callable[[str], None]]
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        messages = [{"role": "user", "content": prompt}]
+        if on_token is None:
+            response = await model.ainvoke(messages)
+            return self._extract_response_content(response), getattr(response, "tool_calls", None) or []
+
+        extractor = DirectResponseStream(on_token)
+        message = None
+        async for chunk in model.astream(messages):
+            # Chunks add up to the full message, tool call arguments included
+            message = chunk if message is None else message + chunk
+            extractor.feed(self._extract_response_content(chunk))
+        return extractor.text, getattr(message, "tool_calls", None) or []
+
+    def _parse_tool_calls(self, response: str, native_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Parse every tool call requested in one LLM turn"""
+        if native_calls:
+            return [{"tool": call["name"], "args": call.get("args") or {}, "reasoning": ""}
+                    for call in native_calls]
+
+        parsed_response = parse_json_response(response)
+        if parsed_response and isinstance(parsed_response.get("tool_calls"), list):
+            calls = []
+            for call in parsed_response["tool_calls"]:
+                if not isinstance(call, dict) or not (call.get("tool_name") or call.get("tool")):
+                    continue
+                calls.append({
+                    "tool": call.get("tool_name") or call.get("tool"),
+                    "args": call.get("parameters", {}),
+                    "reasoning": call.get("reasoning", parsed_response.get("reasoning", ""))
+                })
+            return calls
+
+        tool_call = self._parse_tool_call(response)
+        return [tool_call] if tool_call else []
+
     def _parse_tool_call(self, response: str) -> Optional[Dict[str, Any]]:
         """Parse tool call from LLM response with JSON format support"""
         # Try JSON parsing first
@@ -148,14 +249,24 @@ class ToolAgent(BaseToolAgent):
 
     # ==================== WORKFLOW EXECUTION ====================
 
-    async def _execute_tools_workflow(self, query: str, chat_history: List[Dict[str, str]]) -> Dict[str, Any]:
+    async def _execute_tools_workflow(
+        self,
+        query: str,
+        chat_history: List[Dict[str, str]],
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
         """Execute the tool-based workflow with enhanced parameter handling"""
         if not self.tools:
-            return await self._handle_no_tools_workflow(query, chat_history)
+            return await self._handle_no_tools_workflow(query, chat_history, on_token)
 
-        return await self._handle_tools_workflow(query, chat_history)
+        return await self._handle_tools_workflow(query, chat_history, on_token)
 
-    async def _handle_no_tools_workflow(self, query: str, chat_history: List[Dict[str, str]]) -> Dict[str, Any]:
+    async def _handle_no_tools_workflow(
+        self,
+        query: str,
+        chat_history: List[Dict[str, str]],
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
         """Handle workflow when no tools are available"""
         enhanced_prompt = self._create_enhanced_system_prompt()
         context = build_conversation_context(chat_history)
@@ -163,10 +274,8 @@ class ToolAgent(BaseToolAgent):
             enhanced_prompt, context, query)
 
         try:
-            response = await self.llm_model.ainvoke(
-                [{"role": "user", "content": prompt}])
-            response_content = self._extract_response_content(response)
-            logger.info(f"Response: {response}")
+            response_content, _ = await self._generate(prompt, on_token)
+            logger.info(f"Response: {response_content}")
             direct_response = extract_direct_response(response_content)
 
             return create_success_response(
@@ -185,7 +294,12 @@ class ToolAgent(BaseToolAgent):
                 no_tools_available=True
             )
 
-    async def _handle_tools_workflow(self, query: str, chat_history: List[Dict[str, str]]) -> Dict[str, Any]:
+    async def _handle_tools_workflow(
+        self,
+        query: str,
+        chat_history: List[Dict[str, str]],
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
         """Handle workflow when tools are available"""
         enhanced_prompt = self._create_enhanced_system_prompt()
         context = build_conversation_context(chat_history)
@@ -197,21 +311,23 @@ class ToolAgent(BaseToolAgent):
 
         for iteration in range(self.max_iterations):
             try:
+                used_before = len(tools_used)
                 result = await self._execute_workflow_iteration(
-                    prompt, iteration, workflow_steps, tools_used
+                    prompt, iteration, workflow_steps, tools_used, on_token
                 )
 
                 if result is not None:
                     return result
 
-                # Update prompt for next iteration if needed
-                if tools_used:
-                    last_tool = tools_used[-1]
-                    continuation_prompt = create_tool_agent_iteration_continuation_prompt(
-                        last_tool['tool_name'],
-                        last_tool['result']
+                # Feed every result of this turn back in one observation
+                new_results = tools_used[used_before:]
+                if len(new_results) == 1:
+                    prompt += create_tool_agent_iteration_continuation_prompt(
+                        new_results[0]['tool_name'],
+                        new_results[0]['result']
                     )
-                    prompt += continuation_prompt
+                elif new_results:
+                    prompt += create_tool_agent_tool_results_continuation_prompt(new_results)
 
             except Exception as e:
                 logger.error(
@@ -234,11 +350,11 @@ class ToolAgent(BaseToolAgent):
         prompt: str,
         iteration: int,
         workflow_steps: List[Dict],
-        tools_used: List[Dict]
+        tools_used: List[Dict],
+        on_token: Optional[Callable[[str], None]] = None
     ) -> Optional[Dict[str, Any]]:
         """Execute a single workflow iteration"""
-        response = await self.llm_model.ainvoke([{"role": "user", "content": prompt}])
-        response_content = self._extract_response_content(response)
+        response_content, native_calls = await self._generate(prompt, on_token, use_tools=True)
         workflow_steps.append(
             {"step": iteration + 1, "response": response_content})
 
@@ -246,9 +362,9 @@ class ToolAgent(BaseToolAgent):
             logger.info(
                 f"Tool workflow step {iteration + 1}: {response_content}")
 
-        tool_call = self._parse_tool_call(response_content)
+        tool_calls = self._parse_tool_calls(response_content, native_calls)
 
-        if not tool_call:
+        if not tool_calls:
             # No tool needed, extract direct response
             direct_response = extract_direct_response(response_content)
             return create_success_response(
@@ -258,8 +374,84 @@ class ToolAgent(BaseToolAgent):
                 tools_used=tools_used
             )
 
+        if len(tool_calls) > 1:
+            return await self._execute_parallel_tools(tool_calls, workflow_steps, tools_used, iteration)
+
         # Execute the tool
-        return await self._execute_single_tool(tool_call, workflow_steps, tools_used, iteration)
+        return await self._execute_single_tool(tool_calls[0], workflow_steps, tools_used, iteration)
+
+    async def _execute_parallel_tools(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        workflow_steps: List[Dict],
+        tools_used: List[Dict],
+        iteration: int
+    ) -> Optional[Dict[str, Any]]:
+        """Execute independent tool calls concurrently
+
+        Failures (unknown tool, invalid parameters, timeout, errors) become that
+        call's result, so the LLM can answer from the others or retry.
+        """
+        slots = asyncio.Semaphore(self.max_parallel_tools)
+
+        async def run(tool_call: Dict[str, Any]) -> Tuple[Dict[str, Any], Any, bool]:
+            tool_name = tool_call["tool"]
+            tool = self.tool_map.get(tool_name)
+            if tool is None:
+                return {}, f"Error: tool '{tool_name}' not found. Available tools: {list(self.tool_map.keys())}", False
+            try:
+                validated_args = validate_tool_parameters(tool, tool_call["args"])
+            except ValueError as e:
+                return tool_call["args"], f"Error: parameter validation failed: {str(e)}", False
+            async with slots:
+                try:
+                    async with trace_span(f"tool {tool_name}", "tool", **{"tool.name": tool_name}):
+                        result = await asyncio.wait_for(tool.invoke(**validated_args), self.tool_timeout)
+                    return validated_args, result, True
+                except asyncio.TimeoutError:
+                    return validated_args, f"Error: tool timed out after {self.tool_timeout}s", False
+                except Exception as e:
+                    logger.error(f"Error executing tool {tool_name}: {str(e)}")
+                    return validated_args, f"Error: tool execution failed: {str(e)}", False
+
+        outcomes = await asyncio.gather(*(run(tool_call) for tool_call in tool_calls))
+
+        direct_result = None
+        for index, (tool_call, (args, tool_result, ok)) in enumerate(zip(tool_calls, outcomes)):
+            tool_name = tool_call["tool"]
+            workflow_steps.append({
+                "step": f"{iteration + 1}_tool_result_{index + 1}",
+                "tool": tool_name,
+                "args": args,
+                "reasoning": tool_call.get("reasoning", ""),
+                "result": tool_result
+            })
+            tools_used.append({
+                "tool_name": tool_name,
+                "args": args,
+                "reasoning": tool_call.get("reasoning", ""),
+                "result": tool_result
+            })
+            tool = self.tool_map.get(tool_name)
+            if ok and direct_result is None and getattr(tool, 'return_direct', False):
+                direct_result = (tool_name, args, tool_result)
+
+        if self.verbose:
+            logger.info(f"Executed {len(tool_calls)} tools in parallel: {[c['tool'] for c in tool_calls]}")
+
+        if direct_result is not None:
+            tool_name, args, tool_result = direct_result
+            return create_success_response(
+                str(tool_result),
+                self._get_agent_name(),
+                steps=workflow_steps,
+                tools_used=tools_used,
+                return_direct=True,
+                tool=tool_name,
+                parameters=args
+            )
+
+        return None  # Continue workflow
 
     async def _execute_single_tool(
         self,
@@ -284,7 +476,8 @@ class ToolAgent(BaseToolAgent):
         try:
             tool = self.tool_map[tool_name]
             validated_args = validate_tool_parameters(tool, tool_args)
-            tool_result = await tool.invoke(**validated_args)
+            async with trace_span(f"tool {tool_name}", "tool", **{"tool.name": tool_name}):
+                tool_result = await asyncio.wait_for(tool.invoke(**validated_args), self.tool_timeout)
 
             logger.info(f"Tool result: {tool_result}")
 
@@ -323,6 +516,11 @@ class ToolAgent(BaseToolAgent):
 
             return None  # Continue workflow
 
+        except asyncio.TimeoutError:
+            return handle_tool_execution_error(
+                TimeoutError(f"timed out after {self.tool_timeout}s"), tool_name, self._get_agent_name(),
+                steps=workflow_steps, iteration=iteration
+            )
         except ValueError as e:
             return handle_parameter_validation_error(
                 e, tool_name, self.tool_map[tool_name], self._get_agent_name(),
@@ -336,17 +534,33 @@ class ToolAgent(BaseToolAgent):
 
     # ==================== PUBLIC API ====================
 
-    async def invoke(self, query: str, chat_history: Optional[List] = None, **kwargs) -> Dict[str, Any]:
-        """Execute a query using available tools"""
+    async def invoke(
+        self,
+        query: str,
+        chat_history: Optional[List] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Execute a query using available tools
+
+        Args:
+            on_token: Optional callback receiving the final answer as it is generated
+        """
         chat_history = chat_history or []
-        result = await self._execute_tools_workflow(query, chat_history)
+        result = await self._execute_tools_workflow(query, chat_history, on_token)
         return result
 
     async def stream(self, query: str, chat_history: Optional[List] = None, **kwargs):
-        """Stream the agent's tool selection and execution process"""
+        """Stream the final answer as {"type": "token"} events, then yield the result"""
+        queue: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self.invoke(
+            query, chat_history,
+            on_token=lambda delta: queue.put_nowait({"type": "token", "delta": delta})))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
         try:
-            result = await self.invoke(query, chat_history)
-            yield result
+            while (event := await queue.get()) is not None:
+                yield event
+            yield await task
         except Exception as e:
             logger.error(f"Error streaming ToolAgent query: {str(e)}")
             yield create_error_response(str(e), self._get_agent_name())
@@ -368,9 +582,7 @@ class ToolAgent(BaseToolAgent):
             selection_prompt = create_tool_selection_prompt(
                 query, tool_descriptions)
 
-            response = await self.llm_model.ainvoke(
-                [{"role": "user", "content": selection_prompt}])
-            response_content = self._extract_response_content(response)
+            response_content, _ = await self._generate(selection_prompt)
 
             return create_success_response(
                 response_content,
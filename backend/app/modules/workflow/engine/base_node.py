@@ -8,6 +8,7 @@ import logging
 import time
 from app.modules.workflow.engine.utils import replace_config_vars
 from app.modules.workflow.engine.workflow_state import WorkflowState
+from app.modules.workflow.tracing import trace_span
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +44,7 @@ class BaseNode(ABC):
         self.output_data = None
         self.execution_start_time: Optional[float] = None
         self.execution_end_time: Optional[float] = None
+        self.response_cache = None
 
         # Validate configuration
         self._validate_config()
@@ -118,6 +120,18 @@ class BaseNode(ABC):
         """Get the conversation memory."""
         return self.state.get_memory()
 
+    def get_token_callback(self):
+        """Callback receiving this node's token deltas, or None when not streaming."""
+        return self.state.get_token_callback(self.node_id)
+
+    def track_response_cache(self, llm: Any) -> None:
+        """Report the hit rate of the LLM's response cache in this node's execution status."""
+        from app.modules.workflow.llm.response_cache import ResponseCache
+
+        cache = getattr(llm, "cache", None)
+        if isinstance(cache, ResponseCache):
+            self.response_cache = cache
+
     def get_session_context(self) -> dict:
         """Get the session context (session data) from workflow state."""
         return self.state.get_session()
@@ -179,6 +193,8 @@ class BaseNode(ABC):
         else:
             self.state.complete_node_execution(
                 self.node_id, self.output_data, None)
+        if self.response_cache is not None and self.node_id in self.state.node_execution_status:
+            self.state.node_execution_status[self.node_id]["responseCache"] = self.response_cache.stats
         logger.debug(f"Node {self.node_id} execution completed")
 
     def get_execution_time(self) -> float:
@@ -302,6 +318,11 @@ class BaseNode(ABC):
         Returns:
             The processed output from the node
         """
+        async with trace_span(f"node {self.get_type()}", "node", **{
+                "node.id": self.node_id, "node.type": self.get_type(), "node.name": self.node_data.get("name")}):
+            return await self._execute(direct_input)
+
+    async def _execute(self, direct_input: Any = None) -> Any:
         try:
 
             # Start execution tracking
@@ -309,9 +330,10 @@ class BaseNode(ABC):
             # self.set_node_input(input_data)
 
             # Resolve configuration template variables
-            source_output = self.get_input_from_source()
-            resolved_config, replacements = replace_config_vars(
-                config=self.node_config, state=self.state, source_output=source_output, direct_input=direct_input)
+            with trace_span("node.resolve_config", "config", **{"node.id": self.node_id}):
+                source_output = self.get_input_from_source()
+                resolved_config, replacements = replace_config_vars(
+                    config=self.node_config, state=self.state, source_output=source_output, direct_input=direct_input)
 
             node_config = resolved_config.get(
                 "data", None) or resolved_config or {}
@@ -8,6 +8,8 @@ import logging
 
 from app.modules.workflow.engine.base_node import BaseNode
 from app.modules.workflow.llm.provider import LLMProvider
+from app.modules.workflow.llm.response_cache import ResponseCacheConfig
+from app.modules.workflow.agents.memory_compaction import MemoryCompactionConfig, get_compacted_history
 from app.modules.workflow.agents.react_agent import ReActAgent
 from app.modules.workflow.agents.react_agent_lc import ReActAgentLC
 from app.modules.workflow.agents.simple_tool_agent import SimpleToolAgent
@@ -45,8 +47,14 @@ class AgentNode(BaseNode):
         # Get tools from connected nodes using the new generic method
         tools = self.get_connected_nodes("tools")
 
-        # Add current time to system prompt
-        system_prompt += f" Current time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        cache_config = ResponseCacheConfig.from_node_config(config)
+
+        # Add current time to system prompt; cached answers only depend on the date,
+        # otherwise every prompt would be unique
+        if cache_config:
+            system_prompt += f" Current date: {datetime.datetime.now().strftime('%Y-%m-%d')}"
+        else:
+            system_prompt += f" Current time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 
         # Set input for tracking
         self.set_node_input({
@@ -60,7 +68,9 @@ class AgentNode(BaseNode):
         try:
             from app.dependencies.injector import injector
             llm_provider = injector.get(LLMProvider)
-            llm_model = await llm_provider.get_model(provider_id)
+            llm_model = await llm_provider.get_model(
+                provider_id, cache_config=cache_config, cache_namespace=self.node_id)
+            self.track_response_cache(llm_model)
             logger.info("Agent type selected: %s, LLM model: %s",
                         agent_type, llm_model)
 
@@ -90,16 +100,23 @@ class AgentNode(BaseNode):
                     llm_model=llm_model,
                     system_prompt=system_prompt,
                     tools=tools,
-                    max_iterations=max_iterations
+                    max_iterations=max_iterations,
+                    native_tool_calls=bool(config.get("nativeToolCalls", False))
                 )
 
             # Get chat history if memory is enabled
             chat_history = []
             if memory_enabled:
-                chat_history = await self.get_memory().get_messages()
-
-            # Invoke the agent
-            result = await agent.invoke(prompt, chat_history=chat_history)
+                compaction = MemoryCompactionConfig.from_node_config(config)
+                if compaction:
+                    chat_history = await get_compacted_history(
+                        self.get_memory(), compaction, provider_id)
+                else:
+                    chat_history = await self.get_memory().get_messages()
+
+            # Invoke the agent, streaming its answer when it feeds a chat output
+            result = await agent.invoke(
+                prompt, chat_history=chat_history, on_token=self.get_token_callback())
             logger.info("Agent result: %s", result)
 
             # Prepare output
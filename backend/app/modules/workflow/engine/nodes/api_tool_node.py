@@ -4,13 +4,18 @@ API tool node implementation using the BaseNode class.
 
 import json
 import logging
-from typing import Dict, Any
-import aiohttp
+from typing import Dict, Any, Optional
+import httpx
+from app.core.http_cache import HttpCacheConfig, HttpResponseCache, get_http_cache
+from app.core.http_client import http_request
 from app.modules.workflow.engine import BaseNode
 
 
 logger = logging.getLogger(__name__)
 
+SUPPORTED_METHODS = ("GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS")
+REQUEST_TIMEOUT = 30.0  # seconds
+
 
 class ApiToolNode(BaseNode):
     """API tool node that makes HTTP requests using the BaseNode approach"""
@@ -33,13 +38,18 @@ class ApiToolNode(BaseNode):
         parameters = config.get("parameters", {})
         request_body: str | dict = config.get("requestBody", {})
 
+        cache_config = HttpCacheConfig.from_node_config(config)
+        cache = get_http_cache(self.node_id, cache_config) if cache_config else None
+        # Reported in the node execution status
+        self.response_cache = cache
+
         try:
             # Make the API call
-            response = await self._make_api_call(method, endpoint, headers, parameters, request_body)
+            response = await self._make_api_call(method, endpoint, headers, parameters, request_body, cache)
             logger.info(f"API Response: {response}")
             return response
 
-        except (aiohttp.ClientError, json.JSONDecodeError, ValueError) as e:
+        except (httpx.HTTPError, json.JSONDecodeError, ValueError) as e:
             error_msg = f"Error processing API tool: {str(e)}"
             logger.error(error_msg)
             return {
@@ -49,8 +59,9 @@ class ApiToolNode(BaseNode):
             }
 
     async def _make_api_call(self, method: str, endpoint: str, headers: Dict[str, str],
-                             parameters: Dict[str, Any], request_body: str | dict) -> Dict[str, Any]:
-        """Make an API call with the given parameters"""
+                             parameters: Dict[str, Any], request_body: str | dict,
+                             cache: Optional[HttpResponseCache] = None) -> Dict[str, Any]:
+        """Make an API call with the given parameters, through the node's response cache if any"""
         try:
             # Add https:// if no schema is provided
             if not endpoint.startswith(('http://', 'https://')):
@@ -67,68 +78,48 @@ class ApiToolNode(BaseNode):
                 else:
                     json_data = request_body
 
-            # Use aiohttp session for connection pooling with timeout
-            timeout = aiohttp.ClientTimeout(total=30)  # 30 second timeout
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                # Make the request based on HTTP method
-                if method == "GET":
-                    async with session.get(endpoint, headers=headers, params=parameters) as response:
-                        return await self._process_response(response, method)
-                elif method == "POST":
-                    async with session.post(endpoint, headers=headers, params=parameters, json=json_data) as response:
-                        return await self._process_response(response, method)
-                elif method == "PUT":
-                    async with session.put(endpoint, headers=headers, params=parameters, json=json_data) as response:
-                        return await self._process_response(response, method)
-                elif method == "DELETE":
-                    async with session.delete(endpoint, headers=headers, params=parameters, json=json_data) as response:
-                        return await self._process_response(response, method)
-                elif method == "PATCH":
-                    async with session.patch(endpoint, headers=headers, params=parameters, json=json_data) as response:
-                        return await self._process_response(response, method)
-                elif method == "HEAD":
-                    async with session.head(endpoint, headers=headers, params=parameters) as response:
-                        return await self._process_response(response, method)
-                elif method == "OPTIONS":
-                    async with session.options(endpoint, headers=headers, params=parameters) as response:
-                        return await self._process_response(response, method)
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
+            if method not in SUPPORTED_METHODS:
+                raise ValueError(f"Unsupported HTTP method: {method}")
+
+            # Shared keep-alive pool of the endpoint's host
+            send = cache.request if cache is not None else http_request
+            response = await send(
+                method, endpoint, headers=headers, params=parameters,
+                json=json_data if method not in ("GET", "HEAD", "OPTIONS") else None,
+                timeout=REQUEST_TIMEOUT, follow_redirects=True)
+            return self._process_response(response, method)
 
-        except (aiohttp.ClientError, json.JSONDecodeError, ValueError) as e:
+        except (httpx.HTTPError, json.JSONDecodeError, ValueError) as e:
             logger.error(f"API call failed: {str(e)}")
             return {
                 "status": 500,
                 "data": {"error": str(e)},
             }
 
-    async def _process_response(self, response: aiohttp.ClientResponse, method: str) -> Dict[str, Any]:
-        """Process the aiohttp response and return standardized format"""
-        try:
-            # Check for HTTP errors
-            response.raise_for_status()
-
-            # Get response data
-            data = None
-            if method not in ["HEAD", "OPTIONS"]:
-                try:
-                    data = await response.json()
-                    logger.info("Response: %s", data)
-                except aiohttp.ContentTypeError:
-                    # If response is not JSON, get as text
-                    data = await response.text()
-                    logger.info("Response (text): %s", data)
-
+    def _process_response(self, response: httpx.Response, method: str) -> Dict[str, Any]:
+        """Process the HTTP response and return standardized format"""
+        # Check for HTTP errors
+        if response.is_error:
+            logger.error(f"HTTP error {response.status_code}: {response.reason_phrase}")
             return {
-                "status": response.status,
-                "data": data,
+                "status": response.status_code,
+                "data": {"error": response.reason_phrase},
                 "headers": dict(response.headers)
             }
 
-        except aiohttp.ClientResponseError as e:
-            logger.error(f"HTTP error {e.status}: {e.message}")
-            return {
-                "status": e.status,
-                "data": {"error": e.message},
-                "headers": dict(response.headers) if hasattr(response, 'headers') else {}
-            }
+        # Get response data
+        data = None
+        if method not in ["HEAD", "OPTIONS"]:
+            if "json" in response.headers.get("content-type", ""):
+                data = response.json()
+                logger.info("Response: %s", data)
+            else:
+                # If response is not JSON, get as text
+                data = response.text
+                logger.info("Response (text): %s", data)
+
+        return {
+            "status": response.status_code,
+            "data": data,
+            "headers": dict(response.headers)
+        }
@@ -14,6 +14,12 @@ from app.core.exceptions.error_messages import ErrorKey
 from app.core.exceptions.exception_classes import AppException
 from app.modules.workflow.engine.base_node import BaseNode
 from app.modules.workflow.llm.provider import LLMProvider
+from app.modules.workflow.llm.response_cache import ResponseCacheConfig
+from app.modules.workflow.agents.memory_compaction import (
+    MemoryCompactionConfig,
+    format_history,
+    get_compacted_history,
+)
 from app.modules.workflow.agents.cot_agent import ChainOfThoughtAgent
 
 logger = logging.getLogger(__name__)
@@ -49,9 +55,13 @@ class LLMModelNode(BaseNode):
             # Set up the environment for the model
             from app.dependencies.injector import injector
             llm_provider = injector.get(LLMProvider)
-            llm = await llm_provider.get_model(provider_id)
+            cache_config = ResponseCacheConfig.from_node_config(config)
+            llm = await llm_provider.get_model(
+                provider_id, cache_config=cache_config, cache_namespace=self.node_id)
+            self.track_response_cache(llm)
 
             memory = self.get_memory() if memory_enabled else None
+            compaction = MemoryCompactionConfig.from_node_config(config) if memory else None
 
             if _type == "Chain-of-Thought":
                 agent = ChainOfThoughtAgent(
@@ -60,13 +70,19 @@ class LLMModelNode(BaseNode):
                     memory=memory,
                 )
                 chat_history = []
-                if memory:
+                if compaction:
+                    chat_history = await get_compacted_history(memory, compaction, provider_id)
+                elif memory:
                     chat_history = await memory.get_messages()
                 result = await agent.invoke(prompt, chat_history=chat_history)
 
                 return result
 
-            if memory:
+            if compaction:
+                chat_history = format_history(
+                    await get_compacted_history(memory, compaction, provider_id))
+                system_prompt = system_prompt + "\n\n" + chat_history
+            elif memory:
                 chat_history = await memory.get_chat_history(
                     as_string=True, max_messages=10)
                 system_prompt = system_prompt + "\n\n" + chat_history
@@ -82,10 +98,19 @@ class LLMModelNode(BaseNode):
                 message_content.extend(attachments_message_content)
             
             # Process the input through the model
-            response = await llm.ainvoke([SystemMessage(content=system_prompt), HumanMessage(content=message_content)])
-            result = response.content
-
-            return result
+            messages = [SystemMessage(content=system_prompt), HumanMessage(content=message_content)]
+            on_token = self.get_token_callback()
+            if on_token is None:
+                response = await llm.ainvoke(messages)
+                return response.content
+
+            # Feeds a chat output: stream the answer while it is generated
+            parts = []
+            async for chunk in llm.astream(messages):
+                if chunk.text:
+                    parts.append(chunk.text)
+                    on_token(chunk.text)
+            return "".join(parts)
 
         except Exception as e:
             logger.error(f"Error processing LLM node: {str(e)}")
@@ -0,0 +1,257 @@
+"""
+Dependency-driven scheduler for workflow execution.
+
+A workflow run is compiled into an execution plan: the flow edges reachable
+from the start node, with tool attachments and cycle-closing edges removed.
+Nodes are started when every incoming edge is resolved, so join nodes
+(e.g. aggregators) run exactly once, after all their live sources. Edges
+not taken by a router, and edges out of failed or skipped nodes, are
+resolved as dead; a node whose incoming edges are all dead is skipped.
+
+Concurrency is bounded per run, per process, and for nodes that open a
+database request scope.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi_injector import RequestScopeFactory
+
+from app.core.config.settings import settings
+from app.core.tenant_scope import get_tenant_context, set_tenant_context
+from app.dependencies.injector import injector
+from app.modules.workflow.engine.workflow_state import WorkflowState
+from app.modules.workflow.tracing import record_span
+
+if TYPE_CHECKING:
+    from app.modules.workflow.engine.workflow_engine import WorkflowEngine
+
+logger = logging.getLogger(__name__)
+
+# Set inside node tasks, so runs nested in a node (tool builder subflows)
+# do not wait on slots their parent already holds
+_holds_process_slot: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "workflow_holds_process_slot", default=False)
+_holds_db_scope: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "workflow_holds_db_scope", default=False)
+
+# Semaphores bind to an event loop, so process-wide limits are kept per loop
+_loop_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary())
+
+
+def _process_semaphore(name: str, limit: int) -> asyncio.Semaphore:
+    semaphores = _loop_semaphores.setdefault(asyncio.get_running_loop(), {})
+    if name not in semaphores:
+        semaphores[name] = asyncio.Semaphore(limit)
+    return semaphores[name]
+
+
+def _is_flow_edge(edge: dict) -> bool:
+    """Tool attachments connect a tool to an agent; they are not execution flow"""
+    return "tools" not in (edge.get("targetHandle") or "")
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """Acyclic flow graph reachable from a start node"""
+    start_node_id: str
+    successors: Dict[str, Tuple[str, ...]]
+    in_degree: Dict[str, int]
+
+    @classmethod
+    def compile(cls, source_edges: Dict[str, List[dict]], start_node_id: str) -> "ExecutionPlan":
+        successors: Dict[str, Tuple[str, ...]] = {}
+        in_degree: Dict[str, int] = {start_node_id: 0}
+        on_path: Set[str] = set()
+        done: Set[str] = set()
+
+        # Iterative DFS; an edge back to a node on the current path closes a
+        # cycle and is dropped, which matches the old visited-set behaviour
+        stack: List[Tuple[str, Iterable[str]]] = []
+
+        def targets(node_id: str) -> Iterable[str]:
+            seen: Dict[str, None] = {}
+            for edge in source_edges.get(node_id, []):
+                if _is_flow_edge(edge):
+                    seen.setdefault(edge["target"])
+            return iter(seen)
+
+        stack.append((start_node_id, targets(start_node_id)))
+        on_path.add(start_node_id)
+        kept: Dict[str, List[str]] = {start_node_id: []}
+        while stack:
+            node_id, remaining = stack[-1]
+            target = next(remaining, None)
+            if target is None:
+                stack.pop()
+                on_path.discard(node_id)
+                done.add(node_id)
+                continue
+            if target in on_path:
+                logger.debug(f"Ignoring cycle edge {node_id} -> {target}")
+                continue
+            kept[node_id].append(target)
+            in_degree[target] = in_degree.get(target, 0) + 1
+            if target not in done and target not in kept:
+                kept[target] = []
+                on_path.add(target)
+                stack.append((target, targets(target)))
+
+        for node_id, node_targets in kept.items():
+            successors[node_id] = tuple(node_targets)
+        return cls(start_node_id=start_node_id, successors=successors, in_degree=in_degree)
+
+
+class WorkflowScheduler:
+    """Runs one execution plan against a workflow state"""
+
+    def __init__(
+        self,
+        engine: "WorkflowEngine",
+        workflow_id: str,
+        state: WorkflowState,
+        plan: ExecutionPlan,
+        max_parallel_nodes: Optional[int] = None,
+    ):
+        self.engine = engine
+        self.workflow_id = workflow_id
+        self.state = state
+        self.plan = plan
+        self._run_slots = asyncio.Semaphore(
+            max_parallel_nodes or settings.WORKFLOW_MAX_PARALLEL_NODES)
+        self._pending: Dict[str, int] = dict(plan.in_degree)
+        self._live: Set[str] = set()
+        self.executed: List[str] = []
+        self.skipped: List[str] = []
+
+    async def run(self) -> None:
+        """
+        Execute the plan. An error in the start node is raised; errors in
+        later nodes are logged and stop only the branches that depend on them.
+        """
+        start = self.plan.start_node_id
+        tasks: Dict[asyncio.Task, str] = {}
+
+        def launch(node_ids: Iterable[str]):
+            for node_id in node_ids:
+                task = asyncio.create_task(self._run_node(node_id))
+                tasks[task] = node_id
+
+        launch([start])
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node_id = tasks.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        if node_id == start:
+                            raise error
+                        logger.error(
+                            f"Error in parallel execution of node {node_id}: {error}")
+                        fired: Set[str] = set()
+                    else:
+                        fired = task.result()
+                    launch(self._resolve(node_id, fired))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _resolve(self, node_id: str, fired: Set[str]) -> List[str]:
+        """Resolve the outgoing edges of a finished node; returns nodes now ready"""
+        ready: List[str] = []
+        finished = [(node_id, fired)]
+        while finished:
+            source, live_targets = finished.pop()
+            for target in self.plan.successors.get(source, ()):
+                if target in live_targets:
+                    self._live.add(target)
+                self._pending[target] -= 1
+                if self._pending[target] > 0:
+                    continue
+                if target in self._live:
+                    ready.append(target)
+                else:
+                    # Every path into this node was skipped
+                    self.skipped.append(target)
+                    finished.append((target, set()))
+        return ready
+
+    async def _run_node(self, node_id: str) -> Set[str]:
+        """Execute one node; returns the successors it activated"""
+        ready_ns = time.time_ns()
+        async with self._run_slots, self._process_slot():
+            record_span("node.queue", "queue", ready_ns, **{"node.id": node_id})
+            node = self.engine.executable_node(node_id, self.state, self.workflow_id)
+            if not node.check_if_requirement_satisfied():
+                logger.debug(f"Node {node_id} requirements not satisfied, skipping execution")
+                self.skipped.append(node_id)
+                return set()
+
+            _, node_type = self.engine.get_node_config(self.workflow_id, node_id)
+            # The start node runs in the caller's scope, as every node used to
+            if node_id != self.plan.start_node_id and self.engine._node_needs_db_access(node_type):
+                output = await self._execute_in_request_scope(node_id)
+            else:
+                output = await self.engine._execute_single_node(node_id, self.state, self.workflow_id)
+            self.executed.append(node_id)
+
+        successors = self.plan.successors.get(node_id, ())
+        if isinstance(output, dict) and "next_nodes" in output:
+            return set(output.get("next_nodes") or []) & set(successors)
+        return set(successors)
+
+    async def _execute_in_request_scope(self, node_id: str):
+        """Run a DB-using node in its own request scope, bounded process-wide"""
+        tenant_id = get_tenant_context()
+        requested_ns = time.time_ns()
+        if _holds_db_scope.get():
+            db_slot = _NullSlot()
+        else:
+            db_slot = _process_semaphore("db_scopes", settings.WORKFLOW_MAX_DB_SCOPES)
+        async with db_slot:
+            token = _holds_db_scope.set(True)
+            try:
+                request_scope_factory = injector.get(RequestScopeFactory)
+                async with request_scope_factory.create_scope():
+                    # Set tenant context in the new scope to match the main request
+                    set_tenant_context(tenant_id)
+                    record_span("db_scope.create", "db_scope", requested_ns, **{"node.id": node_id})
+                    return await self.engine._execute_single_node(node_id, self.state, self.workflow_id)
+            finally:
+                _holds_db_scope.reset(token)
+
+    def _process_slot(self):
+        if _holds_process_slot.get():
+            return _NullSlot()
+        return _ProcessSlot()
+
+
+class _NullSlot:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _ProcessSlot:
+    """Process-wide node slot; marks the holding task so nested runs reuse it"""
+
+    async def __aenter__(self):
+        self._semaphore = _process_semaphore(
+            "nodes", settings.WORKFLOW_PROCESS_MAX_PARALLEL_NODES)
+        await self._semaphore.acquire()
+        self._token = _holds_process_slot.set(True)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        _holds_process_slot.reset(self._token)
+        self._semaphore.release()
+        return False
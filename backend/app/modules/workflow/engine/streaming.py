@@ -0,0 +1,58 @@
+"""
+Streaming channel between a running workflow and its caller.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional
+
+_CLOSED = object()
+
+
+class WorkflowStream:
+    """
+    Async channel of events emitted while a workflow executes.
+
+    Nodes push events without blocking (`token`, `emit`); the caller consumes
+    them with `async for` until the channel is closed. Events are plain dicts:
+
+        {"type": "token", "node_id": ..., "delta": "..."}
+        {"type": "final", "response": {...}}          (added by the caller)
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._closed = False
+        self.token_count = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        if self._closed:
+            return
+        self._queue.put_nowait(event)
+
+    def token(self, node_id: str, delta: str) -> None:
+        """Emit a text delta produced by `node_id`"""
+        if not delta:
+            return
+        self.token_count += 1
+        self.emit({"type": "token", "node_id": node_id, "delta": delta})
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._queue.put_nowait(_CLOSED)
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            event = await self._queue.get()
+            if event is _CLOSED:
+                return
+            yield event
+
+    async def next_event(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None once the channel is closed and drained"""
+        event = await asyncio.wait_for(self._queue.get(), timeout)
+        return None if event is _CLOSED else event
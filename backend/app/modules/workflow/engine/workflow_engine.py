@@ -34,14 +34,14 @@ from app.modules.workflow.engine.nodes import (
     ThreadRAGNode,
     MCPNode,
 )
-from typing import Dict, Any, List, Optional, Set
+from app.modules.workflow.engine.scheduler import ExecutionPlan, WorkflowScheduler
+from app.modules.workflow.engine.streaming import WorkflowStream
+from app.modules.workflow.tracing import RunTrace
+from typing import AsyncIterator, Dict, Any, List, Optional
 import logging
 import asyncio
 from collections import defaultdict
 import uuid
-from fastapi_injector import RequestScopeFactory
-from app.dependencies.injector import injector
-from app.core.tenant_scope import get_tenant_context, set_tenant_context
 
 
 logger = logging.getLogger(__name__)
@@ -56,7 +56,7 @@ class WorkflowEngine:
     - Execute workflows with state tracking
     - Handle special nodes (router, aggregator)
     - Execute from specific starting nodes
-    - Parallel execution support
+    - Parallel execution with bounded concurrency (see scheduler.py)
     """
 
     _instances: Dict[str, "WorkflowEngine"] = {}
@@ -230,6 +230,7 @@ class WorkflowEngine:
         input_data: Optional[Dict[str, Any]] = None,
         thread_id: str = str(uuid.uuid4()),
         persist: Optional[bool] = True,
+        stream: Optional[WorkflowStream] = None,
     ) -> WorkflowState:
         """
         Execute workflow starting from a specific node.
@@ -239,6 +240,7 @@ class WorkflowEngine:
             start_node_id: Optional ID of the starting node
             input_data: Input data for the workflow
             thread_id: Thread ID for this execution
+            stream: Optional channel receiving token deltas of the answering nodes
 
         Returns:
             WorkflowState with execution results
@@ -271,6 +273,10 @@ class WorkflowEngine:
             thread_id=thread_id or str(uuid.uuid4()),
             initial_values=initial_values,
         )
+        if stream is not None:
+            state.attach_stream(stream)
+        run_trace = RunTrace(state)
+        state.trace = run_trace.start()
 
         try:
             state.start_execution()
@@ -278,9 +284,10 @@ class WorkflowEngine:
 
             # Execute from the specified node
             try:
-                await self._execute_from_node_recursive(
-                    start_node_id, state, workflow_id, set()
-                )
+                await WorkflowScheduler(
+                    self, workflow_id, state,
+                    self.get_execution_plan(workflow_id, start_node_id),
+                ).run()
 
                 state.complete_execution()
             except ValueError as e:
@@ -288,7 +295,11 @@ class WorkflowEngine:
 
         except Exception as e:
             state.fail_execution(str(e))
+            run_trace.finish(error=str(e))
             raise
+        run_trace.finish(
+            error=None if state.status == "completed"
+            else (state.errors[-1]["message"] if state.errors else state.status))
 
         try:
             if initial_values.get("message") and persist:
@@ -302,6 +313,38 @@ class WorkflowEngine:
             logger.error(f"Error adding message to memory: {e}")
         return state
 
+    async def stream_from_node(
+        self,
+        workflow_id: str,
+        start_node_id: Optional[str] = None,
+        input_data: Optional[Dict[str, Any]] = None,
+        thread_id: str = str(uuid.uuid4()),
+        persist: Optional[bool] = True,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a workflow, yielding token events while it runs.
+
+        Yields {"type": "token", "node_id", "delta"} events, then one
+        {"type": "final", "state": WorkflowState} event. Errors raised by the
+        execution are raised after the tokens already emitted.
+        """
+        stream = WorkflowStream()
+        task = asyncio.create_task(self.execute_from_node(
+            workflow_id,
+            start_node_id=start_node_id,
+            input_data=input_data,
+            thread_id=thread_id,
+            persist=persist,
+            stream=stream,
+        ))
+        task.add_done_callback(lambda _: stream.close())
+
+        async for event in stream:
+            yield event
+        # A consumer that stops early leaves the run to finish in the
+        # background, so tool side effects and memory are not cut halfway
+        yield {"type": "final", "state": await task}
+
     def _find_starting_nodes(self, workflow_id: str) -> List[str]:
         """Find nodes with no incoming edges (starting nodes)."""
         workflow = self.workflows[workflow_id]
@@ -324,94 +367,14 @@ class WorkflowEngine:
 
         return starting_nodes
 
-    async def _execute_from_node_recursive(
-        self, node_id: str, state: WorkflowState, workflow_id: str, visited: Set[str]
-    ) -> None:
-        """Recursively execute nodes starting from a specific node."""
-        if node_id in visited:
-            return  # Avoid cycles
-
-        visited.add(node_id)
-
-        # _, node_type = self.get_node_config(workflow_id, node_id=node_id)
-        node_output: Optional[dict] = None
-
-        # if "aggregator" in node_type.lower():
-        # Check if aggregator requirements are satisfied
-        node = self.executable_node(node_id, state, workflow_id)
-        executable_node = node.check_if_requirement_satisfied()
-        if executable_node:
-            # All sources are ready, execute the aggregator
-            node_output = await self._execute_single_node(node_id, state, workflow_id)
-        else:
-            # Requirements not satisfied, skip execution and continue flow
-            logger.debug(
-                f"Aggregator {node_id} requirements not satisfied, skipping execution"
-            )
-            return
-        # else:
-        #     # Execute regular nodes normally
-        #     node_output = await self._execute_single_node(node_id, state, workflow_id)
-
-        # Handle next nodes based on execution result
-        if node_output and "next_nodes" in node_output:
-            next_nodes = node_output.get("next_nodes", [])
-        else:
-            next_nodes = self._find_next_nodes(node_id, workflow_id)
-
-        # Find and execute next nodes in parallel
-        if next_nodes:
-            # Capture tenant context from the main request scope
-            tenant_id = get_tenant_context()
-
-            # Create tasks for all next nodes
-            next_tasks = []
-            for next_node_id in next_nodes:
-                # Create a copy of visited set for each task to avoid conflicts
-                task_visited = visited.copy()
-
-                # Check if this node needs DB access to determine if we need a separate scope
-                _, next_node_type = self.get_node_config(workflow_id, next_node_id)
-                needs_db = self._node_needs_db_access(next_node_type)
-
-                # Create a wrapper function that conditionally uses a request scope
-                async def execute_node_conditionally(
-                    node_id: str, visited_set: Set[str], tenant: str, requires_db: bool
-                ):
-                    """
-                    Execute a node, creating a request scope only if it needs DB access.
-                    This avoids creating unnecessary database connections for nodes that don't need them.
-                    """
-                    if requires_db:
-                        # Only create scope for nodes that need DB access
-                        request_scope_factory = injector.get(RequestScopeFactory)
-                        async with request_scope_factory.create_scope():
-                            # Set tenant context in the new scope to match the main request
-                            set_tenant_context(tenant)
-                            return await self._execute_from_node_recursive(
-                                node_id, state, workflow_id, visited_set
-                            )
-                    else:
-                        # No DB needed, execute directly without creating a scope
-                        return await self._execute_from_node_recursive(
-                            node_id, state, workflow_id, visited_set
-                        )
-
-                task = asyncio.create_task(
-                    execute_node_conditionally(next_node_id, task_visited, tenant_id, needs_db)
-                )
-                next_tasks.append(task)
-
-            # Execute all next nodes in parallel
-            # Use return_exceptions=True to handle any individual task failures gracefully
-            results = await asyncio.gather(*next_tasks, return_exceptions=True)
-
-            # Log any exceptions that occurred during parallel execution
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.error(
-                        f"Error in parallel execution of node {next_nodes[i]}: {result}"
-                    )
+    def get_execution_plan(self, workflow_id: str, start_node_id: str) -> ExecutionPlan:
+        """Get the compiled execution plan for a workflow and start node."""
+        workflow = self.workflows[workflow_id]
+        plans = workflow.setdefault("plans", {})
+        if start_node_id not in plans:
+            plans[start_node_id] = ExecutionPlan.compile(
+                workflow["source_edges"], start_node_id)
+        return plans[start_node_id]
 
     def _find_next_nodes(self, node_id: str, workflow_id: str) -> List[str]:
         """Find next nodes connected to the current node."""
@@ -454,7 +417,7 @@ class WorkflowEngine:
         """
         Execute a single node.
         
-        Note: Request scope creation is handled at the parallel execution level
+        Note: Request scope creation is handled by the scheduler
         to optimize connection pool usage. This method executes within the
         existing scope (either from the main request or from parallel execution).
         """
@@ -2,7 +2,7 @@
 Enhanced workflow state management for execution tracking and performance metrics.
 """
 
-from typing import Dict, Any, Union
+from typing import Callable, Dict, Any, Optional, Union
 import logging
 import uuid
 from datetime import datetime
@@ -12,6 +12,7 @@ from app.modules.workflow.agents.memory import (
     BaseConversationMemory,
     ConversationMemory,
 )
+from app.modules.workflow.engine.streaming import WorkflowStream
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +79,13 @@ class WorkflowState:
         self.source_edges = workflow.get("source_edges", {}) if workflow else {}
         self.target_edges = workflow.get("target_edges", {}) if workflow else {}
 
+        # Token streaming, enabled by the caller through attach_stream
+        self.stream: Optional[WorkflowStream] = None
+        self.streaming_node_ids: set[str] = set()
+
+        # Span trace of this run (app.modules.workflow.tracing), None when not sampled
+        self.trace = None
+
         # Apply initial values if provided
         if initial_values:
             self._apply_initial_values(initial_values)
@@ -379,6 +387,25 @@ class WorkflowState:
         """Get the conversation memory for this workflow execution"""
         return self.memory
 
+    def attach_stream(self, stream: WorkflowStream) -> None:
+        """Stream token deltas of the nodes that feed a chat output node"""
+        self.stream = stream
+        nodes = self.workflow.get("nodes", []) if self.workflow else []
+        output_ids = {node["id"] for node in nodes if node.get("type") == "chatOutputNode"}
+        self.streaming_node_ids = {
+            edge["source"]
+            for edges in self.target_edges.values()
+            for edge in edges
+            if edge.get("target") in output_ids and edge.get("source")
+        }
+
+    def get_token_callback(self, node_id: str) -> Optional[Callable[[str], None]]:
+        """Callback for token deltas of a node, or None if it should not stream"""
+        if self.stream is None or node_id not in self.streaming_node_ids:
+            return None
+        stream = self.stream
+        return lambda delta: stream.token(node_id, delta)
+
     def record_workflow_output(self, output: Any) -> None:
         """Record the final output of the workflow execution"""
         self.output = output
@@ -440,6 +467,7 @@ class WorkflowState:
         """Get the complete state including all execution details"""
         return {
             "status": self.status,
+            "execution_id": self.execution_id,
             "input": self.initial_values,
             "output": self.output,
             "workflow_id": self.workflow_id,
@@ -1,5 +1,6 @@
+import hashlib
 import json
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
 import os
 import logging
 
@@ -13,11 +14,29 @@ from app.db.models.llm import LlmProvidersModel
 from app.services.llm_providers import LlmProviderService
 from app.schemas.dynamic_form_schemas import LLM_FORM_SCHEMAS_DICT
 from app.services.open_ai_fine_tuning import OpenAIFineTuningService
+from app.core.tenant_scope import get_tenant_context
+from app.modules.workflow.llm.provider_invalidation import register_provider
+from app.modules.workflow.llm.response_cache import ResponseCacheConfig, with_response_cache
+from app.modules.workflow.tracing import llm_tracing_callback
 
 
 logger = logging.getLogger(__name__)
 
 
+def config_hash(config: LlmProvidersModel) -> str:
+    """Content hash of everything a client is built from"""
+    content = json.dumps(
+        {
+            "provider": config.llm_model_provider,
+            "model": config.llm_model,
+            "connection_data": config.connection_data,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
 @inject
 class LLMProvider:
     """Tenant-aware singleton class for managing LLM instances.
@@ -27,6 +46,10 @@ class LLMProvider:
 
     Note: Services are obtained from injector when needed to ensure they use the correct
     tenant database session, rather than caching stale request-scoped services.
+
+    Clients are cached by the content hash of their configuration, so a reload
+    only rebuilds the clients whose configuration changed. Edits made by other
+    processes arrive through provider_invalidation and mark the provider stale.
     """
 
     llm_instances: Dict[str, BaseChatModel] = {}
@@ -36,7 +59,11 @@ class LLMProvider:
     def __init__(self):
         self.llm_instances = {}
         self.configurations = []
+        self._configurations_by_id: Dict[str, LlmProvidersModel] = {}
+        self._default_configuration: Optional[LlmProvidersModel] = None
         self._loading = False
+        self._stale = False
+        register_provider(get_tenant_context(), self)
         logger.info("LLMProvider initialized")
         # Don't create background task that can conflict with request cleanup
         # Configurations will be loaded lazily when needed
@@ -79,13 +106,38 @@ class LLMProvider:
         Returns:
             List[LlmProvidersModel]: All LLM configurations
         """
+        # Cleared first, so an invalidation arriving during the query is kept
+        self._stale = False
         # Get fresh service instance to ensure correct tenant database session
         from app.dependencies.injector import injector
         llm_provider_service = injector.get(LlmProviderService)
-        self.configurations = await llm_provider_service.get_all()
-        self.llm_instances = {}
+        configurations = await llm_provider_service.get_all()
+
+        self.configurations = configurations
+        self._configurations_by_id = {str(c.id): c for c in configurations}
+        self._default_configuration = next(
+            (c for c in configurations if c.is_default == 1),
+            configurations[0] if configurations else None,
+        )
+
+        # Keep the clients of unchanged configurations
+        current = {config_hash(c) for c in configurations}
+        dropped = [key for key in self.llm_instances if key not in current]
+        for key in dropped:
+            del self.llm_instances[key]
+        if dropped:
+            logger.info(f"Dropped {len(dropped)} LLM instance(s) with changed or removed configurations")
         return self.configurations
 
+    def invalidate(self, provider_ids: Optional[Iterable[str]] = None) -> None:
+        """
+        Mark the configurations stale; the next get_model reloads them.
+
+        Safe to call from any thread. The reload re-reads every configuration,
+        so provider_ids is informational.
+        """
+        self._stale = True
+
     def get_all_configurations(self) -> List[LlmProvidersModel]:
         """
         Get all LLM configurations
@@ -99,31 +151,32 @@ class LLMProvider:
         """
         Ensure configurations are loaded. Safe to call multiple times.
         """
-        if not self.configurations and not self._loading:
+        if (not self.configurations or self._stale) and not self._loading:
             self._loading = True
             try:
                 await self.reload()
             finally:
                 self._loading = False
 
-    def get_configuration(self, model_id: str) -> LlmProvidersModel:
+    def get_configuration(self, model_id: str) -> Optional[LlmProvidersModel]:
         """
-        Get an LLM configuration by its ID
+        Get an LLM configuration by its ID, falling back to the default one
         """
-        default = next(
-            (c for c in self.configurations if c.is_default == 1),
-            self.configurations[0],
-        )
-        return next(
-            (c for c in self.configurations if str(c.id) == str(model_id)), default
-        )
-
-    async def get_model(self, model_id: str | None = None) -> BaseChatModel:
+        return self._configurations_by_id.get(str(model_id), self._default_configuration)
+
+    async def get_model(
+        self,
+        model_id: str | None = None,
+        cache_config: Optional[ResponseCacheConfig] = None,
+        cache_namespace: str = "",
+    ) -> BaseChatModel:
         """
         Get an LLM instance by its ID
 
         Args:
             model_id: ID of the LLM instance to get
+            cache_config: Optional response cache of the calling node
+            cache_namespace: Cache owner, usually the node ID
 
         Returns:
             BaseChatModel: The LLM instance
@@ -140,12 +193,13 @@ class LLMProvider:
             raise ValueError("Model ID is required")
         model_id = str(model_id)
 
-        if model_id not in self.llm_instances:
-            # Find the configuration
-            config = self.get_configuration(model_id)
-            if not config:
-                raise ValueError(f"No configuration found for model ID: {model_id}")
+        # Find the configuration
+        config = self.get_configuration(model_id)
+        if not config:
+            raise ValueError(f"No configuration found for model ID: {model_id}")
+        key = config_hash(config)
 
+        if key not in self.llm_instances:
             try:
                 # Validate connection data
                 validated_data = json.loads(
@@ -181,15 +235,17 @@ class LLMProvider:
                     "model_provider": provider,
                     "model": config.llm_model,
                     **validated_data,
+                    # Spans of the calls made within traced workflow runs
+                    "callbacks": [llm_tracing_callback],
                 }
 
                 # Initialize the model
                 llm = init_chat_model(**model_kwargs)
 
-                self.llm_instances[model_id] = llm
+                self.llm_instances[key] = llm
                 logger.info(f"Created new LLM instance with ID: {model_id}")
             except Exception as e:
                 logger.error(f"Failed to initialize LLM instance: {str(e)}")
                 raise
 
-        return self.llm_instances[model_id]
+        return with_response_cache(self.llm_instances[key], cache_namespace or model_id, cache_config)
@@ -0,0 +1,172 @@
+"""
+Cluster-wide invalidation of LLMProvider configurations.
+
+Every API worker and Celery process holds its own LLMProvider per tenant. The
+worker saving a provider edit reloads its own and publishes the changed
+provider IDs on a Redis channel; every other process listens in a daemon
+thread and marks its LLMProvider of that tenant stale. The next get_model
+then re-reads the configurations and rebuilds only the clients whose
+configuration changed.
+"""
+
+import json
+import logging
+import threading
+import uuid
+import weakref
+from typing import Iterable, Optional
+
+from app.core.config.settings import settings
+from app.core.tenant_scope import get_tenant_context
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "llm_provider:invalidate"
+
+# Identifies this process, so it skips the invalidations it published itself
+_ORIGIN = uuid.uuid4().hex
+
+_providers: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+_providers_lock = threading.Lock()
+
+
+def register_provider(tenant_id: str, provider) -> None:
+    """Track the LLMProvider of a tenant in this process"""
+    with _providers_lock:
+        _providers[tenant_id] = provider
+
+
+def invalidate_local(tenant_id: Optional[str], provider_ids: Optional[Iterable[str]] = None) -> None:
+    """Mark the LLMProvider of a tenant (or of every tenant, when None) stale"""
+    with _providers_lock:
+        if tenant_id is None:
+            providers = list(_providers.values())
+        else:
+            provider = _providers.get(tenant_id)
+            providers = [provider] if provider is not None else []
+    for provider in providers:
+        provider.invalidate(provider_ids)
+
+
+def handle_message(data: str) -> None:
+    """Apply an invalidation received from another process"""
+    try:
+        message = json.loads(data)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring malformed LLM provider invalidation: {data!r}")
+        return
+    if message.get("origin") == _ORIGIN:
+        return
+    tenant_id = message.get("tenant_id")
+    if not tenant_id:
+        return
+    logger.info(f"LLM providers {message.get('provider_ids')} changed for tenant {tenant_id}")
+    invalidate_local(tenant_id, message.get("provider_ids"))
+
+
+async def publish_invalidation(provider_ids: Iterable[str]) -> None:
+    """
+    Tell the other processes that providers of the current tenant changed.
+
+    Failures are logged, not raised: the edit itself is saved and this
+    process is already reloaded.
+    """
+    from app.dependencies.injector import injector
+    from app.dependencies.dependency_injection import RedisString
+
+    message = json.dumps({
+        "origin": _ORIGIN,
+        "tenant_id": get_tenant_context(),
+        "provider_ids": [str(provider_id) for provider_id in provider_ids],
+    })
+    try:
+        await injector.get(RedisString).publish(CHANNEL, message)
+    except Exception as e:
+        logger.error(f"Failed to publish LLM provider invalidation: {e}")
+
+
+class ProviderInvalidationListener:
+    """
+    Daemon thread subscribed to the invalidation channel.
+
+    A thread rather than an asyncio task, so Celery processes (which run each
+    task in its own event loop) are covered as well. Reconnects on errors;
+    since messages may have been missed meanwhile, every provider of the
+    process is marked stale after a reconnect.
+    """
+
+    def __init__(self, redis_url: str):
+        self._redis_url = redis_url
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="llm-provider-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        from redis import Redis
+
+        connected_before = False
+        while not self._stop.is_set():
+            client = pubsub = None
+            try:
+                client = Redis.from_url(
+                    self._redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                )
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                if connected_before:
+                    invalidate_local(None)
+                connected_before = True
+                logger.info(f"Subscribed to Redis channel: {CHANNEL}")
+
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        handle_message(message["data"])
+            except Exception as e:
+                logger.error(f"LLM provider invalidation listener error: {e}")
+                self._stop.wait(5)
+            finally:
+                for resource in (pubsub, client):
+                    try:
+                        if resource is not None:
+                            resource.close()
+                    except Exception:
+                        pass
+
+
+_listener: Optional[ProviderInvalidationListener] = None
+
+
+def start_invalidation_listener() -> None:
+    """Start listening for invalidations in this process (idempotent)"""
+    global _listener
+    if _listener is None:
+        _listener = ProviderInvalidationListener(settings.REDIS_URL)
+    _listener.start()
+
+
+def stop_invalidation_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
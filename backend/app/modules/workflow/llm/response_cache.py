@@ -0,0 +1,345 @@
+"""
+Response cache for deterministic LLM calls of workflow nodes.
+
+Opted into per node (`cacheResponses`); the node's model from
+LLMProvider.get_model is a copy carrying a ResponseCache, consulted by
+LangChain before every call. Entries are keyed on the model parameters
+(provider, model, temperature, bound tools...), the normalised messages and
+the tenant. An optional semantic tier reuses the answer of a previous call
+whose last user message is similar enough, when everything else is equal.
+
+Models that can answer differently to the same prompt (temperature not 0)
+are never cached.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.caches import BaseCache
+from langchain_core.language_models import BaseChatModel
+from pydantic import BaseModel, Field
+
+from app.core.tenant_scope import get_tenant_context
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCacheConfig(BaseModel):
+    """Per-node response cache settings"""
+    enabled: bool = Field(
+        default=False, description="Whether responses are cached")
+    ttl_seconds: float = Field(
+        default=3600, description="Lifetime of a cached response (0 = until evicted)")
+    similarity_threshold: Optional[float] = Field(
+        default=None, description="Cosine similarity (0-1) for semantic hits; None disables the tier")
+    max_entries: int = Field(
+        default=1000, description="Cached responses kept per node")
+
+    @classmethod
+    def from_node_config(cls, config: Dict[str, Any]) -> Optional["ResponseCacheConfig"]:
+        """Read the cache fields of an LLM or agent node"""
+        if not config.get("cacheResponses"):
+            return None
+        threshold = config.get("cacheSimilarityThreshold")
+        return cls(
+            enabled=True,
+            ttl_seconds=float(config.get("cacheTtlSeconds") or 3600),
+            similarity_threshold=float(threshold) if threshold else None,
+        )
+
+
+@dataclass
+class _Entry:
+    generations: List[Any]
+    expires_at: Optional[float]
+    scope: str  # hash of tenant, model parameters and all but the last user message
+    vector: Optional[np.ndarray]
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return str(content)
+
+
+def _normalise(value: Any) -> Any:
+    """Collapse whitespace in every string, so formatting noise does not miss"""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, list):
+        return [_normalise(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalise(v) for k, v in value.items()}
+    return value
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def split_prompt(prompt: str) -> Tuple[str, str, str]:
+    """
+    Split a serialised LangChain prompt into its normalised form, the same
+    form without the last user message, and the last user message text.
+    """
+    try:
+        messages = _normalise(json.loads(prompt))
+    except (TypeError, ValueError):
+        normalised = _normalise(prompt)
+        return normalised, normalised, ""
+
+    question = ""
+    context = copy.deepcopy(messages)
+    if isinstance(context, list):
+        for message in reversed(context):
+            if isinstance(message, dict) and "HumanMessage" in (message.get("id") or []):
+                kwargs = message.get("kwargs") or {}
+                question = _text(kwargs.get("content", ""))
+                kwargs["content"] = None
+                break
+    return (json.dumps(messages, sort_keys=True, default=str),
+            json.dumps(context, sort_keys=True, default=str),
+            question)
+
+
+class ResponseCache(BaseCache):
+    """
+    Exact and semantic response cache of one workflow node.
+
+    Thread-safe; lookups never raise, a failing semantic tier only misses.
+    Deliberately has no __len__: LangChain skips caches that are falsy.
+    """
+
+    def __init__(self, namespace: str, config: ResponseCacheConfig, embedder: Optional[Any] = None):
+        self.namespace = namespace
+        self.config = config
+        self._embedder = embedder
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._pending_vectors: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    # ==================== KEYS ====================
+
+    @staticmethod
+    def _keys(prompt: str, llm_string: str) -> Tuple[str, str, str]:
+        """Returns (exact key, semantic scope, question)"""
+        normalised, context, question = split_prompt(prompt)
+        tenant_id = get_tenant_context() or ""
+        return (_digest(tenant_id, llm_string, normalised),
+                _digest(tenant_id, llm_string, context),
+                question)
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return bool(self.config.similarity_threshold)
+
+    # ==================== STORAGE ====================
+
+    def _get(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: str, entry: _Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.config.max_entries:
+                self._entries.popitem(last=False)
+
+    def _nearest(self, scope: str, vector: np.ndarray) -> Optional[_Entry]:
+        now = time.monotonic()
+        best, best_score = None, self.config.similarity_threshold
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.scope != scope or entry.vector is None:
+                    continue
+                if entry.expires_at is not None and entry.expires_at <= now:
+                    continue
+                score = float(np.dot(entry.vector, vector))
+                if score >= best_score:
+                    best, best_score = entry, score
+        return best
+
+    def _entry(self, scope: str, return_val: Sequence[Any], vector: Optional[np.ndarray]) -> _Entry:
+        ttl = self.config.ttl_seconds
+        return _Entry(
+            generations=[g.model_copy(deep=True) for g in return_val],
+            expires_at=time.monotonic() + ttl if ttl else None,
+            scope=scope,
+            vector=vector,
+        )
+
+    def _hit(self, entry: _Entry, semantic: bool = False) -> List[Any]:
+        with self._lock:
+            if semantic:
+                self.semantic_hits += 1
+            else:
+                self.hits += 1
+        return [g.model_copy(deep=True) for g in entry.generations]
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    # ==================== EMBEDDINGS ====================
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        if not text:
+            return None
+        try:
+            if self._embedder is None:
+                self._embedder = await get_cache_embedder()
+            vector = np.asarray(await self._embedder.embed_query(text), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Semantic response cache unavailable for {self.namespace}: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    # ==================== BaseCache ====================
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[List[Any]]:
+        key, _, _ = self._keys(prompt, llm_string)
+        entry = self._get(key)
+        if entry is None:
+            self._miss()
+            return None
+        return self._hit(entry)
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        key, scope, _ = self._keys(prompt, llm_string)
+        self._put(key, self._entry(scope, return_val, self._pending_vectors.pop(key, None)))
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[List[Any]]:
+        key, scope, question = self._keys(prompt, llm_string)
+        entry = self._get(key)
+        if entry is not None:
+            return self._hit(entry)
+
+        if self.semantic_enabled:
+            vector = await self._embed(question)
+            if vector is not None:
+                entry = self._nearest(scope, vector)
+                if entry is not None:
+                    return self._hit(entry, semantic=True)
+                # Reused by aupdate for the answer about to be generated
+                with self._lock:
+                    self._pending_vectors[key] = vector
+                    while len(self._pending_vectors) > self.config.max_entries:
+                        self._pending_vectors.pop(next(iter(self._pending_vectors)))
+        self._miss()
+        return None
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        key, scope, question = self._keys(prompt, llm_string)
+        with self._lock:
+            vector = self._pending_vectors.pop(key, None)
+        if vector is None and self.semantic_enabled:
+            vector = await self._embed(question)
+        self._put(key, self._entry(scope, return_val, vector))
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._pending_vectors.clear()
+
+    # ==================== STATS ====================
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(namespace: str, config: ResponseCacheConfig) -> ResponseCache:
+    """Process-wide cache of a node; entries survive across workflow runs"""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = ResponseCache(namespace, config)
+        else:
+            # Node settings may have been edited since the cache was created
+            cache.config = config
+        return cache
+
+
+def get_response_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit statistics of every node cache in this process"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.namespace: cache.stats for cache in caches}
+
+
+_embedder = None
+
+
+async def get_cache_embedder():
+    """Shared local embedding model of the semantic tier"""
+    global _embedder
+    if _embedder is None:
+        from app.modules.data.providers.vector.embedding import EmbeddingConfig
+
+        embedder = EmbeddingConfig(type="huggingface", device="cpu").get()
+        if not await embedder.initialize():
+            raise RuntimeError("embedding model failed to initialize")
+        _embedder = embedder
+    return _embedder
+
+
+def is_deterministic(llm: BaseChatModel) -> bool:
+    """Whether the model answers an identical prompt identically"""
+    temperature = getattr(llm, "temperature", None)
+    if temperature is None:
+        temperature = (getattr(llm, "model_kwargs", None) or {}).get("temperature")
+    return isinstance(temperature, (int, float)) and temperature == 0 and getattr(llm, "n", 1) in (None, 1)
+
+
+def with_response_cache(llm: BaseChatModel, namespace: str, config: Optional[ResponseCacheConfig]) -> BaseChatModel:
+    """
+    Copy of the model answering from the node's response cache.
+
+    Returns the model unchanged when caching is off or the model is not
+    deterministic. Cached models answer streaming calls in one chunk, since
+    LangChain only consults the cache on non-streaming calls.
+    """
+    if config is None or not config.enabled:
+        return llm
+    if not is_deterministic(llm):
+        logger.info(f"Response cache bypassed for {namespace}: model temperature is not 0")
+        return llm
+    return llm.model_copy(update={
+        "cache": get_response_cache(namespace, config),
+        "disable_streaming": True,
+    })
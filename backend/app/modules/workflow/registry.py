@@ -1,7 +1,7 @@
 """Registry for managing initialized agents"""
 
 import logging
-from typing import Union
+from typing import Any, AsyncIterator, Dict, Union
 
 from app.db.models import AgentModel
 from app.schemas.agent import AgentRead
@@ -42,25 +42,40 @@ class RegistryItem:
         else:
             logger.warning(f"Agent {self.agent_name} ({self.agent_id}) has no workflow assigned")
 
-    async def execute(self, session_message: str, metadata: dict) -> dict:
-        """Execute a workflow"""
+    def _input_data(self, session_message: str, metadata: dict) -> dict:
         if self.workflow_model is None:
             raise ValueError(
                 f"Cannot execute workflow for agent {self.agent_name} ({self.agent_id}): "
                 f"No workflow is assigned to this agent"
             )
 
-        thread_id = metadata.get("thread_id", None)
-
         # add the content blocks to the input data
-        input_data = {
+        return {
             "message": session_message,
             **metadata,
         }
 
+    async def execute(self, session_message: str, metadata: dict) -> dict:
+        """Execute a workflow"""
+        input_data = self._input_data(session_message, metadata)
+
         state = await self.workflow_engine.execute_from_node(
             self.workflow_model["id"],
             input_data=input_data,
-            thread_id=thread_id,
+            thread_id=metadata.get("thread_id", None),
         )
-        return state.format_state_as_response()
\ No newline at end of file
+        return state.format_state_as_response()
+
+    async def stream(self, session_message: str, metadata: dict) -> AsyncIterator[Dict[str, Any]]:
+        """Execute a workflow, yielding token events and then the final response"""
+        input_data = self._input_data(session_message, metadata)
+
+        async for event in self.workflow_engine.stream_from_node(
+            self.workflow_model["id"],
+            input_data=input_data,
+            thread_id=metadata.get("thread_id", None),
+        ):
+            if event["type"] == "final":
+                yield {"type": "final", "response": event["state"].format_state_as_response()}
+            else:
+                yield event
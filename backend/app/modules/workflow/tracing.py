@@ -0,0 +1,440 @@
+"""
+Span tracing of workflow runs.
+
+Each run gets a trace (its ID derived from the state's execution_id) made of
+spans for the run, each node, and the sub-operations inside a node: queue
+wait, DB scope creation, config resolution, LLM calls, tool calls and memory
+I/O. The current trace and span travel in context variables, so code deep in
+a node records spans with `trace_span(...)` without access to the state, and
+is a no-op outside a traced run.
+
+Finished traces are:
+- kept in a bounded in-process buffer, served as Gantt timelines by the API,
+- sampled into per node type duration reservoirs, served as percentiles,
+- appended to WORKFLOW_TRACE_EXPORT_PATH as OTLP/JSON (one
+  ExportTraceServiceRequest per line, the format of the OpenTelemetry
+  Collector's otlpjsonfile receiver).
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from app.core.config.settings import settings
+from app.core.tenant_scope import get_tenant_context
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "genassist-workflow"
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    name: str
+    category: str  # run, node, queue, db_scope, config, llm, tool, memory
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def end(self, error: Optional[str] = None, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+            if error:
+                self.error = error
+
+
+class WorkflowTrace:
+    """Spans of one workflow run (and of the runs nested in its nodes)"""
+
+    def __init__(self, execution_id: str, workflow_id: Optional[str], thread_id: str, tenant_id: str):
+        self.trace_id = uuid.UUID(execution_id).hex if _is_uuid(execution_id) else uuid.uuid4().hex
+        self.execution_id = execution_id
+        self.workflow_id = workflow_id
+        self.thread_id = thread_id
+        self.tenant_id = tenant_id
+        self.spans: List[Span] = []
+        self.finished = False
+
+    @property
+    def resource_attributes(self) -> Dict[str, Any]:
+        return {
+            "service.name": SERVICE_NAME,
+            "workflow.id": self.workflow_id or "",
+            "workflow.execution_id": self.execution_id,
+            "thread.id": self.thread_id,
+            "tenant.id": self.tenant_id,
+        }
+
+    def start_span(self, name: str, category: str, parent: Optional[Span] = None,
+                   start_ns: Optional[int] = None, **attributes: Any) -> Span:
+        span = Span(
+            trace_id=self.trace_id,
+            span_id=uuid.uuid4().hex[:16],
+            parent_span_id=parent.span_id if parent else None,
+            name=name,
+            category=category,
+            start_ns=start_ns or time.time_ns(),
+            attributes={k: v for k, v in attributes.items() if v is not None},
+        )
+        if not self.finished:
+            self.spans.append(span)
+        return span
+
+    @property
+    def root(self) -> Optional[Span]:
+        return self.spans[0] if self.spans else None
+
+    # ==================== EXPORT ====================
+
+    def timeline(self) -> Dict[str, Any]:
+        """Gantt rows ordered by start, offsets relative to the run start"""
+        root = self.root
+        origin = root.start_ns if root else 0
+        rows = [
+            {
+                "span_id": s.span_id,
+                "parent_span_id": s.parent_span_id,
+                "name": s.name,
+                "category": s.category,
+                "node_id": s.attributes.get("node.id"),
+                "node_type": s.attributes.get("node.type"),
+                "start_offset_ms": round((s.start_ns - origin) / 1e6, 3),
+                "duration_ms": round(s.duration_ms, 3),
+                "status": "error" if s.error else "ok",
+                "error": s.error,
+                "attributes": s.attributes,
+            }
+            for s in sorted(self.spans, key=lambda s: s.start_ns)
+        ]
+        return {
+            "trace_id": self.trace_id,
+            "execution_id": self.execution_id,
+            "workflow_id": self.workflow_id,
+            "thread_id": self.thread_id,
+            "tenant_id": self.tenant_id,
+            "duration_ms": round(root.duration_ms, 3) if root else 0,
+            "spans": rows,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """ExportTraceServiceRequest in OTLP/JSON encoding"""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes(self.resource_attributes)},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [_otlp_span(s) for s in self.spans],
+                }],
+            }],
+        }
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns or span.start_ns),
+        "attributes": _otlp_attributes({"span.category": span.category, **span.attributes}),
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_span_id:
+        otlp["parentSpanId"] = span.parent_span_id
+    return otlp
+
+
+# ==================== CONTEXT ====================
+
+_current_trace: contextvars.ContextVar[Optional[WorkflowTrace]] = contextvars.ContextVar(
+    "workflow_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "workflow_span", default=None)
+
+
+def current_trace() -> Optional[WorkflowTrace]:
+    return _current_trace.get()
+
+
+class trace_span:
+    """
+    Record a span under the current one, as a (sync or async) context manager.
+    A no-op when the run is not traced.
+
+        async with trace_span("memory.get_messages", "memory", thread_id=...):
+            ...
+    """
+
+    def __init__(self, name: str, category: str, start_ns: Optional[int] = None, **attributes: Any):
+        self.name = name
+        self.category = category
+        self.start_ns = start_ns
+        self.attributes = attributes
+        self.span: Optional[Span] = None
+        self._token = None
+
+    def __enter__(self) -> Optional[Span]:
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+        self.span = trace.start_span(
+            self.name, self.category, _current_span.get(), self.start_ns, **self.attributes)
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self.span is not None:
+            self.span.end(error=f"{exc_type.__name__}: {exc}" if exc_type else None)
+            _current_span.reset(self._token)
+        return False
+
+    async def __aenter__(self) -> Optional[Span]:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return self.__exit__(exc_type, exc, tb)
+
+
+def record_span(name: str, category: str, start_ns: int, end_ns: Optional[int] = None, **attributes: Any) -> None:
+    """Record an already measured span under the current one"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.start_span(name, category, _current_span.get(), start_ns, **attributes).end(end_ns=end_ns)
+
+
+# ==================== RUNS ====================
+
+class RunTrace:
+    """
+    Traces one workflow run. A run nested in a traced node (e.g. a tool
+    builder subflow) joins the outer trace as a child span instead of
+    starting its own.
+    """
+
+    def __init__(self, state: Any):
+        self.state = state
+        self.trace: Optional[WorkflowTrace] = None
+        self.owner = False
+        self.span: Optional[Span] = None
+        self._tokens: List[Tuple[contextvars.ContextVar, contextvars.Token]] = []
+
+    def start(self) -> Optional[WorkflowTrace]:
+        trace = _current_trace.get()
+        if trace is None:
+            if not settings.WORKFLOW_TRACING_ENABLED or random.random() >= settings.WORKFLOW_TRACE_SAMPLE_RATE:
+                return None
+            trace = WorkflowTrace(
+                self.state.execution_id, self.state.workflow_id, self.state.thread_id, get_tenant_context())
+            self.owner = True
+            self._tokens.append((_current_trace, _current_trace.set(trace)))
+        self.trace = trace
+        self.span = trace.start_span(
+            "workflow.run", "run", _current_span.get(),
+            **{"workflow.id": self.state.workflow_id, "workflow.execution_id": self.state.execution_id})
+        self._tokens.append((_current_span, _current_span.set(self.span)))
+        return trace
+
+    def finish(self, error: Optional[str] = None) -> None:
+        if self.trace is None:
+            return
+        self.span.end(error=error)
+        for var, token in reversed(self._tokens):
+            var.reset(token)
+        self._tokens.clear()
+        if self.owner:
+            self.trace.finished = True
+            _store(self.trace)
+
+
+# ==================== STORAGE AND STATS ====================
+
+_traces: "OrderedDict[str, WorkflowTrace]" = OrderedDict()
+_reservoirs: Dict[Tuple[str, str, str], "_Reservoir"] = {}
+_lock = threading.Lock()
+_export_lock = threading.Lock()
+
+
+class _Reservoir:
+    """Uniform sample of durations (Algorithm R)"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.count = 0
+        self.samples: List[float] = []
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        else:
+            i = random.randrange(self.count)
+            if i < self.size:
+                self.samples[i] = value
+
+
+def _store(trace: WorkflowTrace) -> None:
+    with _lock:
+        _traces[trace.execution_id] = trace
+        while len(_traces) > settings.WORKFLOW_TRACE_BUFFER_SIZE:
+            _traces.popitem(last=False)
+        for span in trace.spans:
+            if span.category in ("node", "queue", "llm", "tool", "memory", "db_scope"):
+                label = span.attributes.get("node.type") or span.name
+                key = (trace.tenant_id, span.category, label)
+                reservoir = _reservoirs.get(key)
+                if reservoir is None:
+                    reservoir = _reservoirs[key] = _Reservoir(settings.WORKFLOW_TRACE_RESERVOIR_SIZE)
+                reservoir.add(span.duration_ms)
+
+    if settings.WORKFLOW_TRACE_EXPORT_PATH:
+        line = json.dumps(trace.to_otlp(), default=str)
+        try:
+            asyncio.get_running_loop().run_in_executor(None, _append_export, line)
+        except RuntimeError:
+            _append_export(line)
+
+
+def _append_export(line: str) -> None:
+    path = settings.WORKFLOW_TRACE_EXPORT_PATH
+    try:
+        with _export_lock:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        logger.warning(f"Failed to export workflow trace to {path}: {e}")
+
+
+def get_trace(execution_id: str, tenant_id: Optional[str] = None) -> Optional[WorkflowTrace]:
+    """A recent trace of this process, if it belongs to the tenant"""
+    with _lock:
+        trace = _traces.get(execution_id)
+    if trace is None or (tenant_id is not None and trace.tenant_id != tenant_id):
+        return None
+    return trace
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+    return round(ordered[index], 3)
+
+
+def get_duration_stats(tenant_id: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Sampled duration percentiles (ms) of the tenant's spans in this process:
+    {category: {node type or span name: {count, p50, p90, p99, max}}}
+    """
+    with _lock:
+        items = [(k, list(r.samples), r.count) for k, r in _reservoirs.items() if k[0] == tenant_id]
+    stats: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for (_, category, label), samples, count in items:
+        ordered = sorted(samples)
+        stats.setdefault(category, {})[label] = {
+            "count": count,
+            "sampled": len(ordered),
+            "p50_ms": _percentile(ordered, 0.5),
+            "p90_ms": _percentile(ordered, 0.9),
+            "p99_ms": _percentile(ordered, 0.99),
+            "max_ms": round(ordered[-1], 3),
+        }
+    return stats
+
+
+def reset_traces() -> None:
+    with _lock:
+        _traces.clear()
+        _reservoirs.clear()
+
+
+# ==================== LLM CALLS ====================
+
+class LLMTracingCallback(AsyncCallbackHandler):
+    """Records a span per chat model call, with token usage when reported"""
+
+    run_inline = True
+
+    def __init__(self):
+        self._spans: Dict[Any, Span] = {}
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None,
+                                  invocation_params=None, **kwargs) -> None:
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        params = invocation_params or {}
+        self._spans[run_id] = trace.start_span(
+            "llm.call", "llm", _current_span.get(),
+            **{"llm.model": params.get("model") or params.get("model_name"),
+               "llm.provider": params.get("_type")})
+
+    async def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        usage = _usage(response)
+        if usage:
+            span.attributes.update(usage)
+        span.end()
+
+    async def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        span = self._spans.pop(run_id, None)
+        if span is not None:
+            span.end(error=f"{type(error).__name__}: {error}")
+
+
+def _usage(response: Any) -> Dict[str, int]:
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if metadata:
+                return {"llm.input_tokens": metadata.get("input_tokens", 0),
+                        "llm.output_tokens": metadata.get("output_tokens", 0)}
+    return {}
+
+
+llm_tracing_callback = LLMTracingCallback()
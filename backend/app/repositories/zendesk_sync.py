@@ -0,0 +1,94 @@
+import datetime
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+
+from injector import inject
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import generate_sequential_uuid
+from app.db.models.zendesk_sync import ZendeskSyncedArticleModel, ZendeskSyncStateModel
+
+_UPSERT_BATCH_SIZE = 1000
+
+
+@inject
+class ZendeskSyncRepository:
+    """Persists Zendesk article sync watermarks and per-article versions per knowledge base."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_state(self, kb_id: UUID) -> Optional[ZendeskSyncStateModel]:
+        result = await self.db.execute(
+            select(ZendeskSyncStateModel).where(ZendeskSyncStateModel.kb_id == kb_id)
+        )
+        return result.scalars().first()
+
+    async def save_state(
+        self,
+        kb_id: UUID,
+        watermark: Optional[int],
+        last_full_sync: Optional[datetime.datetime] = None,
+    ) -> None:
+        values = {"watermark": watermark}
+        if last_full_sync:
+            values["last_full_sync"] = last_full_sync
+        stmt = insert(ZendeskSyncStateModel).values(
+            id=generate_sequential_uuid(), kb_id=kb_id, is_deleted=0, **values
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="zendesk_sync_states_kb_unique", set_=values
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def get_article_versions(self, kb_id: UUID) -> Dict[str, Optional[str]]:
+        """Return {zendesk_article_id: updated_at} for all articles synced into the KB."""
+        result = await self.db.execute(
+            select(
+                ZendeskSyncedArticleModel.article_id,
+                ZendeskSyncedArticleModel.article_updated_at,
+            ).where(ZendeskSyncedArticleModel.kb_id == kb_id)
+        )
+        return {row.article_id: row.article_updated_at for row in result}
+
+    async def upsert_article_versions(
+        self, kb_id: UUID, versions: Dict[str, Optional[str]]
+    ) -> None:
+        if not versions:
+            return
+        rows = [
+            {
+                "id": generate_sequential_uuid(),
+                "kb_id": kb_id,
+                "article_id": article_id,
+                "article_updated_at": updated_at,
+                "is_deleted": 0,
+            }
+            for article_id, updated_at in versions.items()
+        ]
+        # Stay well below the Postgres bind parameter limit per statement
+        for start in range(0, len(rows), _UPSERT_BATCH_SIZE):
+            stmt = insert(ZendeskSyncedArticleModel).values(
+                rows[start:start + _UPSERT_BATCH_SIZE]
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint="zendesk_synced_articles_unique",
+                set_={"article_updated_at": stmt.excluded.article_updated_at},
+            )
+            await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def delete_articles(self, kb_id: UUID, article_ids: Iterable[str]) -> None:
+        article_ids = list(article_ids)
+        if not article_ids:
+            return
+        await self.db.execute(
+            delete(ZendeskSyncedArticleModel).where(
+                ZendeskSyncedArticleModel.kb_id == kb_id,
+                ZendeskSyncedArticleModel.article_id.in_(article_ids),
+            )
+        )
+        await self.db.commit()
@@ -40,6 +40,7 @@ class ApiKeyRead(ApiKeyBase):
 
 
 class ApiKeyInternal(BaseModel):
+    id: Optional[UUID] = None
     permissions: list[str] = []
     roles: list[RoleRead] = []
     user: UserAuth
@@ -370,6 +370,43 @@ AGENT_RAG_FORM_SCHEMAS_VECTOR_AND_LEGRA: Dict[str, TypeSchema] = {
                     ],
                 },
             ),
+            SectionSchema(
+                name="hybrid",
+                label="Hybrid Search",
+                fields=[
+                    FieldSchema(
+                        name="hybrid_enabled",
+                        type="boolean",
+                        label="Keyword Search (BM25)",
+                        required=False,
+                        default=True,
+                        description="Combine keyword matches with semantic search; "
+                                    "exact identifiers (SKUs, error codes) are found without embedding",
+                    ),
+                    FieldSchema(
+                        name="hybrid_vector_weight",
+                        type="number",
+                        label="Semantic Weight",
+                        required=False,
+                        default=1.0,
+                        min=0,
+                        max=10,
+                        step=0.1,
+                        description="Weight of semantic results when merging rankings",
+                    ),
+                    FieldSchema(
+                        name="hybrid_lexical_weight",
+                        type="number",
+                        label="Keyword Weight",
+                        required=False,
+                        default=1.0,
+                        min=0,
+                        max=10,
+                        step=0.1,
+                        description="Weight of keyword results when merging rankings",
+                    ),
+                ],
+            ),
         ],
     ),
     "legra": TypeSchema(
@@ -458,6 +495,19 @@ AGENT_RAG_FORM_SCHEMAS_VECTOR_AND_LEGRA: Dict[str, TypeSchema] = {
                         ],
                         description="Distance metric for graph construction",
                     ),
+                    FieldSchema(
+                        name="graph_knn_mode",
+                        type="select",
+                        label="Neighbor Search",
+                        required=False,
+                        default="auto",
+                        options=[
+                            {"value": "auto", "label": "Auto (exact for small KBs)"},
+                            {"value": "exact", "label": "Exact"},
+                            {"value": "approximate", "label": "Approximate (HNSW)"},
+                        ],
+                        description="How nearest neighbors are found when building the kNN graph",
+                    ),
                 ],
             ),
             SectionSchema(
@@ -683,6 +733,76 @@ AGENT_RAG_FORM_SCHEMAS_VECTOR_AND_LEGRA: Dict[str, TypeSchema] = {
     #         ),
     #     ],
     # ),
+    "rerank": TypeSchema(
+        name="Reranking",
+        description="Rerank retrieved chunks with a cross-encoder so fewer, more relevant chunks reach the LLM",
+        sections=[
+            SectionSchema(
+                name="rerank",
+                label="Reranking",
+                fields=[
+                    FieldSchema(
+                        name="rerank_model_name",
+                        type="select",
+                        label="Reranker Model",
+                        required=True,
+                        default="cross-encoder/ms-marco-MiniLM-L-6-v2",
+                        options=[
+                            {"value": "cross-encoder/ms-marco-MiniLM-L-6-v2", "label": "MS MARCO MiniLM-L6 (fast)"},
+                            {"value": "cross-encoder/ms-marco-MiniLM-L-12-v2", "label": "MS MARCO MiniLM-L12"},
+                            {"value": "BAAI/bge-reranker-base", "label": "BGE Reranker Base"},
+                        ],
+                        description="Cross-encoder used to score query/chunk pairs",
+                    ),
+                    FieldSchema(
+                        name="rerank_backend",
+                        type="select",
+                        label="Backend",
+                        required=False,
+                        default="torch",
+                        options=[
+                            {"value": "torch", "label": "PyTorch"},
+                            {"value": "onnx", "label": "ONNX Runtime"},
+                        ],
+                        description="Inference backend (ONNX is usually faster on CPU)",
+                    ),
+                    FieldSchema(
+                        name="rerank_candidate_multiplier",
+                        type="number",
+                        label="Candidates per Result",
+                        required=False,
+                        default=4,
+                        min=1,
+                        max=10,
+                        step=1,
+                        description="How many candidates to retrieve and rerank per returned result",
+                    ),
+                    FieldSchema(
+                        name="rerank_latency_budget_ms",
+                        type="number",
+                        label="Latency Budget (ms)",
+                        required=False,
+                        default=300,
+                        min=0,
+                        max=5000,
+                        step=50,
+                        description="Candidates not scored within this time keep their retrieval order (0 = no limit)",
+                    ),
+                    FieldSchema(
+                        name="rerank_min_score",
+                        type="number",
+                        label="Minimum Relevance",
+                        required=False,
+                        default=0.1,
+                        min=0,
+                        max=1,
+                        step=0.05,
+                        description="Chunks scoring below this relevance are not passed to the LLM",
+                    ),
+                ],
+            ),
+        ],
+    ),
 }
 
 # For backwards compatibility, alias to the main schema (includes all types: vector, legra, lightrag)
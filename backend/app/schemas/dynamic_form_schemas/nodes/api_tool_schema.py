@@ -1,5 +1,5 @@
 from typing import List
-from ..base import FieldSchema
+from ..base import ConditionalField, FieldSchema
 
 API_TOOL_NODE_DIALOG_SCHEMA: List[FieldSchema] = [
     FieldSchema(
@@ -27,5 +27,24 @@ API_TOOL_NODE_DIALOG_SCHEMA: List[FieldSchema] = [
         type="text",
         label="Request Body (JSON)",
         required=False
+    ),
+    FieldSchema(
+        name="cacheResponses",
+        type="boolean",
+        label="Cache Responses",
+        required=False,
+        default=False,
+        description="Reuse responses to identical requests, following the API's Cache-Control and ETag headers. Only enable for endpoints that read data; PUT, PATCH and DELETE are never cached."
+    ),
+    FieldSchema(
+        name="cacheTtlSeconds",
+        type="number",
+        label="Cache Lifetime (seconds)",
+        required=False,
+        default=60,
+        min=0,
+        description="Used when the API sends no caching headers.",
+        conditional=ConditionalField(field="cacheResponses", value=True),
+        advanced=True
     )
 ]
@@ -1,5 +1,5 @@
 from typing import List
-from ..base import FieldSchema
+from ..base import ConditionalField, FieldSchema
 
 LLM_MODEL_NODE_DIALOG_SCHEMA: List[FieldSchema] = [
     FieldSchema(
@@ -38,4 +38,44 @@ LLM_MODEL_NODE_DIALOG_SCHEMA: List[FieldSchema] = [
         label="Enable Memory",
         required=True
     ),
+    FieldSchema(
+        name="memoryTokenBudget",
+        type="number",
+        label="Memory Token Budget",
+        required=False,
+        description="Summarise older turns so the history sent with each prompt stays within this many tokens. Leave empty to send the last messages as they are.",
+        min=0,
+        conditional=ConditionalField(field="memory", value=True),
+        advanced=True
+    ),
+    FieldSchema(
+        name="cacheResponses",
+        type="boolean",
+        label="Cache Responses",
+        required=False,
+        default=False,
+        description="Reuse answers to repeated prompts. Only applies when the provider temperature is 0."
+    ),
+    FieldSchema(
+        name="cacheTtlSeconds",
+        type="number",
+        label="Cache Lifetime (seconds)",
+        required=False,
+        default=3600,
+        min=0,
+        conditional=ConditionalField(field="cacheResponses", value=True),
+        advanced=True
+    ),
+    FieldSchema(
+        name="cacheSimilarityThreshold",
+        type="number",
+        label="Semantic Cache Similarity",
+        required=False,
+        description="Also reuse answers to similar questions (0-1, e.g. 0.95). Leave empty for exact matches only.",
+        min=0,
+        max=1,
+        step=0.01,
+        conditional=ConditionalField(field="cacheResponses", value=True),
+        advanced=True
+    ),
 ]
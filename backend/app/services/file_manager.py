@@ -1,14 +1,25 @@
 from ast import Dict
 from uuid import UUID
 import uuid
-from fastapi import UploadFile
+from fastapi import UploadFile, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from injector import inject
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 import logging
 import base64
+import json
+import os
 from urllib.parse import quote
 
 from app.modules.filemanager.providers.base import BaseStorageProvider
+from app.modules.filemanager.streaming import (
+    RangeNotSatisfiable,
+    etag_matches,
+    http_date,
+    if_range_allows,
+    iter_base64,
+    parse_byte_range,
+)
 from app.db.models.file import FileModel
 from app.repositories.file_manager import FileManagerRepository
 from app.schemas.file import FileCreate, FileUpdate
@@ -87,7 +98,7 @@ class FileManagerService:
             "content-disposition": content_disposition,
             "x-content-type-options": "nosniff",
             "access-control-allow-origin": "*",
-            "access-control-expose-headers": "Age, Date, Content-Length, Content-Range, X-Content-Duration, X-Cache",
+            "access-control-expose-headers": "Age, Date, Content-Length, Content-Range, X-Content-Duration, X-Cache, ETag, Accept-Ranges",
             "cache-control": "public, max-age=31536000"
         }
 
@@ -118,9 +129,6 @@ class FileManagerService:
         """
 
 
-        # read from the file
-        file_content = await file.read()
-        file_size = len(file_content)
         file_extension = file.filename.split(".")[-1].lower()
         file_mime_type = file.content_type
         file_name = file.filename
@@ -152,6 +160,19 @@ class FileManagerService:
 
         user_id = get_current_user_id()
 
+        # Hand the spooled upload to the provider as a file object so it is copied
+        # in chunks instead of being read into memory
+        upload_stream = file.file
+        start = upload_stream.tell()
+        file_size = upload_stream.seek(0, os.SEEK_END) - start
+        upload_stream.seek(start)
+
+        await self.storage_provider.upload_file(
+            file_content=upload_stream,
+            storage_path=relative_storage_path,
+            file_metadata={"name": file_name, "mime_type": file_mime_type}
+        )
+
         file_data = FileCreate(
             file=file,
             name=file_name,
@@ -166,14 +187,6 @@ class FileManagerService:
             permissions=permissions,
         )
 
-        # Upload file content if provided
-        if file_content is not None:
-            uploaded_file = await self.storage_provider.upload_file(
-                file_content=file_content,
-                storage_path=file_data.storage_path,
-                file_metadata={"name": file_data.name, "mime_type": file_data.mime_type}
-            )
-
         # Create file metadata record
         db_file = await self.repository.create_file(file_data, user_id)
         return db_file
@@ -184,6 +197,11 @@ class FileManagerService:
 
     async def get_file_content(self, file: FileModel) -> bytes:
         """Get file content from storage provider."""
+        storage_provider = await self._get_file_storage_provider(file)
+        return await storage_provider.download_file(file.storage_path)
+
+    async def _get_file_storage_provider(self, file: FileModel) -> BaseStorageProvider:
+        """Initialize the storage provider that holds the given file."""
         file_storage_provider = file.storage_provider
 
         if not file_storage_provider:
@@ -203,8 +221,89 @@ class FileManagerService:
         if not self.storage_provider.is_initialized():
             raise ValueError(f"Storage provider {self.storage_provider} not initialized")
 
-        content = await self.storage_provider.download_file(file.storage_path)
-        return content
+        return self.storage_provider
+
+    async def build_file_response(
+        self, file: FileModel, request: Request, disposition_type: str = "inline"
+    ) -> Response:
+        """
+        Build a streamed response for a file with ETag, If-None-Match and Range support.
+
+        Local files are served by FileResponse (sendfile / pathsend where the server
+        supports it); other providers stream ranged reads. Memory use is independent
+        of the file size.
+        """
+        storage_provider = await self._get_file_storage_provider(file)
+        headers, media_type = self.build_file_headers(file, disposition_type=disposition_type)
+        headers.pop("content-Length", None)
+
+        info = await storage_provider.get_file_info(file.storage_path)
+        size = info.size if info else file.size
+        etag = info.etag if info and info.etag else None
+        last_modified = info.last_modified if info else None
+        if etag is None:
+            updated_at = getattr(file, "updated_at", None)
+            version = updated_at.timestamp() if updated_at else ""
+            etag = f'W/"{file.id}-{size}-{version}"'
+        headers["etag"] = etag
+        if last_modified:
+            headers["last-modified"] = http_date(last_modified)
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            not_modified_headers = {
+                key: value for key, value in headers.items()
+                if key in ("etag", "last-modified", "cache-control")
+            }
+            return Response(status_code=304, headers=not_modified_headers)
+
+        local_path = storage_provider.get_local_path(file.storage_path)
+        if local_path is not None:
+            # FileResponse handles Range, If-Range and HEAD itself
+            return FileResponse(local_path, headers=headers, media_type=media_type)
+
+        status_code = 200
+        start, end = 0, None
+        if size is not None:
+            headers["accept-ranges"] = "bytes"
+            headers["content-length"] = str(size)
+            if if_range_allows(request.headers.get("if-range"), etag, last_modified):
+                try:
+                    byte_range = parse_byte_range(request.headers.get("range"), size)
+                except RangeNotSatisfiable:
+                    return Response(status_code=416, headers={"content-range": f"bytes */{size}"})
+                if byte_range:
+                    start, end = byte_range
+                    status_code = 206
+                    headers["content-range"] = f"bytes {start}-{end}/{size}"
+                    headers["content-length"] = str(end - start + 1)
+
+        if request.method == "HEAD":
+            return Response(status_code=status_code, headers=headers, media_type=media_type)
+
+        return StreamingResponse(
+            storage_provider.stream_file(file.storage_path, start=start, end=end),
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+        )
+
+    async def build_file_base64_response(self, file: FileModel) -> StreamingResponse:
+        """Stream a file as a JSON document with base64 encoded content."""
+        storage_provider = await self._get_file_storage_provider(file)
+        head = json.dumps({
+            "file_id": str(file.id),
+            "name": file.name,
+            "mime_type": file.mime_type,
+            "size": file.size,
+        })[:-1] + ', "content": "'
+
+        async def _body() -> AsyncIterator[bytes]:
+            yield head.encode("utf-8")
+            async for encoded in iter_base64(storage_provider.stream_file(file.storage_path)):
+                yield encoded
+            yield b'"}'
+
+        return StreamingResponse(_body(), media_type="application/json")
 
     async def get_file_base64(self, file_id: UUID) -> str:
         """Get file content as base64 encoded string."""
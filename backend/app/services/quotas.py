@@ -1,51 +1,272 @@
-from fastapi_injector import Injected
-from sqlalchemy.ext.asyncio import AsyncSession
 import logging
-from redis import Redis
-import os
-from typing import Optional
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 
-from app.schemas.api_key import ApiKeyRead
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config.settings import settings
+from app.core.exceptions.error_messages import ErrorKey
+from app.core.exceptions.exception_classes import AppException
 
 logger = logging.getLogger(__name__)
 
-@Injected
+
+# Sliding-window counter over one or more keys, evaluated atomically.
+#
+# Each key is a hash holding the start of the current fixed window and the
+# counts of the current and previous windows. The effective usage is the
+# current count plus the previous count weighted by how much of the previous
+# window still overlaps the sliding window. All keys must allow the request
+# for it to be granted, and all keys are charged by the same amount.
+#
+# KEYS: quota hashes (must share a hash tag in Redis Cluster)
+# ARGV[1]: window length in ms
+# ARGV[2]: requested permits (local allowance batch)
+# ARGV[3..]: limit per key, in KEYS order
+#
+# Returns {granted, remaining, reset_ms, limit} for the most constrained key.
+_SLIDING_WINDOW_LUA = """
+local window = tonumber(ARGV[1])
+local requested = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window_start = now - (now % window)
+local weight = (window - (now - window_start)) / window
+
+local states = {}
+local available = nil
+local tightest = 1
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i + 2])
+    local data = redis.call('HMGET', key, 'start', 'curr', 'prev')
+    local start = tonumber(data[1]) or window_start
+    local curr = tonumber(data[2]) or 0
+    local prev = tonumber(data[3]) or 0
+    if start ~= window_start then
+        if window_start - start == window then
+            prev = curr
+        else
+            prev = 0
+        end
+        curr = 0
+    end
+    local used = math.floor(prev * weight) + curr
+    local free = limit - used
+    if free < 0 then
+        free = 0
+    end
+    if available == nil or free < available then
+        available = free
+        tightest = i
+    end
+    states[i] = {curr, prev, limit, used}
+end
+
+local granted = 0
+if available >= requested then
+    granted = requested
+elseif available >= 1 then
+    granted = 1
+end
+
+for i, key in ipairs(KEYS) do
+    local state = states[i]
+    redis.call('HSET', key, 'start', window_start, 'curr', state[1] + granted, 'prev', state[2])
+    redis.call('PEXPIRE', key, window * 2)
+end
+
+local tight = states[tightest]
+local remaining = tight[3] - tight[4] - granted
+if remaining < 0 then
+    remaining = 0
+end
+return {granted, remaining, window - (now - window_start), tight[3]}
+"""
+
+
+@dataclass
+class QuotaStatus:
+    """Outcome of a quota check, used to populate rate limit response headers."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_seconds: int
+
+
+@dataclass
+class _LocalAllowance:
+    permits: int
+    expires_at: float
+    limit: int
+    remaining: int
+    reset_at: float
+
+
 class QuotaService:
+    """
+    Enforces per API key and per tenant request quotas with a Redis sliding window.
+
+    A single Lua script checks and charges every quota that applies to a request,
+    so each Redis call is one round trip. When there is plenty of headroom the
+    script reserves a small batch of permits that is then spent from a short-lived
+    in-process allowance, so hot keys do not hit Redis on every request. Denials
+    are cached locally for the same short period.
+    """
+
     def __init__(
         self,
-        db: AsyncSession = Injected(AsyncSession),
-        redis_client: Optional[Redis] = None,
+        redis_client: Redis,
+        window_seconds: Optional[int] = None,
+        tenant_limit: Optional[int] = None,
+        api_key_limit: Optional[int] = None,
+        allowance_batch: Optional[int] = None,
+        allowance_ttl: Optional[float] = None,
     ):
-        self.db = db
-        self.redis_client = redis_client or Redis(
-            host=os.environ.get("REDIS_HOST", "redis"),
-            port=int(os.environ.get("REDIS_PORT", 6379)),
-            db=0,
-            decode_responses=True
+        self.redis_client = redis_client
+        self.window_seconds = window_seconds or settings.DEFAULT_WINDOW_SECONDS
+        self.tenant_limit = (
+            tenant_limit if tenant_limit is not None else settings.QUOTA_TENANT_PER_WINDOW
+        )
+        self.api_key_limit = (
+            api_key_limit if api_key_limit is not None else settings.QUOTA_API_KEY_PER_WINDOW
+        )
+        self.allowance_batch = max(
+            1, allowance_batch or settings.QUOTA_LOCAL_ALLOWANCE_BATCH
         )
+        self.allowance_ttl = (
+            allowance_ttl if allowance_ttl is not None else settings.QUOTA_LOCAL_ALLOWANCE_TTL
+        )
+        self._script = redis_client.register_script(_SLIDING_WINDOW_LUA)
+        self._allowances: Dict[str, _LocalAllowance] = {}
+        self._denied_until: Dict[str, Tuple[float, QuotaStatus]] = {}
+        self._next_prune = 0.0
+
+    def _quota_keys(
+        self, tenant_id: str, api_key_id: Optional[str]
+    ) -> Tuple[list[str], list[int]]:
+        # The {tenant} hash tag keeps every key of one check in the same cluster slot
+        keys, limits = [], []
+        if self.tenant_limit > 0:
+            keys.append(f"quota:{{{tenant_id}}}:tenant")
+            limits.append(self.tenant_limit)
+        if api_key_id and self.api_key_limit > 0:
+            keys.append(f"quota:{{{tenant_id}}}:api_key:{api_key_id}")
+            limits.append(self.api_key_limit)
+        return keys, limits
+
+    def _prune(self, now: float) -> None:
+        """Drop expired allowances and denials, including those of keys that went quiet."""
+        if now < self._next_prune:
+            return
+        self._next_prune = now + max(self.allowance_ttl, 1.0)
+        self._allowances = {
+            key: allowance for key, allowance in self._allowances.items()
+            if allowance.permits > 0 and now < allowance.expires_at
+        }
+        self._denied_until = {
+            key: denied for key, denied in self._denied_until.items() if now < denied[0]
+        }
+
+    def _take_local(self, cache_key: str, now: float) -> Optional[QuotaStatus]:
+        denied = self._denied_until.get(cache_key)
+        if denied:
+            until, status = denied
+            if now < until:
+                return QuotaStatus(
+                    allowed=False,
+                    limit=status.limit,
+                    remaining=0,
+                    reset_seconds=max(1, int(until - now + 0.999)),
+                )
+            del self._denied_until[cache_key]
+
+        allowance = self._allowances.get(cache_key)
+        if allowance is None:
+            return None
+        if allowance.permits <= 0 or now >= allowance.expires_at:
+            del self._allowances[cache_key]
+            return None
+        allowance.permits -= 1
+        return QuotaStatus(
+            allowed=True,
+            limit=allowance.limit,
+            remaining=allowance.remaining + allowance.permits,
+            reset_seconds=max(0, int(allowance.reset_at - now + 0.999)),
+        )
+
+    async def check_quota(
+        self, tenant_id: str, api_key_id: Optional[str] = None
+    ) -> Optional[QuotaStatus]:
+        """
+        Consume one request from the tenant quota and, if given, the API key quota.
 
-    async def enforce_quota(self, api_key: ApiKeyRead):
+        Returns None when no quota applies or Redis is unavailable (fail open).
         """
-        Enforce usage quota for a given API key using a sliding window algorithm with Redis.
+        keys, limits = self._quota_keys(tenant_id, api_key_id)
+        if not keys:
+            return None
+
+        cache_key = keys[-1]
+        now = time.monotonic()
+        self._prune(now)
+        local_status = self._take_local(cache_key, now)
+        if local_status is not None:
+            return local_status
+
+        try:
+            granted, remaining, reset_ms, limit = await self._script(
+                keys=keys,
+                args=[self.window_seconds * 1000, self.allowance_batch, *limits],
+            )
+        except RedisError as e:
+            logger.warning(f"Quota check skipped, Redis unavailable: {e}")
+            return None
+
+        granted, remaining, limit = int(granted), int(remaining), int(limit)
+        reset_seconds = max(1, int(int(reset_ms) / 1000 + 0.999))
+
+        if granted <= 0:
+            status = QuotaStatus(
+                allowed=False, limit=limit, remaining=0, reset_seconds=reset_seconds
+            )
+            if self.allowance_ttl > 0:
+                self._denied_until[cache_key] = (
+                    now + min(self.allowance_ttl, reset_seconds),
+                    status,
+                )
+            return status
+
+        if granted > 1 and self.allowance_ttl > 0:
+            self._allowances[cache_key] = _LocalAllowance(
+                permits=granted - 1,
+                expires_at=now + min(self.allowance_ttl, reset_seconds),
+                limit=limit,
+                remaining=remaining,
+                reset_at=now + reset_seconds,
+            )
+        return QuotaStatus(
+            allowed=True,
+            limit=limit,
+            remaining=remaining + granted - 1,
+            reset_seconds=reset_seconds,
+        )
+
+    async def enforce_quota(
+        self, tenant_id: str, api_key_id: Optional[str] = None
+    ) -> Optional[QuotaStatus]:
         """
-        # TODO enforce quota, adding db_field
-        # now = int(time.time())
-        # window_start = now - project_params.DEFAULT_WINDOW_SECONDS
-        # redis_key = f"quota:{api_key.id}"
-        #
-        # # Remove old timestamps
-        # self.redis_client.zremrangebyscore(redis_key, 0, window_start)
-        #
-        # # Count how many requests are in the window
-        # request_count = self.redis_client.zcard(redis_key)
-        #
-        # # Check quota
-        # if request_count >= api_key.usage_quota:
-        #     logger.warning(f"Quota exceeded for API key {api_key.id}")
-        #     raise AppException(status_code=429, error_key=ErrorKey.QUOTA_EXCEEDED)
-        #
-        # # Add the current timestamp
-        # self.redis_client.zadd(redis_key, {now: now})
-        # self.redis_client.expire(redis_key, project_params.DEFAULT_WINDOW_SECONDS)
-        pass
+        Enforce usage quota for a tenant and optional API key using a sliding window.
 
+        Raises AppException (429) when the quota is exhausted.
+        """
+        status = await self.check_quota(tenant_id, api_key_id)
+        if status is not None and not status.allowed:
+            logger.warning(
+                f"Quota exceeded for tenant {tenant_id}"
+                + (f", API key {api_key_id}" if api_key_id else "")
+            )
+            raise AppException(status_code=429, error_key=ErrorKey.QUOTA_EXCEEDED)
+        return status
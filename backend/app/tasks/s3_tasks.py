@@ -8,7 +8,8 @@ from croniter import croniter
 from app.dependencies.injector import injector
 from app.core.utils.s3_utils import S3Client
 from app.modules.data.manager import AgentRAGServiceManager
-from app.modules.data.utils import FileTextExtractor
+from app.modules.data.providers.vector.db.faiss import flush_faiss_collections
+from app.modules.data.utils import get_extraction_service
 from app.schemas.agent_knowledge import KBCreate
 from app.services.agent_knowledge import KnowledgeBaseService
 from app.services.datasources import DataSourceService
@@ -39,10 +40,15 @@ def import_s3_files_to_kb():
 async def import_s3_files_to_kb_async_with_scope():
     """Wrapper to run S3 import for all tenants"""
     from app.tasks.base import run_task_with_tenant_support
-    return await run_task_with_tenant_support(
-        import_s3_files_to_kb_async,
-        "S3 file import"
-    )
+    try:
+        return await run_task_with_tenant_support(
+            import_s3_files_to_kb_async,
+            "S3 file import"
+        )
+    finally:
+        # Celery runs this on a loop that stops when it returns, before the
+        # write-behind flush of the vector store would run
+        await flush_faiss_collections()
 
 
 async def import_s3_files_to_kb_async(kb_id: Optional[UUID] = None):
@@ -204,7 +210,7 @@ async def import_s3_files_to_kb_async(kb_id: Optional[UUID] = None):
                 # Download file content
                 file_content = s3_client.get_file_content(file_info["key"])
                 logger.info(f"Extracting text from {file_info}...")
-                extracted_text = FileTextExtractor().extract(
+                extracted_text = await get_extraction_service().extract(
                     filename=file_info["key"], content=file_content
                 )
 
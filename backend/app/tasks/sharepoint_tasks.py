@@ -6,9 +6,10 @@ from typing import Optional
 from uuid import UUID
 from croniter import croniter, CroniterBadCronError
 from celery import shared_task
-from app.modules.data.utils import FileTextExtractor
+from app.modules.data.utils import get_extraction_service
 from app.dependencies.injector import injector
 from app.modules.data.manager import AgentRAGServiceManager
+from app.modules.data.providers.vector.db.faiss import flush_faiss_collections
 from app.schemas.agent_knowledge import KBCreate
 from app.services.agent_knowledge import KnowledgeBaseService
 from app.services.datasources import DataSourceService
@@ -55,10 +56,15 @@ def import_sharepoint_files_to_kb():
 async def import_sharepoint_files_to_kb_async_with_scope():
     """Wrapper to run SharePoint import for all tenants"""
     from app.tasks.base import run_task_with_tenant_support
-    return await run_task_with_tenant_support(
-        import_sharepoint_files_to_kb_async,
-        "SharePoint file import"
-    )
+    try:
+        return await run_task_with_tenant_support(
+            import_sharepoint_files_to_kb_async,
+            "SharePoint file import"
+        )
+    finally:
+        # Celery runs this on a loop that stops when it returns, before the
+        # write-behind flush of the vector store would run
+        await flush_faiss_collections()
 
 
 async def import_sharepoint_files_to_kb_async(kb_id: Optional[UUID] = None):
@@ -149,7 +155,7 @@ async def import_sharepoint_files_to_kb_async(kb_id: Optional[UUID] = None):
 
             # ---- enumerate files ----
             try:
-                result = sp_client.list_files()
+                result = await sp_client.list_files()
             except Exception as e:
                 logger.error(f"Failed to list files: {e}")
                 errors.append(f"{kb.id} file listing failed: {str(e)}")
@@ -182,7 +188,7 @@ async def import_sharepoint_files_to_kb_async(kb_id: Optional[UUID] = None):
             # ---- add new files ----
             for file_info in new_files:
                 try:
-                    file_content = sp_client.get_file_content(
+                    file_content = await sp_client.get_file_content(
                         file_info["download_url"])
                     if len(file_content) == 0:
                         logger.warning(
@@ -190,7 +196,7 @@ async def import_sharepoint_files_to_kb_async(kb_id: Optional[UUID] = None):
                         continue
 
                     # Use the filename's suffix to indentify the type (e.g., .docx)
-                    extracted_text = FileTextExtractor().extract_from_bytes(
+                    extracted_text = await get_extraction_service().extract(
                         filename=file_info.get("name", ""),
                         content=file_content,
                     )
@@ -1,14 +1,17 @@
 import asyncio
 import json
 import logging
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Tuple
 from uuid import UUID
 from croniter import croniter
 
 from app.dependencies.injector import injector
 from app.modules.data.manager import AgentRAGServiceManager
+from app.modules.data.providers.vector.db.faiss import flush_faiss_collections
+from app.core.config.settings import settings
 from app.modules.integration.zendesk import ZendeskConnector
+from app.repositories.zendesk_sync import ZendeskSyncRepository
 from app.schemas.agent_knowledge import KBCreate
 from app.services.agent_knowledge import KnowledgeBaseService
 from app.services.datasources import DataSourceService
@@ -17,6 +20,34 @@ from celery import shared_task
 
 logger = logging.getLogger(__name__)
 
+# Where article updated_at values were kept before the zendesk_synced_articles table
+LEGACY_UPDATED_AT_KEY = "zendesk_article_updated_at"
+WATERMARK_OVERLAP_SECONDS = 60
+
+
+def _article_doc_id(kb_id: UUID, article_id: Any) -> str:
+    return f"KB:{str(kb_id)}#article_{article_id}"
+
+
+def _article_document(kb_id: UUID, ds_name: str, article: dict) -> Tuple[str, dict]:
+    """Build the RAG content and metadata for a Zendesk article."""
+    article_title = article.get("title", "Untitled Article")
+    article_body = article.get("body", "")
+
+    # Zendesk API returns HTML, the body is used as-is
+    content = f"{article_title}\n\n{article_body}"
+
+    metadata = {
+        "name": article_title,
+        "description": f"Zendesk article from {ds_name}",
+        "kb_id": str(kb_id),
+        "article_id": str(article["id"]),
+        "article_url": article.get("html_url", ""),
+        "locale": article.get("locale", ""),
+        "section_id": str(article.get("section_id", "")),
+    }
+    return content, metadata
+
 
 @shared_task
 def import_zendesk_articles_to_kb():
@@ -39,10 +70,15 @@ def import_zendesk_articles_to_kb():
 async def import_zendesk_articles_to_kb_async_with_scope():
     """Wrapper to run Zendesk article import for all tenants"""
     from app.tasks.base import run_task_with_tenant_support
-    result = await run_task_with_tenant_support(
-        import_zendesk_articles_to_kb_async,
-        "Zendesk article import"
-    )
+    try:
+        result = await run_task_with_tenant_support(
+            import_zendesk_articles_to_kb_async,
+            "Zendesk article import"
+        )
+    finally:
+        # Celery runs this on a loop that stops when it returns, before the
+        # write-behind flush of the vector store would run
+        await flush_faiss_collections()
     if result.get("status") == "success":
         logger.info(f"Results: {result.get('results')}")
     return result
@@ -54,6 +90,7 @@ async def import_zendesk_articles_to_kb_async(kb_id: Optional[UUID] = None):
 
     kb_service = injector.get(KnowledgeBaseService)
     rag_manager = injector.get(AgentRAGServiceManager)
+    sync_repo = injector.get(ZendeskSyncRepository)
 
     kbList = []
     if not kb_id:
@@ -129,195 +166,135 @@ async def import_zendesk_articles_to_kb_async(kb_id: Optional[UUID] = None):
             continue
 
         try:
-            # Fetch articles from Zendesk using ZendeskConnector
             zendesk_connector = ZendeskConnector(
                 subdomain=subdomain, email=email, api_token=api_token
             )
-            articles = await zendesk_connector.fetch_articles(
-                locale=locale, section_id=section_id
+            sync_started_at = datetime.now(timezone.utc)
+
+            # Known article versions live in a dedicated table; fall back once to the
+            # map older versions stored in the KB's extra_metadata
+            sync_state = await sync_repo.get_state(kb.id)
+            article_versions = await sync_repo.get_article_versions(kb.id)
+            legacy_versions = (kb.extra_metadata or {}).get(LEGACY_UPDATED_AT_KEY)
+            if not article_versions and legacy_versions:
+                article_versions = dict(legacy_versions)
+                await sync_repo.upsert_article_versions(kb.id, article_versions)
+
+            full_sync = (
+                not sync_state
+                or sync_state.watermark is None
+                or not sync_state.last_full_sync
+                or sync_started_at - sync_state.last_full_sync
+                >= timedelta(hours=settings.ZENDESK_FULL_SYNC_INTERVAL_HOURS)
             )
 
-            if not articles:
+            existing_articles: set[str] = set()
+            deleted_article_ids: list[str] = []
+            if full_sync:
+                logger.info(f"Running full Zendesk article sync for knowledge base {kb.id}")
+                articles = await zendesk_connector.fetch_articles(
+                    locale=locale, section_id=section_id
+                )
+                # Overlap the watermark slightly so edits during the listing are not missed
+                next_watermark = int(sync_started_at.timestamp()) - WATERMARK_OVERLAP_SECONDS
+
+                logger.info("Getting existing articles from RAG...")
+                existing_articles = set(await rag_manager.get_document_ids(kb))
+                logger.info(
+                    f"Found {len(existing_articles)} existing articles in RAG for knowledge base {kb.id}"
+                )
+
+                # Find deleted articles (exist in RAG but not in Zendesk)
+                zendesk_article_ids = {_article_doc_id(kb.id, a["id"]) for a in articles}
+                # An empty listing is treated as a fetch problem, never as "delete everything"
+                deleted_article_ids = [
+                    article_id
+                    for article_id in existing_articles
+                    if articles
+                    and article_id.startswith(_article_doc_id(kb.id, ""))
+                    and article_id not in zendesk_article_ids
+                ]
                 logger.info(
-                    f"No articles found in Zendesk for datasource {ds.name}"
+                    f"Found {len(deleted_article_ids)} deleted articles to remove for knowledge base {kb.id}"
                 )
-                processed_ds += 1
-                kb.last_synced = datetime.now()
-                await kb_service.update(kb.id, KBCreate(**kb.__dict__))  # type: ignore
-                continue
+            else:
+                articles, next_watermark = await zendesk_connector.fetch_articles_incremental(
+                    start_time=sync_state.watermark, locale=locale, section_id=section_id
+                )
+                existing_articles = {
+                    _article_doc_id(kb.id, article_id) for article_id in article_versions
+                }
 
             articles_added = 0
             articles_deleted = 0
             articles_updated = 0
             kb_errors = []
 
-            logger.info("Getting existing articles from RAG...")
-            existing_articles = await rag_manager.get_document_ids(kb)
-            logger.info(
-                f"Found {len(existing_articles)} existing articles in RAG for knowledge base {kb.id}"
-            )
-
-            # Create a set of article IDs from Zendesk
-            zendesk_article_ids = {
-                f"KB:{str(kb.id)}#article_{article['id']}" for article in articles
-            }
-
-            # Find new articles
-            new_articles = [
-                article
-                for article in articles
-                if f"KB:{str(kb.id)}#article_{article['id']}" not in existing_articles
-            ]
-            logger.info(
-                f"Found {len(new_articles)} new articles to process for knowledge base {kb.id}"
-            )
-
-            # Find deleted articles (exist in RAG but not in Zendesk)
-            deleted_article_ids = [
-                article_id
-                for article_id in existing_articles
-                if article_id.startswith(f"KB:{str(kb.id)}#article_")
-                and article_id not in zendesk_article_ids
-            ]
-            logger.info(
-                f"Found {len(deleted_article_ids)} deleted articles to remove for knowledge base {kb.id}"
-            )
-
-            # Load last-known updated_at per article from KB extra_metadata (for skip-if-unchanged)
-            article_updated_at_key = "zendesk_article_updated_at"
-            stored_updated_at: dict = (kb.extra_metadata or {}).get(
-                article_updated_at_key
-            ) or {}
-            # Work on a copy so we can persist it after add/update/delete
-            article_updated_at_map = dict(stored_updated_at)
-
             def _is_article_edited(article: dict) -> bool:
                 """True if we have no stored updated_at or Zendesk's is newer."""
-                aid = str(article["id"])
                 zendesk_updated = article.get("updated_at") or ""
                 if not zendesk_updated:
                     return True  # unknown freshness, treat as edited to be safe
-                stored = stored_updated_at.get(aid)
+                stored = article_versions.get(str(article["id"]))
                 if not stored:
                     return True  # first time we've seen it in stored state
                 # ISO8601 strings compare correctly as strings
                 return zendesk_updated > stored
 
-            # Find updated articles (exist in both AND edited in Zendesk since last sync)
-            updated_articles = []
-            for article in articles:
-                article_id = f"KB:{str(kb.id)}#article_{article['id']}"
-                if article_id in existing_articles and _is_article_edited(article):
-                    updated_articles.append(article)
-            skipped_unchanged = sum(
-                1
-                for a in articles
-                if f"KB:{str(kb.id)}#article_{a['id']}" in existing_articles
-                and not _is_article_edited(a)
+            new_articles = [
+                a for a in articles
+                if _article_doc_id(kb.id, a["id"]) not in existing_articles
+            ]
+            # Updated articles exist in both AND were edited in Zendesk since last sync
+            updated_articles = [
+                a for a in articles
+                if _article_doc_id(kb.id, a["id"]) in existing_articles
+                and _is_article_edited(a)
+            ]
+            logger.info(
+                f"Found {len(new_articles)} new and {len(updated_articles)} updated articles "
+                f"to process for knowledge base {kb.id} "
+                f"({len(articles) - len(new_articles) - len(updated_articles)} unchanged)"
             )
-            if skipped_unchanged:
-                logger.info(
-                    f"Skipping {skipped_unchanged} existing articles (unchanged) for knowledge base {kb.id}"
-                )
 
-            # Delete removed articles from RAG and from our updated_at map
-            article_id_prefix = f"KB:{str(kb.id)}#article_"
-            if deleted_article_ids:
-                for doc_id in deleted_article_ids:
-                    try:
-                        logger.info(f"Deleting article {doc_id} from RAG...")
-                        await rag_manager.delete_document(kb, doc_id)
-                        articles_deleted += 1
-                        if doc_id.startswith(article_id_prefix):
-                            zendesk_id = doc_id[len(article_id_prefix) :]
-                            article_updated_at_map.pop(zendesk_id, None)
-                    except Exception as e:
-                        error_msg = f"Error deleting article {doc_id}: {str(e)}"
-                        logger.error(error_msg)
-                        kb_errors.append(error_msg)
-                        continue
-
-            # Add new articles to RAG
-            for article in new_articles:
+            # Delete removed articles from RAG and from the synced articles table
+            removed_zendesk_ids = []
+            article_id_prefix = _article_doc_id(kb.id, "")
+            for doc_id in deleted_article_ids:
                 try:
-                    article_id = f"KB:{str(kb.id)}#article_{article['id']}"
-                    article_title = article.get("title", "Untitled Article")
-                    article_body = article.get("body", "")
-                    article_url = article.get("html_url", "")
-
-                    # Extract plain text from HTML body if needed
-                    # For now, we'll use the body as-is (Zendesk API returns HTML)
-                    content = f"{article_title}\n\n{article_body}"
-
-                    metadata = {
-                        "name": article_title,
-                        "description": f"Zendesk article from {ds.name}",
-                        "kb_id": str(kb.id),
-                        "article_id": str(article["id"]),
-                        "article_url": article_url,
-                        "locale": article.get("locale", ""),
-                        "section_id": str(article.get("section_id", "")),
-                    }
-
-                    res = await rag_manager.add_document(
-                        kb, article_id, content, metadata
-                    )
-                    logger.info(f"Article {article_title} processed with result: {res}")
-                    articles_added += 1
-                    if article.get("updated_at"):
-                        article_updated_at_map[str(article["id"])] = article[
-                            "updated_at"
-                        ]
-
-                    # Track last file date
-                    updated_at = article.get("updated_at")
-                    if updated_at:
-                        try:
-                            article_date = datetime.fromisoformat(
-                                updated_at.replace("Z", "+00:00")
-                            )
-                            if not last_file_date or article_date > last_file_date:
-                                last_file_date = article_date
-                        except Exception:
-                            pass
-
+                    logger.info(f"Deleting article {doc_id} from RAG...")
+                    await rag_manager.delete_document(kb, doc_id)
+                    articles_deleted += 1
+                    removed_zendesk_ids.append(doc_id[len(article_id_prefix) :])
                 except Exception as e:
-                    error_msg = f"Error processing article {article.get('id')}: {str(e)}"
+                    error_msg = f"Error deleting article {doc_id}: {str(e)}"
                     logger.error(error_msg)
                     kb_errors.append(error_msg)
                     continue
+            await sync_repo.delete_articles(kb.id, removed_zendesk_ids)
 
-            # Update existing articles
-            for article in updated_articles:
+            synced_versions: dict = {}
+            updated_ids = {a["id"] for a in updated_articles}
+            for article in new_articles + updated_articles:
+                is_update = article["id"] in updated_ids
                 try:
-                    article_id = f"KB:{str(kb.id)}#article_{article['id']}"
-                    article_title = article.get("title", "Untitled Article")
-                    article_body = article.get("body", "")
-                    article_url = article.get("html_url", "")
-
-                    content = f"{article_title}\n\n{article_body}"
-
-                    metadata = {
-                        "name": article_title,
-                        "description": f"Zendesk article from {ds.name}",
-                        "kb_id": str(kb.id),
-                        "article_id": str(article["id"]),
-                        "article_url": article_url,
-                        "locale": article.get("locale", ""),
-                        "section_id": str(article.get("section_id", "")),
-                    }
-
-                    # Delete and re-add to update
-                    await rag_manager.delete_document(kb, article_id)
+                    article_id = _article_doc_id(kb.id, article["id"])
+                    content, metadata = _article_document(kb.id, ds.name, article)
+
+                    if is_update:
+                        # Delete and re-add to update
+                        await rag_manager.delete_document(kb, article_id)
                     res = await rag_manager.add_document(
                         kb, article_id, content, metadata
                     )
-                    logger.info(f"Article {article_title} updated with result: {res}")
-                    articles_updated += 1
-                    if article.get("updated_at"):
-                        article_updated_at_map[str(article["id"])] = article[
-                            "updated_at"
-                        ]
+                    logger.info(
+                        f"Article {metadata['name']} {'updated' if is_update else 'processed'} with result: {res}"
+                    )
+                    if is_update:
+                        articles_updated += 1
+                    else:
+                        articles_added += 1
+                    synced_versions[str(article["id"])] = article.get("updated_at")
 
                     # Track last file date
                     updated_at = article.get("updated_at")
@@ -332,20 +309,32 @@ async def import_zendesk_articles_to_kb_async(kb_id: Optional[UUID] = None):
                             pass
 
                 except Exception as e:
-                    error_msg = f"Error updating article {article.get('id')}: {str(e)}"
+                    action = "updating" if is_update else "processing"
+                    error_msg = f"Error {action} article {article.get('id')}: {str(e)}"
                     logger.error(error_msg)
                     kb_errors.append(error_msg)
                     continue
 
-            # Update last synced time and persist article updated_at map (skip unchanged next run)
+            await sync_repo.upsert_article_versions(kb.id, synced_versions)
+            # Only advance the watermark when every change was applied, so failed
+            # articles are picked up again by the next incremental export
+            if not kb_errors:
+                await sync_repo.save_state(
+                    kb.id,
+                    watermark=next_watermark,
+                    last_full_sync=sync_started_at if full_sync else None,
+                )
+
+            # Update last synced time
             logger.info(f"Updating knowledge base {kb.id} last synced time...")
             kb_update = json.loads(kb.model_dump_json())
             kb_update["last_synced"] = datetime.now()
             if last_file_date:
                 kb_update["last_file_date"] = last_file_date
-            extra = dict(kb_update.get("extra_metadata") or {})
-            extra[article_updated_at_key] = article_updated_at_map
-            kb_update["extra_metadata"] = extra
+            if LEGACY_UPDATED_AT_KEY in (kb_update.get("extra_metadata") or {}):
+                extra = dict(kb_update["extra_metadata"])
+                extra.pop(LEGACY_UPDATED_AT_KEY)
+                kb_update["extra_metadata"] = extra
             await kb_service.update(kb.id, KBCreate(**kb_update))
 
             articles_added_tot += articles_added
@@ -1,11 +1,12 @@
 import asyncio
 from datetime import datetime, timezone
 import json
-from typing import List
+import time
+from typing import Any, Dict, List
 from uuid import UUID
 
 from app.dependencies.injector import injector
-from app.api.v1.routes.agents import run_query_agent_logic
+from app.api.v1.routes.agents import run_query_agent_stream
 from app.core.exceptions.error_messages import ErrorKey
 from app.core.exceptions.exception_classes import AppException
 from app.core.utils.enums.conversation_status_enum import ConversationStatus
@@ -27,6 +28,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Token deltas are coalesced into one socket message per interval
+MESSAGE_DELTA_INTERVAL = 0.05
+
 # send message to the socket
 async def send_message_to_socket(
     message: TranscriptSegmentInput,
@@ -54,6 +58,57 @@ async def send_message_to_socket(
         )
     )
 
+async def stream_agent_answer(
+    agent_service: AgentConfigService,
+    agent_id: str,
+    message_id: UUID,
+    session_message: str,
+    metadata: Dict[str, Any],
+    conversation_id: UUID,
+    current_user_id: UUID,
+    tenant_id: str,
+) -> Dict[str, Any]:
+    """
+    Run the agent, broadcasting its answer to the conversation room as
+    "message_delta" events ({id, speaker, delta}) while it is generated.
+    The id is the one of the final "message" event, which replaces the deltas.
+
+    Returns the agent response.
+    """
+    socket_connection_manager = injector.get(SocketConnectionManager)
+    pending: List[str] = []
+    last_flush = time.monotonic()
+
+    async def flush():
+        nonlocal last_flush
+        last_flush = time.monotonic()
+        if not pending:
+            return
+        delta = "".join(pending)
+        pending.clear()
+        await socket_connection_manager.broadcast(
+            msg_type="message_delta",
+            payload={"id": str(message_id), "speaker": "agent", "delta": delta},
+            room_id=conversation_id,
+            current_user_id=current_user_id,
+            required_topic="message",
+            tenant_id=tenant_id,
+        )
+
+    response: Dict[str, Any] = {}
+    async for event in run_query_agent_stream(
+        agent_service, agent_id, session_message=session_message, metadata=metadata
+    ):
+        if event["type"] == "token":
+            pending.append(event["delta"])
+            if time.monotonic() - last_flush >= MESSAGE_DELTA_INTERVAL:
+                await flush()
+        elif event["type"] == "final":
+            response = event["response"]
+    await flush()
+    return response
+
+
 async def process_conversation_update_with_agent(
     conversation_id: UUID,
     model: InProgConvTranscrUpdate,
@@ -108,11 +163,18 @@ async def process_conversation_update_with_agent(
      
         model.metadata["thread_id"] = str(conversation_id)
 
-        agent_response = await run_query_agent_logic(
+        # Generate the agent message ID upfront, so streamed deltas and the
+        # final message share it
+        agent_message_id = generate_sequential_uuid()
+        agent_response = await stream_agent_answer(
             agent_service,
             str(agent.id),
+            agent_message_id,
             session_message=model.messages[-1].text,
             metadata=model.metadata,
+            conversation_id=conversation_id,
+            current_user_id=current_user_id,
+            tenant_id=tenant_id,
         )
 
         agent_answer = agent_response.get("response", "No answer found")
@@ -123,7 +185,7 @@ async def process_conversation_update_with_agent(
         elapsed_seconds = (now - conversation.created_at).total_seconds()
 
         transcript_object = TranscriptSegmentInput(
-            id=generate_sequential_uuid(),  # Generate ID upfront
+            id=agent_message_id,
             create_time=now,
             start_time=elapsed_seconds,
             end_time=elapsed_seconds,
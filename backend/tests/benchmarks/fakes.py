@@ -0,0 +1,193 @@
+"""
+Offline stand-ins for the services a workflow calls out to.
+
+The fake LLM and embedder sleep for a configurable latency and answer
+deterministically, so a benchmark measures our own code (engine, config
+resolution, RAG service, vector DB adapters) plus a fixed, known wait.
+"""
+
+import asyncio
+import json
+import random
+import time
+import zlib
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+from unittest import mock
+
+import numpy as np
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.core.config.settings import settings
+from app.core.tenant_scope import set_tenant_context
+from app.dependencies.injector import injector
+from app.modules.data.manager import AgentRAGServiceManager
+from app.modules.data.providers.vector.embedding.base import BaseEmbedder, EmbeddingConfig
+from app.modules.workflow.llm.provider import LLMProvider
+from app.services.agent_knowledge import KnowledgeBaseService
+
+BENCHMARK_TENANT = "benchmark"
+
+WORDS = (
+    "order shipping refund invoice account password reset delivery warranty "
+    "battery screen router firmware payment card subscription plan upgrade "
+    "cancel return label tracking address customer support ticket priority "
+    "europe canada storage backup sync device license renewal discount"
+).split()
+
+
+def make_corpus(size: int, sentences: int = 10, seed: int = 7) -> Dict[str, str]:
+    """Deterministic documents of random sentences, with one identifier each"""
+    rng = random.Random(seed)
+    corpus = {}
+    for i in range(size):
+        body = " ".join(
+            " ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + "."
+            for _ in range(sentences))
+        corpus[f"doc-{i}"] = f"Article KB-{1000 + i}. {body}"
+    return corpus
+
+
+def make_queries(count: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(6)) for _ in range(count)]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model speaking the ToolAgent JSON protocol.
+
+    Asks for `tool_name` once, then answers with the tool results it was given.
+    """
+
+    latency: float = 0.0
+    tool_name: Optional[str] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-fake"
+
+    def _reply(self, messages) -> AIMessage:
+        prompt = str(messages[-1].content)
+        # "Tool Result from <tool>: ..." or "Tool Results:\n- <tool>: ..."
+        marker = max(prompt.rfind("Tool Result from "), prompt.rfind("Tool Results:"))
+        if self.tool_name and marker < 0:
+            content = {"action": "tool_call", "tool_name": self.tool_name,
+                       "parameters": {}, "reasoning": "look it up"}
+        else:
+            result = prompt[marker:].splitlines()[0] if marker >= 0 else "no tools used"
+            content = {"action": "direct_response", "reasoning": "answer", "response": f"Answer: {result}"}
+        tokens = len(prompt) // 4 + 1
+        return AIMessage(content=json.dumps(content), usage_metadata={
+            "input_tokens": tokens, "output_tokens": 40, "total_tokens": tokens + 40})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+
+class FakeLLMProvider:
+    """Hands every node the same fake model, whatever provider it names"""
+
+    def __init__(self, model: FakeChatModel):
+        self.model = model
+
+    async def get_model(self, provider_id: Optional[str] = None, **kwargs) -> FakeChatModel:
+        return self.model
+
+
+class FakeEmbedder(BaseEmbedder):
+    """Hashed bag-of-words vectors; sleeps `latency` seconds per call"""
+
+    def __init__(self, latency: float = 0.0, dimension: int = 64):
+        super().__init__(EmbeddingConfig(type="huggingface"))
+        self.latency = latency
+        self.dimension = dimension
+
+    async def initialize(self):
+        return True
+
+    async def get_dimension(self):
+        return self.dimension
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode()) % self.dimension] += 1
+        return (vector / (np.linalg.norm(vector) or 1)).tolist()
+
+    async def embed_texts(self, texts):
+        await asyncio.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    async def embed_query(self, query):
+        await asyncio.sleep(self.latency)
+        return self._vector(query)
+
+
+class FakeKnowledgeBaseService:
+    """Serves knowledge base rows from memory instead of the database"""
+
+    def __init__(self, knowledge_bases: Dict[str, Any]):
+        self.knowledge_bases = knowledge_bases
+
+    async def get_by_ids(self, ids: List[str]):
+        return [self.knowledge_bases[str(i)] for i in ids if str(i) in self.knowledge_bases]
+
+
+def knowledge_base(kb_id: str, vector_db: str = "faiss") -> SimpleNamespace:
+    """A knowledge base row with a vector (and BM25) RAG configuration"""
+    vector = {
+        "enabled": True,
+        "vector_db_type": vector_db,
+        "vector_db_collection_name": f"bench_{kb_id}",
+        "chunk_size": 500,
+        "chunk_overlap": 50,
+    }
+    if vector_db == "chroma":
+        vector.update(vector_db_host=settings.CHROMA_HOST, vector_db_port=settings.CHROMA_PORT)
+    return SimpleNamespace(id=kb_id, name=kb_id, rag_config={"enabled": True, "vector": vector})
+
+
+@contextmanager
+def offline_services(
+    workdir: str,
+    llm_latency: float = 0.0,
+    embed_latency: float = 0.0,
+    tool_name: Optional[str] = None,
+    knowledge_bases: Optional[Dict[str, Any]] = None,
+) -> Iterator[SimpleNamespace]:
+    """
+    Route LLM, embedding and knowledge base lookups to the fakes, and keep
+    lexical indexes under `workdir`, for the duration of the block.
+    """
+    services = SimpleNamespace(
+        llm=FakeChatModel(latency=llm_latency, tool_name=tool_name),
+        embedder=FakeEmbedder(latency=embed_latency),
+        rag_manager=AgentRAGServiceManager(),
+        knowledge=FakeKnowledgeBaseService(knowledge_bases or {}),
+    )
+    fakes = {
+        LLMProvider: FakeLLMProvider(services.llm),
+        KnowledgeBaseService: services.knowledge,
+        AgentRAGServiceManager: services.rag_manager,
+    }
+    get = injector.get
+
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.object(
+            injector, "get", lambda cls, *a, **kw: fakes[cls] if cls in fakes else get(cls, *a, **kw)))
+        stack.enter_context(mock.patch.object(EmbeddingConfig, "get", lambda self: services.embedder))
+        stack.enter_context(mock.patch.object(settings, "LEXICAL_INDEX_DIR", workdir))
+        set_tenant_context(BENCHMARK_TENANT)
+        try:
+            yield services
+        finally:
+            set_tenant_context(None)
@@ -0,0 +1,278 @@
+"""
+Offline benchmark harness for the workflow engine and the RAG stack.
+
+Runs each scenario against fake LLMs and embedders, reports latency
+percentiles, throughput and memory, and compares them with a stored baseline.
+
+    python -m tests.benchmarks.harness --save-baseline tests/benchmarks/baseline.json
+    python -m tests.benchmarks.harness --baseline tests/benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import math
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .fakes import offline_services
+from .scenarios import TOOL_NAME, BenchmarkContext, Scenario, get_scenarios
+
+# Metrics compared with the baseline, and whether higher values are better
+COMPARED_METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "throughput_per_s": True,
+    "memory_peak_mb": False,
+}
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: str
+    iterations: int
+    concurrency: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    max_ms: float
+    throughput_per_s: float
+    memory_peak_mb: float
+    errors: int = 0
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(scenario: str, durations: List[float], wall_time: float, concurrency: int,
+              memory_peak: int, errors: int = 0) -> BenchmarkResult:
+    """Build a result from per-operation durations (seconds) and peak traced bytes"""
+    ms = [d * 1000 for d in durations]
+    return BenchmarkResult(
+        scenario=scenario,
+        iterations=len(durations),
+        concurrency=concurrency,
+        p50_ms=round(percentile(ms, 50), 3),
+        p95_ms=round(percentile(ms, 95), 3),
+        p99_ms=round(percentile(ms, 99), 3),
+        mean_ms=round(sum(ms) / len(ms), 3) if ms else 0.0,
+        max_ms=round(max(ms), 3) if ms else 0.0,
+        throughput_per_s=round(len(durations) / wall_time, 2) if wall_time else 0.0,
+        memory_peak_mb=round(memory_peak / 2**20, 2),
+        errors=errors,
+    )
+
+
+async def _timed_run(operation, iterations: int, concurrency: int, offset: int) -> Dict[str, Any]:
+    durations: List[float] = []
+    errors = 0
+    counter = iter(range(offset, offset + iterations))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                await operation(i)
+            except Exception as e:
+                errors += 1
+                logging.getLogger(__name__).warning(f"Iteration {i} failed: {e}")
+            durations.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"durations": durations, "wall_time": time.perf_counter() - started, "errors": errors}
+
+
+async def run_scenario(
+    scenario: Scenario,
+    ctx: BenchmarkContext,
+    iterations: int = 50,
+    warmup: int = 5,
+    concurrency: int = 1,
+    memory_iterations: int = 10,
+) -> BenchmarkResult:
+    """
+    Warm up, time `iterations` operations on `concurrency` workers, then
+    measure peak Python allocations over a separate, shorter pass (tracing
+    allocations slows everything down, so it is kept out of the timings).
+    """
+    operation = await scenario.setup(ctx)
+    await _timed_run(operation, warmup, 1, 0)
+
+    gc.collect()
+    timed = await _timed_run(operation, iterations, concurrency, warmup)
+
+    tracemalloc.start()
+    try:
+        await _timed_run(operation, memory_iterations, concurrency, warmup + iterations)
+        _, memory_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return summarize(scenario.name, timed["durations"], timed["wall_time"], concurrency,
+                     memory_peak, timed["errors"])
+
+
+async def run_benchmarks(
+    scenarios: List[Scenario],
+    llm_latency: float = 0.05,
+    embed_latency: float = 0.005,
+    vector_db: str = "faiss",
+    corpus_size: int = 200,
+    **run_options,
+) -> List[BenchmarkResult]:
+    """Run scenarios one after another inside the offline services"""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="genassist-bench-") as workdir:
+        with offline_services(workdir, llm_latency, embed_latency, tool_name=TOOL_NAME) as services:
+            ctx = BenchmarkContext(services, vector_db=vector_db, corpus_size=corpus_size)
+            for scenario in scenarios:
+                results.append(await run_scenario(scenario, ctx, **run_options))
+    return results
+
+
+def compare_to_baseline(
+    results: List[BenchmarkResult], baseline: Dict[str, Any], tolerance: float = 0.15
+) -> List[str]:
+    """Regressions beyond `tolerance` (a fraction) against the baseline's results"""
+    regressions = []
+    previous = baseline.get("results", {})
+    for result in results:
+        base = previous.get(result.scenario)
+        if not base:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = base.get(metric), getattr(result, metric)
+            if not old:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    f"{result.scenario}: {metric} {old} -> {new} ({change:+.0%}, tolerance {tolerance:.0%})")
+    return regressions
+
+
+def build_report(results: List[BenchmarkResult], parameters: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "max_rss_mb": round(_max_rss_bytes() / 2**20, 1),
+            "parameters": parameters,
+        },
+        "results": {result.scenario: asdict(result) for result in results},
+    }
+
+
+def _max_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def format_table(results: List[BenchmarkResult], baseline: Optional[Dict[str, Any]] = None) -> str:
+    previous = (baseline or {}).get("results", {})
+    header = f"{'scenario':<32}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'peak MB':>10}{'errors':>8}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(f"{r.scenario:<32}{r.p50_ms:>10.2f}{r.p95_ms:>10.2f}{r.p99_ms:>10.2f}"
+                     f"{r.throughput_per_s:>10.2f}{r.memory_peak_mb:>10.2f}{r.errors:>8}")
+        base = previous.get(r.scenario)
+        if base:
+            lines.append(f"{'  baseline':<32}{base['p50_ms']:>10.2f}{base['p95_ms']:>10.2f}"
+                         f"{base['p99_ms']:>10.2f}{base['throughput_per_s']:>10.2f}"
+                         f"{base['memory_peak_mb']:>10.2f}")
+    return "\n".join(lines)
+
+
+def quiet_logging(level: str) -> None:
+    """Drop log records below `level`; at DEBUG, writing logs would dominate the timings"""
+    from loguru import logger
+
+    logging.disable(logging.getLevelName(level) - 1)
+    logger.remove()
+    logger.add(sys.stderr, level=level)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the workflow engine and RAG stack")
+    parser.add_argument("--scenario", action="append", dest="scenarios",
+                        help="Scenario to run (repeatable, defaults to all)")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed operations per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed operations before timing")
+    parser.add_argument("--concurrency", type=int, default=1, help="Operations in flight at once")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="Latency of each fake LLM call")
+    parser.add_argument("--embed-latency-ms", type=float, default=5.0, help="Latency of each fake embedding call")
+    parser.add_argument("--vector-db", choices=["faiss", "chroma"], default="faiss",
+                        help="Vector DB adapter (chroma needs a local server at CHROMA_HOST:CHROMA_PORT)")
+    parser.add_argument("--corpus-size", type=int, default=200, help="Documents ingested before searching")
+    parser.add_argument("--baseline", type=Path, help="Baseline JSON to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed relative regression before failing (0.15 = 15%%)")
+    parser.add_argument("--save-baseline", type=Path, help="Write these results as the new baseline")
+    parser.add_argument("--output", type=Path, help="Write these results as JSON")
+    parser.add_argument("--log-level", default="WARNING", help="Lowest log level kept while benchmarking")
+    args = parser.parse_args(argv)
+
+    quiet_logging(args.log_level.upper())
+    parameters = {
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "concurrency": args.concurrency,
+        "llm_latency_ms": args.llm_latency_ms,
+        "embed_latency_ms": args.embed_latency_ms,
+        "vector_db": args.vector_db,
+        "corpus_size": args.corpus_size,
+    }
+    results = asyncio.run(run_benchmarks(
+        get_scenarios(args.scenarios),
+        llm_latency=args.llm_latency_ms / 1000,
+        embed_latency=args.embed_latency_ms / 1000,
+        vector_db=args.vector_db,
+        corpus_size=args.corpus_size,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+    ))
+    report = build_report(results, parameters)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    print(format_table(results, baseline))
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {path}")
+
+    failed = any(r.errors for r in results)
+    if baseline:
+        if baseline.get("meta", {}).get("parameters") != parameters:
+            print("Warning: baseline was recorded with different parameters")
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Benchmark scenarios.
+
+A scenario's setup runs once per benchmark (building workflows, ingesting the
+corpus) and returns the operation that is timed; the operation receives the
+iteration number so inputs vary deterministically between runs.
+"""
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List
+
+from app.modules.workflow.engine.utils import replace_config_vars
+from app.modules.workflow.engine.workflow_engine import WorkflowEngine
+from app.modules.workflow.engine.workflow_state import WorkflowState
+
+from .fakes import knowledge_base, make_corpus, make_queries
+
+Operation = Callable[[int], Awaitable[Any]]
+
+TOOL_NAME = "order_lookup"
+
+TOOL_CODE = """
+def executable_function(params):
+    return {"order": "A-1001", "status": "shipped", "carrier": "DHL"}
+"""
+
+
+@dataclass
+class BenchmarkContext:
+    """What scenarios share: the fakes and the run parameters"""
+    services: Any
+    vector_db: str = "faiss"
+    corpus_size: int = 200
+    _ids: itertools.count = field(default_factory=itertools.count)
+
+    def add_knowledge_base(self, name: str):
+        kb = knowledge_base(f"{name}-{next(self._ids)}", self.vector_db)
+        self.services.knowledge.knowledge_bases[kb.id] = kb
+        return kb
+
+    async def ingest(self, kb, corpus: Dict[str, str]) -> None:
+        for doc_id, content in corpus.items():
+            await self.services.rag_manager.add_document(kb, doc_id, content)
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    setup: Callable[[BenchmarkContext], Awaitable[Operation]]
+
+
+def support_workflow(kb_id: str) -> Dict[str, Any]:
+    """Chat input -> router -> knowledge base -> agent (with a Python tool) -> chat output"""
+    edge = {"sourceHandle": "output", "targetHandle": "input"}
+    return {
+        "id": "benchmark-support",
+        "nodes": [
+            {"id": "input", "type": "chatInputNode", "data": {
+                "inputSchema": {"message": {"type": "string", "required": True}}}},
+            {"id": "router", "type": "routerNode", "data": {
+                "first_value": "{{source.message}}", "compare_condition": "contains",
+                "second_value": "order"}},
+            {"id": "kb", "type": "knowledgeBaseNode", "data": {
+                "selectedBases": [kb_id], "query": "{{source.first_value}}", "limit": 3}},
+            {"id": "agent", "type": "agentNode", "data": {
+                "systemPrompt": "You answer support questions.",
+                "userPrompt": "Context:\n{{source}}\n\nQuestion: {{message}}",
+                "maxIterations": 3}},
+            {"id": "tool", "type": "pythonCodeNode", "data": {
+                "name": TOOL_NAME, "description": "Look up the customer's latest order",
+                "code": TOOL_CODE, "unwrap": True}},
+            {"id": "output", "type": "chatOutputNode", "data": {}},
+        ],
+        "edges": [
+            {"source": "input", "target": "router", **edge},
+            {"source": "router", "target": "kb", "sourceHandle": "true", "targetHandle": "input"},
+            {"source": "router", "target": "output", "sourceHandle": "false", "targetHandle": "input"},
+            {"source": "kb", "target": "agent", **edge},
+            {"source": "tool", "target": "agent", "sourceHandle": "output", "targetHandle": "input_tools"},
+            {"source": "agent", "target": "output", **edge},
+        ],
+    }
+
+
+async def _workflow(ctx: BenchmarkContext) -> Operation:
+    kb = ctx.add_knowledge_base("workflow")
+    await ctx.ingest(kb, make_corpus(ctx.corpus_size))
+    # Tool nodes are resolved through the default engine instance
+    engine = WorkflowEngine.get_instance()
+    workflow_id = engine.build_workflow(support_workflow(kb.id))
+    queries = make_queries(64)
+
+    async def run(i: int):
+        state = await engine.execute_from_node(
+            workflow_id, start_node_id="input", persist=False,
+            input_data={"message": f"Where is my order? {queries[i % len(queries)]}"})
+        if state.errors:
+            raise RuntimeError(state.errors[-1]["message"])
+        return state.node_outputs["agent"]
+
+    return run
+
+
+async def _ingest(ctx: BenchmarkContext) -> Operation:
+    kb = ctx.add_knowledge_base("ingest")
+    corpus = list(make_corpus(64, seed=13).values())
+
+    async def run(i: int):
+        return await ctx.services.rag_manager.add_document(kb, f"ingest-{i}", corpus[i % len(corpus)])
+
+    return run
+
+
+async def _search(ctx: BenchmarkContext) -> Operation:
+    kb = ctx.add_knowledge_base("search")
+    await ctx.ingest(kb, make_corpus(ctx.corpus_size))
+    queries = make_queries(64)
+
+    async def run(i: int):
+        return await ctx.services.rag_manager.search([kb], queries[i % len(queries)], limit=5)
+
+    return run
+
+
+async def _config_vars(ctx: BenchmarkContext) -> Operation:
+    state = WorkflowState({"nodes": [], "edges": []}, {"message": "Where is my order?"})
+    source = {"customer": {"name": "Ada", "tier": "gold"},
+              "fields": {f"field_{i}": f"value {i}" for i in range(20)},
+              "summary": "order history " * 150}
+    state.add_node_output("crm", source)
+    config = {"data": {
+        "systemPrompt": "Customer {{source.customer.name}} ({{source.customer.tier}}). {{source.summary}}",
+        "userPrompt": "{{message}}",
+        "headers": {f"X-Field-{i}": f"{{{{node_outputs.crm.result.fields.field_{i}}}}}" for i in range(20)},
+        "body": "{{source}}",
+    }}
+
+    async def run(i: int):
+        return replace_config_vars(config, state, source)
+
+    return run
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("workflow_router_rag_agent_tool",
+             "Router, knowledge base search, agent with one tool call, chat output", _workflow),
+    Scenario("rag_ingest", "Chunk, embed and index one document (vector + BM25)", _ingest),
+    Scenario("rag_search", "Hybrid search over the ingested corpus", _search),
+    Scenario("replace_config_vars", "Resolve a node configuration with 24 template variables", _config_vars),
+]
+
+
+def get_scenarios(names: List[str] = None) -> List[Scenario]:
+    if not names:
+        return list(SCENARIOS)
+    by_name = {scenario.name: scenario for scenario in SCENARIOS}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(unknown)}. Known: {', '.join(by_name)}")
+    return [by_name[name] for name in names]
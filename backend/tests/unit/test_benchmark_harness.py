@@ -0,0 +1,43 @@
+import pytest
+
+from tests.benchmarks.fakes import offline_services
+from tests.benchmarks.harness import compare_to_baseline, percentile, run_benchmarks, summarize
+from tests.benchmarks.scenarios import TOOL_NAME, BenchmarkContext, get_scenarios
+
+
+def test_percentiles_and_baseline_regressions():
+    samples = [i / 1000 for i in range(1, 101)]
+    result = summarize("search", samples, wall_time=2.0, concurrency=1, memory_peak=2**20)
+
+    assert percentile([5, 1, 3], 50) == 3
+    assert (result.p50_ms, result.p95_ms, result.p99_ms) == (50, 95, 99)
+    assert result.throughput_per_s == 50 and result.memory_peak_mb == 1
+
+    baseline = {"results": {"search": {
+        "p50_ms": 50, "p95_ms": 70, "p99_ms": 200, "throughput_per_s": 80, "memory_peak_mb": 1}}}
+    regressions = compare_to_baseline([result], baseline, tolerance=0.1)
+    assert [r.split(" ")[1] for r in regressions] == ["p95_ms", "throughput_per_s"]
+    assert compare_to_baseline([result], {"results": {}}) == []
+
+
+@pytest.mark.asyncio
+async def test_workflow_scenario_runs_offline(tmp_path):
+    with offline_services(str(tmp_path), tool_name=TOOL_NAME) as services:
+        ctx = BenchmarkContext(services, corpus_size=10)
+        workflow = await get_scenarios(["workflow_router_rag_agent_tool"])[0].setup(ctx)
+        output = await workflow(0)
+
+    assert "shipped" in output["message"]
+    assert [step.get("tool") for step in output["steps"]] == [None, TOOL_NAME, None]
+
+
+@pytest.mark.asyncio
+async def test_all_scenarios_report_without_errors():
+    results = await run_benchmarks(
+        get_scenarios(), llm_latency=0, embed_latency=0, corpus_size=10,
+        iterations=5, warmup=1, memory_iterations=1)
+
+    assert [r.scenario for r in results] == [s.name for s in get_scenarios()]
+    assert all(r.iterations == 5 and r.errors == 0 and r.p99_ms >= r.p50_ms > 0 for r in results)
+    with pytest.raises(ValueError):
+        get_scenarios(["missing"])
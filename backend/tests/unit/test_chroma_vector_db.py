@@ -0,0 +1,44 @@
+import pytest
+
+from app.modules.data.providers.vector.db.base import VectorDBConfig
+from app.modules.data.providers.vector.db.chroma import ChromaVectorDB
+
+
+class FakeCollection:
+    """Records the where clauses Chroma is queried with."""
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.gets = []
+
+    async def get(self, where=None, include=None):
+        self.gets.append(where)
+        return {"ids": self.ids}
+
+    async def count(self):
+        return len(self.ids)
+
+
+def test_build_where_translates_flat_filters():
+    assert ChromaVectorDB._build_where(None) is None
+    assert ChromaVectorDB._build_where({}) is None
+    assert ChromaVectorDB._build_where({"kb_id": "kb1"}) == {"kb_id": "kb1"}
+    assert ChromaVectorDB._build_where({"kb_id": "kb1", "doc_id": "d1"}) == {
+        "$and": [{"kb_id": "kb1"}, {"doc_id": "d1"}]
+    }
+    # Clauses already written in Chroma's syntax pass through
+    clause = {"$or": [{"kb_id": "kb1"}, {"kb_id": "kb2"}]}
+    assert ChromaVectorDB._build_where(clause) is clause
+
+
+@pytest.mark.asyncio
+async def test_filters_are_sent_to_chroma_as_where_clauses():
+    db = ChromaVectorDB(VectorDBConfig(type="chroma", collection_name="test"))
+    db.collection = FakeCollection(["a", "b"])
+
+    assert await db.get_all_ids({"kb_id": "kb1", "doc_id": "d1"}) == ["a", "b"]
+    assert await db.count({"kb_id": "kb1"}) == 2
+    # Unfiltered counts do not list the ids
+    assert await db.count() == 2
+
+    assert db.collection.gets == [{"$and": [{"kb_id": "kb1"}, {"doc_id": "d1"}]}, {"kb_id": "kb1"}]
@@ -0,0 +1,112 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from app.core.exceptions.exception_classes import AppException
+from app.modules.data.utils import extraction_service as extraction_module
+from app.modules.data.utils.extraction_service import DocumentExtractionService
+from app.modules.data.utils.file_extractor import FileTextExtractor
+
+SAMPLE_PDF = Path(__file__).parent / "file_extract_tests" / "test_files" / "file-sample_150kB.pdf"
+
+
+def _service(tmp_path, **kwargs) -> DocumentExtractionService:
+    kwargs.setdefault("max_workers", 0)
+    kwargs.setdefault("cache_dir", str(tmp_path / "cache"))
+    return DocumentExtractionService(**kwargs)
+
+
+@pytest.fixture
+def counted_extraction(monkeypatch):
+    calls = []
+    original = extraction_module._run_extraction
+
+    def _counting(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(extraction_module, "_run_extraction", _counting)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_identical_content_is_extracted_once(tmp_path, counted_extraction):
+    service = _service(tmp_path)
+
+    first = await service.extract(filename="notes.txt", content=b"hello cache")
+    second = await service.extract(filename="other-name.txt", content=b"hello cache")
+
+    assert first == second == "hello cache"
+    assert len(counted_extraction) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_is_shared_between_bytes_and_path(tmp_path, counted_extraction):
+    service = _service(tmp_path)
+    file_path = tmp_path / "doc.txt"
+    file_path.write_bytes(b"same bytes")
+
+    await service.extract(filename="upload.txt", content=b"same bytes")
+    assert await service.extract(path=file_path) == "same bytes"
+    assert len(counted_extraction) == 1
+
+    # Same bytes with a different type are routed to another extractor
+    await service.extract(filename="upload.md", content=b"same bytes")
+    assert len(counted_extraction) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled(tmp_path, counted_extraction):
+    service = _service(tmp_path, cache_dir="")
+
+    await service.extract(filename="a.txt", content=b"x")
+    await service.extract(filename="a.txt", content=b"x")
+
+    assert len(counted_extraction) == 2
+
+
+@pytest.mark.asyncio
+async def test_pdf_is_split_into_page_batches(tmp_path, counted_extraction):
+    total_pages = FileTextExtractor.count_pdf_pages(SAMPLE_PDF)
+    assert total_pages > 1
+    service = _service(tmp_path, pages_per_task=1)
+    progress = []
+
+    text = await service.extract(
+        path=SAMPLE_PDF, on_progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert "lorem ipsum" in text.lower()
+    assert [(args[3], args[4]) for args in counted_extraction] == [
+        (page, page) for page in range(1, total_pages + 1)
+    ]
+    assert progress[-1] == (total_pages, total_pages)
+    assert [done for done, _ in progress] == list(range(1, total_pages + 1))
+
+
+@pytest.mark.asyncio
+async def test_timeout_raises_app_exception(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        extraction_module, "_run_extraction", lambda *args: time.sleep(1.5) or "late"
+    )
+    service = _service(tmp_path, timeout_seconds=1)
+
+    with pytest.raises(AppException) as exc:
+        await service.extract(filename="slow.txt", content=b"slow")
+    assert "timed out" in exc.value.error_detail
+
+
+def test_worker_alarm_interrupts_extraction(monkeypatch, tmp_path):
+    def _hang(self, path):
+        time.sleep(5)
+        return "never"
+
+    monkeypatch.setattr(FileTextExtractor, "extract_from_path", _hang)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        extraction_module._run_extraction(
+            FileTextExtractor().options, 1, str(tmp_path / "x.txt")
+        )
+    assert time.monotonic() - started < 3
@@ -0,0 +1,364 @@
+import asyncio
+import json
+import pickle
+import threading
+
+import faiss
+import numpy as np
+import pytest
+import pytest_asyncio
+
+from app.modules.data.providers.vector.db.base import VectorDBConfig
+from app.modules.data.providers.vector.db import faiss as faiss_module
+from app.modules.data.providers.vector.db.faiss import FaissVectorDB
+
+DIM = 8
+
+
+def _vectors(n, seed=0):
+    return np.random.default_rng(seed).random((n, DIM), dtype=np.float32).tolist()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_collections():
+    yield
+    # Stop pending write-behind tasks before the event loop goes away
+    for db in list(faiss_module._persistent_collections):
+        db.close()
+
+
+async def _db(tmp_path=None, index_type="flat", **extra) -> FaissVectorDB:
+    config = VectorDBConfig(
+        type="faiss",
+        collection_name="test",
+        index_type=index_type,
+        persist_directory=str(tmp_path) if tmp_path else None,
+        extra_params=extra,
+    )
+    db = FaissVectorDB(config)
+    assert await db.create_collection(DIM)
+    return db
+
+
+async def _add(db, ids, seed=0):
+    vectors = _vectors(len(ids), seed)
+    assert await db.add_vectors(
+        ids, vectors, [{"doc_id": i.split("_")[0]} for i in ids], [f"text {i}" for i in ids]
+    )
+    return vectors
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+async def test_delete_tombstones_without_rebuilding(index_type):
+    db = await _db(index_type=index_type)
+    vectors = await _add(db, [f"d{i}_chunk_0" for i in range(20)])
+    index_before = db.index
+
+    assert await db.delete_vectors(["d3_chunk_0", "missing"])
+
+    assert db.index is index_before
+    assert db.index.ntotal == 20
+    assert db.tombstones == {3}
+    results = await db.search(vectors[3], limit=20)
+    assert "d3_chunk_0" not in [r.id for r in results]
+    assert len(results) == 19
+    assert await db.count() == 19
+
+
+@pytest.mark.asyncio
+async def test_re_adding_an_id_replaces_the_vector():
+    db = await _db()
+    await _add(db, ["a", "b"])
+    replacement = _vectors(1, seed=42)
+
+    await db.add_vectors(["a"], replacement, [{"v": 2}], ["new a"])
+
+    results = await db.search(replacement[0], limit=1)
+    assert results[0].id == "a" and results[0].content == "new a"
+    assert db.doc_to_id["a"] == 2
+    assert db.tombstones == {0}
+    assert await db.count() == 2
+
+
+@pytest.mark.asyncio
+async def test_compaction_is_scheduled_after_threshold():
+    db = await _db(compaction_ratio=0.25, compaction_min_tombstones=2)
+    vectors = await _add(db, [f"d{i}" for i in range(8)])
+
+    await db.delete_vectors(["d0"])
+    assert db._compaction_task is None
+
+    await db.delete_vectors(["d1"])
+    assert db._compaction_task is not None
+    await db._compaction_task
+
+    assert db.tombstones == set()
+    assert db.index.ntotal == 6
+    # Ids stay stable through compaction
+    assert db.doc_to_id["d5"] == 5
+    assert (await db.search(vectors[5], limit=1))[0].id == "d5"
+
+
+@pytest.mark.asyncio
+async def test_compaction_keeps_writes_made_while_rebuilding(monkeypatch):
+    db = await _db(index_type="hnsw")
+    await _add(db, ["a", "b", "c"])
+    await db.delete_vectors(["a"])
+    building, release = threading.Event(), threading.Event()
+    original_build = db._build_index
+
+    def _slow_build(*args):
+        building.set()
+        release.wait(5)
+        return original_build(*args)
+
+    monkeypatch.setattr(db, "_build_index", _slow_build)
+    task = asyncio.create_task(db.compact())
+    while not building.is_set():
+        await asyncio.sleep(0.01)
+
+    late = _vectors(1, seed=7)
+    await db.add_vectors(["d"], late, [{}], ["late"])
+    await db.delete_vectors(["b"])
+    release.set()
+    assert await task == 1
+
+    assert db.index.ntotal == 3  # b was copied before its delete, so it stays tombstoned
+    assert db.tombstones == {1}
+    assert [r.id for r in await db.search(late[0], limit=5)][0] == "d"
+    assert await db.count() == 2
+
+
+@pytest.mark.asyncio
+async def test_legacy_positional_index_is_upgraded(tmp_path):
+    vectors = np.asarray(_vectors(3), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    legacy = faiss.IndexFlatIP(DIM)
+    legacy.add(vectors)
+    db = FaissVectorDB(VectorDBConfig(
+        type="faiss", collection_name="test", index_type="flat", persist_directory=str(tmp_path)
+    ))
+    name = db.config.collection_name
+    faiss.write_index(legacy, str(tmp_path / f"{name}.index"))
+    with open(tmp_path / f"{name}_metadata.pkl", "wb") as f:
+        pickle.dump({
+            "id_map": {0: "a", 2: "c"},
+            "metadata_map": {"a": {}, "c": {}},
+            "content_map": {"a": "A", "c": "C"},
+            "next_id": 3,
+            "dimension": DIM,
+        }, f)
+
+    assert await db.initialize()
+
+    assert isinstance(db.index, faiss.IndexIDMap2)
+    assert db.doc_to_id == {"a": 0, "c": 2}
+    assert (await db.search(vectors[2].tolist(), limit=1))[0].id == "c"
+    await db.add_vectors(["d"], _vectors(1, seed=3), [{}], ["D"])
+    assert db.doc_to_id["d"] == 3
+    assert await db.flush()
+    assert not (tmp_path / f"{name}.index").exists()
+    assert not (tmp_path / f"{name}_metadata.pkl").exists()
+    assert (tmp_path / f"{name}.manifest.json").exists()
+
+
+async def _reopen(tmp_path, **extra) -> FaissVectorDB:
+    db = FaissVectorDB(VectorDBConfig(
+        type="faiss", collection_name="test", index_type="flat",
+        persist_directory=str(tmp_path), extra_params=extra,
+    ))
+    assert await db.initialize()
+    assert await db.create_collection(DIM)
+    return db
+
+
+def _manifest(db):
+    with open(db.store.manifest_path) as f:
+        return json.load(f)
+
+
+@pytest.mark.asyncio
+async def test_writes_are_deferred_until_flush(tmp_path):
+    db = await _db(tmp_path, flush_interval_seconds=3600)
+    for batch in range(5):
+        await _add(db, [f"d{batch}_{i}" for i in range(10)], seed=batch)
+
+    assert not (tmp_path / f"{db.config.collection_name}.manifest.json").exists()
+    assert await db.flush()
+    manifest = _manifest(db)
+    assert manifest["format_version"] == 2
+    assert manifest["log_records"] == 50
+
+    reopened = await _reopen(tmp_path)
+    assert await reopened.count() == 50
+    assert reopened.next_id == 50
+
+
+@pytest.mark.asyncio
+async def test_deletes_only_append_to_the_log(tmp_path):
+    db = await _db(tmp_path, flush_interval_seconds=3600)
+    vectors = await _add(db, ["a", "b", "c"])
+    await db.flush()
+    index_file = _manifest(db)["index_file"]
+
+    await db.delete_vectors(["b"])
+    await db.flush()
+
+    assert _manifest(db)["index_file"] == index_file
+    reopened = await _reopen(tmp_path)
+    assert sorted(await reopened.get_all_ids()) == ["a", "c"]
+    assert reopened.tombstones == {1}
+    assert "b" not in [r.id for r in await reopened.search(vectors[1], limit=3)]
+
+
+@pytest.mark.asyncio
+async def test_uncommitted_writes_are_discarded_on_load(tmp_path):
+    db = await _db(tmp_path, flush_interval_seconds=3600)
+    await _add(db, ["a", "b"])
+    await db.flush()
+    manifest = _manifest(db)
+
+    # Torn append and an orphaned temp file from a crashed flush
+    with open(tmp_path / manifest["log_file"], "ab") as f:
+        f.write(b"\x80\x04garbage")
+    (tmp_path / f".{manifest['index_file']}.x.tmp").write_bytes(b"partial")
+
+    reopened = await _reopen(tmp_path, flush_interval_seconds=3600)
+    assert sorted(await reopened.get_all_ids()) == ["a", "b"]
+
+    await reopened.delete_vectors(["a"])
+    await reopened.flush()
+    assert await (await _reopen(tmp_path)).get_all_ids() == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_pending_threshold_and_close_trigger_flush(tmp_path):
+    db = await _db(tmp_path, flush_interval_seconds=3600, flush_max_pending=5)
+    await _add(db, [f"d{i}" for i in range(5)])
+    for _ in range(50):
+        if db.store.manifest:
+            break
+        await asyncio.sleep(0.01)
+    assert _manifest(db)["log_records"] == 5
+
+    await _add(db, ["late"], seed=1)
+    db.close()
+    assert _manifest(db)["log_records"] == 6
+
+
+def test_flush_survives_short_lived_event_loops(tmp_path):
+    """Celery tasks each run on a loop that stops when the task returns"""
+    async def settle(tasks):
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def run(coro):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            # Cancel the write-behind task left on the loop, as asyncio.run would
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(settle(pending))
+            loop.close()
+
+    async def first_task():
+        db = await _db(tmp_path, flush_interval_seconds=3600, flush_max_pending=3)
+        await _add(db, ["a"])
+        return db
+
+    async def second_task():
+        await _add(db, ["b", "c"], seed=1)
+        for _ in range(50):
+            if db.store.manifest:
+                break
+            await asyncio.sleep(0.01)
+
+    db = run(first_task())
+    # The flush task of the finished loop never runs; the next write reschedules it
+    run(second_task())
+    assert _manifest(db)["log_records"] == 3
+
+    run(_add(db, ["d"], seed=2))
+    faiss_module.flush_faiss_collections_sync()
+    assert _manifest(db)["log_records"] == 4
+
+
+@pytest.mark.asyncio
+async def test_log_is_rewritten_when_mostly_dead(tmp_path, monkeypatch):
+    monkeypatch.setattr(faiss_module, "LOG_REWRITE_SLACK", 4)
+    db = await _db(tmp_path, flush_interval_seconds=3600)
+    await _add(db, ["a", "b"])
+    await db.flush()
+    first_log = _manifest(db)["log_file"]
+    for seed in range(3):
+        await _add(db, ["a", "b"], seed=seed)
+
+    await db.flush()
+
+    manifest = _manifest(db)
+    assert manifest["log_file"] != first_log
+    assert manifest["log_records"] == 2
+    assert not (tmp_path / first_log).exists()
+    assert sorted(await (await _reopen(tmp_path)).get_all_ids()) == ["a", "b"]
+
+
+async def _add_grouped(db, groups, per_group, seed=0):
+    ids, metadatas = [], []
+    for group in range(groups):
+        for chunk in range(per_group):
+            ids.append(f"doc{group}_chunk_{chunk}")
+            metadatas.append({"kb_id": "kb", "doc_id": f"doc{group}", "chunk_index": chunk})
+    vectors = _vectors(len(ids), seed)
+    await db.add_vectors(ids, vectors, metadatas, ids)
+    return vectors
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+async def test_selective_filter_returns_full_limit(index_type):
+    db = await _db(index_type=index_type)
+    vectors = await _add_grouped(db, groups=200, per_group=5)
+
+    # Query sits right on another document, the filtered one ranks far below limit * 2
+    results = await db.search(vectors[0], limit=5, filter_dict={"kb_id": "kb", "doc_id": "doc150"})
+
+    assert sorted(r.id for r in results) == [f"doc150_chunk_{i}" for i in range(5)]
+    assert sorted(await db.get_all_ids({"doc_id": "doc150"})) == [f"doc150_chunk_{i}" for i in range(5)]
+    assert await db.count({"kb_id": "kb"}) == 1000
+
+
+@pytest.mark.asyncio
+async def test_large_candidate_sets_use_an_id_selector():
+    db = await _db(index_type="hnsw", brute_force_max_candidates=10)
+    vectors = await _add_grouped(db, groups=50, per_group=10)
+    for group in range(0, 50, 2):
+        for chunk in range(10):
+            db.metadata_map[f"doc{group}_chunk_{chunk}"]["kb_id"] = "other"
+    db.metadata_index = {}
+    for internal_id, doc_id in db.id_map.items():
+        db._index_metadata(internal_id, db.metadata_map[doc_id])
+
+    results = await db.search(vectors[0], limit=10, filter_dict={"kb_id": "kb"})
+
+    assert len(results) == 10
+    assert all(r.metadata["kb_id"] == "kb" for r in results)
+
+
+@pytest.mark.asyncio
+async def test_metadata_index_follows_deletes_and_reload(tmp_path):
+    db = await _db(tmp_path, flush_interval_seconds=3600)
+    await _add_grouped(db, groups=3, per_group=2)
+    await db.delete_vectors(["doc1_chunk_0"])
+
+    assert await db.get_all_ids({"doc_id": "doc1"}) == ["doc1_chunk_1"]
+    # Keys left out of the inverted index still filter correctly
+    assert sorted(await db.get_all_ids({"chunk_index": 1})) == [f"doc{i}_chunk_1" for i in range(3)]
+    assert await db.search(_vectors(1)[0], filter_dict={"doc_id": "missing"}) == []
+
+    await db.flush()
+    reopened = await _reopen(tmp_path)
+    assert await reopened.get_all_ids({"doc_id": "doc1"}) == ["doc1_chunk_1"]
+    assert "chunk_index" not in reopened.metadata_index
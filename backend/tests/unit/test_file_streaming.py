@@ -0,0 +1,201 @@
+import base64
+import io
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.modules.filemanager.providers.base import BaseStorageProvider
+from app.modules.filemanager.providers.local import LocalFileSystemProvider
+from app.modules.filemanager.streaming import (
+    RangeNotSatisfiable,
+    etag_matches,
+    iter_base64,
+    parse_byte_range,
+)
+from app.services.file_manager import FileManagerService
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+
+
+class RangedMemoryProvider(BaseStorageProvider):
+    """Non-local provider that records the ranges it was asked to stream."""
+
+    name = "memory"
+    provider_type = "memory"
+
+    def __init__(self, files):
+        super().__init__({})
+        self.files = files
+        self.streamed = []
+
+    async def initialize(self):
+        self._initialized = True
+        return True
+
+    def get_base_path(self):
+        return "memory"
+
+    async def upload_file(self, file_content, storage_path, file_metadata=None):
+        self.files[storage_path] = file_content
+        return storage_path
+
+    async def download_file(self, storage_path):
+        raise AssertionError("downloads must be streamed")
+
+    async def stream_file(self, storage_path, start=0, end=None, chunk_size=1024):
+        self.streamed.append((start, end))
+        data = self.files[storage_path]
+        stop = len(data) if end is None else end + 1
+        for offset in range(start, stop, chunk_size):
+            yield data[offset:min(offset + chunk_size, stop)]
+
+    async def delete_file(self, storage_path):
+        return self.files.pop(storage_path, None) is not None
+
+    async def file_exists(self, storage_path):
+        return storage_path in self.files
+
+    async def list_files(self, prefix=None, limit=None):
+        return list(self.files)
+
+    def get_stats(self):
+        return {}
+
+
+def _file_record(storage_provider, storage_path, path="memory"):
+    return SimpleNamespace(
+        id=uuid4(),
+        name="recording.wav",
+        mime_type="audio/wav",
+        size=len(CONTENT),
+        storage_provider=storage_provider,
+        path=path,
+        storage_path=storage_path,
+        updated_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def _client(file_record, provider) -> TestClient:
+    service = FileManagerService(repository=MagicMock())
+    service.get_storage_provider_by_name = lambda name, config=None: provider
+    app = FastAPI()
+
+    @app.api_route("/source", methods=["GET", "HEAD"])
+    async def source(request: Request):
+        return await service.build_file_response(file_record, request)
+
+    @app.get("/base64")
+    async def as_base64():
+        return await service.build_file_base64_response(file_record)
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 10239)),
+        ("bytes=-100", (10140, 10239)),
+        ("bytes=10000-99999", (10000, 10239)),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+        ("bytes=abc", None),
+    ],
+)
+def test_parse_byte_range(header, expected):
+    assert parse_byte_range(header, len(CONTENT)) == expected
+
+
+def test_parse_byte_range_unsatisfiable():
+    with pytest.raises(RangeNotSatisfiable):
+        parse_byte_range("bytes=20000-", len(CONTENT))
+
+
+def test_etag_matches_weak_and_lists():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"x"')
+    assert not etag_matches('"a"', '"b"')
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 4096])
+async def test_iter_base64_matches_one_shot_encoding(chunk_size):
+    async def chunks():
+        for offset in range(0, len(CONTENT), chunk_size):
+            yield CONTENT[offset:offset + chunk_size]
+
+    encoded = b"".join([piece async for piece in iter_base64(chunks())])
+    assert encoded == base64.standard_b64encode(CONTENT)
+
+
+@pytest.mark.asyncio
+async def test_local_provider_copies_file_objects_and_streams_ranges(tmp_path):
+    provider = LocalFileSystemProvider({"base_path": str(tmp_path)})
+
+    await provider.upload_file(io.BytesIO(CONTENT), "a/file.bin")
+
+    assert (tmp_path / "a" / "file.bin").read_bytes() == CONTENT
+    assert [p.name for p in (tmp_path / "a").iterdir()] == ["file.bin"]
+    ranged = b"".join([c async for c in provider.stream_file("a/file.bin", 100, 5099, chunk_size=512)])
+    assert ranged == CONTENT[100:5100]
+    info = await provider.get_file_info("a/file.bin")
+    assert info.size == len(CONTENT) and info.etag.startswith('"')
+
+
+def test_local_file_response_supports_range_and_etag(tmp_path):
+    (tmp_path / "f.wav").write_bytes(CONTENT)
+    provider = LocalFileSystemProvider({"base_path": str(tmp_path)})
+    client = _client(_file_record("local", "f.wav", path=str(tmp_path)), provider)
+
+    full = client.get("/source")
+    assert full.status_code == 200 and full.content == CONTENT
+    etag = full.headers["etag"]
+
+    partial = client.get("/source", headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == CONTENT[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+    assert client.get("/source", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_remote_provider_streams_requested_range():
+    provider = RangedMemoryProvider({"rec.wav": CONTENT})
+    client = _client(_file_record("memory", "rec.wav"), provider)
+
+    partial = client.get("/source", headers={"Range": "bytes=-16"})
+    assert partial.status_code == 206
+    assert partial.content == CONTENT[-16:]
+    assert partial.headers["content-length"] == "16"
+    assert provider.streamed == [(len(CONTENT) - 16, len(CONTENT) - 1)]
+
+    full = client.get("/source")
+    assert full.status_code == 200 and full.content == CONTENT
+    assert full.headers["accept-ranges"] == "bytes"
+
+    assert client.get("/source", headers={"Range": "bytes=999999-"}).status_code == 416
+    assert client.get("/source", headers={"If-None-Match": full.headers["etag"]}).status_code == 304
+
+    head = client.head("/source")
+    assert head.status_code == 200 and head.content == b""
+    assert head.headers["content-length"] == str(len(CONTENT))
+    assert len(provider.streamed) == 2
+
+
+def test_base64_endpoint_streams_valid_json():
+    provider = RangedMemoryProvider({"rec.wav": CONTENT})
+    client = _client(_file_record("memory", "rec.wav"), provider)
+
+    payload = json.loads(client.get("/base64").content)
+
+    assert payload["name"] == "recording.wav"
+    assert payload["size"] == len(CONTENT)
+    assert base64.standard_b64decode(payload["content"]) == CONTENT
@@ -0,0 +1,196 @@
+import asyncio
+import base64
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from app.modules.integration import gmail_connector as gmail_module
+from app.modules.integration.gmail_connector import GmailConnector
+
+
+def _recorded_message(message_id: str, history_id: str = "100") -> dict:
+    """A trimmed `users.messages.get(format=full)` response."""
+    return {
+        "id": message_id,
+        "threadId": f"thread-{message_id}",
+        "historyId": history_id,
+        "labelIds": ["INBOX", "UNREAD"],
+        "payload": {
+            "mimeType": "text/plain",
+            "headers": [
+                {"name": "From", "value": "customer@example.com"},
+                {"name": "To", "value": "support@example.com"},
+                {"name": "Subject", "value": f"Order {message_id}"},
+                {"name": "Date", "value": "Mon, 1 Sep 2025 10:00:00 +0000"},
+            ],
+            "body": {
+                "data": base64.urlsafe_b64encode(f"Body {message_id}".encode()).decode()
+            },
+        },
+    }
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class _Batch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request, request_id))
+
+    def execute(self):
+        self.service.batch_sizes.append(len(self.requests))
+        responses = self.service.call(lambda: [(i, r.execute()) for r, i in self.requests])
+        for request_id, response in responses:
+            self.callback(request_id, response, None)
+
+
+class FakeGmailService:
+    """Replays recorded Gmail API responses and records how the API was used."""
+
+    def __init__(self, message_ids, delay=0.0):
+        self.message_ids = message_ids
+        self.batch_sizes = []
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def call(self, fn):
+        """Runs one API round trip, tracking how many overlap."""
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            return fn()
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def list(self, userId, q="", maxResults=100, includeSpamTrash=False, pageToken=None):
+        offset = int(pageToken or 0)
+        page = self.message_ids[offset:offset + maxResults]
+        response = {"messages": [{"id": mid} for mid in page]}
+        if offset + maxResults < len(self.message_ids):
+            response["nextPageToken"] = str(offset + maxResults)
+        return _Request(lambda: self.call(lambda: response))
+
+    def get(self, userId, id, format="full"):
+        def _get():
+            return _recorded_message(id)
+
+        return _Request(_get)
+
+    def new_batch_http_request(self, callback):
+        return _Batch(self, callback)
+
+
+def _connector(service) -> GmailConnector:
+    connector = GmailConnector("ds-1")
+    connector.service = service
+    connector.current_access_token = "token"
+    connector.refresh_token = "refresh"
+    connector.expires_at = datetime.now() + timedelta(hours=1)
+    return connector
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    gmail_module._token_cache.clear()
+    yield
+    gmail_module._token_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_messages_uses_batches():
+    service = FakeGmailService([f"m{i}" for i in range(120)])
+    connector = _connector(service)
+
+    messages = await connector.get_messages(query="in:inbox", max_results=120)
+
+    assert [m["id"] for m in messages] == [f"m{i}" for i in range(120)]
+    assert service.batch_sizes == [50, 50, 20]
+    first = messages[0]
+    assert first["subject"] == "Order m0"
+    assert first["from"] == "customer@example.com"
+    assert first["body"] == "Body m0"
+    assert first["is_unread"] is True
+    assert first["history_id"] == "100"
+
+
+@pytest.mark.asyncio
+async def test_get_messages_respects_max_results():
+    service = FakeGmailService([f"m{i}" for i in range(30)])
+    connector = _connector(service)
+
+    messages = await connector.get_messages(max_results=10)
+
+    assert len(messages) == 10
+    assert service.batch_sizes == [10]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_do_not_share_the_transport():
+    service = FakeGmailService([f"m{i}" for i in range(60)], delay=0.02)
+    connector = _connector(service)
+
+    results = await asyncio.gather(*(connector.get_messages(max_results=60) for _ in range(4)))
+
+    assert all(len(messages) == 60 for messages in results)
+    assert service.max_active == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_refreshed_async_and_cached(monkeypatch):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"access_token": "new-token", "expires_in": 3600})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        gmail_module.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(gmail_module, "injector", MagicMock())
+    monkeypatch.setattr(GmailConnector, "_save_refreshed_tokens", AsyncMock())
+
+    connector = _connector(FakeGmailService([]))
+    connector.client_id, connector.client_secret = "id", "secret"
+    connector.expires_at = datetime.now() - timedelta(minutes=1)
+
+    tokens = await connector.get_gmail_tokens()
+
+    assert tokens["access_token"] == "new-token"
+    assert calls == ["/token"]
+
+    # A new connector for the same data source reuses the cached token
+    other = _connector(FakeGmailService([]))
+    other.current_access_token = "stale"
+    other.expires_at = datetime.now() - timedelta(minutes=1)
+    tokens = await other.get_gmail_tokens()
+
+    assert tokens["access_token"] == "new-token"
+    assert calls == ["/token"]
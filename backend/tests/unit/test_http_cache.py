@@ -0,0 +1,137 @@
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+
+from app.core import http_cache as cache_module
+from app.core.http_cache import HttpCacheConfig, HttpResponseCache, freshness_lifetime
+from app.core.tenant_scope import set_tenant_context
+from app.modules.workflow.engine.nodes.api_tool_node import ApiToolNode
+from app.modules.workflow.engine.workflow_state import WorkflowState
+
+
+class FakeUpstream:
+    """Stands in for http_request; answers from `responses` and records the requests."""
+
+    def __init__(self, *responses: httpx.Response, delay: float = 0.0):
+        self.responses: List[httpx.Response] = list(responses)
+        self.calls: List[dict] = []
+        self.delay = delay
+
+    async def __call__(self, method, url, **kwargs) -> httpx.Response:
+        self.calls.append({"method": method, "url": str(url), **kwargs})
+        await asyncio.sleep(self.delay)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    def install(*responses, delay=0.0):
+        fake = FakeUpstream(*responses, delay=delay)
+        monkeypatch.setattr(cache_module, "http_request", fake)
+        return fake
+    monkeypatch.setattr(cache_module, "_caches", {})
+    return install
+
+
+def test_freshness_follows_cache_headers():
+    assert freshness_lifetime(httpx.Headers({"cache-control": "public, max-age=30"}), 60) == 30
+    assert freshness_lifetime(httpx.Headers({"cache-control": "max-age=30, s-maxage=5"}), 60) == 5
+    assert freshness_lifetime(httpx.Headers({"cache-control": "max-age=30", "age": "10"}), 60) == 20
+    assert freshness_lifetime(httpx.Headers({
+        "date": "Mon, 19 Oct 2026 10:00:00 GMT", "expires": "Mon, 19 Oct 2026 10:02:00 GMT"}), 60) == 120
+    assert freshness_lifetime(httpx.Headers({"expires": "0"}), 60) == 0
+    assert freshness_lifetime(httpx.Headers({"cache-control": "no-cache"}), 60) == 0
+    assert freshness_lifetime(httpx.Headers({"cache-control": "no-store"}), 60) is None
+    assert freshness_lifetime(httpx.Headers({"vary": "*"}), 60) is None
+    assert freshness_lifetime(httpx.Headers(), 60) == 60
+
+
+@pytest.mark.asyncio
+async def test_fresh_responses_are_reused_per_request_and_tenant(upstream):
+    upstream(*(httpx.Response(200, json={"n": n}) for n in range(4)))
+    cache = HttpResponseCache("node", HttpCacheConfig(enabled=True, ttl_seconds=60))
+
+    first = await cache.request("GET", "https://api.example.com/orders", params={"id": 1})
+    again = await cache.request("GET", "https://api.example.com/orders?id=1")
+    other = await cache.request("GET", "https://api.example.com/orders", params={"id": 2})
+    with_auth = await cache.request("GET", "https://api.example.com/orders", params={"id": 1},
+                                    headers={"Authorization": "Bearer other"})
+    set_tenant_context("tenant-b")
+    try:
+        other_tenant = await cache.request("GET", "https://api.example.com/orders", params={"id": 1})
+    finally:
+        set_tenant_context(None)
+
+    assert first.json() == again.json() == {"n": 0}
+    assert [r.json()["n"] for r in (other, with_auth, other_tenant)] == [1, 2, 3]
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 4
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_responses_and_methods_are_not_stored(upstream):
+    fake = upstream(*[
+        httpx.Response(200, headers={"cache-control": "no-store"}, json={}),
+        httpx.Response(503),
+        httpx.Response(204),
+    ] * 2)
+    cache = HttpResponseCache("node", HttpCacheConfig(enabled=True))
+
+    for _ in range(2):
+        await cache.request("GET", "https://api.example.com/private")
+        await cache.request("GET", "https://api.example.com/broken")
+        await cache.request("DELETE", "https://api.example.com/orders/1")
+
+    assert len(fake.calls) == 6
+    assert cache.stats["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_revalidated_with_etag(upstream):
+    fake = upstream(
+        httpx.Response(200, headers={"cache-control": "max-age=0", "etag": '"v1"'}, json={"rate": 1.1}),
+        httpx.Response(304, headers={"cache-control": "max-age=60", "etag": '"v1"'}),
+    )
+    cache = HttpResponseCache("node", HttpCacheConfig(enabled=True))
+
+    await cache.request("GET", "https://fx.example.com/eur")
+    revalidated = await cache.request("GET", "https://fx.example.com/eur")
+    cached = await cache.request("GET", "https://fx.example.com/eur")
+
+    assert revalidated.status_code == 200 and revalidated.json() == cached.json() == {"rate": 1.1}
+    assert fake.calls[1]["headers"] == {"If-None-Match": '"v1"'}
+    assert len(fake.calls) == 2
+    assert (cache.stats["misses"], cache.stats["revalidated"], cache.stats["hits"]) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_in_flight_share_one_call(upstream):
+    fake = upstream(httpx.Response(200, json={"status": "shipped"}),
+                    httpx.Response(200, json={"status": "pending"}), delay=0.02)
+    cache = HttpResponseCache("node", HttpCacheConfig(enabled=True))
+
+    responses = await asyncio.gather(
+        *(cache.request("POST", "https://api.example.com/search", json={"order": 1}) for _ in range(5)),
+        cache.request("POST", "https://api.example.com/search", json={"order": 2}),
+    )
+
+    assert [r.json()["status"] for r in responses] == ["shipped"] * 5 + ["pending"]
+    assert len(fake.calls) == 2
+    assert cache.stats["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_api_tool_node_opts_into_cache(upstream):
+    fake = upstream(httpx.Response(200, json={"id": 7}), httpx.Response(200, json={"id": 8}))
+    config = {"endpoint": "api.example.com/orders/7", "method": "GET",
+              "cacheResponses": True, "cacheTtlSeconds": 30}
+    node = ApiToolNode("api-cache-node", config, WorkflowState({"nodes": [], "edges": []}))
+
+    outputs = [await node.process(config) for _ in range(2)]
+
+    assert [o["data"] for o in outputs] == [{"id": 7}, {"id": 7}]
+    assert len(fake.calls) == 1
+    assert node.response_cache.stats["hits"] == 1
+    assert HttpCacheConfig.from_node_config({"cacheResponses": False}) is None
+    assert HttpCacheConfig.from_node_config(config).ttl_seconds == 30
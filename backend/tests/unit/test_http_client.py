@@ -0,0 +1,128 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import http_client as http_module
+from app.core.config.settings import settings
+from app.core.http_client import (
+    close_http_clients,
+    get_http_client,
+    get_http_client_metrics,
+    http_request,
+)
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """Route pooled clients to a mock transport answering from `transport.responses`."""
+    state = {"responses": [], "requests": [], "clients": 0, "delay": 0.0, "active": 0, "peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"].append(request)
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(state["delay"])
+        state["active"] -= 1
+        response = state["responses"].pop(0) if state["responses"] else httpx.Response(200)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    real_client = httpx.AsyncClient
+
+    def make_client(**kwargs):
+        state["clients"] += 1
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(http_module.httpx, "AsyncClient", make_client)
+    monkeypatch.setattr(settings, "HTTP_CLIENT_RETRY_BACKOFF", 0.0)
+    monkeypatch.setattr(http_module, "_pools", {})
+    monkeypatch.setattr(http_module, "_metrics", {})
+    return state
+
+
+@pytest.mark.asyncio
+async def test_one_pooled_client_per_origin(transport):
+    await http_request("GET", "https://api.example.com/a")
+    await http_request("GET", "https://api.example.com/b", params={"q": 1})
+    await http_request("GET", "https://other.example.com/")
+
+    assert transport["clients"] == 2
+    assert get_http_client("https://api.example.com/c") is get_http_client("https://api.example.com:443/")
+    assert get_http_client("http://api.example.com/") is not get_http_client("https://api.example.com/")
+
+    metrics = get_http_client_metrics()["hosts"]
+    assert metrics["https://api.example.com:443"]["requests"] == 2
+    assert metrics["https://other.example.com:443"]["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_idempotent_requests_are_retried(transport):
+    transport["responses"] = [
+        httpx.Response(503),
+        httpx.ConnectError("refused"),
+        httpx.Response(200, json={"ok": True}),
+    ]
+
+    response = await http_request("GET", "https://api.example.com/items")
+
+    assert response.json() == {"ok": True}
+    assert len(transport["requests"]) == 3
+    hosts = get_http_client_metrics()["hosts"]["https://api.example.com:443"]
+    assert (hosts["requests"], hosts["retries"], hosts["failures"]) == (3, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_post_is_only_retried_when_never_sent(transport):
+    transport["responses"] = [httpx.Response(503), httpx.Response(200)]
+    response = await http_request("POST", "https://api.example.com/orders", json={"id": 1})
+    assert response.status_code == 503
+
+    transport["responses"] = [httpx.ConnectError("refused"), httpx.Response(201)]
+    response = await http_request("POST", "https://api.example.com/orders", json={"id": 1})
+    assert response.status_code == 201
+
+    transport["responses"] = [httpx.ReadTimeout("slow")]
+    with pytest.raises(httpx.ReadTimeout):
+        await http_request("POST", "https://api.example.com/orders", json={"id": 1})
+
+    transport["responses"] = [httpx.Response(503)] * 3
+    response = await http_request("GET", "https://api.example.com/orders", retries=1)
+    assert response.status_code == 503
+    assert len(transport["requests"]) == 1 + 2 + 1 + 2
+
+
+def test_retry_after_is_honoured_and_capped(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_CLIENT_RETRY_BACKOFF_MAX", 5.0)
+
+    assert http_module._retry_delay(0, httpx.Response(429, headers={"Retry-After": "2"})) == 2.0
+    assert http_module._retry_delay(0, httpx.Response(429, headers={"Retry-After": "600"})) == 5.0
+    assert 0 <= http_module._retry_delay(10) <= 5.0
+
+
+@pytest.mark.asyncio
+async def test_host_override_caps_concurrency(transport, monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_CLIENT_HOST_OVERRIDES", {"slow.example.com": {"max_concurrency": 2}})
+    transport["delay"] = 0.01
+
+    await asyncio.gather(*(http_request("GET", "https://slow.example.com/") for _ in range(6)))
+    assert transport["peak"] == 2
+    await asyncio.gather(*(http_request("GET", "https://fast.example.com/") for _ in range(6)))
+
+    assert len(transport["requests"]) == 12
+    assert transport["peak"] == 6
+
+
+@pytest.mark.asyncio
+async def test_close_http_clients_closes_pools_of_current_loop(transport):
+    await http_request("GET", "https://api.example.com/")
+    client = get_http_client("https://api.example.com/")
+
+    await close_http_clients()
+
+    assert client.is_closed
+    assert get_http_client_metrics()["pools"] == 0
+    # The next request opens a new pool
+    await http_request("GET", "https://api.example.com/")
+    assert transport["clients"] == 2
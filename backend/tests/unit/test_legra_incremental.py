@@ -0,0 +1,188 @@
+import json
+import zlib
+from pathlib import Path
+
+import igraph as ig
+import numpy as np
+import pytest
+
+from app.modules.data.providers.legra.clustering.community import LeidenClusterer
+from app.modules.data.providers.legra.core import Legra
+from app.modules.data.providers.legra.embedding.base import Embedder
+from app.modules.data.providers.legra.graph.knn_graph import FaissKNNGraphBuilder
+from app.modules.data.providers.legra.index.faiss_index import FaissFlatIndexer
+
+DIM = 16
+TOPICS = np.random.default_rng(0).normal(size=(6, DIM))
+
+
+class TopicEmbedder(Embedder):
+    """Chunks named "<topic>:<n>" land near one of a few topic centres."""
+
+    model_name = "topic"
+
+    def encode(self, texts):
+        rows = []
+        for text in texts:
+            topic, n = text.split(":")
+            noise = np.random.default_rng(zlib.crc32(text.encode())).normal(size=DIM)
+            rows.append(TOPICS[int(topic)] + 0.05 * noise)
+        return np.asarray(rows, dtype=np.float32)
+
+    @property
+    def dimension(self):
+        return DIM
+
+
+def _legra(**kwargs) -> Legra:
+    return Legra(
+        doc_folder=Path(),
+        chunker=lambda text: text.split(),
+        embedder=TopicEmbedder(),
+        indexer=FaissFlatIndexer(dim=DIM),
+        max_tokens=512,
+        graph_builder=FaissKNNGraphBuilder(n_neighbors=4, mode="exact"),
+        clusterer=LeidenClusterer(resolution_parameter=0.5),
+        **kwargs,
+    )
+
+
+def _add(legra, name, topic, chunks=10):
+    text = " ".join(f"{topic}:{name}{i}" for i in range(chunks))
+    legra.add_document(f"KB:kb#{name}", text, {"kb_id": "kb", "finalize": True})
+
+
+def _labels(legra):
+    """Community of each chunk, by "<doc_id>#<chunk_ix>"."""
+    return {key.rsplit("#", 1)[0]: label for key, label in zip(legra.graph.vs["node_key"], legra.community_labels)}
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def test_incremental_add_and_delete_patch_the_graph():
+    legra = _legra()
+    for i in range(6):
+        _add(legra, f"doc{i}", topic=i)
+    # Early documents are large changes and rebuild, later ones are patched in
+    assert legra.graph_updates == 2
+    before = _labels(legra)
+
+    _add(legra, "doc6", topic=2, chunks=4)
+
+    assert legra.graph_builder.last_stats["mode"] == "incremental"
+    assert legra.graph_builder.last_stats["queried"] == 4
+    assert legra.graph.vcount() == len(legra.docs_meta) == 64
+    after = _labels(legra)
+    # Existing communities keep their ids; the new chunks join their topic's
+    assert all(after[key] == label for key, label in before.items())
+    assert {after[f"KB:kb#doc6#{i}"] for i in range(4)} == {before["KB:kb#doc2#0"]}
+
+    assert legra.delete_document("KB:kb#doc3")
+    legra.update_index_graph("kb")
+
+    keys = legra.graph.vs["node_key"]
+    assert len(keys) == 54 and not any(key.startswith("KB:kb#doc3#") for key in keys)
+    assert legra.indexer.index.ntotal == 54
+    assert all(m["community"] == before[f"{m['doc_id']}#{m['chunk_ix']}"]
+               for m in legra.docs_meta if m["doc_id"] != "KB:kb#doc6")
+
+
+def test_full_rebuild_on_schedule_and_large_changes():
+    legra = _legra(full_rebuild_every=2)
+    _add(legra, "a", topic=0, chunks=20)
+    _add(legra, "b", topic=1, chunks=2)
+    _add(legra, "c", topic=1, chunks=2)
+    assert legra.graph_updates == 2
+
+    _add(legra, "d", topic=2, chunks=2)
+    assert legra.graph_updates == 0
+    assert legra.graph_builder.last_stats["mode"] == "exact"
+
+    # Adding more than max_incremental_change of the graph also rebuilds
+    _add(legra, "e", topic=3, chunks=20)
+    assert legra.graph_updates == 0
+
+    with open("legra_data/kb/legra.json") as f:
+        assert json.load(f)["graph_updates"] == 0
+
+
+def test_update_count_accumulates_across_instances():
+    _add(_legra(full_rebuild_every=2), "a", topic=0, chunks=20)
+    _add(_legra(full_rebuild_every=2), "b", topic=1, chunks=2)
+
+    # Each request builds a new provider; a plain add must not reset the count
+    _legra(full_rebuild_every=2).add_document("KB:kb#c", "1:c0 1:c1", {"kb_id": "kb"})
+    with open("legra_data/kb/legra.json") as f:
+        assert json.load(f)["graph_updates"] == 1
+
+    legra = _legra(full_rebuild_every=2)
+    _add(legra, "d", topic=2, chunks=2)
+    assert legra.graph_builder.last_stats["mode"] == "incremental"
+    assert legra.graph_updates == 2
+
+    legra = _legra(full_rebuild_every=2)
+    _add(legra, "e", topic=2, chunks=2)
+    assert legra.graph_builder.last_stats["mode"] == "exact"
+    assert legra.graph_updates == 0
+
+
+def test_only_changed_communities_lose_their_summaries():
+    legra = _legra()
+    for i in range(4):
+        _add(legra, f"doc{i}", topic=i)
+    labels = _labels(legra)
+    grown, untouched = labels["KB:kb#doc0#0"], labels["KB:kb#doc1#0"]
+    legra.community_summaries = {label: f"summary {label}" for label in set(labels.values())}
+    legra.save("kb", True)
+
+    legra.add_document("KB:kb#doc9", " ".join(f"0:x{i}" for i in range(5)), {"kb_id": "kb"})
+    stale = legra.update_index_graph("kb")
+
+    assert stale == {grown}
+    assert grown not in legra.community_summaries
+    assert legra.community_summaries[untouched] == f"summary {untouched}"
+
+
+def test_edited_document_is_relinked():
+    legra = _legra()
+    for i in range(6):
+        _add(legra, f"doc{i}", topic=i)
+    labels = _labels(legra)
+    old, new = labels["KB:kb#doc0#0"], labels["KB:kb#doc5#0"]
+    legra.community_summaries = {label: f"summary {label}" for label in set(labels.values())}
+    legra.save("kb", True)
+
+    # Same doc_id and chunk positions, different content
+    legra.add_document("KB:kb#doc0", " ".join(f"5:edit{i}" for i in range(5)), {"kb_id": "kb"})
+    stale = legra.update_index_graph("kb")
+
+    assert legra.graph_builder.last_stats["mode"] == "incremental"
+    assert legra.graph_builder.last_stats["queried"] == 5
+    after = _labels(legra)
+    assert {after[f"KB:kb#doc0#{i}"] for i in range(5)} == {new}
+    assert stale == {old, new}
+    assert old not in legra.community_summaries and new not in legra.community_summaries
+
+
+def test_align_labels_keeps_previous_ids():
+    previous = [7, 7, 7, 3, 3, None, None]
+    labels = [0, 0, 0, 1, 1, 1, 2]
+    assert Legra._align_labels(previous, labels) == [7, 7, 7, 3, 3, 3, 8]
+
+
+def test_builder_update_queries_only_given_rows():
+    emb = np.random.default_rng(1).normal(size=(200, DIM)).astype(np.float32)
+    builder = FaissKNNGraphBuilder(n_neighbors=5, mode="exact")
+    _, old_edges = builder.fit(emb[:150])
+
+    graph, edges = builder.update(emb, old_edges, np.arange(150, 200))
+
+    assert isinstance(graph, ig.Graph) and graph.vcount() == 200
+    assert builder.last_stats["queried"] == 50
+    _, full_edges = builder.fit(emb)
+    new_rows = {tuple(e) for e in full_edges.tolist() if max(e) >= 150 and min(e) >= 150}
+    assert new_rows <= {tuple(e) for e in edges.tolist()}
+    assert {tuple(e) for e in old_edges.tolist()} <= {tuple(e) for e in edges.tolist()}
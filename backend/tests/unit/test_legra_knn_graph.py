@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from app.modules.data.providers.legra.graph.knn_graph import (
+    FaissKNNGraphBuilder,
+    KNNGraphBuilder,
+    get_graph_builder,
+)
+from app.modules.data.providers.legra.index.faiss_index import FaissFlatIndexer
+
+
+def _clustered(n=600, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(12, dim))
+    return (centers[rng.integers(0, 12, n)] + 0.1 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def _random(n=600, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def _exact_edges(emb, k):
+    normed = emb.astype(np.float64) / np.linalg.norm(emb, axis=1, keepdims=True)
+    sims = normed @ normed.T
+    np.fill_diagonal(sims, -np.inf)
+    neighbours = np.argsort(-sims, axis=1)[:, :k]
+    return {(min(i, int(j)), max(i, int(j))) for i, row in enumerate(neighbours) for j in row}
+
+
+def test_exact_graph_matches_brute_force_neighbours():
+    emb = _random()
+    builder = FaissKNNGraphBuilder(n_neighbors=5, mode="exact", batch_size=128)
+
+    graph, edges = builder.fit(emb)
+
+    assert {tuple(e) for e in edges.tolist()} == _exact_edges(emb, 5)
+    assert graph.vcount() == len(emb)
+    assert graph.ecount() == len(edges)
+    assert not graph.has_multiple() and not any(graph.is_loop())
+    assert builder.last_stats["recall"] == 1.0
+
+
+def test_reuses_legra_flat_index():
+    emb = _random()
+    indexer = FaissFlatIndexer(dim=emb.shape[1])
+    indexer.build_index(emb)
+    builder = FaissKNNGraphBuilder(n_neighbors=5, mode="exact")
+
+    _, edges = builder.fit(emb, index=indexer.index)
+
+    assert builder.last_stats["reused_index"] is True
+    assert {tuple(e) for e in edges.tolist()} == _exact_edges(emb, 5)
+
+    # An index over different vectors is not reused
+    builder.fit(emb[:-1], index=indexer.index)
+    assert builder.last_stats["reused_index"] is False
+
+
+def test_approximate_mode_reports_recall():
+    emb = _clustered(n=2000)
+    builder = FaissKNNGraphBuilder(n_neighbors=10, mode="approximate", recall_sample_size=200)
+
+    graph, _ = builder.fit(emb)
+
+    stats = builder.last_stats
+    assert stats["mode"] == "approximate"
+    assert 0.9 <= stats["recall"] <= 1.0
+    assert graph.vcount() == 2000
+
+
+def test_auto_mode_switches_on_size():
+    emb = _clustered(n=300)
+    builder = FaissKNNGraphBuilder(n_neighbors=4, mode="auto", exact_max_nodes=100)
+
+    builder.fit(emb)
+
+    assert builder.last_stats["mode"] == "approximate"
+
+
+def test_drop_self_when_search_misses_the_query_node():
+    ids = np.array([[0, 3, 4], [5, 6, 7]])
+    kept = FaissKNNGraphBuilder._drop_self(ids, np.array([0, 1]), 2)
+    assert kept.tolist() == [[3, 4], [5, 6]]
+
+
+def test_unsupported_metric_falls_back_to_sklearn():
+    assert type(get_graph_builder(metric="manhattan")) is KNNGraphBuilder
+    with pytest.raises(ValueError):
+        FaissKNNGraphBuilder(mode="fast")
@@ -0,0 +1,120 @@
+import json
+
+import igraph as ig
+import numpy as np
+import pytest
+
+from app.modules.data.providers.legra import core, embedding
+from app.modules.data.providers.legra.core import Legra
+from app.modules.data.providers.legra.index.faiss_index import FaissFlatIndexer
+from app.modules.data.providers.legra.storage import FORMAT_VERSION, LegraStore
+
+
+class FixedEmbedder(embedding.Embedder):
+    model_name = "fixed"
+
+    def __init__(self, model_name="fixed"):
+        self.model_name = model_name
+
+    def encode(self, texts):
+        return np.random.default_rng(len(texts)).normal(size=(len(texts), 8)).astype(np.float32)
+
+    @property
+    def dimension(self):
+        return 8
+
+
+def _graph(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    edges = {tuple(sorted(e)) for e in rng.integers(0, n, size=(150, 2)).tolist() if e[0] != e[1]}
+    graph = ig.Graph(n=n, edges=sorted(edges))
+    graph.vs["node_key"] = [f"doc#{i}" for i in range(n)]
+    graph.vs["community"] = rng.integers(0, 5, n).tolist()
+    return graph
+
+
+def test_graph_round_trips_through_csr_arrays(tmp_path):
+    store = LegraStore(tmp_path)
+    graph = _graph()
+
+    store.write_graph(graph)
+    loaded = store.read_graph()
+
+    assert sorted(loaded.get_edgelist()) == sorted(graph.get_edgelist())
+    assert loaded.vs["node_key"] == graph.vs["node_key"]
+    assert loaded.vs["community"] == graph.vs["community"]
+    indptr = np.load(tmp_path / "graph_indptr.npy")
+    assert len(indptr) == 51 and indptr[-1] == graph.ecount()
+
+
+def test_rewrites_do_not_disturb_memory_mapped_readers(tmp_path):
+    store = LegraStore(tmp_path)
+    store.write_embeddings(np.ones((4, 3), dtype=np.float32))
+    mapped = store.read_embeddings()
+
+    store.write_embeddings(np.zeros((2, 3), dtype=np.float32))
+
+    assert isinstance(mapped, np.memmap) and mapped.sum() == 12
+    assert store.read_embeddings().shape == (2, 3)
+
+
+def _write_format_1(kb_dir):
+    kb_dir.mkdir(parents=True)
+    meta = [{"doc_id": "KB:kb#a", "chunk_ix": i, "text": f"t{i}", "community": i % 2} for i in range(6)]
+    (kb_dir / "docs_meta.json").write_text(json.dumps(meta, indent=2))
+    np.save(kb_dir / "emb_matrix.npy", np.random.default_rng(0).normal(size=(6, 8)).astype(np.float32))
+    graph = ig.Graph(n=6, edges=[(0, 1), (1, 2), (3, 4), (4, 5)])
+    graph.write_graphml(str(kb_dir / "graph.graphml"))
+    (kb_dir / "community_summaries.json").write_text(json.dumps({"0": "zero", "1": "one"}))
+    (kb_dir / "legra.json").write_text(json.dumps({"max_tokens": 256}))
+    (kb_dir / "embedder.json").write_text(json.dumps({"class": "FixedEmbedder", "model_name": "fixed"}))
+    indexer = FaissFlatIndexer(dim=8)
+    indexer.build_index(np.load(kb_dir / "emb_matrix.npy"))
+    LegraStore(kb_dir).write_index(indexer.index)
+    return meta
+
+
+def test_format_1_store_is_migrated_on_load(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(embedding, "FixedEmbedder", FixedEmbedder, raising=False)
+    kb_dir = tmp_path / "legra_data" / "kb"
+    meta = _write_format_1(kb_dir)
+
+    legra = Legra.load("kb")
+
+    assert legra.docs_meta == meta
+    assert legra.community_summaries == {0: "zero", 1: "one"}
+    assert legra.graph is None  # not needed for search
+    assert isinstance(legra.emb_matrix, np.memmap)
+    for legacy in LegraStore.LEGACY_FILES:
+        assert not (kb_dir / legacy).exists()
+    assert json.loads((kb_dir / "legra.json").read_text()) == {
+        "max_tokens": 256, "format_version": FORMAT_VERSION
+    }
+
+    graph = Legra.load("kb", load_reason="finalize").graph
+    assert sorted(graph.get_edgelist()) == [(0, 1), (1, 2), (3, 4), (4, 5)]
+
+
+def test_save_writes_binary_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(embedding, "FixedEmbedder", FixedEmbedder, raising=False)
+    _write_format_1(tmp_path / "legra_data" / "kb")
+    legra = Legra.load("kb", load_reason="finalize")
+
+    legra.save("kb", full=True)
+
+    names = {p.name for p in (tmp_path / "legra_data" / "kb").iterdir()}
+    assert {"docs_meta.msgpack", "graph_indptr.npy", "community_summaries.msgpack"} <= names
+    assert not names & set(LegraStore.LEGACY_FILES)
+    assert Legra.load("kb").community_summaries == {0: "zero", 1: "one"}
+
+
+def test_newer_format_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    kb_dir = tmp_path / "legra_data" / "kb"
+    kb_dir.mkdir(parents=True)
+    (kb_dir / "legra.json").write_text(json.dumps({"max_tokens": 1, "format_version": FORMAT_VERSION + 1}))
+
+    with pytest.raises(RuntimeError, match="storage format"):
+        core.Legra.load("kb")
@@ -0,0 +1,151 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app.modules.data.providers.legra.core import Legra
+from app.modules.data.providers.legra.generation.base import Generator
+from app.modules.data.providers.legra.storage import LegraStore
+from app.modules.data.providers.legra.summarization import (
+    BudgetedGenerator,
+    RateBudget,
+    SummaryCache,
+    SummaryScheduler,
+    get_budget,
+)
+
+
+class FakeLLM(Generator):
+    """Records calls and the highest number of calls in flight at once."""
+
+    model_name = "fake-llm"
+
+    def __init__(self, delay=0.02, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate(self, query, context=None, **kwargs):
+        with self._lock:
+            self.calls.append(query)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if self.fail_on is not None and self.fail_on in query:
+                raise RuntimeError("LLM unavailable")
+            return f"summary of {query.removeprefix('Summarize: ')}"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _run(scheduler, llm, texts):
+    return scheduler.run("node", texts, lambda text: llm.generate(f"Summarize: {text}"))
+
+
+def test_concurrency_is_bounded():
+    llm = FakeLLM()
+    scheduler = SummaryScheduler(SummaryCache(), max_concurrency=3)
+
+    results = _run(scheduler, llm, {i: f"text {i}" for i in range(12)})
+
+    assert results == {i: f"summary of text {i}" for i in range(12)}
+    assert 1 < llm.max_in_flight <= 3
+    assert scheduler.last_stats["generated"] == 12
+
+
+def test_unchanged_content_is_never_resummarised(tmp_path):
+    llm = FakeLLM(delay=0)
+    texts = {"a": "alpha", "b": "beta", "b2": "beta"}
+
+    _run(SummaryScheduler(SummaryCache(LegraStore(tmp_path))), llm, texts)
+    assert sorted(llm.calls) == ["Summarize: alpha", "Summarize: beta"]  # duplicates share one call
+
+    llm.calls.clear()
+    texts["a"] = "alpha, edited"
+    scheduler = SummaryScheduler(SummaryCache(LegraStore(tmp_path)))
+    results = _run(scheduler, llm, texts)
+
+    assert llm.calls == ["Summarize: alpha, edited"]
+    assert results["b2"] == "summary of beta"
+    assert scheduler.last_stats["cached"] == 2
+
+
+def test_failed_run_resumes_from_checkpoint(tmp_path):
+    texts = {i: f"text {i}" for i in range(10)}
+    llm = FakeLLM(delay=0, fail_on="text 7")
+    scheduler = SummaryScheduler(SummaryCache(LegraStore(tmp_path)), max_concurrency=1)
+
+    with pytest.raises(RuntimeError):
+        _run(scheduler, llm, texts)
+
+    done_before_failure = len(llm.calls) - 1
+    llm = FakeLLM(delay=0)
+    results = _run(SummaryScheduler(SummaryCache(LegraStore(tmp_path))), llm, texts)
+
+    assert len(results) == 10
+    assert len(llm.calls) == 10 - done_before_failure
+    assert "Summarize: text 7" in llm.calls
+
+
+def test_checkpoints_are_written_while_the_run_is_going():
+    llm = FakeLLM(delay=0.05)
+    writes = []
+
+    class RecordingStore:
+        def read_summary_cache(self):
+            return {}
+
+        def write_summary_cache(self, entries):
+            writes.append((len(entries), len(llm.calls)))
+
+    scheduler = SummaryScheduler(SummaryCache(RecordingStore()), max_concurrency=2, checkpoint_every=2)
+    _run(scheduler, llm, {i: f"text {i}" for i in range(6)})
+
+    # The first checkpoint lands before the last summaries were even requested
+    assert writes[0][0] == 2 and writes[0][1] < 6
+    assert writes[-1][0] == 6
+
+
+def test_budget_throttles_requests_and_tokens():
+    now = [0.0]
+    budget = RateBudget(requests_per_minute=60, tokens_per_minute=600,
+                        clock=lambda: now[0], sleep=lambda s: now.__setitem__(0, now[0] + s))
+
+    assert budget.acquire(100) == 0
+    # Token bucket (500 left, refilling 10/s) is the binding limit
+    assert budget.acquire(550) == pytest.approx(5.0)
+    # Request bucket: refilled to 59 during that wait, then one per second
+    for _ in range(59):
+        budget.acquire(0)
+    assert budget.acquire(0) == pytest.approx(1.0)
+
+
+def test_budget_is_shared_per_key_and_charged_per_call():
+    assert get_budget("tenant-a") is None
+    budget = get_budget("tenant-a", requests_per_minute=100)
+    assert get_budget("tenant-a", requests_per_minute=100) is budget
+    assert get_budget("tenant-b", requests_per_minute=100) is not budget
+
+    llm = FakeLLM(delay=0)
+    BudgetedGenerator(llm, budget).generate("Summarize: x")
+    assert llm.calls == ["Summarize: x"]
+    assert budget._requests == pytest.approx(99, abs=0.1)
+
+
+def test_node_summaries_use_the_kb_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    llm = FakeLLM(delay=0)
+    legra = Legra(doc_folder=Path(), chunker=None, embedder=None, indexer=None,
+                  max_tokens=256, generator=llm, summary_concurrency=2)
+    legra.docs_meta = [{"text": "one"}, {"text": "two"}]
+
+    assert legra.generate_node_summaries(kb_id="kb") == ["summary of one", "summary of two"]
+    assert legra.generate_node_summaries(kb_id="kb") == ["summary of one", "summary of two"]
+    assert len(llm.calls) == 2
+    assert (tmp_path / "legra_data" / "kb" / "summary_cache.msgpack").exists()
@@ -0,0 +1,113 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.tenant_scope import set_tenant_context
+from app.dependencies.injector import injector
+from app.modules.workflow.llm import provider as provider_module
+from app.modules.workflow.llm import provider_invalidation
+from app.modules.workflow.llm.provider import LLMProvider
+from app.services.llm_providers import LlmProviderService
+
+
+def _config(id, model, base_url="http://ollama:11434", is_default=0):
+    return SimpleNamespace(
+        id=id,
+        llm_model_provider="ollama",
+        llm_model=model,
+        connection_data={"base_url": base_url},
+        is_default=is_default,
+    )
+
+
+class FakeService:
+    def __init__(self, configurations):
+        self.configurations = configurations
+        self.queries = 0
+
+    async def get_all(self):
+        self.queries += 1
+        return list(self.configurations)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = FakeService([_config("a", "llama3", is_default=1), _config("b", "mistral")])
+    get = injector.get
+    monkeypatch.setattr(
+        injector, "get", lambda cls, *a, **kw: service if cls is LlmProviderService else get(cls, *a, **kw))
+    return service
+
+
+@pytest.fixture
+def built(monkeypatch):
+    built = []
+
+    def init_chat_model(**kwargs):
+        model = SimpleNamespace(**kwargs)
+        built.append(model)
+        return model
+
+    monkeypatch.setattr(provider_module, "init_chat_model", init_chat_model)
+    return built
+
+
+@pytest.fixture(autouse=True)
+def tenant():
+    set_tenant_context("tenant-a")
+    yield
+    set_tenant_context(None)
+
+
+@pytest.mark.asyncio
+async def test_reload_rebuilds_only_changed_clients(service, built):
+    provider = LLMProvider()
+    a, b = await provider.get_model("a"), await provider.get_model("b")
+
+    service.configurations = [_config("a", "llama3", is_default=1), _config("b", "mistral-large")]
+    await provider.reload()
+
+    assert await provider.get_model("a") is a
+    new_b = await provider.get_model("b")
+    assert new_b is not b and new_b.model == "mistral-large"
+    assert len(built) == 3
+
+
+@pytest.mark.asyncio
+async def test_unknown_ids_fall_back_to_the_default_client(service, built):
+    provider = LLMProvider()
+
+    assert await provider.get_model("missing") is await provider.get_model("a")
+    assert len(built) == 1
+
+
+@pytest.mark.asyncio
+async def test_remote_invalidation_marks_only_that_tenant_stale(service, built):
+    provider = LLMProvider()
+    a = await provider.get_model("a")
+    set_tenant_context("tenant-b")
+    other = LLMProvider()
+    await other.get_model("a")
+    set_tenant_context("tenant-a")
+
+    service.configurations = [_config("a", "llama3", "http://gpu:11434", is_default=1), _config("b", "mistral")]
+    provider_invalidation.handle_message(json.dumps(
+        {"origin": "another-worker", "tenant_id": "tenant-a", "provider_ids": ["a"]}))
+
+    assert provider._stale and not other._stale
+    refreshed = await provider.get_model("a")
+    assert refreshed is not a and refreshed.base_url == "http://gpu:11434"
+    assert service.queries == 3
+
+
+@pytest.mark.asyncio
+async def test_own_invalidations_are_ignored(service, built):
+    provider = LLMProvider()
+    await provider.get_model("a")
+
+    provider_invalidation.handle_message(json.dumps(
+        {"origin": provider_invalidation._ORIGIN, "tenant_id": "tenant-a", "provider_ids": ["a"]}))
+    provider_invalidation.handle_message("not json")
+
+    assert not provider._stale
@@ -0,0 +1,135 @@
+import time
+from typing import List, Optional
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.core.tenant_scope import set_tenant_context
+from app.modules.workflow.llm.response_cache import (
+    ResponseCache,
+    ResponseCacheConfig,
+    with_response_cache,
+)
+
+
+class CountingModel(BaseChatModel):
+    """Answers with a call counter, so cached answers are recognisable.
+
+    The cached model is a copy, so calls are counted on the copy.
+    """
+
+    temperature: Optional[float] = 0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"answer {self.calls}"))])
+
+
+class KeywordEmbedder:
+    """Embeds texts by the words they contain from a small vocabulary."""
+
+    vocabulary = ["reset", "password", "refund", "order", "hours"]
+
+    async def embed_query(self, text: str) -> List[float]:
+        words = text.lower().replace("?", "").split()
+        return [float(word in words) for word in self.vocabulary]
+
+
+def _cached(model, threshold=None, ttl=3600, embedder=None):
+    config = ResponseCacheConfig(enabled=True, ttl_seconds=ttl, similarity_threshold=threshold)
+    cached = with_response_cache(model, "node", config)
+    cached.cache = ResponseCache("node", config, embedder=embedder)
+    return cached
+
+
+def _ask(question: str, system: str = "You classify tickets."):
+    return [SystemMessage(content=system), HumanMessage(content=question)]
+
+
+@pytest.fixture(autouse=True)
+def tenant():
+    set_tenant_context("tenant-a")
+    yield
+    set_tenant_context(None)
+
+
+@pytest.mark.asyncio
+async def test_exact_hits_ignore_whitespace_and_are_tenant_scoped():
+    model = CountingModel()
+    cached = _cached(model)
+
+    first = await cached.ainvoke(_ask("Where is my order?"))
+    again = await cached.ainvoke(_ask("  Where is   my order?\n"))
+    assert (first.content, again.content, cached.calls) == ("answer 1", "answer 1", 1)
+
+    set_tenant_context("tenant-b")
+    assert (await cached.ainvoke(_ask("Where is my order?"))).content == "answer 2"
+    assert cached.cache.stats["hits"] == 1
+    assert cached.cache.stats["hit_rate"] == pytest.approx(1 / 3, abs=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_model_parameters_and_tools_are_part_of_the_key():
+    model = CountingModel()
+    cached = _cached(model)
+
+    await cached.ainvoke(_ask("Where is my order?"))
+    await cached.bind(tools=[{"type": "function", "function": {"name": "lookup"}}]).ainvoke(
+        _ask("Where is my order?"))
+    await cached.ainvoke(_ask("Where is my order?"), stop=["\n"])
+
+    assert cached.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_semantic_tier_matches_similar_questions_with_same_context():
+    model = CountingModel()
+    cached = _cached(model, threshold=0.9, embedder=KeywordEmbedder())
+
+    await cached.ainvoke(_ask("How do I reset my password?"))
+    hit = await cached.ainvoke(_ask("password reset?"))
+    other_question = await cached.ainvoke(_ask("What are your opening hours?"))
+    other_prompt = await cached.ainvoke(_ask("password reset?", system="You write poems."))
+
+    assert hit.content == "answer 1"
+    assert other_question.content == "answer 2"
+    assert other_prompt.content == "answer 3"
+    assert cached.cache.stats["semantic_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_streaming_answers_from_cache():
+    model = CountingModel()
+    cached = _cached(model, ttl=0.05)
+
+    await cached.ainvoke(_ask("Where is my order?"))
+    chunks = [c async for c in cached.astream(_ask("Where is my order?"))]
+    assert "".join(c.content for c in chunks) == "answer 1"
+
+    time.sleep(0.06)
+    assert (await cached.ainvoke(_ask("Where is my order?"))).content == "answer 2"
+
+
+def test_non_deterministic_models_are_not_cached():
+    model = CountingModel(temperature=0.7)
+    config = ResponseCacheConfig(enabled=True)
+
+    assert with_response_cache(model, "node", config) is model
+    assert with_response_cache(CountingModel(), "node", None).cache is None
+
+
+def test_config_from_node_fields():
+    assert ResponseCacheConfig.from_node_config({"cacheResponses": False}) is None
+
+    config = ResponseCacheConfig.from_node_config(
+        {"cacheResponses": True, "cacheTtlSeconds": 60, "cacheSimilarityThreshold": ""})
+
+    assert config.ttl_seconds == 60
+    assert config.similarity_threshold is None
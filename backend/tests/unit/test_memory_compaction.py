@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.core.tenant_scope import set_tenant_context
+from app.modules.workflow.agents import memory_compaction
+from app.modules.workflow.agents.agent_prompts import create_conversation_context
+from app.modules.workflow.agents.memory import InMemoryConversationMemory
+from app.modules.workflow.agents.memory_compaction import (
+    SUMMARY_METADATA_KEY,
+    MemoryCompactionConfig,
+    count_tokens,
+    format_history,
+    get_compacted_history,
+    split_history,
+)
+
+
+class SummaryLLM:
+    """Summarises by listing the user messages it was shown."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        prompt = messages[-1].content
+        asked = [line[len("User: "):] for line in prompt.splitlines() if line.startswith("User: ")]
+        previous = prompt.split("\n\nNew messages:")[0].split("Existing summary:\n")[1]
+        parts = ([] if previous == "(none)" else [previous]) + asked
+        return AIMessage(content="asked: " + ", ".join(p.replace("asked: ", "") for p in parts))
+
+
+@pytest.fixture(autouse=True)
+def tenant():
+    set_tenant_context("tenant-a")
+    yield
+    set_tenant_context(None)
+
+
+async def _settle():
+    await asyncio.gather(*list(memory_compaction._background_tasks))
+
+
+@pytest.mark.asyncio
+async def test_prompt_history_stays_within_budget_as_the_chat_grows():
+    memory = InMemoryConversationMemory("long-chat")
+    config = MemoryCompactionConfig(token_budget=120)
+    llm = SummaryLLM()
+
+    sizes = []
+    for turn in range(30):
+        await memory.add_input_output(f"question number {turn} about my order", f"answer number {turn}")
+        history = await get_compacted_history(memory, config, summary_llm=llm)
+        sizes.append(count_tokens(format_history(history)))
+        await _settle()
+
+    assert max(sizes) <= config.token_budget + 20
+    history = await get_compacted_history(memory, config, summary_llm=llm)
+    assert history[0]["message_type"] == "summary"
+    assert "question number 0 about my order" in history[0]["content"]
+    assert history[-1]["content"] == "answer number 29"
+
+
+@pytest.mark.asyncio
+async def test_summarisation_runs_off_the_request_path_once_per_thread():
+    memory = InMemoryConversationMemory("busy-chat")
+    config = MemoryCompactionConfig(token_budget=40)
+    llm = SummaryLLM(delay=0.2)
+    for turn in range(6):
+        await memory.add_input_output(f"question {turn}", f"answer {turn}")
+
+    started = asyncio.get_running_loop().time()
+    first = await get_compacted_history(memory, config, summary_llm=llm)
+    await get_compacted_history(memory, config, summary_llm=llm)
+    assert asyncio.get_running_loop().time() - started < 0.1
+    assert first[0]["message_type"] != "summary"
+
+    await _settle()
+    assert llm.calls == 1
+    summary = await memory.get_metadata(SUMMARY_METADATA_KEY)
+    assert summary["text"].startswith("asked: question 0")
+
+
+def test_oversized_message_is_shortened_and_summary_survives_context_limit():
+    config = MemoryCompactionConfig(token_budget=40)
+    huge = {"role": "user", "content": "x" * 1000, "timestamp": "2026-01-01T00:00:00"}
+
+    recent, overflow = split_history([huge], None, config)
+    assert overflow == [] and count_tokens(recent[0]["content"]) <= config.recent_tokens + 1
+
+    history = [{"role": "system", "content": "Summary of the earlier conversation: s",
+                "message_type": "summary"}]
+    history += [{"role": "user", "content": f"m{i}"} for i in range(10)]
+    context = create_conversation_context(history, max_messages=2)
+    assert "Summary of the earlier conversation" in context
+    # The budget, not max_messages, bounds compacted history
+    assert all(f"m{i}" in context for i in range(10))
+    assert "m7" not in create_conversation_context(history[1:], max_messages=2)
+
+
+@pytest.mark.asyncio
+async def test_agent_context_keeps_every_message_within_budget():
+    memory = InMemoryConversationMemory("agent-chat")
+    config = MemoryCompactionConfig(token_budget=400)
+    llm = SummaryLLM()
+    for turn in range(5):
+        await memory.add_input_output(f"question {turn}", f"answer {turn}")
+
+    history = await get_compacted_history(memory, config, summary_llm=llm)
+    context = create_conversation_context(history)
+
+    assert len(history) == 10 and llm.calls == 0
+    assert all(f"question {turn}" in context for turn in range(5))
+
+
+def test_budget_from_node_config():
+    assert MemoryCompactionConfig.from_node_config({}) is None
+    assert MemoryCompactionConfig.from_node_config({"memoryTokenBudget": ""}) is None
+    assert MemoryCompactionConfig.from_node_config({"memoryTokenBudget": "800"}).token_budget == 800
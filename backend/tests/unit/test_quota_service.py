@@ -0,0 +1,138 @@
+from types import SimpleNamespace
+
+import pytest
+import fakeredis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services import quotas as quotas_module
+from app.services.quotas import QuotaService
+from app.core.exceptions.exception_classes import AppException
+from app.core.exceptions.error_messages import ErrorKey
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def make_service(redis_client, **kwargs):
+    params = dict(
+        window_seconds=60,
+        tenant_limit=100,
+        api_key_limit=3,
+        allowance_batch=1,
+        allowance_ttl=0,
+    )
+    params.update(kwargs)
+    return QuotaService(redis_client=redis_client, **params)
+
+
+@pytest.mark.asyncio
+async def test_api_key_quota_denies_after_limit(redis_client):
+    svc = make_service(redis_client)
+
+    statuses = [await svc.check_quota("t1", "key1") for _ in range(4)]
+
+    assert [s.allowed for s in statuses] == [True, True, True, False]
+    assert [s.remaining for s in statuses] == [2, 1, 0, 0]
+    assert statuses[0].limit == 3
+    assert statuses[-1].reset_seconds >= 1
+
+
+@pytest.mark.asyncio
+async def test_tenant_quota_is_shared_across_api_keys(redis_client):
+    svc = make_service(redis_client, tenant_limit=2, api_key_limit=10)
+
+    assert (await svc.check_quota("t1", "key1")).allowed
+    assert (await svc.check_quota("t1", "key2")).allowed
+    denied = await svc.check_quota("t1", "key3")
+
+    assert not denied.allowed
+    assert denied.limit == 2
+    # Another tenant is not affected
+    assert (await svc.check_quota("t2", "key1")).allowed
+
+
+@pytest.mark.asyncio
+async def test_denied_request_is_not_charged(redis_client):
+    svc = make_service(redis_client, tenant_limit=5, api_key_limit=1)
+
+    assert (await svc.check_quota("t1", "key1")).allowed
+    assert not (await svc.check_quota("t1", "key1")).allowed
+
+    tenant_state = await redis_client.hgetall("quota:{t1}:tenant")
+    assert tenant_state["curr"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_local_allowance_avoids_round_trips(redis_client):
+    svc = make_service(redis_client, api_key_limit=50, allowance_batch=5, allowance_ttl=30)
+
+    first = await svc.check_quota("t1", "key1")
+    key_state = await redis_client.hgetall("quota:{t1}:api_key:key1")
+    assert key_state["curr"] == "5"
+    assert first.remaining == 49
+
+    for expected_remaining in (48, 47, 46, 45):
+        status = await svc.check_quota("t1", "key1")
+        assert status.allowed
+        assert status.remaining == expected_remaining
+
+    key_state = await redis_client.hgetall("quota:{t1}:api_key:key1")
+    assert key_state["curr"] == "5"
+
+    await svc.check_quota("t1", "key1")
+    key_state = await redis_client.hgetall("quota:{t1}:api_key:key1")
+    assert key_state["curr"] == "10"
+
+
+@pytest.mark.asyncio
+async def test_batch_falls_back_to_single_permit_near_limit(redis_client):
+    svc = make_service(redis_client, api_key_limit=3, allowance_batch=5, allowance_ttl=30)
+
+    statuses = [await svc.check_quota("t1", "key1") for _ in range(4)]
+
+    assert [s.allowed for s in statuses] == [True, True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_enforce_quota_raises_429(redis_client):
+    svc = make_service(redis_client, api_key_limit=1)
+
+    await svc.enforce_quota("t1", "key1")
+    with pytest.raises(AppException) as exc:
+        await svc.enforce_quota("t1", "key1")
+
+    assert exc.value.status_code == 429
+    assert exc.value.error_key == ErrorKey.QUOTA_EXCEEDED
+
+
+@pytest.mark.asyncio
+async def test_quota_fails_open_when_redis_unavailable(redis_client):
+    svc = make_service(redis_client)
+
+    async def broken_script(*args, **kwargs):
+        raise RedisConnectionError("down")
+
+    svc._script = broken_script
+
+    assert await svc.enforce_quota("t1", "key1") is None
+
+
+@pytest.mark.asyncio
+async def test_expired_local_entries_of_idle_keys_are_dropped(redis_client, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(quotas_module, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    svc = make_service(redis_client, api_key_limit=1, allowance_batch=5, allowance_ttl=10)
+
+    for i in range(20):
+        await svc.check_quota(f"t{i}")  # tenant quota only: reserves an allowance
+        await svc.check_quota(f"t{i}", "key")
+        await svc.check_quota(f"t{i}", "key")  # denied and cached
+    assert (len(svc._allowances), len(svc._denied_until)) == (20, 20)
+
+    clock[0] += 11
+    await svc.check_quota("t-new")
+
+    assert list(svc._allowances) == ["quota:{t-new}:tenant"]
+    assert svc._denied_until == {}
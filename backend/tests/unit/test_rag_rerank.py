@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+from app.modules.data.config import AgentRAGConfig, KbRAGConfig
+from app.modules.data.providers import SearchResult
+from app.modules.data.rerank import BaseReranker, RerankConfig, RerankStage, ScoreCache
+from app.modules.data.service import AgentRAGService
+
+
+class OverlapReranker(BaseReranker):
+    """Scores by the share of query words found in the passage."""
+
+    def __init__(self, config=None, delay=0.0):
+        super().__init__(config)
+        self.delay = delay
+        self.scored = []
+
+    def score(self, query, passages):
+        time.sleep(self.delay)
+        self.scored.extend(passages)
+        words = set(query.lower().split())
+        return [len(words & set(p.lower().split())) / len(words) for p in passages]
+
+
+def _result(i, content, score):
+    return SearchResult(id=f"doc{i}", content=content, score=score, source="vector")
+
+
+CANDIDATES = [
+    _result(0, "shipping rates for europe", 0.9),
+    _result(1, "how to reset your password", 0.8),
+    _result(2, "holiday opening hours", 0.7),
+    _result(3, "password reset link expired", 0.6),
+]
+
+
+def _stage(reranker=None, **config):
+    return RerankStage(RerankConfig(enabled=True, **config),
+                       reranker=reranker or OverlapReranker(), cache=ScoreCache())
+
+
+def test_rerank_reorders_and_cuts_irrelevant():
+    stage = _stage(min_score=0.3)
+
+    results = stage.rerank_sync("reset password", CANDIDATES, limit=4)
+
+    assert [r.id for r in results] == ["doc1", "doc3"]
+    assert results[0].score == 1.0
+    assert results[0].metadata["retrieval_score"] == 0.8
+    assert CANDIDATES[1].score == 0.8  # inputs are not modified
+
+
+def test_scores_are_cached_per_query_and_content():
+    reranker = OverlapReranker()
+    stage = _stage(reranker)
+
+    stage.rerank_sync("reset password", CANDIDATES, limit=2)
+    stage.rerank_sync("reset password", CANDIDATES, limit=2)
+    assert len(reranker.scored) == 4
+    assert stage.last_stats["cached"] == 4
+
+    edited = [CANDIDATES[0].model_copy(update={"content": "password reset by email"})]
+    assert stage.rerank_sync("reset password", edited, limit=1)[0].score == 1.0
+    stage.rerank_sync("opening hours", CANDIDATES[:1], limit=1)
+    assert len(reranker.scored) == 6
+
+
+def test_latency_budget_leaves_rest_in_retrieval_order():
+    stage = _stage(OverlapReranker(delay=0.05), batch_size=1, latency_budget_ms=10, min_score=0)
+
+    results = stage.rerank_sync("password reset link", CANDIDATES, limit=4)
+
+    # Only the first batch fits in the budget; the rest follow unscored
+    assert stage.last_stats["scored"] == 1
+    assert [r.id for r in results] == ["doc0", "doc1", "doc2", "doc3"]
+    assert all(r.score <= results[0].score for r in results)
+
+
+class ListProvider:
+    name = "vector"
+
+    def __init__(self, results):
+        self.results = results
+        self.limits = []
+
+    async def search(self, query, limit, doc_ids=None):
+        self.limits.append(limit)
+        return [r.model_copy() for r in self.results[:limit]]
+
+
+@pytest.mark.asyncio
+async def test_service_overfetches_and_reranks():
+    service = AgentRAGService(AgentRAGConfig(knowledge_base_id="kb"))
+    provider = ListProvider(CANDIDATES)
+    service.data_provider = [provider]
+    service.rerank_stage = _stage(candidate_multiplier=2, min_score=0.3)
+    service._initialized = True
+
+    results = await service.search("reset password", limit=2)
+
+    assert provider.limits == [4]
+    assert [r.id for r in results] == ["doc1", "doc3"]
+
+
+def test_rerank_config_from_form_values():
+    assert KbRAGConfig(enabled=True).get_rerank_config() is None
+
+    config = KbRAGConfig(enabled=True, rerank={"enabled": True, "rerank_backend": "onnx"}).get_rerank_config()
+
+    assert config.backend == "onnx"
+    assert config.model_name == "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    assert config.candidate_multiplier == 4
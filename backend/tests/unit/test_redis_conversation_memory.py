@@ -0,0 +1,98 @@
+import json
+
+import fakeredis
+import pytest
+
+from app.core.tenant_scope import set_tenant_context
+from app.modules.workflow.agents.memory import Message, RedisConversationMemory
+
+
+class CountingRedis(fakeredis.FakeAsyncRedis):
+    """Counts round trips: single commands and whole pipelines."""
+
+    round_trips = 0
+
+    async def execute_command(self, *args, **options):
+        CountingRedis.round_trips += 1
+        return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute = pipe.execute
+
+        async def counted(*args, **kwargs):
+            CountingRedis.round_trips += 1
+            return await execute(*args, **kwargs)
+
+        pipe.execute = counted
+        return pipe
+
+
+@pytest.fixture
+def memory():
+    set_tenant_context("tenant-a")
+    memory = RedisConversationMemory("thread-1")
+    memory.redis_client = CountingRedis()
+    memory.window = 6
+    CountingRedis.round_trips = 0
+    yield memory
+    set_tenant_context(None)
+
+
+@pytest.mark.asyncio
+async def test_each_write_is_one_round_trip_and_lists_are_trimmed(memory):
+    for i in range(5):
+        await memory.add_input_output(f"question {i}", f"answer {i}")
+
+    assert CountingRedis.round_trips == 10
+    assert await memory.redis_client.llen(memory._message_key) == 6
+    assert await memory.redis_client.llen(memory._role_key("user")) == 5
+
+    info = await memory.get_conversation_info()
+    assert info["thread_id"] == "thread-1" and info["executions_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_reads_return_only_requested_messages_in_order(memory):
+    for i in range(4):
+        await memory.add_input_output(f"question {i}", f"answer {i}")
+    CountingRedis.round_trips = 0
+
+    last = await memory.get_messages(max_messages=3)
+    users = await memory.get_messages(max_messages=2, roles=["user"])
+    both = await memory.get_messages(max_messages=3, roles=["user", "assistant"])
+
+    assert [m["content"] for m in last] == ["answer 2", "question 3", "answer 3"]
+    assert [m["content"] for m in users] == ["question 2", "question 3"]
+    assert [m["content"] for m in both] == ["answer 2", "question 3", "answer 3"]
+    assert CountingRedis.round_trips == 3
+    assert await memory.get_chat_history(as_string=True, max_messages=2) == \
+        "User: question 3\nAssistant: answer 3"
+
+
+@pytest.mark.asyncio
+async def test_json_messages_written_before_msgpack_are_read(memory):
+    legacy = Message("user", {"text": "hello"})
+    await memory.redis_client.lpush(memory._message_key, json.dumps(legacy.to_dict()))
+    await memory.add_assistant_message("hi")
+
+    messages = await memory.get_messages()
+
+    assert [m["content"] for m in messages] == [{"text": "hello"}, "hi"]
+
+
+@pytest.mark.asyncio
+async def test_clear_removes_role_lists_and_metadata(memory):
+    await memory.add_input_output("q", "a")
+    await memory.set_metadata("topic", {"name": "billing"})
+    assert await memory.get_metadata("topic") == {"name": "billing"}
+
+    await memory.clear()
+
+    assert await memory.get_messages() == []
+    assert await memory.get_messages(roles=["user"]) == []
+    assert await memory.get_metadata("topic") is None
+    assert await memory.redis_client.exists(memory._conversation_key)
+
+    await memory.delete_conversation()
+    assert await memory.redis_client.keys("*") == []
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.modules.workflow.agents.base_tool import BaseTool
+from app.modules.workflow.agents.tool_agent import ToolAgent
+
+
+class ScriptedLLM:
+    """Returns scripted replies and records the prompts it was sent."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    async def ainvoke(self, messages):
+        self.prompts.append(messages[-1]["content"])
+        reply = self.replies.pop(0)
+        return reply if isinstance(reply, AIMessage) else AIMessage(content=reply)
+
+
+class NativeLLM(ScriptedLLM):
+    def __init__(self, replies):
+        super().__init__(replies)
+        self.bound = None
+
+    def bind_tools(self, tools):
+        self.bound = tools
+        return self
+
+
+class ProviderError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RejectingModel:
+    """Tool-bound model whose requests fail with `error`."""
+
+    def __init__(self, error):
+        self.error = error
+
+    async def ainvoke(self, messages):
+        raise self.error
+
+
+class Gauge:
+    def __init__(self):
+        self.now = 0
+        self.max = 0
+
+
+def _tool(name, result, delay=0.05, gauge=None, parameters=None):
+    async def run(payload):
+        if gauge:
+            gauge.now += 1
+            gauge.max = max(gauge.max, gauge.now)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            if gauge:
+                gauge.now -= 1
+        return result
+
+    return BaseTool(name, name, f"{name} tool", parameters or {}, run)
+
+
+def _calls(*names):
+    return json.dumps({
+        "action": "tool_calls",
+        "tool_calls": [{"tool_name": name, "parameters": {}} for name in names],
+    })
+
+
+ANSWER = json.dumps({"action": "direct_response", "response": "All done."})
+
+
+@pytest.mark.asyncio
+async def test_independent_tools_run_in_one_turn():
+    tools = [_tool("crm", "gold customer", 0.1), _tool("kb", "refund policy", 0.1),
+             _tool("orders", "shipped", 0.1)]
+    llm = ScriptedLLM([_calls("crm", "kb", "orders"), ANSWER])
+    agent = ToolAgent(llm_model=llm, system_prompt="", tools=tools)
+
+    started = time.perf_counter()
+    result = await agent.invoke("Where is my order and can I get a refund?")
+
+    assert time.perf_counter() - started < 0.25
+    assert result["response"] == "All done."
+    assert len(llm.prompts) == 2
+    assert all(r in llm.prompts[1] for r in ("gold customer", "refund policy", "shipped"))
+    assert [t["tool_name"] for t in result["tools_used"]] == ["crm", "kb", "orders"]
+
+
+@pytest.mark.asyncio
+async def test_cap_timeout_and_unknown_tools_do_not_stop_the_turn():
+    gauge = Gauge()
+    tools = [_tool(f"t{i}", f"r{i}", 0.02, gauge) for i in range(4)]
+    tools.append(_tool("slow", "never", 1.0))
+    llm = ScriptedLLM([_calls("t0", "t1", "t2", "t3", "slow", "missing"), ANSWER])
+    agent = ToolAgent(llm_model=llm, system_prompt="", tools=tools,
+                      tool_timeout=0.1, max_parallel_tools=2)
+
+    result = await agent.invoke("q")
+
+    assert result["status"] == "success"
+    assert gauge.max <= 2
+    results = {t["tool_name"]: str(t["result"]) for t in result["tools_used"]}
+    assert results["t3"] == "r3"
+    assert "timed out" in results["slow"]
+    assert "not found" in results["missing"]
+
+
+@pytest.mark.asyncio
+async def test_native_tool_calls_are_used_when_supported():
+    params = {"order_id": {"type": "string", "description": "Order", "required": True}}
+    tools = [_tool("orders", "shipped", parameters=params), _tool("kb", "policy")]
+    llm = NativeLLM([
+        AIMessage(content="", tool_calls=[
+            {"name": "orders", "args": {"order_id": "A1"}, "id": "1"},
+            {"name": "kb", "args": {}, "id": "2"},
+        ]),
+        ANSWER,
+    ])
+    assert ToolAgent(llm_model=llm, system_prompt="", tools=tools)._tool_model is None
+    agent = ToolAgent(llm_model=llm, system_prompt="", tools=tools, native_tool_calls=True)
+
+    result = await agent.invoke("q")
+
+    schema = llm.bound[0]["function"]
+    assert schema["name"] == "orders"
+    assert schema["parameters"]["required"] == ["order_id"]
+    assert result["tools_used"][0]["args"] == {"order_id": "A1"}
+    assert "shipped" in llm.prompts[1] and "policy" in llm.prompts[1]
+
+
+@pytest.mark.asyncio
+async def test_single_tool_call_keeps_sequential_protocol():
+    llm = ScriptedLLM([
+        json.dumps({"action": "tool_call", "tool_name": "kb", "parameters": {}}),
+        ANSWER,
+    ])
+    agent = ToolAgent(llm_model=llm, system_prompt="", tools=[_tool("kb", "policy")])
+
+    result = await agent.invoke("q")
+
+    assert result["response"] == "All done."
+    assert "Tool Result from kb: policy" in llm.prompts[1]
+
+
+@pytest.mark.asyncio
+async def test_only_tool_rejections_fall_back_to_the_json_protocol():
+    llm = ScriptedLLM([ANSWER])
+    agent = ToolAgent(llm_model=llm, system_prompt="", tools=[_tool("kb", "policy")])
+
+    agent._tool_model = RejectingModel(ProviderError("rate limited", 429))
+    with pytest.raises(ProviderError):
+        await agent._generate("q", use_tools=True)
+    assert agent._tool_model is not None and llm.prompts == []
+
+    agent._tool_model = RejectingModel(ProviderError("tools is not supported for this model", 400))
+    text, calls = await agent._generate("q", use_tools=True)
+    assert text == ANSWER and calls == []
+    assert agent._tool_model is None
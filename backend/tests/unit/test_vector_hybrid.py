@@ -0,0 +1,172 @@
+import zlib
+
+import numpy as np
+import pytest
+import pytest_asyncio
+
+from app.modules.data.providers.vector import VectorConfig, VectorProvider
+from app.modules.data.providers.vector.db import faiss as faiss_module
+from app.modules.data.providers.vector.db.base import SearchResult, VectorDBConfig
+from app.modules.data.providers.vector.embedding.base import BaseEmbedder, EmbeddingConfig
+from app.modules.data.providers.vector.lexical import LexicalConfig, SqliteFTSIndex, fuse_results
+
+DIM = 16
+
+DOCS = {
+    "manual": "To reset the router hold the power button for ten seconds until the light blinks.",
+    "errors": "Error ERR-4012 means the payment gateway rejected the card. Retry with another card.",
+    "catalog": "Product SKU AB-7731 is the blue widget. SKU AB-7732 is the red widget.",
+}
+
+
+class CountingEmbedder(BaseEmbedder):
+    """Deterministic bag-of-words vectors; counts query embeddings."""
+
+    def __init__(self):
+        super().__init__(EmbeddingConfig(type="huggingface"))
+        self.queries = []
+
+    async def initialize(self):
+        return True
+
+    async def get_dimension(self):
+        return DIM
+
+    def _vector(self, text):
+        vector = np.zeros(DIM, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode()) % DIM] += 1
+        return (vector / (np.linalg.norm(vector) or 1)).tolist()
+
+    async def embed_texts(self, texts):
+        return [self._vector(text) for text in texts]
+
+    async def embed_query(self, query):
+        self.queries.append(query)
+        return self._vector(query)
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_collections():
+    yield
+    for db in list(faiss_module._persistent_collections):
+        db.close()
+
+
+async def _provider(tmp_path, monkeypatch, embedder=None, **lexical):
+    embedder = embedder or CountingEmbedder()
+    monkeypatch.setattr(EmbeddingConfig, "get", lambda self: embedder)
+    config = VectorConfig(
+        enabled=True,
+        vector_db=VectorDBConfig(type="faiss", collection_name="hybrid", index_type="flat"),
+        lexical=LexicalConfig(index_directory=str(tmp_path), **lexical),
+    )
+    provider = VectorProvider(config, "kb1")
+    assert await provider.initialize()
+    return provider, embedder
+
+
+async def _add_docs(provider):
+    for doc_id, content in DOCS.items():
+        assert await provider.add_document(doc_id, content)
+
+
+@pytest.mark.asyncio
+async def test_identifier_query_skips_embedding(tmp_path, monkeypatch):
+    provider, embedder = await _provider(tmp_path, monkeypatch)
+    await _add_docs(provider)
+
+    results = await provider.search("ERR-4012", limit=2)
+
+    assert [r.id for r in results] == ["errors"]
+    assert embedder.queries == []
+
+
+@pytest.mark.asyncio
+async def test_descriptive_query_fuses_both_rankings(tmp_path, monkeypatch):
+    provider, embedder = await _provider(tmp_path, monkeypatch)
+    await _add_docs(provider)
+
+    results = await provider.search("how do I reset the router", limit=3)
+
+    assert embedder.queries == ["how do I reset the router"]
+    assert results[0].id == "manual"
+    assert 0 < results[0].score <= 1
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_identifier_falls_back_to_fusion(tmp_path, monkeypatch):
+    provider, embedder = await _provider(tmp_path, monkeypatch)
+    await _add_docs(provider)
+    assert await provider.add_document("catalog2", "SKU AB-7731 also ships in a bundle.")
+
+    results = await provider.search("AB-7731", limit=3)
+
+    assert embedder.queries == ["AB-7731"]
+    assert {r.id for r in results[:2]} == {"catalog", "catalog2"}
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_keyword_matches(tmp_path, monkeypatch):
+    provider, _ = await _provider(tmp_path, monkeypatch, decisive_ratio=0)
+    await _add_docs(provider)
+
+    assert await provider.delete_document("errors")
+
+    assert provider.lexical_index.search("ERR-4012", 5) == []
+    assert "errors" not in [r.id for r in await provider.search("ERR-4012", limit=3)]
+
+
+@pytest.mark.asyncio
+async def test_existing_collection_is_backfilled(tmp_path, monkeypatch):
+    provider, _ = await _provider(tmp_path, monkeypatch, enabled=False)
+    await _add_docs(provider)
+    assert provider.lexical_index is None
+
+    # Same in-memory collection, now with hybrid search switched on
+    provider.config.lexical.enabled = True
+    await provider._initialize_lexical_index()
+
+    assert provider.lexical_index.count({"kb_id": "kb1"}) == 3
+    assert provider.lexical_index.search("AB-7732", 1)[0].metadata["doc_id"] == "catalog"
+
+
+@pytest.mark.asyncio
+async def test_interrupted_backfill_is_completed(tmp_path, monkeypatch):
+    provider, _ = await _provider(tmp_path, monkeypatch)
+    await _add_docs(provider)
+    # Only part of the collection made it into the keyword index
+    catalog_ids = await provider.vector_db.get_all_ids({"doc_id": "catalog"})
+    provider.lexical_index.delete(catalog_ids)
+    assert 0 < provider.lexical_index.count({"kb_id": "kb1"}) < 3
+
+    await provider._initialize_lexical_index()
+
+    assert provider.lexical_index.count({"kb_id": "kb1"}) == 3
+    assert provider.lexical_index.search("AB-7732", 1)[0].metadata["doc_id"] == "catalog"
+
+
+def test_index_filters_and_replaces(tmp_path):
+    index = SqliteFTSIndex(str(tmp_path), "kb")
+    index.add(["a_chunk_0", "b_chunk_0"], ["alpha ERR-1", "beta ERR-1"],
+              [{"doc_id": "a", "kb_id": "x"}, {"doc_id": "b", "kb_id": "y"}])
+    index.add(["a_chunk_0"], ["alpha ERR-2"], [{"doc_id": "a", "kb_id": "x"}])
+
+    assert [r.id for r in index.search("ERR-1", 5)] == ["b_chunk_0"]
+    assert [r.id for r in index.search("alpha", 5, {"kb_id": "x"})] == ["a_chunk_0"]
+    assert index.search("alpha", 5, {"kb_id": "y"}) == []
+    assert index.count() == 2
+    index.close()
+
+
+def test_fusion_rewards_agreement():
+    def ranking(*ids):
+        return [SearchResult(id=i, content=i, metadata={}, score=1.0) for i in ids]
+
+    fused = fuse_results([(ranking("a", "b", "c"), 1.0), (ranking("b", "c"), 1.0)])
+    assert [r.id for r in fused] == ["b", "c", "a"]
+
+    fused = fuse_results([(ranking("a", "b"), 1.0), (ranking("b", "a"), 3.0)])
+    assert [r.id for r in fused] == ["b", "a"]
+    assert fused[0].score == pytest.approx(
+        (1 / 62 + 3 / 61) / (4 / 61))
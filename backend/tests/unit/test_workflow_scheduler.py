@@ -0,0 +1,189 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.core.config.settings import settings
+from app.modules.workflow.engine import scheduler as scheduler_module
+from app.modules.workflow.engine.base_node import BaseNode
+from app.modules.workflow.engine.scheduler import ExecutionPlan
+from app.modules.workflow.engine.workflow_engine import WorkflowEngine
+
+
+class Tracker:
+    def __init__(self):
+        self.runs = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.seen_outputs = {}
+
+
+class RecordingNode(BaseNode):
+    """Sleeps, records concurrency, and optionally routes or fails."""
+
+    tracker = Tracker()
+
+    async def process(self, config):
+        tracker = RecordingNode.tracker
+        tracker.runs.append(self.node_id)
+        tracker.seen_outputs[self.node_id] = set(self.state.node_outputs)
+        tracker.in_flight += 1
+        tracker.max_in_flight = max(tracker.max_in_flight, tracker.in_flight)
+        try:
+            await asyncio.sleep(config.get("delay", 0.01))
+        finally:
+            tracker.in_flight -= 1
+        if config.get("fail"):
+            raise RuntimeError(f"{self.node_id} failed")
+        output = {"node": self.node_id}
+        if "route" in config:
+            output["next_nodes"] = config["route"]
+        return output
+
+
+@pytest.fixture
+def tracker():
+    RecordingNode.tracker = Tracker()
+    return RecordingNode.tracker
+
+
+def _engine(nodes, edges, db_nodes=()):
+    engine = WorkflowEngine()
+    engine.register_node_type("recordingNode", RecordingNode)
+    engine._node_needs_db_access = lambda node_type: node_type == "dbNode"
+    engine.register_node_type("dbNode", RecordingNode)
+    workflow_id = engine.build_workflow({
+        "id": "wf",
+        "nodes": [
+            {"id": node_id, "type": "dbNode" if node_id in db_nodes else "recordingNode", "data": data}
+            for node_id, data in nodes.items()
+        ],
+        "edges": [
+            {"source": s, "target": t, "sourceHandle": "output", "targetHandle": handle}
+            for s, t, handle in (e if len(e) == 3 else (*e, "input") for e in edges)
+        ],
+    })
+    return engine, workflow_id
+
+
+async def _run(engine, workflow_id, start="start"):
+    return await engine.execute_from_node(workflow_id, start_node_id=start, persist=False)
+
+
+@pytest.mark.asyncio
+async def test_join_runs_once_after_all_branches(tracker):
+    engine, wf = _engine(
+        {"start": {}, "a": {"delay": 0.03}, "b": {}, "c": {"delay": 0.02}, "join": {}, "end": {}},
+        [("start", "a"), ("start", "b"), ("start", "c"),
+         ("a", "join"), ("b", "join"), ("c", "join"), ("join", "end")],
+    )
+
+    state = await _run(engine, wf)
+
+    assert tracker.runs.count("join") == 1
+    assert {"a", "b", "c"} <= tracker.seen_outputs["join"]
+    assert tracker.runs[-1] == "end"
+    assert state.current_step == 6
+
+
+@pytest.mark.asyncio
+async def test_fan_out_respects_concurrency_caps(tracker, monkeypatch):
+    branches = {f"n{i}": {"delay": 0.01} for i in range(12)}
+    engine, wf = _engine({"start": {}, **branches}, [("start", n) for n in branches])
+
+    monkeypatch.setattr(settings, "WORKFLOW_MAX_PARALLEL_NODES", 3)
+    await _run(engine, wf)
+    assert len(tracker.runs) == 13
+    assert tracker.max_in_flight == 3
+
+    tracker.max_in_flight = 0
+    monkeypatch.setattr(settings, "WORKFLOW_MAX_PARALLEL_NODES", 10)
+    monkeypatch.setattr(settings, "WORKFLOW_PROCESS_MAX_PARALLEL_NODES", 2)
+    monkeypatch.setattr(scheduler_module, "_loop_semaphores", type(scheduler_module._loop_semaphores)())
+    await _run(engine, wf)
+    assert tracker.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_untaken_route_is_skipped_without_blocking_join(tracker):
+    engine, wf = _engine(
+        {"start": {}, "router": {"route": ["x"]}, "x": {}, "y": {}, "z": {}, "join": {}},
+        [("start", "router"), ("router", "x"), ("router", "y"),
+         ("x", "join"), ("y", "join"), ("y", "z")],
+    )
+
+    await _run(engine, wf)
+
+    assert tracker.runs == ["start", "router", "x", "join"]
+
+
+@pytest.mark.asyncio
+async def test_failed_branch_stops_only_its_descendants(tracker):
+    engine, wf = _engine(
+        {"start": {}, "bad": {"fail": True}, "after_bad": {}, "good": {}, "after_good": {}},
+        [("start", "bad"), ("bad", "after_bad"), ("start", "good"), ("good", "after_good")],
+    )
+
+    await _run(engine, wf)
+
+    assert "after_good" in tracker.runs
+    assert "after_bad" not in tracker.runs
+
+
+@pytest.mark.asyncio
+async def test_cycles_and_tool_edges_do_not_block(tracker):
+    engine, wf = _engine(
+        {"start": {}, "a": {}, "b": {}, "tool": {}, "agent": {}},
+        [("start", "a"), ("a", "b"), ("b", "a"), ("b", "agent"),
+         ("tool", "agent", "input_tools")],
+    )
+
+    await _run(engine, wf)
+
+    assert tracker.runs == ["start", "a", "b", "agent"]
+    plan = engine.get_execution_plan(wf, "start")
+    assert plan.in_degree == {"start": 0, "a": 1, "b": 1, "agent": 1}
+    assert engine.get_execution_plan(wf, "start") is plan
+
+
+def test_plan_counts_each_predecessor_once():
+    edges = {
+        "s": [{"source": "s", "target": "j", "targetHandle": "input"},
+              {"source": "s", "target": "j", "targetHandle": "input_extra"},
+              {"source": "s", "target": "m", "targetHandle": "input"}],
+        "m": [{"source": "m", "target": "j", "targetHandle": "input"}],
+    }
+
+    plan = ExecutionPlan.compile(edges, "s")
+
+    assert plan.in_degree == {"s": 0, "j": 2, "m": 1}
+
+
+@pytest.mark.asyncio
+async def test_db_nodes_share_a_bounded_scope_pool(tracker, monkeypatch):
+    open_scopes = {"now": 0, "max": 0}
+
+    class FakeScopeFactory:
+        @asynccontextmanager
+        async def create_scope(self):
+            open_scopes["now"] += 1
+            open_scopes["max"] = max(open_scopes["max"], open_scopes["now"])
+            try:
+                yield
+            finally:
+                open_scopes["now"] -= 1
+
+    class FakeInjector:
+        def get(self, _):
+            return FakeScopeFactory()
+
+    monkeypatch.setattr(scheduler_module, "injector", FakeInjector())
+    monkeypatch.setattr(scheduler_module, "_loop_semaphores", type(scheduler_module._loop_semaphores)())
+    monkeypatch.setattr(settings, "WORKFLOW_MAX_DB_SCOPES", 2)
+    branches = {f"db{i}": {"delay": 0.01} for i in range(6)}
+    engine, wf = _engine({"start": {}, **branches}, [("start", n) for n in branches], db_nodes=branches)
+
+    await _run(engine, wf)
+
+    assert len(tracker.runs) == 7
+    assert open_scopes["max"] == 2
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from app.modules.workflow.agents.agent_utils import DirectResponseStream
+from app.modules.workflow.agents.base_tool import BaseTool
+from app.modules.workflow.agents.tool_agent import ToolAgent
+from app.modules.workflow.engine.base_node import BaseNode
+from app.modules.workflow.engine.workflow_engine import WorkflowEngine
+
+
+def _feed(text, size):
+    deltas = []
+    extractor = DirectResponseStream(deltas.append)
+    for i in range(0, len(text), size):
+        extractor.feed(text[i:i + size])
+    return "".join(deltas), extractor.text
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 1000])
+def test_direct_response_is_decoded_across_chunk_boundaries(size):
+    answer = 'Price is "12€"\nThanks 😀'
+    reply = json.dumps({"reasoning": "r", "action": "direct_response", "response": answer})
+
+    streamed, full = _feed(reply, size)
+
+    assert streamed == answer
+    assert full == reply
+
+
+def test_tool_calls_emit_nothing_and_plain_text_passes_through():
+    tool_call = json.dumps({"action": "tool_call", "tool_name": "t", "response": "hidden"})
+    assert _feed(tool_call, 3)[0] == ""
+    assert _feed("```json\n" + tool_call + "\n```", 4)[0] == ""
+    assert _feed("  Plain answer.", 3)[0] == "Plain answer."
+
+
+class WordsNode(BaseNode):
+    """Emits its configured text word by word when the state asks it to stream."""
+
+    async def process(self, config):
+        on_token = self.get_token_callback()
+        words = config["text"].split(" ")
+        for i, word in enumerate(words):
+            if on_token:
+                on_token(word if i == 0 else " " + word)
+        return config["text"]
+
+
+def _engine():
+    engine = WorkflowEngine()
+    engine.register_node_type("wordsNode", WordsNode)
+    workflow_id = engine.build_workflow({
+        "id": "wf",
+        "nodes": [
+            {"id": "start", "type": "wordsNode", "data": {"text": "not streamed"}},
+            {"id": "answer", "type": "wordsNode", "data": {"text": "hello there world"}},
+            {"id": "out", "type": "chatOutputNode", "data": {}},
+        ],
+        "edges": [
+            {"source": "start", "target": "answer", "sourceHandle": "output", "targetHandle": "input"},
+            {"source": "answer", "target": "out", "sourceHandle": "output", "targetHandle": "input"},
+        ],
+    })
+    return engine, workflow_id
+
+
+@pytest.mark.asyncio
+async def test_engine_streams_tokens_of_nodes_feeding_chat_output():
+    engine, wf = _engine()
+
+    events = [e async for e in engine.stream_from_node(
+        wf, start_node_id="start", input_data={"message": "hi"}, persist=False)]
+
+    tokens = [e for e in events if e["type"] == "token"]
+    assert {e["node_id"] for e in tokens} == {"answer"}
+    assert "".join(e["delta"] for e in tokens) == "hello there world"
+    assert events[-1]["type"] == "final"
+    assert events[-1]["state"].node_outputs["answer"] == "hello there world"
+
+
+@pytest.mark.asyncio
+async def test_execute_without_stream_is_unchanged():
+    engine, wf = _engine()
+
+    state = await engine.execute_from_node(wf, start_node_id="start", persist=False)
+
+    assert state.stream is None
+    assert state.get_token_callback("answer") is None
+    assert state.node_outputs["answer"] == "hello there world"
+
+
+class ScriptedLLM:
+    """Streams scripted replies a few characters at a time."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+
+    async def astream(self, messages):
+        reply = self.replies.pop(0)
+        for i in range(0, len(reply), 4):
+            yield AIMessageChunk(content=reply[i:i + 4])
+
+
+@pytest.mark.asyncio
+async def test_tool_agent_streams_only_the_final_answer():
+    async def lookup(payload):
+        return "42"
+
+    tool = BaseTool("tool", "lookup", "Look things up", {}, lookup)
+    llm = ScriptedLLM([
+        json.dumps({"action": "tool_call", "tool_name": "lookup", "parameters": {}}),
+        json.dumps({"action": "direct_response", "response": "The answer is 42."}),
+    ])
+    agent = ToolAgent(llm_model=llm, system_prompt="Be brief.", tools=[tool])
+
+    events = [e async for e in agent.stream("question?")]
+
+    tokens = "".join(e["delta"] for e in events if e.get("type") == "token")
+    assert tokens == "The answer is 42."
+    assert events[-1]["status"] == "success"
+    assert events[-1]["response"] == "The answer is 42."
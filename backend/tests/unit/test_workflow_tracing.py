@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.core.config.settings import settings
+from app.core.tenant_scope import set_tenant_context
+from app.modules.workflow import tracing
+from app.modules.workflow.engine.base_node import BaseNode
+from app.modules.workflow.engine.workflow_engine import WorkflowEngine
+from app.modules.workflow.tracing import get_duration_stats, get_trace, llm_tracing_callback, trace_span
+
+
+class EchoModel(BaseChatModel):
+    @property
+    def _llm_type(self) -> str:
+        return "echo"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = AIMessage(content="ok", usage_metadata={
+            "input_tokens": 12, "output_tokens": 3, "total_tokens": 15})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class SlowNode(BaseNode):
+    """Sleeps, reads memory and calls an LLM, each traced."""
+
+    async def process(self, config):
+        await asyncio.sleep(config.get("delay", 0.01))
+        async with trace_span("memory.get_messages", "memory"):
+            await asyncio.sleep(0.001)
+        if config.get("llm"):
+            await EchoModel(callbacks=[llm_tracing_callback]).ainvoke("hi")
+        return "done"
+
+
+def _engine():
+    engine = WorkflowEngine()
+    engine.register_node_type("slowNode", SlowNode)
+    workflow_id = engine.build_workflow({
+        "id": "traced",
+        "nodes": [
+            {"id": "start", "type": "slowNode", "data": {"delay": 0.01}},
+            {"id": "left", "type": "slowNode", "data": {"delay": 0.03, "llm": True}},
+            {"id": "right", "type": "slowNode", "data": {"delay": 0.01}},
+        ],
+        "edges": [
+            {"source": "start", "target": "left", "sourceHandle": "output", "targetHandle": "input"},
+            {"source": "start", "target": "right", "sourceHandle": "output", "targetHandle": "input"},
+        ],
+    })
+    return engine, workflow_id
+
+
+@pytest.fixture(autouse=True)
+def clean(monkeypatch):
+    set_tenant_context("tenant-a")
+    monkeypatch.setattr(settings, "WORKFLOW_TRACE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "WORKFLOW_TRACE_EXPORT_PATH", None)
+    tracing.reset_traces()
+    yield
+    set_tenant_context(None)
+
+
+@pytest.mark.asyncio
+async def test_timeline_has_nested_spans_per_node():
+    engine, wf = _engine()
+
+    state = await engine.execute_from_node(wf, start_node_id="start", persist=False, thread_id="t-1")
+
+    timeline = get_trace(state.execution_id, "tenant-a").timeline()
+    assert (timeline["thread_id"], timeline["tenant_id"]) == ("t-1", "tenant-a")
+    spans = timeline["spans"]
+    by_id = {s["span_id"]: s for s in spans}
+    run = spans[0]
+    assert run["category"] == "run" and run["start_offset_ms"] == 0
+
+    nodes = {s["node_id"]: s for s in spans if s["category"] == "node"}
+    assert set(nodes) == {"start", "left", "right"}
+    assert all(n["parent_span_id"] == run["span_id"] for n in nodes.values())
+    assert nodes["left"]["duration_ms"] >= 30
+    # Both branches ran side by side
+    assert nodes["right"]["start_offset_ms"] < nodes["left"]["start_offset_ms"] + nodes["left"]["duration_ms"]
+
+    llm = next(s for s in spans if s["category"] == "llm")
+    assert by_id[llm["parent_span_id"]]["node_id"] == "left"
+    assert llm["attributes"]["llm.input_tokens"] == 12
+    categories = {s["category"] for s in spans}
+    assert {"queue", "config", "memory"} <= categories
+    assert get_trace(state.execution_id, "tenant-b") is None
+
+
+@pytest.mark.asyncio
+async def test_percentiles_per_node_type_and_sampling():
+    engine, wf = _engine()
+    for _ in range(3):
+        await engine.execute_from_node(wf, start_node_id="start", persist=False)
+
+    stats = get_duration_stats("tenant-a")
+    assert stats["node"]["slowNode"]["count"] == 9
+    assert stats["node"]["slowNode"]["p90_ms"] >= 30
+    assert stats["llm"]["llm.call"]["count"] == 3
+    assert get_duration_stats("tenant-b") == {}
+
+    settings.WORKFLOW_TRACE_SAMPLE_RATE = 0.0
+    state = await engine.execute_from_node(wf, start_node_id="start", persist=False)
+    assert state.trace is None and get_trace(state.execution_id) is None
+
+
+@pytest.mark.asyncio
+async def test_traces_are_exported_as_otlp_json(tmp_path):
+    path = tmp_path / "traces" / "workflow.jsonl"
+    settings.WORKFLOW_TRACE_EXPORT_PATH = str(path)
+    engine, wf = _engine()
+
+    state = await engine.execute_from_node(wf, start_node_id="start", persist=False)
+    for _ in range(100):
+        if path.exists():
+            break
+        await asyncio.sleep(0.01)
+
+    request = json.loads(path.read_text().splitlines()[0])
+    resource = request["resourceSpans"][0]
+    attributes = {a["key"]: a["value"] for a in resource["resource"]["attributes"]}
+    assert attributes["workflow.execution_id"] == {"stringValue": state.execution_id}
+    spans = resource["scopeSpans"][0]["spans"]
+    assert {len(s["traceId"]) for s in spans} == {32}
+    assert all("parentSpanId" in s for s in spans[1:])
+    assert int(spans[0]["endTimeUnixNano"]) > int(spans[0]["startTimeUnixNano"])
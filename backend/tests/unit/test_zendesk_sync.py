@@ -0,0 +1,251 @@
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config.settings import settings
+from app.modules.integration import zendesk as zendesk_module
+from app.modules.integration.zendesk import ZendeskConnector
+from app.repositories.zendesk_sync import ZendeskSyncRepository
+from app.tasks import zendesk_article_sync_tasks as sync_module
+
+HC = "https://acme.zendesk.com/api/v2/help_center"
+
+
+@pytest.fixture
+def zendesk_api(monkeypatch):
+    """Answers Zendesk requests from `responses` (url -> list of responses) and records them."""
+    state = {"responses": {}, "calls": [], "sleeps": []}
+
+    async def fake_request(method, url, params=None, **kwargs):
+        state["calls"].append((str(url), params))
+        return state["responses"][str(url)].pop(0)
+
+    async def fake_sleep(seconds):
+        state["sleeps"].append(seconds)
+        # Let the backoff window pass without waiting for it
+        for limiter in zendesk_module._limiters.values():
+            limiter.blocked_until = 0.0
+
+    monkeypatch.setattr(zendesk_module, "http_request", fake_request)
+    monkeypatch.setattr(zendesk_module.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(zendesk_module, "_limiters", {})
+    return state
+
+
+def _page(articles, end_time, next_page=None):
+    body = {"articles": articles, "end_time": end_time, "next_page": next_page}
+    return httpx.Response(200, json=body, request=httpx.Request("GET", HC))
+
+
+@pytest.mark.asyncio
+async def test_incremental_export_follows_pages_until_the_cursor_repeats(zendesk_api):
+    first, second = f"{HC}/incremental/articles.json", f"{HC}/incremental/articles.json?start_time=200"
+    zendesk_api["responses"] = {
+        first: [_page([{"id": 1, "locale": "en-us"}, {"id": 2, "locale": "de"}], 200, second)],
+        # The last page of a time-based export points at itself
+        second: [_page([{"id": 3, "locale": "en-us"}], 300, second)],
+    }
+    connector = ZendeskConnector(subdomain="acme.zendesk.com", email="a@acme.com", api_token="t")
+
+    articles, watermark = await connector.fetch_articles_incremental(100, locale="en-us")
+
+    assert [a["id"] for a in articles] == [1, 3]
+    assert watermark == 300
+    assert zendesk_api["calls"] == [(first, {"start_time": 100}), (second, {})]
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_requests_wait_for_retry_after(zendesk_api, monkeypatch):
+    monkeypatch.setattr(settings, "ZENDESK_MAX_RETRIES", 2)
+    url = f"{HC}/incremental/articles.json"
+    limited = httpx.Response(429, headers={"Retry-After": "7"}, request=httpx.Request("GET", url))
+    zendesk_api["responses"] = {url: [limited, limited, _page([{"id": 1}], 150)]}
+    connector = ZendeskConnector(subdomain="acme.zendesk.com", email="a@acme.com", api_token="t")
+
+    articles, watermark = await connector.fetch_articles_incremental(100)
+
+    assert (len(articles), watermark) == (1, 150)
+    assert len(zendesk_api["calls"]) == 3
+    assert [round(s) for s in zendesk_api["sleeps"]] == [7, 7]
+
+    # Past ZENDESK_MAX_RETRIES the 429 is surfaced
+    zendesk_api["responses"] = {url: [limited] * 3}
+    with pytest.raises(Exception) as error:
+        await connector.fetch_articles_incremental(100)
+    assert error.value.status_code == 429
+
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+async def test_repository_upserts_state_and_versions_in_batches():
+    session = FakeSession()
+    repo = ZendeskSyncRepository(session)
+    kb_id = uuid4()
+
+    await repo.save_state(kb_id, watermark=1234)
+    await repo.upsert_article_versions(kb_id, {str(i): "2026-01-01T00:00:00Z" for i in range(2500)})
+    await repo.upsert_article_versions(kb_id, {})
+
+    state_sql, *version_sql = session.statements
+    assert "ON CONFLICT ON CONSTRAINT zendesk_sync_states_kb_unique DO UPDATE SET watermark" in state_sql
+    # Without a full sync the last_full_sync column is left alone
+    assert "last_full_sync" not in state_sql
+    assert len(version_sql) == 3
+    assert all("ON CONFLICT ON CONSTRAINT zendesk_synced_articles_unique" in sql for sql in version_sql)
+    assert session.commits == 2
+
+
+class FakeSyncRepository:
+    def __init__(self):
+        self.state = None
+        self.versions = {}
+
+    async def get_state(self, kb_id):
+        return self.state
+
+    async def save_state(self, kb_id, watermark, last_full_sync=None):
+        self.state = SimpleNamespace(
+            watermark=watermark,
+            last_full_sync=last_full_sync or (self.state.last_full_sync if self.state else None),
+        )
+
+    async def get_article_versions(self, kb_id):
+        return dict(self.versions)
+
+    async def upsert_article_versions(self, kb_id, versions):
+        self.versions.update(versions)
+
+    async def delete_articles(self, kb_id, article_ids):
+        for article_id in article_ids:
+            self.versions.pop(article_id, None)
+
+
+class FakeRAG:
+    def __init__(self):
+        self.documents = {}
+        self.fail = set()
+
+    async def get_document_ids(self, kb):
+        return list(self.documents)
+
+    async def add_document(self, kb, doc_id, content, metadata):
+        if doc_id in self.fail:
+            raise RuntimeError("embedding failed")
+        self.documents[doc_id] = content
+
+    async def delete_document(self, kb, doc_id):
+        self.documents.pop(doc_id, None)
+
+
+class FakeConnector:
+    """Help Center state served to the sync task: full listing and incremental export."""
+
+    articles = []
+    changes = []
+    calls = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def fetch_articles(self, locale=None, section_id=None):
+        FakeConnector.calls.append(("full", None))
+        return list(self.articles)
+
+    async def fetch_articles_incremental(self, start_time, locale=None, section_id=None):
+        FakeConnector.calls.append(("incremental", start_time))
+        return list(self.changes), 5000
+
+
+@pytest.fixture
+def sync_env(monkeypatch):
+    kb = SimpleNamespace(id=uuid4(), name="help", sync_active=1, sync_source_id=uuid4(),
+                         sync_schedule="* * * * *", last_synced=None, extra_metadata={})
+    kb.model_dump_json = lambda: json.dumps({"id": str(kb.id), "extra_metadata": {}})
+    ds = SimpleNamespace(name="zendesk", source_type="Zendesk",
+                         connection_data={"subdomain": "acme.zendesk.com", "email": "a@acme.com", "api_token": "t"})
+    repo, rag = FakeSyncRepository(), FakeRAG()
+
+    class KBService:
+        async def get_by_id(self, kb_id):
+            return kb
+
+        async def update(self, kb_id, data):
+            pass
+
+    class DataSources:
+        async def get_by_id(self, ds_id, decrypt):
+            return ds
+
+    services = {
+        sync_module.KnowledgeBaseService: KBService(),
+        sync_module.AgentRAGServiceManager: rag,
+        sync_module.ZendeskSyncRepository: repo,
+        sync_module.DataSourceService: DataSources(),
+    }
+    monkeypatch.setattr(sync_module, "injector", SimpleNamespace(get=services.__getitem__))
+    monkeypatch.setattr(sync_module, "KBCreate", dict)
+    monkeypatch.setattr(sync_module, "ZendeskConnector", FakeConnector)
+    for attribute in ("articles", "changes", "calls"):
+        monkeypatch.setattr(FakeConnector, attribute, [])
+    return SimpleNamespace(kb=kb, repo=repo, rag=rag)
+
+
+@pytest.mark.asyncio
+async def test_watermark_advances_only_when_every_change_is_applied(sync_env):
+    kb, repo, rag = sync_env.kb, sync_env.repo, sync_env.rag
+    FakeConnector.articles = [{"id": 1, "title": "Returns", "updated_at": "2026-01-01T00:00:00Z"}]
+
+    before = datetime.now(timezone.utc)
+    await sync_module.import_zendesk_articles_to_kb_async(kb.id)
+
+    assert FakeConnector.calls == [("full", None)]
+    assert repo.state.last_full_sync >= before
+    # A full listing overlaps its watermark with the time it took
+    assert repo.state.watermark <= int(before.timestamp())
+    assert repo.versions == {"1": "2026-01-01T00:00:00Z"}
+    full_watermark = repo.state.watermark
+
+    FakeConnector.changes = [{"id": 1, "title": "Returns v2", "updated_at": "2026-02-01T00:00:00Z"},
+                             {"id": 2, "title": "Shipping", "updated_at": "2026-02-01T00:00:00Z"}]
+    rag.fail = {f"KB:{kb.id}#article_2"}
+    await sync_module.import_zendesk_articles_to_kb_async(kb.id)
+
+    # Article 2 failed: the next run exports from the same watermark again
+    assert FakeConnector.calls[-1] == ("incremental", full_watermark)
+    assert repo.state.watermark == full_watermark
+    assert rag.documents[f"KB:{kb.id}#article_1"].startswith("Returns v2")
+
+    rag.fail = set()
+    await sync_module.import_zendesk_articles_to_kb_async(kb.id)
+
+    assert FakeConnector.calls[-1] == ("incremental", full_watermark)
+    assert repo.state.watermark == 5000
+    assert set(repo.versions) == {"1", "2"}
+
+
+@pytest.mark.asyncio
+async def test_full_sync_runs_again_after_the_interval(sync_env):
+    sync_env.repo.state = SimpleNamespace(
+        watermark=100,
+        last_full_sync=datetime.now(timezone.utc) - timedelta(hours=settings.ZENDESK_FULL_SYNC_INTERVAL_HOURS + 1),
+    )
+
+    await sync_module.import_zendesk_articles_to_kb_async(sync_env.kb.id)
+
+    assert FakeConnector.calls == [("full", None)]